@@ -0,0 +1,80 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def help():
+    print("example_multithreading.py <path to dir with FaceEngine*.so> <path to image> [max threads] [iterations]")
+    print("example of using: python3 example_multithreading.py build images/Cameron_Diaz.jpg 8 64")
+
+if len(sys.argv) < 3:
+    help()
+    exit(1)
+
+# if FaceEngine is not installed pass the path to dir with FaceEngine*.so and add it to system paths
+sys.path.append(sys.argv[1])
+import FaceEngine as fe
+from example_license import make_activation
+
+
+# SDK objects are not shared between threads: every worker creates its own detector, warper and extractor
+_thread_data = threading.local()
+
+
+def get_workers():
+    if not hasattr(_thread_data, "detector"):
+        _thread_data.detector = face_engine.createDetector(fe.FACE_DET_V3)
+        _thread_data.warper = face_engine.createWarper()
+        _thread_data.extractor = face_engine.createExtractor()
+        _thread_data.descriptor = face_engine.createDescriptor()
+    return _thread_data
+
+
+def process(image):
+    # detect, warp and extract release the GIL, so python threads run them in parallel
+    workers = get_workers()
+    err, face = workers.detector.detectOne(image, image.getRect(), fe.DetectionType(fe.dt5Landmarks))
+    if err.isError or not face.isValid():
+        return False
+    transformation = workers.warper.createTransformation(face.detection, face.landmarks5_opt.value())
+    err, warp = workers.warper.warp(image, transformation)
+    if err.isError:
+        return False
+    err, _ = workers.extractor.extractFromWarpedImage(warp, workers.descriptor)
+    return err.isOk
+
+
+def benchmark(image, thread_count, iterations):
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        # warm up every worker so that creation of SDK objects is not measured
+        list(executor.map(process, [image] * thread_count))
+        start = time.perf_counter()
+        results = list(executor.map(process, [image] * iterations))
+        elapsed = time.perf_counter() - start
+    return sum(results), iterations / elapsed
+
+
+if __name__ == "__main__":
+    max_threads = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    iterations = int(sys.argv[4]) if len(sys.argv) > 4 else 64
+    # correct path or put directory "data" with example.py
+    face_engine = fe.createFaceEngine("data")
+    if not make_activation(face_engine):
+        print("failed to activate license!")
+        exit(-1)
+    image = fe.Image()
+    err = image.load(sys.argv[2], fe.FormatType.R8G8B8)
+    if err.isError:
+        print("Failed to load image {0}, reason: {1}".format(sys.argv[2], err.what))
+        exit(1)
+
+    base_throughput = None
+    thread_count = 1
+    while thread_count <= max_threads:
+        succeeded, throughput = benchmark(image, thread_count, iterations)
+        if base_throughput is None:
+            base_throughput = throughput
+        print("threads: {0:3d}, processed: {1}/{2}, throughput: {3:8.2f} images/s, speedup: {4:.2f}x".format(
+            thread_count, succeeded, iterations, throughput, throughput / base_throughput))
+        thread_count *= 2
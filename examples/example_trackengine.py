@@ -28,7 +28,10 @@ if __name__ == "__main__":
     if not image.isValid():
         print("Image error = ", err_image_loaded)
         exit(-1)
-    stream = trackEngine.createStream()
+    # callbacks are buffered in a ring buffer of 1024 items, the oldest ones are dropped if nobody takes them
+    stream = trackEngine.createStream(1024, te.opDropOldest)
+    # one descriptor aggregated from 3 best shots is attached to the ctTrackEnd callback of every track
+    stream.setTrackDescriptorExtraction(faceEngine, faceEngine.createWarper(), faceEngine.createExtractor(), 3)
     for x in range(0, 20):
         if not stream.pushFrame(image, x):
             print("push error {0}".format(x))
@@ -36,6 +39,9 @@ if __name__ == "__main__":
     print("All frames are pushed")
     stream.waitStream()
     clb = stream.getCallbacks()
+    print("Dropped callbacks: {0}".format(stream.getDroppedCallbackCount()))
     for c in clb:
         if c.type == te.ctVisual:
             print("have callback {0} {1}".format(c.frameId, c.trackId))
+        elif c.type == te.ctTrackEnd and c.descriptor is not None:
+            print("track {0} descriptor score {1}".format(c.trackId, c.descriptorScore))
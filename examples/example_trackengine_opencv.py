@@ -56,15 +56,20 @@ if __name__ == "__main__":
         print("failed to activate license!")
         exit(-1)
     trackEngine = te.createTrackEngine(faceEngine, "data/trackengine.conf")
-    stream = trackEngine.createStream()
+    # only bboxes of visual callbacks are drawn, frames are not attached to them
+    stream = trackEngine.createStream(visualImageMode=te.vimNone)
+    # only best shots better than the previous ones of the track reach python
+    stream.setBestShotFilter(minScore=0.5, topN=1)
     x = 0
     while True:
         # Capture frame-by-frame
         ret, frame = cap.read()
 
-        image = fe.Image()
-        rgbframe = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        image.setData(rgbframe, fe.FormatType.R8G8B8)
+        # convert the frame directly into memory of a new image: one pass without intermediate copies.
+        # The image owns its memory, so the stream can keep it after pushFrame returns.
+        height, width, _ = frame.shape
+        image = fe.Image(width, height, fe.FormatType.R8G8B8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=image.getData())
 
         if not stream.pushFrame(image, x):
             print("push error {0}".format(x))
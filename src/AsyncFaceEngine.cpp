@@ -0,0 +1,476 @@
+#include "AsyncFaceEngine.hpp"
+#include "BatchedCalls.hpp"
+#include "ErrorsAdapter.hpp"
+#include "OwnedImage.hpp"
+
+#include <pybind11/stl.h>
+
+#include <algorithm>
+#include <stdexcept>
+
+AsyncExecutor::AsyncExecutor(size_t threadCount, size_t maxQueueSize, size_t maxBatchSize) :
+	m_maxQueueSize(std::max<size_t>(maxQueueSize, 1)),
+	m_maxBatchSize(std::max<size_t>(maxBatchSize, 1)),
+	m_stop(false) {
+	if (threadCount == 0)
+		threadCount = std::max(std::thread::hardware_concurrency(), 1u);
+	m_workers.reserve(threadCount);
+	for (size_t i = 0; i < threadCount; ++i)
+		m_workers.emplace_back([this] { run(); });
+}
+
+AsyncExecutor::~AsyncExecutor() {
+	close();
+}
+
+py::object AsyncExecutor::submit(std::shared_ptr<AsyncRequest> request) {
+	py::module asyncio = py::module::import("asyncio");
+	py::object loop;
+	try {
+		loop = asyncio.attr("get_running_loop")();
+	} catch (py::error_already_set&) {
+		loop = asyncio.attr("get_event_loop")();
+	}
+	py::object future = loop.attr("create_future")();
+	request->loop = loop;
+	request->future = future;
+	{
+		std::lock_guard<std::mutex> lock(m_mutex);
+		if (m_stop)
+			throw std::runtime_error("AsyncFaceEngine is closed");
+		if (m_queue.size() >= m_maxQueueSize)
+			throw std::runtime_error("AsyncFaceEngine queue is full");
+		m_queue.push_back(request);
+	}
+	m_condition.notify_one();
+	return future;
+}
+
+void AsyncExecutor::close() {
+	std::deque<std::shared_ptr<AsyncRequest>> pending;
+	{
+		std::lock_guard<std::mutex> lock(m_mutex);
+		if (m_stop)
+			return;
+		m_stop = true;
+		pending.swap(m_queue);
+	}
+	m_condition.notify_all();
+	{
+		// workers need the GIL to complete requests they are executing
+		py::gil_scoped_release release;
+		for (std::thread& worker : m_workers)
+			worker.join();
+	}
+	for (const std::shared_ptr<AsyncRequest>& request : pending) {
+		try {
+			request->loop.attr("call_soon_threadsafe")(request->future.attr("cancel"));
+		} catch (py::error_already_set&) {
+			// event loop is already closed
+		}
+	}
+}
+
+size_t AsyncExecutor::getQueueSize() {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	return m_queue.size();
+}
+
+size_t AsyncExecutor::getMaxQueueSize() const {
+	return m_maxQueueSize;
+}
+
+size_t AsyncExecutor::getMaxBatchSize() const {
+	return m_maxBatchSize;
+}
+
+void AsyncExecutor::run() {
+	for (;;) {
+		std::vector<std::shared_ptr<AsyncRequest>> group;
+		{
+			std::unique_lock<std::mutex> lock(m_mutex);
+			m_condition.wait(lock, [this] { return m_stop || !m_queue.empty(); });
+			if (m_stop)
+				return;
+			group.push_back(m_queue.front());
+			m_queue.pop_front();
+			for (auto it = m_queue.begin(); it != m_queue.end() && group.size() < m_maxBatchSize;) {
+				if (group.front()->canBatchWith(**it)) {
+					group.push_back(*it);
+					it = m_queue.erase(it);
+				} else {
+					++it;
+				}
+			}
+		}
+		std::vector<AsyncRequest*> requests;
+		for (const std::shared_ptr<AsyncRequest>& request : group)
+			requests.push_back(request.get());
+		std::string error;
+		try {
+			group.front()->execute(requests);
+		} catch (const std::exception& e) {
+			error = e.what();
+		}
+		complete(group, error);
+	}
+}
+
+void AsyncExecutor::complete(std::vector<std::shared_ptr<AsyncRequest>>& group, const std::string& error) {
+	py::gil_scoped_acquire acquire;
+	for (const std::shared_ptr<AsyncRequest>& request : group) {
+		py::object value;
+		bool isError = !error.empty();
+		try {
+			if (!isError)
+				value = request->result();
+		} catch (const std::exception& e) {
+			isError = true;
+			value = py::module::import("builtins").attr("RuntimeError")(e.what());
+		}
+		if (isError && !value)
+			value = py::module::import("builtins").attr("RuntimeError")(error);
+		const py::object future = request->future;
+		py::cpp_function callback([future, value, isError]() {
+			// future might be cancelled by the caller meanwhile
+			if (future.attr("done")().cast<bool>())
+				return;
+			future.attr(isError ? "set_exception" : "set_result")(value);
+		});
+		try {
+			request->loop.attr("call_soon_threadsafe")(callback);
+		} catch (py::error_already_set&) {
+			// event loop is already closed, nobody waits for the result
+		}
+	}
+	// python objects of requests are released while the GIL is held
+	group.clear();
+}
+
+namespace {
+
+	class DetectRequest : public AsyncRequest {
+	public:
+		DetectRequest(
+			fsdk::IDetectorPtr detector,
+			std::shared_ptr<std::mutex> mutex,
+			const std::vector<fsdk::Image>& images,
+			const std::vector<fsdk::Rect>& rectangles,
+			uint32_t detectionPerImageNum,
+			fsdk::DetectionType type) :
+			detector(detector),
+			mutex(mutex),
+			images(images),
+			rectangles(rectangles),
+			detectionPerImageNum(detectionPerImageNum),
+			type(type),
+			error(fsdk::FSDKError::Ok) {
+			// requests are executed after the call returns, borrowed images may be freed by then
+			for (fsdk::Image& image : this->images)
+				image = ownedImage(image);
+		}
+
+		bool canBatchWith(const AsyncRequest& other) const override {
+			const DetectRequest* request = dynamic_cast<const DetectRequest*>(&other);
+			return request &&
+				request->detector.get() == detector.get() &&
+				request->detectionPerImageNum == detectionPerImageNum &&
+				request->type == type;
+		}
+
+		void execute(const std::vector<AsyncRequest*>& group) override {
+			std::vector<fsdk::Image> allImages;
+			std::vector<fsdk::Rect> allRectangles;
+			for (AsyncRequest* item : group) {
+				DetectRequest* request = static_cast<DetectRequest*>(item);
+				allImages.insert(allImages.end(), request->images.begin(), request->images.end());
+				allRectangles.insert(allRectangles.end(), request->rectangles.begin(), request->rectangles.end());
+			}
+			std::vector<BatchedDetection> results;
+			{
+				std::lock_guard<std::mutex> lock(*mutex);
+				results = detectBatched(detector, allImages, allRectangles, detectionPerImageNum, type);
+			}
+
+			size_t offset = 0;
+			for (AsyncRequest* item : group) {
+				DetectRequest* request = static_cast<DetectRequest*>(item);
+				request->error = fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Ok);
+				request->faces.resize(request->images.size());
+				for (size_t i = 0; i < request->images.size(); ++i) {
+					BatchedDetection& detection = results[offset + i];
+					// the request fails as a whole as it does when detected alone
+					if (detection.error.isError() && request->error.isOk())
+						request->error = detection.error;
+					request->faces[i].swap(detection.faces);
+				}
+				if (request->error.isError())
+					request->faces.clear();
+				offset += request->images.size();
+			}
+		}
+
+		py::object result() override {
+			return py::make_tuple(FSDKErrorResult(error), faces);
+		}
+
+	private:
+		fsdk::IDetectorPtr detector;
+		std::shared_ptr<std::mutex> mutex;
+		std::vector<fsdk::Image> images;
+		std::vector<fsdk::Rect> rectangles;
+		uint32_t detectionPerImageNum;
+		fsdk::DetectionType type;
+		fsdk::Result<fsdk::FSDKError> error;
+		std::vector<std::vector<fsdk::Face>> faces;
+	};
+
+	class ExtractRequest : public AsyncRequest {
+	public:
+		ExtractRequest(
+			fsdk::IFaceEnginePtr faceEngine,
+			fsdk::IDescriptorExtractorPtr extractor,
+			std::shared_ptr<std::mutex> mutex,
+			const fsdk::Image& warp) :
+			faceEngine(faceEngine),
+			extractor(extractor),
+			mutex(mutex),
+			warp(ownedImage(warp)),
+			error(fsdk::FSDKError::Ok),
+			score(0.f)
+		{}
+
+		bool canBatchWith(const AsyncRequest& other) const override {
+			const ExtractRequest* request = dynamic_cast<const ExtractRequest*>(&other);
+			return request && request->extractor.get() == extractor.get();
+		}
+
+		void execute(const std::vector<AsyncRequest*>& group) override {
+			std::vector<fsdk::Image> warps;
+			for (AsyncRequest* item : group)
+				warps.push_back(static_cast<ExtractRequest*>(item)->warp);
+			std::vector<BatchedExtraction> results;
+			{
+				std::lock_guard<std::mutex> lock(*mutex);
+				results = extractBatched(faceEngine, extractor, warps);
+			}
+			for (size_t i = 0; i < group.size(); ++i) {
+				ExtractRequest* request = static_cast<ExtractRequest*>(group[i]);
+				request->error = results[i].error;
+				request->score = results[i].garbageScore;
+				request->descriptor = results[i].descriptor;
+			}
+		}
+
+		py::object result() override {
+			return py::make_tuple(FSDKErrorResult(error), descriptor, score);
+		}
+
+	private:
+		fsdk::IFaceEnginePtr faceEngine;
+		fsdk::IDescriptorExtractorPtr extractor;
+		std::shared_ptr<std::mutex> mutex;
+		fsdk::Image warp;
+		fsdk::Result<fsdk::FSDKError> error;
+		fsdk::IDescriptorPtr descriptor;
+		float score;
+	};
+
+	class MatchRequest : public AsyncRequest {
+	public:
+		MatchRequest(
+			fsdk::IDescriptorMatcherPtr matcher,
+			std::shared_ptr<std::mutex> mutex,
+			fsdk::IDescriptorPtr reference,
+			fsdk::IDescriptorPtr candidate,
+			fsdk::IDescriptorBatchPtr candidates) :
+			matcher(matcher),
+			mutex(mutex),
+			reference(reference),
+			candidate(candidate),
+			candidates(candidates),
+			error(fsdk::FSDKError::Ok)
+		{}
+
+		void execute(const std::vector<AsyncRequest*>& /*group*/) override {
+			std::lock_guard<std::mutex> lock(*mutex);
+			if (candidates) {
+				results.resize(candidates->getCount());
+				error = matcher->match(reference, candidates, results.data());
+				if (error.isError())
+					results.clear();
+				return;
+			}
+			fsdk::ResultValue<fsdk::FSDKError, fsdk::MatchingResult> err = matcher->match(reference, candidate);
+			error = err;
+			results.assign(1, err.isOk() ? err.getValue() : fsdk::MatchingResult());
+		}
+
+		py::object result() override {
+			if (candidates)
+				return py::make_tuple(FSDKErrorResult(error), results);
+			return py::make_tuple(FSDKErrorResult(error), results.front());
+		}
+
+	private:
+		fsdk::IDescriptorMatcherPtr matcher;
+		std::shared_ptr<std::mutex> mutex;
+		fsdk::IDescriptorPtr reference;
+		fsdk::IDescriptorPtr candidate;
+		fsdk::IDescriptorBatchPtr candidates;
+		fsdk::Result<fsdk::FSDKError> error;
+		std::vector<fsdk::MatchingResult> results;
+	};
+
+	class SearchRequest : public AsyncRequest {
+	public:
+		SearchRequest(
+			IndexSearchFunction search,
+			std::shared_ptr<std::mutex> mutex,
+			fsdk::IDescriptorPtr reference,
+			int maxResultsCount) :
+			search(search),
+			mutex(mutex),
+			reference(reference),
+			maxResultsCount(maxResultsCount),
+			error(fsdk::FSDKError::Ok)
+		{}
+
+		void execute(const std::vector<AsyncRequest*>& /*group*/) override {
+			results.resize(std::max(maxResultsCount, 0));
+			std::lock_guard<std::mutex> lock(*mutex);
+			fsdk::ResultValue<fsdk::FSDKError, int> err = search(reference, maxResultsCount, results.data());
+			error = err;
+			results.resize(err.isOk() ? err.getValue() : 0);
+		}
+
+		py::object result() override {
+			return py::make_tuple(FSDKErrorResult(error), results);
+		}
+
+	private:
+		IndexSearchFunction search;
+		std::shared_ptr<std::mutex> mutex;
+		fsdk::IDescriptorPtr reference;
+		int maxResultsCount;
+		fsdk::Result<fsdk::FSDKError> error;
+		std::vector<fsdk::SearchResult> results;
+	};
+
+} // namespace
+
+PyAsyncDetector::PyAsyncDetector(std::shared_ptr<AsyncExecutor> executor, fsdk::IDetectorPtr detector) :
+	executor(executor),
+	detector(detector),
+	mutex(std::make_shared<std::mutex>())
+{}
+
+py::object PyAsyncDetector::detect(
+	const std::vector<fsdk::Image>& images,
+	const std::vector<fsdk::Rect>& rectangles,
+	uint32_t detectionPerImageNum,
+	fsdk::DetectionType type) {
+	if (images.size() != rectangles.size())
+		throw py::value_error("detect_async: images and rectangles must be of the same size");
+	return executor->submit(std::make_shared<DetectRequest>(
+		detector,
+		mutex,
+		images,
+		rectangles,
+		detectionPerImageNum,
+		type));
+}
+
+PyAsyncExtractor::PyAsyncExtractor(
+	std::shared_ptr<AsyncExecutor> executor,
+	fsdk::IFaceEnginePtr faceEngine,
+	fsdk::IDescriptorExtractorPtr extractor) :
+	executor(executor),
+	faceEngine(faceEngine),
+	extractor(extractor),
+	mutex(std::make_shared<std::mutex>())
+{}
+
+py::object PyAsyncExtractor::extract(const fsdk::Image& warp) {
+	return executor->submit(std::make_shared<ExtractRequest>(faceEngine, extractor, mutex, warp));
+}
+
+PyAsyncMatcher::PyAsyncMatcher(std::shared_ptr<AsyncExecutor> executor, fsdk::IDescriptorMatcherPtr matcher) :
+	executor(executor),
+	matcher(matcher),
+	mutex(std::make_shared<std::mutex>())
+{}
+
+py::object PyAsyncMatcher::match(const fsdk::IDescriptorPtr& first, const fsdk::IDescriptorPtr& second) {
+	return executor->submit(std::make_shared<MatchRequest>(matcher, mutex, first, second, fsdk::IDescriptorBatchPtr()));
+}
+
+py::object PyAsyncMatcher::match(const fsdk::IDescriptorPtr& reference, const fsdk::IDescriptorBatchPtr& candidates) {
+	return executor->submit(std::make_shared<MatchRequest>(matcher, mutex, reference, fsdk::IDescriptorPtr(), candidates));
+}
+
+PyAsyncIndex::PyAsyncIndex(std::shared_ptr<AsyncExecutor> executor, IndexSearchFunction search) :
+	executor(executor),
+	searchFunction(search),
+	mutex(std::make_shared<std::mutex>())
+{}
+
+py::object PyAsyncIndex::search(const fsdk::IDescriptorPtr& reference, int maxResultsCount) {
+	return executor->submit(std::make_shared<SearchRequest>(searchFunction, mutex, reference, maxResultsCount));
+}
+
+PyAsyncFaceEngine::PyAsyncFaceEngine(
+	PyIFaceEngine& pyIFaceEngine,
+	size_t threadCount,
+	size_t maxQueueSize,
+	size_t maxBatchSize) :
+	faceEngine(pyIFaceEngine),
+	executor(std::make_shared<AsyncExecutor>(threadCount, maxQueueSize, maxBatchSize))
+{}
+
+PyAsyncDetector PyAsyncFaceEngine::createDetector(fsdk::ObjectDetectorClassType type) {
+	return PyAsyncDetector(executor, faceEngine.createDetector(type));
+}
+
+PyAsyncExtractor PyAsyncFaceEngine::createExtractor(uint32_t version) {
+	return PyAsyncExtractor(executor, faceEngine.faceEnginePtr, faceEngine.createExtractor(version));
+}
+
+PyAsyncMatcher PyAsyncFaceEngine::createMatcher(uint32_t version) {
+	return PyAsyncMatcher(executor, faceEngine.createMatcher(version));
+}
+
+template<typename IndexPtr>
+static IndexSearchFunction makeSearchFunction(const IndexPtr& index) {
+	return [index](const fsdk::IDescriptorPtr& reference, int maxResultsCount, fsdk::SearchResult* results) {
+		return index->search(reference, maxResultsCount, results);
+	};
+}
+
+PyAsyncIndex PyAsyncFaceEngine::wrapIndex(const fsdk::IIndexPtr& index) {
+	return PyAsyncIndex(executor, makeSearchFunction(index));
+}
+
+PyAsyncIndex PyAsyncFaceEngine::wrapIndex(const fsdk::IDenseIndexPtr& index) {
+	return PyAsyncIndex(executor, makeSearchFunction(index));
+}
+
+PyAsyncIndex PyAsyncFaceEngine::wrapIndex(const fsdk::IDynamicIndexPtr& index) {
+	return PyAsyncIndex(executor, makeSearchFunction(index));
+}
+
+void PyAsyncFaceEngine::close() {
+	executor->close();
+}
+
+size_t PyAsyncFaceEngine::getQueueSize() {
+	return executor->getQueueSize();
+}
+
+size_t PyAsyncFaceEngine::getMaxQueueSize() const {
+	return executor->getMaxQueueSize();
+}
+
+size_t PyAsyncFaceEngine::getMaxBatchSize() const {
+	return executor->getMaxBatchSize();
+}
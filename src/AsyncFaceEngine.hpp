@@ -0,0 +1,165 @@
+#pragma once
+
+#include <pybind11/pybind11.h>
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+namespace py = pybind11;
+
+// Request executed by AsyncExecutor. Inputs are converted to C++ objects before submission,
+// future and loop are the only python objects and are released by the executor with the GIL.
+class AsyncRequest {
+public:
+	virtual ~AsyncRequest() {}
+
+	// Whether other request can be executed by the same SDK call as this one
+	virtual bool canBatchWith(const AsyncRequest& /*other*/) const {
+		return false;
+	}
+
+	// Executes group of requests, the first one of group is this. Called without the GIL.
+	virtual void execute(const std::vector<AsyncRequest*>& group) = 0;
+
+	// Result of executed request. Called with the GIL.
+	virtual py::object result() = 0;
+
+	py::object future;
+	py::object loop;
+};
+
+// Pool of native workers completing asyncio futures. The queue is bounded: submission fails when it is full,
+// so callers get backpressure instead of unbounded memory growth. A worker takes the oldest request
+// together with queued requests that can be batched with it, up to maxBatchSize.
+class AsyncExecutor {
+public:
+	AsyncExecutor(size_t threadCount, size_t maxQueueSize, size_t maxBatchSize);
+
+	~AsyncExecutor();
+
+	// Creates future of the current event loop and queues request. Must be called with the GIL.
+	py::object submit(std::shared_ptr<AsyncRequest> request);
+
+	// Stops workers and cancels queued requests. Must be called with the GIL.
+	void close();
+
+	size_t getQueueSize();
+
+	size_t getMaxQueueSize() const;
+
+	size_t getMaxBatchSize() const;
+
+private:
+	void run();
+
+	void complete(std::vector<std::shared_ptr<AsyncRequest>>& group, const std::string& error);
+
+	std::vector<std::thread> m_workers;
+	std::deque<std::shared_ptr<AsyncRequest>> m_queue;
+	std::mutex m_mutex;
+	std::condition_variable m_condition;
+	size_t m_maxQueueSize;
+	size_t m_maxBatchSize;
+	bool m_stop;
+};
+
+// Async facades over SDK objects. SDK calls of one facade are serialized, requests queued
+// at the same time are coalesced into batch calls.
+class PyAsyncDetector {
+public:
+	PyAsyncDetector(std::shared_ptr<AsyncExecutor> executor, fsdk::IDetectorPtr detector);
+
+	py::object detect(
+		const std::vector<fsdk::Image>& images,
+		const std::vector<fsdk::Rect>& rectangles,
+		uint32_t detectionPerImageNum,
+		fsdk::DetectionType type);
+
+private:
+	std::shared_ptr<AsyncExecutor> executor;
+	fsdk::IDetectorPtr detector;
+	std::shared_ptr<std::mutex> mutex;
+};
+
+class PyAsyncExtractor {
+public:
+	PyAsyncExtractor(
+		std::shared_ptr<AsyncExecutor> executor,
+		fsdk::IFaceEnginePtr faceEngine,
+		fsdk::IDescriptorExtractorPtr extractor);
+
+	py::object extract(const fsdk::Image& warp);
+
+private:
+	std::shared_ptr<AsyncExecutor> executor;
+	fsdk::IFaceEnginePtr faceEngine;
+	fsdk::IDescriptorExtractorPtr extractor;
+	std::shared_ptr<std::mutex> mutex;
+};
+
+class PyAsyncMatcher {
+public:
+	PyAsyncMatcher(std::shared_ptr<AsyncExecutor> executor, fsdk::IDescriptorMatcherPtr matcher);
+
+	py::object match(const fsdk::IDescriptorPtr& first, const fsdk::IDescriptorPtr& second);
+
+	py::object match(const fsdk::IDescriptorPtr& reference, const fsdk::IDescriptorBatchPtr& candidates);
+
+private:
+	std::shared_ptr<AsyncExecutor> executor;
+	fsdk::IDescriptorMatcherPtr matcher;
+	std::shared_ptr<std::mutex> mutex;
+};
+
+typedef std::function<fsdk::ResultValue<fsdk::FSDKError, int>(
+	const fsdk::IDescriptorPtr&, int, fsdk::SearchResult*)> IndexSearchFunction;
+
+class PyAsyncIndex {
+public:
+	PyAsyncIndex(std::shared_ptr<AsyncExecutor> executor, IndexSearchFunction search);
+
+	py::object search(const fsdk::IDescriptorPtr& reference, int maxResultsCount);
+
+private:
+	std::shared_ptr<AsyncExecutor> executor;
+	IndexSearchFunction searchFunction;
+	std::shared_ptr<std::mutex> mutex;
+};
+
+class PyAsyncFaceEngine {
+public:
+	PyAsyncFaceEngine(PyIFaceEngine& pyIFaceEngine, size_t threadCount, size_t maxQueueSize, size_t maxBatchSize);
+
+	PyAsyncDetector createDetector(fsdk::ObjectDetectorClassType type);
+
+	PyAsyncExtractor createExtractor(uint32_t version);
+
+	PyAsyncMatcher createMatcher(uint32_t version);
+
+	PyAsyncIndex wrapIndex(const fsdk::IIndexPtr& index);
+
+	PyAsyncIndex wrapIndex(const fsdk::IDenseIndexPtr& index);
+
+	// The dynamic index must not be modified while searches of the wrapper are queued or executed
+	PyAsyncIndex wrapIndex(const fsdk::IDynamicIndexPtr& index);
+
+	void close();
+
+	size_t getQueueSize();
+
+	size_t getMaxQueueSize() const;
+
+	size_t getMaxBatchSize() const;
+
+private:
+	PyIFaceEngine faceEngine;
+	std::shared_ptr<AsyncExecutor> executor;
+};
@@ -0,0 +1,85 @@
+#include "BatchedCalls.hpp"
+
+std::vector<BatchedDetection> detectBatched(
+	const fsdk::IDetectorPtr& detector,
+	const std::vector<fsdk::Image>& images,
+	const std::vector<fsdk::Rect>& rectangles,
+	uint32_t detectionPerImageNum,
+	fsdk::DetectionType type) {
+	std::vector<BatchedDetection> results(images.size());
+	if (images.empty())
+		return results;
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::Ref<fsdk::IResultBatch<fsdk::Face>>> err = detector->detect(
+		fsdk::Span<const fsdk::Image>(images),
+		fsdk::Span<const fsdk::Rect>(rectangles),
+		detectionPerImageNum,
+		type);
+	if (err.isError() && images.size() > 1) {
+		for (size_t i = 0; i < images.size(); ++i)
+			results[i] = detectBatched(
+				detector,
+				std::vector<fsdk::Image>(1, images[i]),
+				std::vector<fsdk::Rect>(1, rectangles[i]),
+				detectionPerImageNum,
+				type).front();
+		return results;
+	}
+	for (size_t i = 0; i < images.size(); ++i) {
+		results[i].error = err;
+		if (err.isError())
+			continue;
+		fsdk::Span<fsdk::Face> faces = err.getValue()->getResults(i);
+		results[i].faces.assign(faces.data(), faces.data() + faces.size());
+	}
+	return results;
+}
+
+std::vector<BatchedExtraction> extractBatched(
+	const fsdk::IFaceEnginePtr& faceEngine,
+	const fsdk::IDescriptorExtractorPtr& extractor,
+	const std::vector<fsdk::Image>& warps) {
+	const uint32_t count = static_cast<uint32_t>(warps.size());
+	const uint32_t version = extractor->getModelVersion();
+	std::vector<BatchedExtraction> results(count);
+	if (count == 1) {
+		results[0].descriptor = fsdk::acquire(faceEngine->createDescriptor(version));
+		if (!results[0].descriptor) {
+			results[0].error = fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Internal);
+			return results;
+		}
+		fsdk::ResultValue<fsdk::FSDKError, float> err = extractor->extractFromWarpedImage(
+			warps[0],
+			results[0].descriptor);
+		results[0].error = err;
+		results[0].garbageScore = err.isOk() ? err.getValue() : 0.f;
+		return results;
+	}
+	if (count == 0)
+		return results;
+
+	fsdk::IDescriptorBatchPtr batch = fsdk::acquire(faceEngine->createDescriptorBatch(
+		static_cast<int32_t>(count),
+		version));
+	if (!batch) {
+		for (BatchedExtraction& result : results)
+			result.error = fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Internal);
+		return results;
+	}
+	std::vector<float> garbageScores(count);
+	fsdk::Result<fsdk::FSDKError> err = extractor->extractFromWarpedImageBatch(
+		warps.data(),
+		batch,
+		garbageScores.data(),
+		count);
+	if (err.isError()) {
+		for (uint32_t i = 0; i < count; ++i)
+			results[i] = extractBatched(faceEngine, extractor, std::vector<fsdk::Image>(1, warps[i])).front();
+		return results;
+	}
+	for (uint32_t i = 0; i < count; ++i) {
+		results[i].error = err;
+		results[i].garbageScore = garbageScores[i];
+		results[i].descriptor = fsdk::acquire(batch->getDescriptorSlow(i));
+	}
+	return results;
+}
@@ -0,0 +1,38 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+
+#include <vector>
+
+// Detection result of one image of a batched call
+struct BatchedDetection {
+	BatchedDetection() : error(fsdk::FSDKError::Ok) {}
+
+	fsdk::Result<fsdk::FSDKError> error;
+	std::vector<fsdk::Face> faces;
+};
+
+// Extraction result of one warp of a batched call
+struct BatchedExtraction {
+	BatchedExtraction() : error(fsdk::FSDKError::Ok), garbageScore(0.f) {}
+
+	fsdk::Result<fsdk::FSDKError> error;
+	fsdk::IDescriptorPtr descriptor;
+	float garbageScore;
+};
+
+// Detects faces on all images by one call of the detector and returns results in order of images.
+// One bad image fails the whole call, then every image is detected alone to find out which ones are wrong.
+std::vector<BatchedDetection> detectBatched(
+	const fsdk::IDetectorPtr& detector,
+	const std::vector<fsdk::Image>& images,
+	const std::vector<fsdk::Rect>& rectangles,
+	uint32_t detectionPerImageNum,
+	fsdk::DetectionType type);
+
+// Extracts descriptors of all warps by one call of the extractor and returns results in order of warps.
+// One bad warp fails the whole call, then every warp is extracted alone to find out which ones are wrong.
+std::vector<BatchedExtraction> extractBatched(
+	const fsdk::IFaceEnginePtr& faceEngine,
+	const fsdk::IDescriptorExtractorPtr& extractor,
+	const std::vector<fsdk::Image>& warps);
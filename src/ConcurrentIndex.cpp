@@ -0,0 +1,354 @@
+#include "ConcurrentIndex.hpp"
+#include "TopK.hpp"
+#include "helpers.hpp"
+
+#include <algorithm>
+#include <limits>
+
+namespace {
+	// pending segments smaller than this are extended by copying on append, so searches match a few batches
+	// instead of one per appended descriptor
+	const size_t pendingChunkSize = 64;
+
+	fsdk::Result<fsdk::FSDKError> makeError(fsdk::FSDKError error) {
+		return fsdk::Result<fsdk::FSDKError>(error);
+	}
+
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> makeIdError(fsdk::FSDKError error) {
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(error, 0);
+	}
+}
+
+fsdk::ResultValue<fsdk::FSDKError, int> PyConcurrentIndexSnapshot::search(
+	const fsdk::IDescriptorPtr& reference,
+	int maxResultsCount,
+	fsdk::SearchResult* results) const {
+	if (!reference || maxResultsCount <= 0)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::InvalidInput, 0);
+
+	const size_t k = static_cast<size_t>(maxResultsCount);
+	TopK<fsdk::SearchResult, MoreSimilar> best(k);
+	std::vector<fsdk::SearchResult> found;
+	std::vector<fsdk::MatchingResult> matches;
+	// snapshots are searched from many threads at once, so every search matches by a matcher of its own
+	fsdk::IDescriptorMatcherPtr matcher;
+	for (const std::shared_ptr<const Segment>& segment : m_segments) {
+		if (segment->index) {
+			// search of a dynamic index without indexed descriptors fails
+			if (segment->indexedCount == 0)
+				continue;
+			const fsdk::Result<fsdk::FSDKError> err = searchSegment(*segment, reference, k, found);
+			if (err.isError())
+				return fsdk::ResultValue<fsdk::FSDKError, int>(err.getError(), 0);
+			for (const fsdk::SearchResult& result : found)
+				best.push(result);
+			continue;
+		}
+		if (!matcher) {
+			matcher = fsdk::acquire(m_faceEngine->createMatcher(m_descriptorVersion));
+			if (!matcher)
+				return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Internal, 0);
+		}
+		matches.resize(segment->count);
+		const fsdk::Result<fsdk::FSDKError> err = matcher->match(reference, segment->batch, matches.data());
+		if (err.isError())
+			return fsdk::ResultValue<fsdk::FSDKError, int>(err.getError(), 0);
+		for (size_t i = 0; i < segment->count; ++i) {
+			const fsdk::DescriptorId id = segment->firstId + static_cast<fsdk::DescriptorId>(i);
+			if (!m_removed.test(id))
+				best.push(fsdk::SearchResult(matches[i].distance, matches[i].similarity, id));
+		}
+	}
+	const std::vector<fsdk::SearchResult> merged = best.take();
+	std::copy(merged.begin(), merged.end(), results);
+	return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, static_cast<int>(merged.size()));
+}
+
+fsdk::Result<fsdk::FSDKError> PyConcurrentIndexSnapshot::searchSegment(
+	const Segment& segment,
+	const fsdk::IDescriptorPtr& reference,
+	size_t k,
+	std::vector<fsdk::SearchResult>& found) const {
+	size_t requested = std::min(k, segment.count);
+	std::vector<fsdk::SearchResult> results;
+	for (;;) {
+		results.resize(requested);
+		fsdk::ResultValue<fsdk::FSDKError, int> searched = segment.index->search(
+			reference,
+			static_cast<int>(requested),
+			results.data());
+		if (searched.isError())
+			return makeError(searched.getError());
+		const size_t count = static_cast<size_t>(searched.getValue());
+		found.clear();
+		for (size_t i = 0; i < count; ++i) {
+			fsdk::SearchResult result = results[i];
+			if (result.index >= segment.count)
+				continue;
+			result.index += segment.firstId;
+			if (!m_removed.test(result.index))
+				found.push_back(result);
+		}
+		// the index has no more results if it returned less than requested
+		if (found.size() >= k || count < requested || requested >= segment.count)
+			return makeError(fsdk::FSDKError::Ok);
+		requested = std::min(requested * 2, segment.count);
+	}
+}
+
+fsdk::Result<fsdk::FSDKError> PyConcurrentIndexSnapshot::descriptorByIndex(
+	fsdk::DescriptorId id,
+	const fsdk::IDescriptorPtr& descriptor) const {
+	if (id >= m_size || !descriptor)
+		return makeError(fsdk::FSDKError::InvalidInput);
+	// the last segment starting not after id
+	auto next = std::upper_bound(
+		m_segments.begin(),
+		m_segments.end(),
+		id,
+		[](fsdk::DescriptorId value, const std::shared_ptr<const Segment>& segment) {
+			return value < segment->firstId;
+		});
+	const Segment& segment = **(next - 1);
+	const fsdk::DescriptorId localId = id - segment.firstId;
+	if (segment.index)
+		return segment.index->descriptorByIndex(localId, descriptor);
+
+	fsdk::IDescriptorPtr pending = fsdk::acquire(segment.batch->getDescriptorFast(localId));
+	if (!pending)
+		return makeError(fsdk::FSDKError::Internal);
+	std::vector<uint8_t> data(pending->getDescriptorLength());
+	if (!pending->getDescriptor(data.data()))
+		return makeError(fsdk::FSDKError::Internal);
+	Archive archive(reinterpret_cast<const char*>(data.data()), static_cast<uint32_t>(data.size()));
+	return descriptor->load(&archive, fsdk::ISerializableObject::NoSignature);
+}
+
+PyConcurrentIndex::PyConcurrentIndex(PyIFaceEngine& faceEngine, uint32_t segmentSize) :
+	m_faceEngine(faceEngine),
+	m_segmentSize(segmentSize) {
+}
+
+fsdk::Result<fsdk::FSDKError> PyConcurrentIndex::create(
+	PyIFaceEngine& faceEngine,
+	const fsdk::IDynamicIndexPtr& index,
+	uint32_t segmentSize,
+	uint32_t descriptorVersion,
+	std::shared_ptr<PyConcurrentIndex>& concurrent) {
+	if (!index || segmentSize == 0)
+		return makeError(fsdk::FSDKError::InvalidInput);
+
+	std::shared_ptr<PyConcurrentIndexSnapshot> snapshot = std::make_shared<PyConcurrentIndexSnapshot>();
+	snapshot->m_faceEngine = faceEngine.faceEnginePtr;
+	std::shared_ptr<Segment> base = std::make_shared<Segment>();
+	base->index = index;
+	base->firstId = 0;
+	base->count = index->size();
+	base->indexedCount = index->countOfIndexedDescriptors();
+	snapshot->m_segments.push_back(base);
+	snapshot->m_size = base->count;
+	snapshot->m_indexedCount = base->indexedCount;
+
+	// ids removed from the index are marked as removed, so removing them again keeps the indexed count
+	const size_t removedCount = base->count - base->indexedCount;
+	if (removedCount != 0) {
+		fsdk::IDescriptorPtr descriptor = fsdk::acquire(
+			faceEngine.faceEnginePtr->createDescriptor(descriptorVersion));
+		if (!descriptor)
+			return makeError(fsdk::FSDKError::IncompatibleModelVersions);
+		for (size_t i = 0; i < base->count; ++i) {
+			const fsdk::DescriptorId id = static_cast<fsdk::DescriptorId>(i);
+			if (index->descriptorByIndex(id, descriptor).isError())
+				snapshot->m_removed.set(id);
+		}
+		// descriptors of another version can not be read at all
+		if (snapshot->m_removed.count() != removedCount)
+			return makeError(fsdk::FSDKError::IncompatibleDescriptors);
+	}
+
+	concurrent.reset(new PyConcurrentIndex(faceEngine, segmentSize));
+	concurrent->m_snapshot = snapshot;
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyConcurrentIndex::appendDescriptor(
+	const fsdk::IDescriptorPtr& descriptor) {
+	if (!descriptor)
+		return makeIdError(fsdk::FSDKError::InvalidInput);
+	fsdk::IDescriptorBatchPtr batch = fsdk::acquire(m_faceEngine.faceEnginePtr->createDescriptorBatch(
+		1,
+		descriptor->getModelVersion()));
+	if (!batch)
+		return makeIdError(fsdk::FSDKError::IncompatibleModelVersions);
+	if (batch->add(descriptor).isError())
+		return makeIdError(fsdk::FSDKError::InvalidDescriptor);
+	std::lock_guard<std::mutex> lock(m_mutex);
+	return append(batch);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyConcurrentIndex::appendBatch(
+	const fsdk::IDescriptorBatchPtr& batch) {
+	if (!batch || batch->getCount() == 0)
+		return makeIdError(fsdk::FSDKError::InvalidInput);
+	std::lock_guard<std::mutex> lock(m_mutex);
+	return append(batch);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyConcurrentIndex::append(
+	const fsdk::IDescriptorBatchPtr& batch) {
+	const std::shared_ptr<PyConcurrentIndexSnapshot> current = snapshot();
+	const size_t count = batch->getCount();
+	const uint32_t version = batch->getModelVersion();
+	if (count >= std::numeric_limits<fsdk::DescriptorId>::max() - current->m_size)
+		return makeIdError(fsdk::FSDKError::InvalidInput);
+
+	std::shared_ptr<PyConcurrentIndexSnapshot> next = std::make_shared<PyConcurrentIndexSnapshot>(*current);
+	if (next->m_descriptorVersion == 0) {
+		// searches create matchers of their own, this one only checks the version
+		const fsdk::IDescriptorMatcherPtr matcher = fsdk::acquire(m_faceEngine.faceEnginePtr->createMatcher(version));
+		if (!matcher)
+			return makeIdError(fsdk::FSDKError::IncompatibleModelVersions);
+		m_descriptorVersion = version;
+		next->m_descriptorVersion = version;
+	} else if (version != m_descriptorVersion) {
+		return makeIdError(fsdk::FSDKError::IncompatibleDescriptors);
+	}
+
+	// the caller may change batch later, the index keeps its own copy
+	std::shared_ptr<Segment> pending = std::make_shared<Segment>();
+	pending->firstId = static_cast<fsdk::DescriptorId>(current->m_size);
+	pending->count = count;
+	pending->indexedCount = 0;
+	const Segment& last = *current->m_segments.back();
+	const bool isExtended = !last.index && last.count + count <= pendingChunkSize;
+	if (isExtended) {
+		pending->firstId = last.firstId;
+		pending->count += last.count;
+	}
+	pending->batch = fsdk::acquire(m_faceEngine.faceEnginePtr->createDescriptorBatch(
+		static_cast<int32_t>(pending->count),
+		version));
+	if (!pending->batch)
+		return makeIdError(fsdk::FSDKError::Internal);
+	if ((isExtended && pending->batch->add(last.batch, 0, static_cast<uint32_t>(last.count)).isError()) ||
+		pending->batch->add(batch, 0, static_cast<uint32_t>(count)).isError())
+		return makeIdError(fsdk::FSDKError::InvalidDescriptorBatch);
+	if (isExtended)
+		next->m_segments.back() = pending;
+	else
+		next->m_segments.push_back(pending);
+	next->m_size += count;
+	next->m_indexedCount += count;
+	++next->m_epoch;
+	std::atomic_store(&m_snapshot, next);
+
+	// descriptors are visible already, a failed build leaves them pending until the next append
+	buildPending();
+	return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(
+		fsdk::FSDKError::Ok,
+		static_cast<fsdk::DescriptorId>(current->m_size));
+}
+
+fsdk::Result<fsdk::FSDKError> PyConcurrentIndex::removeDescriptor(fsdk::DescriptorId id) {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	const std::shared_ptr<PyConcurrentIndexSnapshot> current = snapshot();
+	if (id >= current->m_size)
+		return makeError(fsdk::FSDKError::InvalidInput);
+	if (current->m_removed.test(id))
+		return makeError(fsdk::FSDKError::Ok);
+
+	// indexes of published segments are searched concurrently, so the id is only filtered out of results
+	std::shared_ptr<PyConcurrentIndexSnapshot> next = std::make_shared<PyConcurrentIndexSnapshot>(*current);
+	next->m_removed.set(id);
+	--next->m_indexedCount;
+	++next->m_epoch;
+	std::atomic_store(&m_snapshot, next);
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyConcurrentIndex::buildPending() {
+	const std::shared_ptr<PyConcurrentIndexSnapshot> current = snapshot();
+	const std::vector<std::shared_ptr<const Segment>>& segments = current->m_segments;
+	size_t first = segments.size();
+	size_t count = 0;
+	while (first > 1 && !segments[first - 1]->index) {
+		--first;
+		count += segments[first]->count;
+	}
+	if (count < m_segmentSize)
+		return makeError(fsdk::FSDKError::Ok);
+	// built segments not larger than the new one are merged into it, the first segment is never rebuilt
+	while (first > 1 && segments[first - 1]->count <= count) {
+		--first;
+		count += segments[first]->count;
+	}
+
+	const std::vector<std::shared_ptr<const Segment>> parts(segments.begin() + first, segments.end());
+	std::shared_ptr<const Segment> built;
+	const fsdk::Result<fsdk::FSDKError> err = buildSegment(parts, current->m_removed, built);
+	if (err.isError())
+		return err;
+
+	std::shared_ptr<PyConcurrentIndexSnapshot> next = std::make_shared<PyConcurrentIndexSnapshot>(*current);
+	next->m_segments.resize(first);
+	next->m_segments.push_back(built);
+	std::atomic_store(&m_snapshot, next);
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyConcurrentIndex::buildSegment(
+	const std::vector<std::shared_ptr<const Segment>>& parts,
+	const SharedBitset& removed,
+	std::shared_ptr<const Segment>& built) {
+	fsdk::IIndexBuilderPtr builder = fsdk::acquire(m_faceEngine.faceEnginePtr->createIndexBuilder());
+	fsdk::IDescriptorPtr descriptor = fsdk::acquire(m_faceEngine.faceEnginePtr->createDescriptor(m_descriptorVersion));
+	if (!builder || !descriptor)
+		return makeError(fsdk::FSDKError::Internal);
+
+	std::shared_ptr<Segment> segment = std::make_shared<Segment>();
+	segment->firstId = parts.front()->firstId;
+	segment->count = 0;
+	for (const std::shared_ptr<const Segment>& part : parts) {
+		fsdk::IDescriptorBatchPtr batch = part->batch;
+		if (part->index) {
+			// descriptors of an index being merged are copied out of it, concurrent searches only read it too
+			batch = fsdk::acquire(m_faceEngine.faceEnginePtr->createDescriptorBatch(
+				static_cast<int32_t>(part->count),
+				m_descriptorVersion));
+			if (!batch)
+				return makeError(fsdk::FSDKError::Internal);
+			for (size_t i = 0; i < part->count; ++i) {
+				// a removed descriptor only keeps place of its id, any data will do if the index lost it
+				const fsdk::DescriptorId id = static_cast<fsdk::DescriptorId>(i);
+				const fsdk::Result<fsdk::FSDKError> err = part->index->descriptorByIndex(id, descriptor);
+				if (err.isError() && !removed.test(part->firstId + id))
+					return err;
+				if (batch->add(descriptor).isError())
+					return makeError(fsdk::FSDKError::InvalidDescriptor);
+			}
+		}
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appended = builder->appendBatch(batch);
+		if (appended.isError())
+			return appended;
+		segment->count += part->count;
+	}
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::IDynamicIndex*> index = builder->buildIndex();
+	if (index.isError())
+		return makeError(index.getError());
+	segment->index = fsdk::acquire(index.getValue());
+	if (segment->index->size() != segment->count)
+		return makeError(fsdk::FSDKError::Internal);
+
+	// the index is not published yet, so removed descriptors may be removed from it
+	for (size_t i = 0; i < segment->count; ++i) {
+		const fsdk::DescriptorId id = static_cast<fsdk::DescriptorId>(i);
+		if (removed.test(segment->firstId + id)) {
+			const fsdk::Result<fsdk::FSDKError> err = segment->index->removeDescriptor(id);
+			if (err.isError())
+				return err;
+		}
+	}
+	segment->indexedCount = segment->index->countOfIndexedDescriptors();
+	built = segment;
+	return makeError(fsdk::FSDKError::Ok);
+}
@@ -0,0 +1,164 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+#include "SharedBitset.hpp"
+
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+// Immutable state of a concurrent index. A snapshot sees every append and remove finished before it was
+// taken and none of the later ones, so several queries may be searched against the same state.
+// Snapshots are never changed and may be used from any number of threads.
+class PyConcurrentIndexSnapshot {
+public:
+	// Writes up to maxResultsCount nearest not removed descriptors sorted by similarity to results and
+	// returns their count. Unlike IDynamicIndex, search of an empty index finds nothing.
+	fsdk::ResultValue<fsdk::FSDKError, int> search(
+		const fsdk::IDescriptorPtr& reference,
+		int maxResultsCount,
+		fsdk::SearchResult* results) const;
+
+	fsdk::Result<fsdk::FSDKError> descriptorByIndex(fsdk::DescriptorId id, const fsdk::IDescriptorPtr& descriptor) const;
+
+	// Count of ids, removed descriptors are included like in IDynamicIndex
+	size_t size() const {
+		return m_size;
+	}
+
+	size_t countOfIndexedDescriptors() const {
+		return m_indexedCount;
+	}
+
+	bool isRemoved(fsdk::DescriptorId id) const {
+		return m_removed.test(id);
+	}
+
+	// Ids removed by PyConcurrentIndex::removeDescriptor
+	const SharedBitset& getRemoved() const {
+		return m_removed;
+	}
+
+	// Count of appends and removes made before the snapshot was taken
+	uint64_t getEpoch() const {
+		return m_epoch;
+	}
+
+private:
+	friend class PyConcurrentIndex;
+
+	// Range of ids starting from firstId kept by a dynamic index or by a batch of pending descriptors
+	// searched by matching. Segments are built before they are published and never changed after it.
+	struct Segment {
+		fsdk::IDynamicIndexPtr index;
+		fsdk::IDescriptorBatchPtr batch;    // pending descriptors if index is null
+		fsdk::DescriptorId firstId;
+		size_t count;
+		size_t indexedCount;
+	};
+
+	// Searches an indexed segment asking for more results while removed descriptors leave less than k of them
+	fsdk::Result<fsdk::FSDKError> searchSegment(
+		const Segment& segment,
+		const fsdk::IDescriptorPtr& reference,
+		size_t k,
+		std::vector<fsdk::SearchResult>& found) const;
+
+	std::vector<std::shared_ptr<const Segment>> m_segments;    // in order of ids
+	SharedBitset m_removed;
+	fsdk::IFaceEnginePtr m_faceEngine;
+	uint32_t m_descriptorVersion = 0;    // version of appended descriptors, 0 before the first append
+	size_t m_size = 0;
+	size_t m_indexedCount = 0;
+	uint64_t m_epoch = 0;
+};
+
+// Dynamic index which may be searched while it is modified. Readers search the current snapshot taken
+// without locks, so searches never wait for appends and removes. Writers are serialized, every modification
+// is published as a new snapshot sharing unchanged segments with the previous one, its ids are visible to
+// all searches started after it returns.
+// Appended descriptors are kept as pending segments searched by matching until there are segmentSize of them,
+// then the writer builds them into a new dynamic index. Built segments not larger than the new one are merged
+// into it, so the count of segments grows as a logarithm of the count of appended descriptors. Removed
+// descriptors are filtered out of results of snapshots taken after the removal and removed from the indexes
+// of segments built later. The initial index is the first segment, it is never rebuilt.
+// All methods must be called without the GIL.
+class PyConcurrentIndex {
+public:
+	// Takes index over, it must not be used directly any more. Descriptors removed from the index before
+	// are read back as descriptors of descriptorVersion to find their ids, 0 - default version from config.
+	static fsdk::Result<fsdk::FSDKError> create(
+		PyIFaceEngine& faceEngine,
+		const fsdk::IDynamicIndexPtr& index,
+		uint32_t segmentSize,
+		uint32_t descriptorVersion,
+		std::shared_ptr<PyConcurrentIndex>& concurrent);
+
+	PyConcurrentIndex(const PyConcurrentIndex&) = delete;
+	PyConcurrentIndex& operator=(const PyConcurrentIndex&) = delete;
+
+	std::shared_ptr<PyConcurrentIndexSnapshot> snapshot() const {
+		return std::atomic_load(&m_snapshot);
+	}
+
+	fsdk::ResultValue<fsdk::FSDKError, int> search(
+		const fsdk::IDescriptorPtr& reference,
+		int maxResultsCount,
+		fsdk::SearchResult* results) const {
+		return snapshot()->search(reference, maxResultsCount, results);
+	}
+
+	fsdk::Result<fsdk::FSDKError> descriptorByIndex(fsdk::DescriptorId id, const fsdk::IDescriptorPtr& descriptor) const {
+		return snapshot()->descriptorByIndex(id, descriptor);
+	}
+
+	size_t size() const {
+		return snapshot()->size();
+	}
+
+	size_t countOfIndexedDescriptors() const {
+		return snapshot()->countOfIndexedDescriptors();
+	}
+
+	// Appended descriptors get ids following the last one. All descriptors appended to the index must have
+	// the same version.
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appendDescriptor(const fsdk::IDescriptorPtr& descriptor);
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appendBatch(const fsdk::IDescriptorBatchPtr& batch);
+
+	// Removes descriptor from search, its id is not reused
+	fsdk::Result<fsdk::FSDKError> removeDescriptor(fsdk::DescriptorId id);
+
+	// Count of built and pending segments of the current snapshot
+	size_t getSegmentCount() const {
+		return snapshot()->m_segments.size();
+	}
+
+private:
+	typedef PyConcurrentIndexSnapshot::Segment Segment;
+
+	PyConcurrentIndex(PyIFaceEngine& faceEngine, uint32_t segmentSize);
+
+	// Appends a copy of batch as a pending segment, must be called with m_mutex locked
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> append(const fsdk::IDescriptorBatchPtr& batch);
+
+	// Builds pending segments together with smaller built ones into one segment if there are segmentSize
+	// pending descriptors, must be called with m_mutex locked
+	fsdk::Result<fsdk::FSDKError> buildPending();
+
+	// Builds segments into one index in order of their ids
+	fsdk::Result<fsdk::FSDKError> buildSegment(
+		const std::vector<std::shared_ptr<const Segment>>& parts,
+		const SharedBitset& removed,
+		std::shared_ptr<const Segment>& built);
+
+	PyIFaceEngine m_faceEngine;
+	const uint32_t m_segmentSize;
+	uint32_t m_descriptorVersion = 0;
+
+	// serializes modifications, searches do not take it
+	std::mutex m_mutex;
+	// accessed only with std::atomic_load and std::atomic_store
+	std::shared_ptr<PyConcurrentIndexSnapshot> m_snapshot;
+};
@@ -0,0 +1,204 @@
+#include "EstimationColumns.hpp"
+#include "EstimatorBatch.hpp"
+
+#include <limits>
+#include <string>
+
+namespace {
+	// Adds column name of optional field values and its validity mask name_valid, invalid rows are set to invalid
+	template<typename T, typename R, typename V>
+	void addOptionalColumn(
+		py::dict& columns,
+		const std::string& name,
+		const std::vector<R>& results,
+		fsdk::Optional<V> R::* field,
+		T invalid) {
+		columns[py::str(name)] = makeColumn<T>(results, [&](const R& r) {
+			return (r.*field).valid() ? static_cast<T>((r.*field).value()) : invalid;
+		});
+		columns[py::str(name + "_valid")] = makeColumn<bool>(results, [&](const R& r) {
+			return (r.*field).valid();
+		});
+	}
+
+	const float invalidFloat = std::numeric_limits<float>::quiet_NaN();
+}
+
+py::dict toColumns(const std::vector<fsdk::Quality>& results) {
+	py::dict columns;
+	columns["light"] = makeColumn<float>(results, [](const fsdk::Quality& q) { return q.light; });
+	columns["dark"] = makeColumn<float>(results, [](const fsdk::Quality& q) { return q.dark; });
+	columns["gray"] = makeColumn<float>(results, [](const fsdk::Quality& q) { return q.gray; });
+	columns["blur"] = makeColumn<float>(results, [](const fsdk::Quality& q) { return q.blur; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::SubjectiveQuality>& results) {
+	py::dict columns;
+	columns["blur"] = makeColumn<float>(results, [](const fsdk::SubjectiveQuality& q) { return q.blur; });
+	columns["light"] = makeColumn<float>(results, [](const fsdk::SubjectiveQuality& q) { return q.light; });
+	columns["darkness"] = makeColumn<float>(results, [](const fsdk::SubjectiveQuality& q) { return q.darkness; });
+	columns["illumination"] = makeColumn<float>(results, [](const fsdk::SubjectiveQuality& q) { return q.illumination; });
+	columns["specularity"] = makeColumn<float>(results, [](const fsdk::SubjectiveQuality& q) { return q.specularity; });
+	columns["isBlurred"] = makeColumn<bool>(results, [](const fsdk::SubjectiveQuality& q) { return q.isBlurred; });
+	columns["isHighlighted"] = makeColumn<bool>(results, [](const fsdk::SubjectiveQuality& q) { return q.isHighlighted; });
+	columns["isDark"] = makeColumn<bool>(results, [](const fsdk::SubjectiveQuality& q) { return q.isDark; });
+	columns["isIlluminated"] = makeColumn<bool>(results, [](const fsdk::SubjectiveQuality& q) { return q.isIlluminated; });
+	columns["isNotSpecular"] = makeColumn<bool>(results, [](const fsdk::SubjectiveQuality& q) { return q.isNotSpecular; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::AttributeEstimationResult>& results) {
+	using Result = fsdk::AttributeEstimationResult;
+	py::dict columns;
+	addOptionalColumn(columns, "age", results, &Result::age, invalidFloat);
+	addOptionalColumn(columns, "gender", results, &Result::gender, invalidFloat);
+	addOptionalColumn(columns, "genderScore", results, &Result::genderScore, invalidFloat);
+	// all ethnicity columns share one validity mask
+	auto ethnicity = [](const Result& r, float fsdk::EthnicityEstimation::* score) {
+		return r.ethnicity.valid() ? r.ethnicity.value().*score : invalidFloat;
+	};
+	columns["africanAmerican"] = makeColumn<float>(results, [&](const Result& r) {
+		return ethnicity(r, &fsdk::EthnicityEstimation::africanAmerican);
+	});
+	columns["indian"] = makeColumn<float>(results, [&](const Result& r) {
+		return ethnicity(r, &fsdk::EthnicityEstimation::indian);
+	});
+	columns["asian"] = makeColumn<float>(results, [&](const Result& r) {
+		return ethnicity(r, &fsdk::EthnicityEstimation::asian);
+	});
+	columns["caucasian"] = makeColumn<float>(results, [&](const Result& r) {
+		return ethnicity(r, &fsdk::EthnicityEstimation::caucasian);
+	});
+	columns["ethnicity"] = makeColumn<int32_t>(results, [](const Result& r) {
+		return r.ethnicity.valid() ? static_cast<int32_t>(r.ethnicity.value().getPredominantEthnicity()) : -1;
+	});
+	columns["ethnicity_valid"] = makeColumn<bool>(results, [](const Result& r) { return r.ethnicity.valid(); });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::HeadPoseEstimation>& results) {
+	py::dict columns;
+	columns["pitch"] = makeColumn<float>(results, [](const fsdk::HeadPoseEstimation& e) { return e.pitch; });
+	columns["yaw"] = makeColumn<float>(results, [](const fsdk::HeadPoseEstimation& e) { return e.yaw; });
+	columns["roll"] = makeColumn<float>(results, [](const fsdk::HeadPoseEstimation& e) { return e.roll; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::SmileEstimation>& results) {
+	py::dict columns;
+	columns["mouth"] = makeColumn<float>(results, [](const fsdk::SmileEstimation& e) { return e.mouth; });
+	columns["smile"] = makeColumn<float>(results, [](const fsdk::SmileEstimation& e) { return e.smile; });
+	columns["occlusion"] = makeColumn<float>(results, [](const fsdk::SmileEstimation& e) { return e.occlusion; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::EyesEstimation>& results) {
+	using EyeAttributes = fsdk::EyesEstimation::EyeAttributes;
+	py::dict columns;
+	columns["left_state"] = makeColumn<int32_t>(results, [](const fsdk::EyesEstimation& e) { return e.leftEye.state; });
+	columns["right_state"] = makeColumn<int32_t>(results, [](const fsdk::EyesEstimation& e) { return e.rightEye.state; });
+	columns["left_iris"] = makePointsColumn(results, EyeAttributes::irisLandmarksCount,
+		[](const fsdk::EyesEstimation& e) -> const EyeAttributes::IrisLandmarks& { return e.leftEye.iris; });
+	columns["right_iris"] = makePointsColumn(results, EyeAttributes::irisLandmarksCount,
+		[](const fsdk::EyesEstimation& e) -> const EyeAttributes::IrisLandmarks& { return e.rightEye.iris; });
+	columns["left_eyelid"] = makePointsColumn(results, EyeAttributes::eyelidLandmarksCount,
+		[](const fsdk::EyesEstimation& e) -> const EyeAttributes::EyelidLandmarks& { return e.leftEye.eyelid; });
+	columns["right_eyelid"] = makePointsColumn(results, EyeAttributes::eyelidLandmarksCount,
+		[](const fsdk::EyesEstimation& e) -> const EyeAttributes::EyelidLandmarks& { return e.rightEye.eyelid; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::EmotionsEstimation>& results) {
+	py::dict columns;
+	columns["anger"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.anger; });
+	columns["disgust"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.disgust; });
+	columns["fear"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.fear; });
+	columns["happiness"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.happiness; });
+	columns["sadness"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.sadness; });
+	columns["surprise"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.surprise; });
+	columns["neutral"] = makeColumn<float>(results, [](const fsdk::EmotionsEstimation& e) { return e.neutral; });
+	columns["predominant"] = makeColumn<int32_t>(results, [](const fsdk::EmotionsEstimation& e) {
+		return e.getPredominantEmotion();
+	});
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::GazeEstimation>& results) {
+	py::dict columns;
+	columns["yaw"] = makeColumn<float>(results, [](const fsdk::GazeEstimation& e) { return e.yaw; });
+	columns["pitch"] = makeColumn<float>(results, [](const fsdk::GazeEstimation& e) { return e.pitch; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::GlassesEstimation>& results) {
+	py::dict columns;
+	columns["glasses"] = makeColumn<int32_t>(results, [](fsdk::GlassesEstimation e) { return e; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::MouthEstimation>& results) {
+	py::dict columns;
+	columns["opened"] = makeColumn<float>(results, [](const fsdk::MouthEstimation& e) { return e.opened; });
+	columns["smile"] = makeColumn<float>(results, [](const fsdk::MouthEstimation& e) { return e.smile; });
+	columns["occluded"] = makeColumn<float>(results, [](const fsdk::MouthEstimation& e) { return e.occluded; });
+	columns["isOpened"] = makeColumn<bool>(results, [](const fsdk::MouthEstimation& e) { return e.isOpened; });
+	columns["isSmiling"] = makeColumn<bool>(results, [](const fsdk::MouthEstimation& e) { return e.isSmiling; });
+	columns["isOccluded"] = makeColumn<bool>(results, [](const fsdk::MouthEstimation& e) { return e.isOccluded; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::MedicalMaskEstimation>& results) {
+	py::dict columns;
+	columns["result"] = makeColumn<int32_t>(results, [](const fsdk::MedicalMaskEstimation& e) { return e.result; });
+	columns["maskScore"] = makeColumn<float>(results, [](const fsdk::MedicalMaskEstimation& e) { return e.maskScore; });
+	columns["noMaskScore"] = makeColumn<float>(results, [](const fsdk::MedicalMaskEstimation& e) { return e.noMaskScore; });
+	columns["occludedFaceScore"] = makeColumn<float>(results, [](const fsdk::MedicalMaskEstimation& e) {
+		return e.occludedFaceScore;
+	});
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::MedicalMaskEstimationExtended>& results) {
+	using Estimation = fsdk::MedicalMaskEstimationExtended;
+	py::dict columns;
+	columns["result"] = makeColumn<int32_t>(results, [](const Estimation& e) { return e.result; });
+	columns["maskScore"] = makeColumn<float>(results, [](const Estimation& e) { return e.maskScore; });
+	columns["noMaskScore"] = makeColumn<float>(results, [](const Estimation& e) { return e.noMaskScore; });
+	columns["maskNotInPlace"] = makeColumn<float>(results, [](const Estimation& e) { return e.maskNotInPlace; });
+	columns["occludedFaceScore"] = makeColumn<float>(results, [](const Estimation& e) { return e.occludedFaceScore; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::FacialHairEstimation>& results) {
+	py::dict columns;
+	columns["result"] = makeColumn<int32_t>(results, [](const fsdk::FacialHairEstimation& e) { return e.result; });
+	columns["noHairScore"] = makeColumn<float>(results, [](const fsdk::FacialHairEstimation& e) { return e.noHairScore; });
+	columns["stubbleScore"] = makeColumn<float>(results, [](const fsdk::FacialHairEstimation& e) { return e.stubbleScore; });
+	columns["mustacheScore"] = makeColumn<float>(results, [](const fsdk::FacialHairEstimation& e) { return e.mustacheScore; });
+	columns["beardScore"] = makeColumn<float>(results, [](const fsdk::FacialHairEstimation& e) { return e.beardScore; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::CredibilityCheckEstimation>& results) {
+	py::dict columns;
+	columns["value"] = makeColumn<float>(results, [](const fsdk::CredibilityCheckEstimation& e) { return e.value; });
+	columns["credibilityStatus"] = makeColumn<int32_t>(results, [](const fsdk::CredibilityCheckEstimation& e) {
+		return e.credibilityStatus;
+	});
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::IREstimation>& results) {
+	py::dict columns;
+	columns["isReal"] = makeColumn<bool>(results, [](const fsdk::IREstimation& e) { return e.isReal; });
+	columns["score"] = makeColumn<float>(results, [](const fsdk::IREstimation& e) { return e.score; });
+	return columns;
+}
+
+py::dict toColumns(const std::vector<fsdk::LivenessFlyingFacesEstimation>& results) {
+	py::dict columns;
+	columns["score"] = makeColumn<float>(results, [](const fsdk::LivenessFlyingFacesEstimation& e) { return e.score; });
+	columns["isReal"] = makeColumn<bool>(results, [](const fsdk::LivenessFlyingFacesEstimation& e) { return e.isReal; });
+	return columns;
+}
@@ -0,0 +1,41 @@
+#pragma once
+
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <fsdk/FaceEngine.h>
+
+#include <vector>
+
+namespace py = pybind11;
+
+// Conversion of batch estimation results to a dict of numpy arrays with one column per field and one row per result.
+// Scores are float32, enum values are int32 and flags are bool. Optional fields get a bool column <name>_valid,
+// invalid rows of float columns are NaN and of int32 columns are -1. Landmarks are float32 arrays (N, count, 2).
+// Must be called with the GIL.
+py::dict toColumns(const std::vector<fsdk::Quality>& results);
+py::dict toColumns(const std::vector<fsdk::SubjectiveQuality>& results);
+py::dict toColumns(const std::vector<fsdk::AttributeEstimationResult>& results);
+py::dict toColumns(const std::vector<fsdk::HeadPoseEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::SmileEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::EyesEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::EmotionsEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::GazeEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::GlassesEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::MouthEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::MedicalMaskEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::MedicalMaskEstimationExtended>& results);
+py::dict toColumns(const std::vector<fsdk::FacialHairEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::CredibilityCheckEstimation>& results);
+py::dict toColumns(const std::vector<fsdk::IREstimation>& results);
+py::dict toColumns(const std::vector<fsdk::LivenessFlyingFacesEstimation>& results);
+
+// Result of a list estimation for Python: list of results or, if asColumns is set, their columns.
+// Columns of a failed estimation are an empty dict, the list is returned as is. Must be called with the GIL.
+template<typename R>
+py::object resultsToObject(const std::vector<R>& results, bool isOk, bool asColumns) {
+	if (!asColumns)
+		return py::cast(results);
+	if (!isOk)
+		return py::dict();
+	return toColumns(results);
+}
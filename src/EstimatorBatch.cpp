@@ -0,0 +1,29 @@
+#include "EstimatorBatch.hpp"
+#include "NumpyAdapter.hpp"
+
+#include <pybind11/stl.h>
+
+#include <string>
+
+std::vector<fsdk::Image> warpsFromObject(const py::object& warps) {
+	if (!py::isinstance<py::array>(warps))
+		return warps.cast<std::vector<fsdk::Image>>();
+
+	py::array array = py::reinterpret_borrow<py::array>(warps);
+	if (array.ndim() != 4)
+		throw py::value_error("warps array must have shape (N, height, width, 3)");
+	std::vector<fsdk::Image> images(static_cast<size_t>(array.shape(0)));
+	for (size_t i = 0; i < images.size(); ++i) {
+		py::array row = array[py::int_(i)];
+		bool borrowed = false;
+		fsdk::Result<fsdk::Image::Error> err = imageFromArray(row, fsdk::Format::R8G8B8, true, images[i], borrowed);
+		if (err.isError())
+			throw py::value_error("warp " + std::to_string(i) + " is not a valid R8G8B8 image: " + err.what());
+	}
+	return images;
+}
+
+void checkBatchSizes(size_t expected, size_t actual, const char* name) {
+	if (expected != actual)
+		throw py::value_error(std::string(name) + " must be of the same size as images");
+}
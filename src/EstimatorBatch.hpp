@@ -0,0 +1,74 @@
+#pragma once
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <fsdk/FaceEngine.h>
+
+#include <mutex>
+#include <vector>
+
+#include "ThreadPool.hpp"
+
+namespace py = pybind11;
+
+// Converts warps argument of batch estimations: list of Images or uint8 numpy array of shape
+// (N, height, width, 3) with R8G8B8 warps. Rows of a writeable array with the layout of an image are wrapped
+// without copying, they are valid while the array is alive. Must be called with the GIL.
+std::vector<fsdk::Image> warpsFromObject(const py::object& warps);
+
+// Throws ValueError if sizes of per item arguments of a batch estimation differ
+void checkBatchSizes(size_t expected, size_t actual, const char* name);
+
+// Calls estimate(i) returning fsdk::Result for every i in [0, count) on threadCount threads
+// (0 means the number of hardware threads, 1 calls them in place). It is used for estimators
+// without batch interface, bindings pass 1 by default: with more threads one estimator is called
+// from all of them at once. Returns the first error, the remaining items are still estimated.
+// Must be called without the GIL.
+template<typename F>
+fsdk::Result<fsdk::FSDKError> estimateEach(size_t count, uint32_t threadCount, F estimate) {
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	std::mutex errorMutex;
+	auto estimateBlock = [&](size_t begin, size_t end) {
+		for (size_t i = begin; i < end; ++i) {
+			fsdk::Result<fsdk::FSDKError> itemErr = estimate(i);
+			if (itemErr.isError()) {
+				std::lock_guard<std::mutex> lock(errorMutex);
+				if (err.isOk())
+					err = itemErr;
+			}
+		}
+	};
+	if (threadCount == 1 || count < 2)
+		estimateBlock(0, count);
+	else
+		parallelForBlocks(count, threadCount, estimateBlock);
+	return err;
+}
+
+// Makes a column of batch results converting get(result) to T for every result
+template<typename T, typename R, typename F>
+py::array_t<T> makeColumn(const std::vector<R>& results, F get) {
+	py::array_t<T> column(static_cast<py::ssize_t>(results.size()));
+	T* data = column.mutable_data();
+	for (size_t i = 0; i < results.size(); ++i)
+		data[i] = static_cast<T>(get(results[i]));
+	return column;
+}
+
+// Makes a float32 column of shape (N, pointCount, 2) of landmarks returned by get(result)
+template<typename R, typename F>
+py::array_t<float> makePointsColumn(const std::vector<R>& results, size_t pointCount, F get) {
+	py::array_t<float> column(std::vector<py::ssize_t>{
+		static_cast<py::ssize_t>(results.size()),
+		static_cast<py::ssize_t>(pointCount),
+		2});
+	float* data = column.mutable_data();
+	for (size_t i = 0; i < results.size(); ++i) {
+		const auto& points = get(results[i]);
+		for (size_t j = 0; j < pointCount; ++j) {
+			data[(i * pointCount + j) * 2] = points.landmarks[j].x;
+			data[(i * pointCount + j) * 2 + 1] = points.landmarks[j].y;
+		}
+	}
+	return column;
+}
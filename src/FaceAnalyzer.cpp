@@ -0,0 +1,159 @@
+#include "FaceAnalyzer.hpp"
+
+#include <future>
+
+namespace {
+	const AnalyzerRequest estimatorFlags[] = {
+		arAttributes,
+		arEmotions,
+		arGlasses,
+		arMouth,
+		arMedicalMask,
+		arEyes,
+		arQuality
+	};
+}
+
+PyFaceAnalyzer::PyFaceAnalyzer(
+	PyIFaceEngine& pyIFaceEngine,
+	fsdk::IAttributeEstimator::EstimationRequest attributeRequest,
+	size_t threadCount) :
+	faceEngine(pyIFaceEngine),
+	attributeRequest(attributeRequest),
+	pool(new ThreadPool(threadCount))
+{}
+
+void PyFaceAnalyzer::prepare(uint32_t request) {
+	if ((request & arAttributes) && !attributeEstimator)
+		attributeEstimator = faceEngine.createAttributeEstimator();
+	if ((request & arEmotions) && !emotionsEstimator)
+		emotionsEstimator = faceEngine.createEmotionsEstimator();
+	if ((request & arGlasses) && !glassesEstimator)
+		glassesEstimator = faceEngine.createGlassesEstimator();
+	if ((request & arMouth) && !mouthEstimator)
+		mouthEstimator = faceEngine.createMouthEstimator();
+	if ((request & arMedicalMask) && !medicalMaskEstimator)
+		medicalMaskEstimator = faceEngine.createMedicalMaskEstimator();
+	if ((request & arEyes) && !eyeEstimator)
+		eyeEstimator = faceEngine.createEyeEstimator();
+	if ((request & arQuality) && !qualityEstimator)
+		qualityEstimator = faceEngine.createQualityEstimator();
+}
+
+uint32_t PyFaceAnalyzer::getCreatedEstimators() const {
+	uint32_t created = 0;
+	created |= attributeEstimator ? arAttributes : 0;
+	created |= emotionsEstimator ? arEmotions : 0;
+	created |= glassesEstimator ? arGlasses : 0;
+	created |= mouthEstimator ? arMouth : 0;
+	created |= medicalMaskEstimator ? arMedicalMask : 0;
+	created |= eyeEstimator ? arEyes : 0;
+	created |= qualityEstimator ? arQuality : 0;
+	return created;
+}
+
+std::tuple<FSDKErrorResult, std::vector<FaceAnalysis>> PyFaceAnalyzer::analyze(
+	const std::vector<fsdk::Image>& warps,
+	const std::vector<fsdk::Landmarks5>& landmarks,
+	uint32_t request) {
+	std::vector<FaceAnalysis> results(warps.size());
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	if (warps.empty())
+		return std::make_tuple(FSDKErrorResult(err), std::move(results));
+
+	// estimators write different fields of the results, so they do not interfere
+	std::vector<std::future<fsdk::Result<fsdk::FSDKError>>> estimations;
+	for (AnalyzerRequest estimator : estimatorFlags) {
+		if (request & estimator)
+			estimations.push_back(pool->submit([this, estimator, &warps, &landmarks, &results] {
+				return estimate(estimator, warps, landmarks, results);
+			}));
+	}
+	// all tasks are finished before an exception of any of them is rethrown, they reference the results
+	for (auto& estimation : estimations)
+		estimation.wait();
+	for (auto& estimation : estimations) {
+		fsdk::Result<fsdk::FSDKError> estimationErr = estimation.get();
+		if (estimationErr.isError() && err.isOk())
+			err = estimationErr;
+	}
+	if (err.isError())
+		return std::make_tuple(FSDKErrorResult(err), std::vector<FaceAnalysis>());
+
+	for (FaceAnalysis& result : results)
+		result.estimated = request & arAll;
+	return std::make_tuple(FSDKErrorResult(err), std::move(results));
+}
+
+fsdk::Result<fsdk::FSDKError> PyFaceAnalyzer::estimate(
+	AnalyzerRequest estimator,
+	const std::vector<fsdk::Image>& warps,
+	const std::vector<fsdk::Landmarks5>& landmarks,
+	std::vector<FaceAnalysis>& results) const {
+	const fsdk::Result<fsdk::FSDKError> ok(fsdk::FSDKError::Ok);
+	switch (estimator) {
+	case arAttributes: {
+		// attribute and medical mask estimators have batch interface
+		std::vector<fsdk::AttributeEstimationResult> attributes(warps.size());
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::AttributeEstimationResult> err = attributeEstimator->estimate(
+			fsdk::Span<const fsdk::Image>(warps.data(), warps.size()),
+			attributeRequest,
+			fsdk::Span<fsdk::AttributeEstimationResult>(attributes.data(), attributes.size()));
+		if (err.isError())
+			return err;
+		for (size_t i = 0; i < warps.size(); ++i)
+			results[i].attributes = attributes[i];
+		return ok;
+	}
+	case arMedicalMask: {
+		std::vector<fsdk::MedicalMaskEstimation> estimations(warps.size());
+		fsdk::Result<fsdk::FSDKError> err = medicalMaskEstimator->estimate(
+			warps,
+			fsdk::Span<fsdk::MedicalMaskEstimation>(estimations.data(), estimations.size()));
+		if (err.isError())
+			return err;
+		for (size_t i = 0; i < warps.size(); ++i)
+			results[i].medicalMask = estimations[i];
+		return ok;
+	}
+	case arEyes: {
+		fsdk::EyeCropper cropper;
+		for (size_t i = 0; i < warps.size(); ++i) {
+			const fsdk::EyeCropper::EyesRects eyeRects = cropper.cropByLandmarks5(warps[i], landmarks[i]);
+			fsdk::Result<fsdk::FSDKError> err = eyeEstimator->estimate(warps[i], eyeRects, results[i].eyes);
+			if (err.isError())
+				return err;
+		}
+		return ok;
+	}
+	default:
+		break;
+	}
+
+	for (size_t i = 0; i < warps.size(); ++i) {
+		fsdk::Result<fsdk::FSDKError> err = ok;
+		switch (estimator) {
+		case arEmotions:
+			err = emotionsEstimator->estimate(warps[i], results[i].emotions);
+			break;
+		case arGlasses: {
+			fsdk::ResultValue<fsdk::FSDKError, fsdk::GlassesEstimation> glasses = glassesEstimator->estimate(warps[i]);
+			if (glasses.isOk())
+				results[i].glasses = glasses.getValue();
+			err = glasses;
+			break;
+		}
+		case arMouth:
+			err = mouthEstimator->estimate(warps[i], results[i].mouth);
+			break;
+		case arQuality:
+			err = qualityEstimator->estimate(warps[i], results[i].quality);
+			break;
+		default:
+			break;
+		}
+		if (err.isError())
+			return err;
+	}
+	return ok;
+}
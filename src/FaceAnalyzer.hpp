@@ -0,0 +1,75 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+#include "ErrorsAdapter.hpp"
+#include "ThreadPool.hpp"
+
+#include <memory>
+#include <tuple>
+#include <vector>
+
+// Estimators run by FaceAnalyzer, flags are combined into a request
+enum AnalyzerRequest {
+	arAttributes = 1 << 0,
+	arEmotions = 1 << 1,
+	arGlasses = 1 << 2,
+	arMouth = 1 << 3,
+	arMedicalMask = 1 << 4,
+	arEyes = 1 << 5,
+	arQuality = 1 << 6,
+	arAll = (1 << 7) - 1
+};
+
+// Estimations of one warp, only fields of estimated flags are valid
+struct FaceAnalysis {
+	uint32_t estimated = 0;
+	fsdk::AttributeEstimationResult attributes;
+	fsdk::EmotionsEstimation emotions = {};
+	fsdk::GlassesEstimation glasses = fsdk::GlassesEstimation::EstimationError;
+	fsdk::MouthEstimation mouth = {};
+	fsdk::MedicalMaskEstimation medicalMask = {};
+	fsdk::EyesEstimation eyes = {};
+	fsdk::SubjectiveQuality quality = {};
+};
+
+// Runs several estimators on the same batch of warps in one native call. Estimators are created on first
+// request and kept, selected estimators run concurrently on the pool of the analyzer, each one on the whole batch.
+class PyFaceAnalyzer {
+public:
+	PyFaceAnalyzer(
+		PyIFaceEngine& pyIFaceEngine,
+		fsdk::IAttributeEstimator::EstimationRequest attributeRequest,
+		size_t threadCount);
+
+	// Creates estimators of request which are not created yet. Must be called with the GIL.
+	void prepare(uint32_t request);
+
+	// Must be called without the GIL after prepare with the same request.
+	// Transformed landmarks of warps are needed for eyes only.
+	std::tuple<FSDKErrorResult, std::vector<FaceAnalysis>> analyze(
+		const std::vector<fsdk::Image>& warps,
+		const std::vector<fsdk::Landmarks5>& landmarks,
+		uint32_t request);
+
+	// Flags of estimators created so far
+	uint32_t getCreatedEstimators() const;
+
+private:
+	fsdk::Result<fsdk::FSDKError> estimate(
+		AnalyzerRequest estimator,
+		const std::vector<fsdk::Image>& warps,
+		const std::vector<fsdk::Landmarks5>& landmarks,
+		std::vector<FaceAnalysis>& results) const;
+
+	PyIFaceEngine faceEngine;
+	fsdk::IAttributeEstimator::EstimationRequest attributeRequest;
+	std::unique_ptr<ThreadPool> pool;
+	fsdk::IAttributeEstimatorPtr attributeEstimator;
+	fsdk::IEmotionsEstimatorPtr emotionsEstimator;
+	fsdk::IGlassesEstimatorPtr glassesEstimator;
+	fsdk::IMouthEstimatorPtr mouthEstimator;
+	fsdk::IMedicalMaskEstimatorPtr medicalMaskEstimator;
+	fsdk::IEyeEstimatorPtr eyeEstimator;
+	fsdk::IQualityEstimatorPtr qualityEstimator;
+};
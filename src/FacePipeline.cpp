@@ -0,0 +1,99 @@
+#include "FacePipeline.hpp"
+
+#include <algorithm>
+
+PyFacePipeline::PyFacePipeline(
+	PyIFaceEngine& pyIFaceEngine,
+	fsdk::ObjectDetectorClassType detectorType,
+	uint32_t descriptorVersion) :
+	faceEnginePtr(pyIFaceEngine.faceEnginePtr),
+	detector(pyIFaceEngine.createDetector(detectorType)),
+	warper(pyIFaceEngine.createWarper()),
+	extractor(pyIFaceEngine.createExtractor(descriptorVersion)),
+	descriptorVersion(extractor->getModelVersion())
+{}
+
+uint32_t PyFacePipeline::getDescriptorVersion() const {
+	return descriptorVersion;
+}
+
+std::tuple<FSDKErrorResult, std::vector<PipelineFace>, fsdk::IDescriptorBatchPtr> PyFacePipeline::process(
+	const std::vector<fsdk::Image>& images,
+	uint32_t detectionPerImageNum,
+	bool keepWarps) {
+	std::vector<PipelineFace> faces;
+	if (images.empty())
+		return std::make_tuple(
+			FSDKErrorResult(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Ok)),
+			std::move(faces),
+			fsdk::IDescriptorBatchPtr());
+
+	std::vector<fsdk::Rect> rectangles;
+	rectangles.reserve(images.size());
+	for (const fsdk::Image& image : images)
+		rectangles.push_back(image.getRect());
+
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::Ref<fsdk::IResultBatch<fsdk::Face>>> detectErr = detector->detect(
+		fsdk::Span<const fsdk::Image>(images),
+		fsdk::Span<const fsdk::Rect>(rectangles),
+		detectionPerImageNum,
+		fsdk::DetectionType(fsdk::dtBBox | fsdk::dt5Landmarks));
+	if (detectErr.isError())
+		return std::make_tuple(FSDKErrorResult(detectErr), std::move(faces), fsdk::IDescriptorBatchPtr());
+
+	std::vector<fsdk::Image> warps;
+	const fsdk::Ref<fsdk::IResultBatch<fsdk::Face>> detections = detectErr.getValue();
+	for (size_t i = 0; i < detections->getSize(); ++i) {
+		fsdk::Span<fsdk::Face> imageFaces = detections->getResults(i);
+		for (size_t j = 0; j < imageFaces.size(); ++j) {
+			const fsdk::Face& face = imageFaces.data()[j];
+			if (!face.landmarks5.valid())
+				continue;
+			PipelineFace result;
+			result.imageIndex = static_cast<uint32_t>(i);
+			result.detection = face.detection;
+			result.landmarks5 = face.landmarks5.value();
+			result.descriptorIndex = static_cast<uint32_t>(faces.size());
+			result.garbageScore = 0.f;
+
+			const fsdk::Transformation transformation = warper->createTransformation(face.detection, result.landmarks5);
+			fsdk::Image warp;
+			fsdk::Result<fsdk::FSDKError> warpErr = warper->warp(images[i], transformation, warp);
+			if (warpErr.isError())
+				return std::make_tuple(FSDKErrorResult(warpErr), std::vector<PipelineFace>(), fsdk::IDescriptorBatchPtr());
+			warps.push_back(warp);
+			faces.push_back(result);
+		}
+	}
+
+	// batch of zero size can not be created, an empty batch of one descriptor is returned if nothing is found
+	fsdk::IDescriptorBatchPtr descriptorBatch = fsdk::acquire(faceEnginePtr->createDescriptorBatch(
+		static_cast<int32_t>(std::max<size_t>(faces.size(), 1)),
+		descriptorVersion));
+	if (!descriptorBatch)
+		return std::make_tuple(
+			FSDKErrorResult(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Internal)),
+			std::vector<PipelineFace>(),
+			fsdk::IDescriptorBatchPtr());
+	if (faces.empty())
+		return std::make_tuple(
+			FSDKErrorResult(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Ok)),
+			std::move(faces),
+			descriptorBatch);
+
+	std::vector<float> garbageScores(faces.size());
+	fsdk::Result<fsdk::FSDKError> extractErr = extractor->extractFromWarpedImageBatch(
+		warps.data(),
+		descriptorBatch,
+		garbageScores.data(),
+		static_cast<uint32_t>(faces.size()));
+	if (extractErr.isError())
+		return std::make_tuple(FSDKErrorResult(extractErr), std::vector<PipelineFace>(), fsdk::IDescriptorBatchPtr());
+
+	for (size_t i = 0; i < faces.size(); ++i) {
+		faces[i].garbageScore = garbageScores[i];
+		if (keepWarps)
+			faces[i].warp = warps[i];
+	}
+	return std::make_tuple(FSDKErrorResult(extractErr), std::move(faces), descriptorBatch);
+}
@@ -0,0 +1,43 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+#include "ErrorsAdapter.hpp"
+
+#include <tuple>
+#include <vector>
+
+// One face found by the pipeline. Descriptor of the face is stored in the returned descriptor batch
+// at descriptorIndex, warp is valid only if warps were requested.
+struct PipelineFace {
+	uint32_t imageIndex;
+	fsdk::Detection detection;
+	fsdk::Landmarks5 landmarks5;
+	fsdk::Image warp;
+	uint32_t descriptorIndex;
+	float garbageScore;
+};
+
+// Detect -> warp -> extract in one native call. All intermediate objects stay on C++ side.
+class PyFacePipeline {
+public:
+	PyFacePipeline(
+		PyIFaceEngine& pyIFaceEngine,
+		fsdk::ObjectDetectorClassType detectorType,
+		uint32_t descriptorVersion);
+
+	// Must be called without the GIL
+	std::tuple<FSDKErrorResult, std::vector<PipelineFace>, fsdk::IDescriptorBatchPtr> process(
+		const std::vector<fsdk::Image>& images,
+		uint32_t detectionPerImageNum,
+		bool keepWarps);
+
+	uint32_t getDescriptorVersion() const;
+
+private:
+	fsdk::IFaceEnginePtr faceEnginePtr;
+	fsdk::IDetectorPtr detector;
+	fsdk::IWarperPtr warper;
+	fsdk::IDescriptorExtractorPtr extractor;
+	uint32_t descriptorVersion;
+};
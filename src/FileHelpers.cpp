@@ -0,0 +1,123 @@
+#include "FileHelpers.hpp"
+
+#include <cerrno>
+#include <cstdio>
+#include <vector>
+
+#ifdef _WIN32
+#include <direct.h>
+#include <fcntl.h>
+#include <io.h>
+#include <share.h>
+#include <sys/stat.h>
+#else
+#include <fcntl.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+uint32_t updateChecksum(uint32_t crc, const uint8_t* data, size_t size) {
+	static const std::vector<uint32_t> table = [] {
+		std::vector<uint32_t> values(256);
+		for (uint32_t i = 0; i < 256; ++i) {
+			uint32_t value = i;
+			for (int bit = 0; bit < 8; ++bit)
+				value = (value & 1) ? 0xEDB88320u ^ (value >> 1) : value >> 1;
+			values[i] = value;
+		}
+		return values;
+	}();
+	crc = ~crc;
+	for (size_t i = 0; i < size; ++i)
+		crc = table[(crc ^ data[i]) & 0xFF] ^ (crc >> 8);
+	return ~crc;
+}
+
+bool replaceFile(const std::string& from, const std::string& to) {
+#ifdef _WIN32
+	// rename does not replace existing files on Windows
+	std::remove(to.c_str());
+#endif
+	return std::rename(from.c_str(), to.c_str()) == 0;
+}
+
+bool syncFile(const std::string& path) {
+#ifdef _WIN32
+	int file = -1;
+	if (_sopen_s(&file, path.c_str(), _O_RDWR | _O_BINARY, _SH_DENYNO, _S_IREAD | _S_IWRITE) != 0)
+		return false;
+	const bool isOk = _commit(file) == 0;
+	_close(file);
+	return isOk;
+#else
+	const int file = open(path.c_str(), O_RDONLY);
+	if (file < 0)
+		return false;
+	const bool isOk = fsync(file) == 0;
+	close(file);
+	return isOk;
+#endif
+}
+
+bool syncStream(FILE* file) {
+	if (std::fflush(file) != 0)
+		return false;
+#ifdef _WIN32
+	return _commit(_fileno(file)) == 0;
+#else
+	return fsync(fileno(file)) == 0;
+#endif
+}
+
+bool syncParentDirectory(const std::string& path) {
+#ifdef _WIN32
+	(void)path;
+	return true;
+#else
+	const size_t separator = path.find_last_of('/');
+	const std::string directory = separator == std::string::npos ? "." :
+		separator == 0 ? "/" :
+		path.substr(0, separator);
+	const int file = open(directory.c_str(), O_RDONLY);
+	if (file < 0)
+		return false;
+	const bool isOk = fsync(file) == 0;
+	close(file);
+	return isOk;
+#endif
+}
+
+bool makeDirectory(const std::string& directory) {
+#ifdef _WIN32
+	return _mkdir(directory.c_str()) == 0 || errno == EEXIST;
+#else
+	return mkdir(directory.c_str(), 0755) == 0 || errno == EEXIST;
+#endif
+}
+
+bool getFileSize(const std::string& path, uint64_t& size) {
+#ifdef _WIN32
+	struct _stat64 status;
+	if (_stat64(path.c_str(), &status) != 0)
+		return false;
+#else
+	struct stat status;
+	if (stat(path.c_str(), &status) != 0)
+		return false;
+#endif
+	size = static_cast<uint64_t>(status.st_size);
+	return true;
+}
+
+bool truncateFile(const std::string& path, uint64_t size) {
+#ifdef _WIN32
+	int file = -1;
+	if (_sopen_s(&file, path.c_str(), _O_RDWR | _O_BINARY, _SH_DENYNO, _S_IREAD | _S_IWRITE) != 0)
+		return false;
+	const bool isOk = _chsize_s(file, static_cast<__int64>(size)) == 0;
+	_close(file);
+	return isOk;
+#else
+	return truncate(path.c_str(), static_cast<off_t>(size)) == 0;
+#endif
+}
@@ -0,0 +1,33 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <cstdio>
+#include <string>
+
+// File routines shared by indexes persisted by the bindings
+
+// CRC-32 with the polynomial of zlib, start with crc == 0
+uint32_t updateChecksum(uint32_t crc, const uint8_t* data, size_t size);
+
+// Renames file from to path to replacing an existing file
+bool replaceFile(const std::string& from, const std::string& to);
+
+// Writes data of file at path to the disk
+bool syncFile(const std::string& path);
+
+// Flushes buffers of stream and writes data of its file to the disk
+bool syncStream(FILE* file);
+
+// Writes entries of the directory containing path to the disk, so a file renamed to path survives a power loss.
+// Does nothing on Windows, directories can not be synced there.
+bool syncParentDirectory(const std::string& path);
+
+// Creates directory if it does not exist
+bool makeDirectory(const std::string& directory);
+
+// Size of file in bytes, false if it does not exist
+bool getFileSize(const std::string& path, uint64_t& size);
+
+// Cuts file to size bytes
+bool truncateFile(const std::string& path, uint64_t size);
@@ -0,0 +1,98 @@
+#include "IndexFilter.hpp"
+
+std::shared_ptr<PyIndexFilter> PyIndexFilter::intersect(const PyIndexFilter& other) const {
+	SharedBitset ids = m_ids;
+	ids.intersect(other.m_ids);
+	return std::make_shared<PyIndexFilter>(m_faceEngine, ids);
+}
+
+std::shared_ptr<PyIndexFilter> PyIndexFilter::unite(const PyIndexFilter& other) const {
+	SharedBitset ids = m_ids;
+	ids.unite(other.m_ids);
+	return std::make_shared<PyIndexFilter>(m_faceEngine, ids);
+}
+
+std::shared_ptr<PyIndexFilter> PyIndexFilter::subtract(const PyIndexFilter& other) const {
+	SharedBitset ids = m_ids;
+	ids.subtract(other.m_ids);
+	return std::make_shared<PyIndexFilter>(m_faceEngine, ids);
+}
+
+void PyDescriptorTags::addTag(uint32_t tag, const std::vector<fsdk::DescriptorId>& ids) {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	SharedBitset& tagged = m_tags[tag];
+	for (fsdk::DescriptorId id : ids)
+		tagged.set(id);
+	if (tagged.count() == 0)
+		m_tags.erase(tag);
+}
+
+void PyDescriptorTags::removeTag(uint32_t tag, const std::vector<fsdk::DescriptorId>& ids) {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	auto tagged = m_tags.find(tag);
+	if (tagged == m_tags.end())
+		return;
+	for (fsdk::DescriptorId id : ids)
+		tagged->second.set(id, false);
+	if (tagged->second.count() == 0)
+		m_tags.erase(tagged);
+}
+
+void PyDescriptorTags::clear(fsdk::DescriptorId id) {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	for (auto tagged = m_tags.begin(); tagged != m_tags.end();) {
+		tagged->second.set(id, false);
+		if (tagged->second.count() == 0)
+			tagged = m_tags.erase(tagged);
+		else
+			++tagged;
+	}
+}
+
+std::vector<uint32_t> PyDescriptorTags::getTags(fsdk::DescriptorId id) const {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	std::vector<uint32_t> tags;
+	for (const auto& tagged : m_tags)
+		if (tagged.second.test(id))
+			tags.push_back(tagged.first);
+	return tags;
+}
+
+size_t PyDescriptorTags::getCount(uint32_t tag) const {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	auto tagged = m_tags.find(tag);
+	return tagged == m_tags.end() ? 0 : tagged->second.count();
+}
+
+std::shared_ptr<PyIndexFilter> PyDescriptorTags::filter(
+	const std::vector<uint32_t>& allOf,
+	const std::vector<uint32_t>& anyOf,
+	const std::vector<uint32_t>& noneOf) const {
+	// bitsets are copied under the lock, copies share chunks with them
+	std::lock_guard<std::mutex> lock(m_mutex);
+	auto tagged = [this](uint32_t tag) {
+		auto found = m_tags.find(tag);
+		return found == m_tags.end() ? SharedBitset() : found->second;
+	};
+	SharedBitset ids;
+	if (!allOf.empty()) {
+		ids = tagged(allOf.front());
+		for (size_t i = 1; i < allOf.size(); ++i)
+			ids.intersect(tagged(allOf[i]));
+	}
+	if (!anyOf.empty()) {
+		SharedBitset any;
+		for (uint32_t tag : anyOf)
+			any.unite(tagged(tag));
+		if (allOf.empty())
+			ids = any;
+		else
+			ids.intersect(any);
+	}
+	if (allOf.empty() && anyOf.empty())
+		for (const auto& tagged : m_tags)
+			ids.unite(tagged.second);
+	for (uint32_t tag : noneOf)
+		ids.subtract(tagged(tag));
+	return std::make_shared<PyIndexFilter>(m_faceEngine, ids);
+}
@@ -0,0 +1,190 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+#include "SharedBitset.hpp"
+#include "TopK.hpp"
+
+#include <algorithm>
+#include <cstdint>
+#include <limits>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <vector>
+
+// Set of descriptor ids a search is restricted to. Filters are immutable, they share bits with the tags and
+// filters they are made of. The face engine of a filter creates the matcher of exact scans.
+class PyIndexFilter {
+public:
+	PyIndexFilter(const PyIFaceEngine& faceEngine, const SharedBitset& ids) :
+		m_faceEngine(faceEngine),
+		m_ids(ids) {
+	}
+
+	const PyIFaceEngine& getFaceEngine() const {
+		return m_faceEngine;
+	}
+
+	const SharedBitset& getIds() const {
+		return m_ids;
+	}
+
+	size_t count() const {
+		return m_ids.count();
+	}
+
+	bool contains(fsdk::DescriptorId id) const {
+		return m_ids.test(id);
+	}
+
+	std::shared_ptr<PyIndexFilter> intersect(const PyIndexFilter& other) const;
+	std::shared_ptr<PyIndexFilter> unite(const PyIndexFilter& other) const;
+	std::shared_ptr<PyIndexFilter> subtract(const PyIndexFilter& other) const;
+
+private:
+	PyIFaceEngine m_faceEngine;
+	const SharedBitset m_ids;
+};
+
+// Integer tags of descriptor ids (tenant, camera, day and so on) kept as a bitset of ids for every tag,
+// so a predicate on tags is evaluated by operations on whole words of bitsets before the search.
+// Methods may be called from several threads.
+class PyDescriptorTags {
+public:
+	explicit PyDescriptorTags(PyIFaceEngine& faceEngine) :
+		m_faceEngine(faceEngine) {
+	}
+
+	PyDescriptorTags(const PyDescriptorTags&) = delete;
+	PyDescriptorTags& operator=(const PyDescriptorTags&) = delete;
+
+	void addTag(uint32_t tag, const std::vector<fsdk::DescriptorId>& ids);
+	void removeTag(uint32_t tag, const std::vector<fsdk::DescriptorId>& ids);
+
+	// Removes all tags of id, e.g. when it is removed from the index
+	void clear(fsdk::DescriptorId id);
+
+	// Tags of id in ascending order
+	std::vector<uint32_t> getTags(fsdk::DescriptorId id) const;
+
+	// Count of ids with tag
+	size_t getCount(uint32_t tag) const;
+
+	// Ids having all tags of allOf, at least one tag of anyOf if it is not empty and no tags of noneOf.
+	// If both allOf and anyOf are empty, ids having any tag are taken.
+	std::shared_ptr<PyIndexFilter> filter(
+		const std::vector<uint32_t>& allOf,
+		const std::vector<uint32_t>& anyOf,
+		const std::vector<uint32_t>& noneOf) const;
+
+private:
+	PyIFaceEngine m_faceEngine;
+	mutable std::mutex m_mutex;
+	std::map<uint32_t, SharedBitset> m_tags;
+};
+
+// count of allowed ids which is always scanned exactly
+const size_t filteredScanMinCount = 1024;
+// count of descriptors matched by one call of the matcher during an exact scan
+const size_t filteredScanChunkSize = 1024;
+
+// Matches descriptors of every allowed id, ids without descriptors in the index, e.g. removed ones, are skipped
+template<typename IndexPtr>
+fsdk::ResultValue<fsdk::FSDKError, int> filteredScan(
+	const IndexPtr& index,
+	const SharedBitset& allowed,
+	const PyIFaceEngine& faceEngine,
+	const fsdk::IDescriptorPtr& reference,
+	size_t k,
+	fsdk::SearchResult* results) {
+	const uint32_t version = reference->getModelVersion();
+	fsdk::IDescriptorMatcherPtr matcher = fsdk::acquire(faceEngine.faceEnginePtr->createMatcher(version));
+	fsdk::IDescriptorPtr descriptor = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptor(version));
+	fsdk::IDescriptorBatchPtr batch = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptorBatch(
+		static_cast<int32_t>(filteredScanChunkSize),
+		version));
+	if (!matcher || !descriptor || !batch)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::IncompatibleModelVersions, 0);
+
+	TopK<fsdk::SearchResult, MoreSimilar> best(k);
+	std::vector<fsdk::DescriptorId> ids;
+	ids.reserve(filteredScanChunkSize);
+	std::vector<fsdk::MatchingResult> matches(filteredScanChunkSize);
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	auto matchChunk = [&]() {
+		if (err.isOk() && !ids.empty())
+			err = matcher->match(reference, batch, matches.data());
+		for (size_t i = 0; i < ids.size() && err.isOk(); ++i)
+			best.push(fsdk::SearchResult(matches[i].distance, matches[i].similarity, ids[i]));
+		batch->clear();
+		ids.clear();
+	};
+	allowed.forEach([&](size_t id) {
+		if (err.isError())
+			return;
+		// descriptors removed from a dynamic index can not be read, they are not found like by search
+		if (index->descriptorByIndex(static_cast<fsdk::DescriptorId>(id), descriptor).isError())
+			return;
+		if (batch->add(descriptor).isError()) {
+			err = fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::InvalidDescriptor);
+			return;
+		}
+		ids.push_back(static_cast<fsdk::DescriptorId>(id));
+		if (ids.size() == filteredScanChunkSize)
+			matchChunk();
+	});
+	matchChunk();
+	if (err.isError())
+		return fsdk::ResultValue<fsdk::FSDKError, int>(err.getError(), 0);
+	const std::vector<fsdk::SearchResult> found = best.take();
+	std::copy(found.begin(), found.end(), results);
+	return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, static_cast<int>(found.size()));
+}
+
+// Writes up to maxResultsCount nearest descriptors with allowed ids below size sorted by similarity to results
+// and returns their count. Allowed ids are scanned exactly if there are few of them: scan costs grow with the count
+// c of allowed ids and searches cost about k * size / c results to find k allowed ones, so the scan is taken when
+// c * c <= k * size. Otherwise the index is asked for k * size / c results and twice more each time removed or
+// filtered out ones leave less than k of them.
+template<typename IndexPtr>
+fsdk::ResultValue<fsdk::FSDKError, int> filteredSearch(
+	const IndexPtr& index,
+	size_t size,
+	SharedBitset allowed,
+	const PyIFaceEngine& faceEngine,
+	const fsdk::IDescriptorPtr& reference,
+	int maxResultsCount,
+	fsdk::SearchResult* results) {
+	if (!reference || maxResultsCount <= 0)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::InvalidInput, 0);
+	allowed.truncate(size);
+	const uint64_t count = allowed.count();
+	if (count == 0)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, 0);
+
+	const uint64_t k = static_cast<uint64_t>(maxResultsCount);
+	if (count <= filteredScanMinCount || count * count <= k * size)
+		return filteredScan(index, allowed, faceEngine, reference, static_cast<size_t>(k), results);
+
+	uint64_t requested = std::min<uint64_t>(std::max(k, k * size / count), size);
+	std::vector<fsdk::SearchResult> found;
+	for (;;) {
+		found.resize(static_cast<size_t>(requested));
+		fsdk::ResultValue<fsdk::FSDKError, int> searched = index->search(
+			reference,
+			static_cast<int>(std::min<uint64_t>(requested, std::numeric_limits<int>::max())),
+			found.data());
+		if (searched.isError())
+			return searched;
+		const size_t foundCount = static_cast<size_t>(searched.getValue());
+		size_t passed = 0;
+		for (size_t i = 0; i < foundCount && passed < k; ++i)
+			if (allowed.test(found[i].index))
+				results[passed++] = found[i];
+		// the index has no more results if it returned less than requested
+		if (passed == k || foundCount < requested || requested >= size)
+			return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, static_cast<int>(passed));
+		requested = std::min<uint64_t>(requested * 2, size);
+	}
+}
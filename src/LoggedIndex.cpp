@@ -0,0 +1,370 @@
+#include "LoggedIndex.hpp"
+#include "FileHelpers.hpp"
+#include "helpers.hpp"
+
+#include <chrono>
+#include <cstring>
+
+namespace {
+	fsdk::Result<fsdk::FSDKError> makeError(fsdk::FSDKError error) {
+		return fsdk::Result<fsdk::FSDKError>(error);
+	}
+
+	std::string logPath(const std::string& path) {
+		return path + ".log";
+	}
+
+	// Applies a record of the log to index. Appends with ids in index and removes of removed
+	// descriptors are records written before the last snapshot.
+	fsdk::Result<fsdk::FSDKError> applyRecord(
+		PyIFaceEngine& faceEngine,
+		const fsdk::IDynamicIndexPtr& index,
+		const LoggedIndexRecord& record,
+		const std::vector<uint8_t>& descriptors) {
+		const size_t size = index->size();
+		if (record.operation == lioRemove) {
+			if (record.id >= size)
+				return makeError(fsdk::FSDKError::InvalidInput);
+			// the descriptor may be removed in the snapshot already
+			index->removeDescriptor(record.id);
+			return makeError(fsdk::FSDKError::Ok);
+		}
+		if (record.operation != lioAppend || record.count == 0 || record.id > size)
+			return makeError(fsdk::FSDKError::InvalidInput);
+		if (uint64_t(record.id) + record.count <= size)
+			return makeError(fsdk::FSDKError::Ok);
+
+		const size_t skipped = size - record.id;
+		fsdk::IDescriptorPtr descriptor = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptor(record.descriptorVersion));
+		fsdk::IDescriptorBatchPtr batch = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptorBatch(
+			static_cast<int32_t>(record.count - skipped),
+			record.descriptorVersion));
+		if (!descriptor || !batch)
+			return makeError(fsdk::FSDKError::IncompatibleModelVersions);
+		if (descriptor->getDescriptorLength() != record.descriptorSize)
+			return makeError(fsdk::FSDKError::InvalidInput);
+		for (size_t i = skipped; i < record.count; ++i) {
+			Archive archive(
+				reinterpret_cast<const char*>(descriptors.data() + i * record.descriptorSize),
+				record.descriptorSize);
+			if (descriptor->load(&archive, fsdk::ISerializableObject::NoSignature).isError() ||
+				batch->add(descriptor).isError())
+				return makeError(fsdk::FSDKError::InvalidDescriptor);
+		}
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appended = index->appendBatch(batch);
+		if (appended.isError())
+			return appended;
+		if (appended.getValue() != size)
+			return makeError(fsdk::FSDKError::Internal);
+		return makeError(fsdk::FSDKError::Ok);
+	}
+
+	// Replays records of the log at path over index. validSize is the size of the log up to the end of
+	// the last complete record or 0 if the log does not exist or its header is not complete.
+	fsdk::Result<fsdk::FSDKError> replayLog(
+		PyIFaceEngine& faceEngine,
+		const std::string& path,
+		const fsdk::IDynamicIndexPtr& index,
+		uint64_t& validSize) {
+		validSize = 0;
+		uint64_t fileSize = 0;
+		if (!getFileSize(path, fileSize) || fileSize < sizeof(LoggedIndexHeader))
+			return makeError(fsdk::FSDKError::Ok);
+		FILE* file = std::fopen(path.c_str(), "rb");
+		if (!file)
+			return makeError(fsdk::FSDKError::InvalidInput);
+
+		LoggedIndexHeader header = {};
+		if (std::fread(&header, sizeof(header), 1, file) != 1 ||
+			std::memcmp(header.magic, loggedIndexMagic, sizeof(header.magic)) != 0 ||
+			header.headerSize != sizeof(LoggedIndexHeader)) {
+			std::fclose(file);
+			return makeError(fsdk::FSDKError::InvalidInput);
+		}
+		if (header.formatVersion != loggedIndexFormatVersion) {
+			std::fclose(file);
+			return makeError(fsdk::FSDKError::UnsupportedFunctionality);
+		}
+
+		validSize = sizeof(header);
+		fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+		std::vector<uint8_t> descriptors;
+		for (;;) {
+			LoggedIndexRecord record = {};
+			uint32_t checksum = 0;
+			if (std::fread(&record, sizeof(record), 1, file) != 1)
+				break;
+			// sizes of a torn record are garbage, they must not exceed the file
+			const uint64_t descriptorsSize = record.operation == lioAppend ?
+				uint64_t(record.count) * record.descriptorSize :
+				0;
+			if (descriptorsSize + sizeof(checksum) > fileSize - validSize - sizeof(record))
+				break;
+			descriptors.resize(static_cast<size_t>(descriptorsSize));
+			if (std::fread(descriptors.data(), 1, descriptors.size(), file) != descriptors.size() ||
+				std::fread(&checksum, sizeof(checksum), 1, file) != 1)
+				break;
+			const uint32_t expected = updateChecksum(
+				updateChecksum(0, reinterpret_cast<const uint8_t*>(&record), sizeof(record)),
+				descriptors.data(),
+				descriptors.size());
+			if (checksum != expected)
+				break;
+			err = applyRecord(faceEngine, index, record, descriptors);
+			if (err.isError())
+				break;
+			validSize += sizeof(record) + descriptorsSize + sizeof(checksum);
+		}
+		std::fclose(file);
+		return err;
+	}
+}
+
+PyLoggedIndex::PyLoggedIndex(
+	PyIFaceEngine& faceEngine,
+	const std::string& path,
+	const fsdk::IDynamicIndexPtr& index,
+	uint64_t compactionLogSize,
+	bool syncRecords) :
+	m_faceEngine(faceEngine),
+	m_path(path),
+	m_index(index),
+	m_compactionLogSize(compactionLogSize),
+	m_syncRecords(syncRecords),
+	m_logSize(0)
+{}
+
+PyLoggedIndex::~PyLoggedIndex() {
+	// background compaction uses the index and the log
+	waitCompaction();
+	if (m_log)
+		std::fclose(m_log);
+}
+
+fsdk::Result<fsdk::FSDKError> PyLoggedIndex::create(
+	PyIFaceEngine& faceEngine,
+	const std::string& path,
+	const fsdk::IDynamicIndexPtr& index,
+	uint64_t compactionLogSize,
+	bool syncRecords,
+	std::shared_ptr<PyLoggedIndex>& logged) {
+	if (!index)
+		return makeError(fsdk::FSDKError::InvalidInput);
+	std::shared_ptr<PyLoggedIndex> created(new PyLoggedIndex(faceEngine, path, index, compactionLogSize, syncRecords));
+	fsdk::Result<fsdk::FSDKError> err = created->compact();
+	if (err.isOk())
+		logged = created;
+	return err;
+}
+
+fsdk::Result<fsdk::FSDKError> PyLoggedIndex::load(
+	PyIFaceEngine& faceEngine,
+	const std::string& path,
+	uint64_t compactionLogSize,
+	bool syncRecords,
+	std::shared_ptr<PyLoggedIndex>& logged) {
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::IDynamicIndex*> loaded = faceEngine.faceEnginePtr->loadDynamicIndex(path.c_str());
+	if (loaded.isError())
+		return makeError(loaded.getError());
+	std::shared_ptr<PyLoggedIndex> result(
+		new PyLoggedIndex(faceEngine, path, fsdk::acquire(loaded.getValue()), compactionLogSize, syncRecords));
+
+	uint64_t validSize = 0;
+	fsdk::Result<fsdk::FSDKError> err = replayLog(faceEngine, logPath(path), result->m_index, validSize);
+	if (err.isError())
+		return err;
+	// a torn record at the end is cut off, new records follow the last complete one
+	if (validSize == 0) {
+		if (!result->resetLog())
+			return makeError(fsdk::FSDKError::Internal);
+	} else {
+		if (!truncateFile(logPath(path), validSize))
+			return makeError(fsdk::FSDKError::Internal);
+		result->m_log = std::fopen(logPath(path).c_str(), "ab");
+		if (!result->m_log)
+			return makeError(fsdk::FSDKError::Internal);
+		result->m_logSize = validSize;
+	}
+	logged = result;
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyLoggedIndex::appendDescriptor(
+	const fsdk::IDescriptorPtr& descriptor) {
+	if (!descriptor)
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::InvalidInput, 0);
+	std::vector<uint8_t> data(descriptor->getDescriptorLength());
+	if (!descriptor->getDescriptor(data.data()))
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::InvalidDescriptor, 0);
+	fsdk::DescriptorId id = 0;
+	{
+		std::lock_guard<std::mutex> lock(m_mutex);
+		if (m_isLogFailed)
+			return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Internal, 0);
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appended = m_index->appendDescriptor(descriptor);
+		if (appended.isError())
+			return appended;
+		id = appended.getValue();
+		const LoggedIndexRecord record = {
+			lioAppend,
+			id,
+			1,
+			descriptor->getModelVersion(),
+			static_cast<uint32_t>(data.size())};
+		fsdk::Result<fsdk::FSDKError> err = writeRecord(record, data);
+		if (err.isError()) {
+			// the index must not have descriptors missing in the log
+			m_index->removeDescriptor(id);
+			return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(err.getError(), 0);
+		}
+	}
+	compactIfNeeded();
+	return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Ok, id);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyLoggedIndex::appendBatch(
+	const fsdk::IDescriptorBatchPtr& batch) {
+	const uint32_t count = batch ? batch->getCount() : 0;
+	if (count == 0)
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::InvalidInput, 0);
+	const uint32_t descriptorSize = batch->getDescriptorSize();
+	std::vector<uint8_t> data(size_t(count) * descriptorSize);
+	for (uint32_t i = 0; i < count; ++i) {
+		fsdk::IDescriptorPtr descriptor = fsdk::acquire(batch->getDescriptorFast(i));
+		if (!descriptor || !descriptor->getDescriptor(data.data() + size_t(i) * descriptorSize))
+			return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::InvalidDescriptorBatch, 0);
+	}
+	fsdk::DescriptorId id = 0;
+	{
+		std::lock_guard<std::mutex> lock(m_mutex);
+		if (m_isLogFailed)
+			return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Internal, 0);
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appended = m_index->appendBatch(batch);
+		if (appended.isError())
+			return appended;
+		id = appended.getValue();
+		const LoggedIndexRecord record = {lioAppend, id, count, batch->getModelVersion(), descriptorSize};
+		fsdk::Result<fsdk::FSDKError> err = writeRecord(record, data);
+		if (err.isError()) {
+			// the index must not have descriptors missing in the log
+			for (uint32_t i = 0; i < count; ++i)
+				m_index->removeDescriptor(id + i);
+			return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(err.getError(), 0);
+		}
+	}
+	compactIfNeeded();
+	return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Ok, id);
+}
+
+fsdk::Result<fsdk::FSDKError> PyLoggedIndex::removeDescriptor(fsdk::DescriptorId id) {
+	{
+		std::lock_guard<std::mutex> lock(m_mutex);
+		if (m_isLogFailed)
+			return makeError(fsdk::FSDKError::Internal);
+		if (id >= m_index->size())
+			return makeError(fsdk::FSDKError::InvalidInput);
+		// a removal can not be undone, it is logged first. Replay ignores results of removes, so a record of
+		// a removal failed afterwards does no harm.
+		const LoggedIndexRecord record = {lioRemove, id, 0, 0, 0};
+		fsdk::Result<fsdk::FSDKError> err = writeRecord(record, std::vector<uint8_t>());
+		if (err.isError())
+			return err;
+		err = m_index->removeDescriptor(id);
+		if (err.isError())
+			return err;
+	}
+	compactIfNeeded();
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyLoggedIndex::compact() {
+	std::lock_guard<std::mutex> lock(m_mutex);
+	const std::string temporaryPath = m_path + ".tmp";
+	fsdk::Result<fsdk::FSDKError> err = m_index->saveToDynamicIndex(temporaryPath.c_str());
+	// the snapshot must be on the disk before it replaces the old one
+	if (err.isOk() && (!syncFile(temporaryPath) || !replaceFile(temporaryPath, m_path)))
+		err = makeError(fsdk::FSDKError::Internal);
+	if (err.isError()) {
+		std::remove(temporaryPath.c_str());
+		return err;
+	}
+	// the log is cleared only when the rename is durable, otherwise a power loss could bring back the old
+	// snapshot without the records. The log stays valid over both snapshots.
+	if (!syncParentDirectory(m_path))
+		return makeError(fsdk::FSDKError::Internal);
+	// records of the old log are in the snapshot now, if it is not cleared they are skipped on load
+	if (!resetLog()) {
+		m_isLogFailed = true;
+		return makeError(fsdk::FSDKError::Internal);
+	}
+	m_isLogFailed = false;
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+void PyLoggedIndex::startCompaction() {
+	std::lock_guard<std::mutex> lock(m_compactionMutex);
+	if (m_compaction.valid() && m_compaction.wait_for(std::chrono::seconds(0)) != std::future_status::ready)
+		return;
+	m_compaction = std::async(std::launch::async, [this] {
+		return compact().getError();
+	}).share();
+}
+
+fsdk::Result<fsdk::FSDKError> PyLoggedIndex::waitCompaction() {
+	std::shared_future<fsdk::FSDKError> compaction;
+	{
+		std::lock_guard<std::mutex> lock(m_compactionMutex);
+		compaction = m_compaction;
+	}
+	if (!compaction.valid())
+		return makeError(fsdk::FSDKError::Ok);
+	return makeError(compaction.get());
+}
+
+uint64_t PyLoggedIndex::getLogSize() const {
+	return m_logSize;
+}
+
+fsdk::Result<fsdk::FSDKError> PyLoggedIndex::writeRecord(
+	const LoggedIndexRecord& record,
+	const std::vector<uint8_t>& descriptors) {
+	std::vector<uint8_t> bytes(sizeof(record) + descriptors.size() + sizeof(uint32_t));
+	std::memcpy(bytes.data(), &record, sizeof(record));
+	if (!descriptors.empty())
+		std::memcpy(bytes.data() + sizeof(record), descriptors.data(), descriptors.size());
+	const uint32_t checksum = updateChecksum(0, bytes.data(), bytes.size() - sizeof(checksum));
+	std::memcpy(bytes.data() + bytes.size() - sizeof(checksum), &checksum, sizeof(checksum));
+	// a partially written record is cut off on load, no records may follow it
+	if (!m_log ||
+		std::fwrite(bytes.data(), 1, bytes.size(), m_log) != bytes.size() ||
+		(m_syncRecords ? !syncStream(m_log) : std::fflush(m_log) != 0)) {
+		m_isLogFailed = true;
+		return makeError(fsdk::FSDKError::Internal);
+	}
+	m_logSize += bytes.size();
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+bool PyLoggedIndex::resetLog() {
+	if (m_log)
+		std::fclose(m_log);
+	m_log = std::fopen(logPath(m_path).c_str(), "wb");
+	if (!m_log)
+		return false;
+	LoggedIndexHeader header = {};
+	std::memcpy(header.magic, loggedIndexMagic, sizeof(header.magic));
+	header.formatVersion = loggedIndexFormatVersion;
+	header.headerSize = sizeof(LoggedIndexHeader);
+	if (std::fwrite(&header, sizeof(header), 1, m_log) != 1 || std::fflush(m_log) != 0) {
+		std::fclose(m_log);
+		m_log = nullptr;
+		return false;
+	}
+	m_logSize = sizeof(header);
+	return true;
+}
+
+void PyLoggedIndex::compactIfNeeded() {
+	if (m_compactionLogSize != 0 && m_logSize >= m_compactionLogSize)
+		startCompaction();
+}
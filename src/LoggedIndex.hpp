@@ -0,0 +1,143 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+
+#include <atomic>
+#include <cstdint>
+#include <cstdio>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <vector>
+
+// Layout of the operation log <path>.log of a logged index, version 1. Integers are little-endian.
+// The header is followed by records: LoggedIndexRecord, for appends count descriptors of descriptorSize bytes
+// without signature, then CRC-32 of the record and its descriptors. A record with a wrong checksum or not
+// complete ends the log, it is a write interrupted by a crash.
+const char loggedIndexMagic[8] = {'L', 'S', 'D', 'K', 'W', 'L', 'O', 'G'};
+const uint32_t loggedIndexFormatVersion = 1;
+
+struct LoggedIndexHeader {
+	char magic[8];
+	uint32_t formatVersion;
+	uint32_t headerSize;
+};
+
+enum LoggedIndexOperation : uint32_t {
+	lioAppend = 1,
+	lioRemove = 2
+};
+
+struct LoggedIndexRecord {
+	uint32_t operation;
+	uint32_t id;    // the first appended id or the removed one
+	uint32_t count;
+	uint32_t descriptorVersion;
+	uint32_t descriptorSize;
+};
+
+// Dynamic index saved incrementally: a snapshot at path saved by saveToDynamicIndex and a log of appends and
+// removes made after it. Every operation is written to the log when it is applied, loading replays the log over
+// the snapshot. Records are flushed to the system, so they survive a crash of the process, with syncRecords they
+// are also synced to the disk and survive a power loss. Compaction saves the index as a new snapshot, syncs it
+// and its directory and only then clears the log. It waits for appends and removes in progress and blocks new
+// ones, searches are not blocked. Replay skips records with ids already in the snapshot, so a crash between
+// the snapshot and the log updates does not apply them twice.
+// Like IDynamicIndex, the index must not be modified while it is being searched.
+// All methods must be called without the GIL.
+class PyLoggedIndex {
+public:
+	// Saves index as the snapshot at path and starts an empty log. If compactionLogSize is not 0,
+	// compaction is started in background when the log grows up to compactionLogSize bytes.
+	static fsdk::Result<fsdk::FSDKError> create(
+		PyIFaceEngine& faceEngine,
+		const std::string& path,
+		const fsdk::IDynamicIndexPtr& index,
+		uint64_t compactionLogSize,
+		bool syncRecords,
+		std::shared_ptr<PyLoggedIndex>& logged);
+
+	// Loads the snapshot at path and replays its log
+	static fsdk::Result<fsdk::FSDKError> load(
+		PyIFaceEngine& faceEngine,
+		const std::string& path,
+		uint64_t compactionLogSize,
+		bool syncRecords,
+		std::shared_ptr<PyLoggedIndex>& logged);
+
+	~PyLoggedIndex();
+
+	PyLoggedIndex(const PyLoggedIndex&) = delete;
+	PyLoggedIndex& operator=(const PyLoggedIndex&) = delete;
+
+	fsdk::ResultValue<fsdk::FSDKError, int> search(
+		const fsdk::IDescriptorPtr& reference,
+		int maxResultsCount,
+		fsdk::SearchResult* results) const {
+		return m_index->search(reference, maxResultsCount, results);
+	}
+
+	fsdk::Result<fsdk::FSDKError> descriptorByIndex(fsdk::DescriptorId id, const fsdk::IDescriptorPtr& descriptor) const {
+		return m_index->descriptorByIndex(id, descriptor);
+	}
+
+	size_t size() const {
+		return m_index->size();
+	}
+
+	size_t countOfIndexedDescriptors() const {
+		return m_index->countOfIndexedDescriptors();
+	}
+
+	// Appends are written to the log after they are applied, removes before. If the log can not be written,
+	// appended descriptors are removed again, their ids stay unused, the index returns Internal error and refuses
+	// new modifications until compaction succeeds.
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appendDescriptor(const fsdk::IDescriptorPtr& descriptor);
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appendBatch(const fsdk::IDescriptorBatchPtr& batch);
+	fsdk::Result<fsdk::FSDKError> removeDescriptor(fsdk::DescriptorId id);
+
+	// Saves the index as a new snapshot and clears the log
+	fsdk::Result<fsdk::FSDKError> compact();
+
+	// Starts compact on a background thread unless a background compaction is running
+	void startCompaction();
+
+	// Waits for the last background compaction and returns its result, Ok if there was none
+	fsdk::Result<fsdk::FSDKError> waitCompaction();
+
+	// Size of the log in bytes
+	uint64_t getLogSize() const;
+
+private:
+	PyLoggedIndex(
+		PyIFaceEngine& faceEngine,
+		const std::string& path,
+		const fsdk::IDynamicIndexPtr& index,
+		uint64_t compactionLogSize,
+		bool syncRecords);
+
+	// Writes record and its descriptors to the log, must be called with m_mutex locked
+	fsdk::Result<fsdk::FSDKError> writeRecord(const LoggedIndexRecord& record, const std::vector<uint8_t>& descriptors);
+
+	// Truncates the log to an empty one, must be called with m_mutex locked
+	bool resetLog();
+
+	void compactIfNeeded();
+
+	PyIFaceEngine m_faceEngine;
+	const std::string m_path;
+	fsdk::IDynamicIndexPtr m_index;
+	const uint64_t m_compactionLogSize;
+	const bool m_syncRecords;
+
+	// guards modifications of the index, the log and compaction
+	mutable std::mutex m_mutex;
+	FILE* m_log = nullptr;
+	std::atomic<uint64_t> m_logSize;
+	bool m_isLogFailed = false;
+
+	std::mutex m_compactionMutex;
+	std::shared_future<fsdk::FSDKError> m_compaction;
+};
@@ -0,0 +1,291 @@
+#include "MappedIndex.hpp"
+#include "ThreadPool.hpp"
+#include "TopK.hpp"
+#include "helpers.hpp"
+#include "FileHelpers.hpp"
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdio>
+#include <cstring>
+#include <vector>
+
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace {
+	// rows matched by one matcher call of a search
+	const size_t searchChunkSize = 1024;
+
+	uint32_t headerChecksum(const MappedIndexHeader& header) {
+		return updateChecksum(
+			0,
+			reinterpret_cast<const uint8_t*>(&header),
+			offsetof(MappedIndexHeader, headerChecksum));
+	}
+
+	fsdk::Result<fsdk::FSDKError> makeError(fsdk::FSDKError error) {
+		return fsdk::Result<fsdk::FSDKError>(error);
+	}
+
+	// Writes rows given by getRow(i, buffer) to a temporary file renamed to path when it is complete
+	template<typename F>
+	fsdk::Result<fsdk::FSDKError> writeMappedIndex(
+		const std::string& path,
+		uint32_t descriptorVersion,
+		uint32_t descriptorSize,
+		size_t count,
+		F getRow) {
+		MappedIndexHeader header = {};
+		std::memcpy(header.magic, mappedIndexMagic, sizeof(header.magic));
+		header.formatVersion = mappedIndexFormatVersion;
+		header.headerSize = sizeof(MappedIndexHeader);
+		header.descriptorVersion = descriptorVersion;
+		header.descriptorSize = descriptorSize;
+		header.count = count;
+		header.matrixOffset = mappedIndexAlignment;
+
+		const std::string temporaryPath = path + ".tmp";
+		FILE* file = std::fopen(temporaryPath.c_str(), "wb");
+		if (!file)
+			return makeError(fsdk::FSDKError::InvalidInput);
+		// header is written last when the matrix checksum is known
+		std::vector<uint8_t> row(std::max<size_t>(descriptorSize, header.matrixOffset));
+		bool isOk = std::fwrite(row.data(), 1, header.matrixOffset, file) == header.matrixOffset;
+		for (size_t i = 0; i < count && isOk; ++i) {
+			isOk = getRow(i, row.data());
+			if (isOk) {
+				header.matrixChecksum = updateChecksum(header.matrixChecksum, row.data(), descriptorSize);
+				isOk = std::fwrite(row.data(), 1, descriptorSize, file) == descriptorSize;
+			}
+		}
+		header.headerChecksum = headerChecksum(header);
+		isOk = isOk &&
+			std::fseek(file, 0, SEEK_SET) == 0 &&
+			std::fwrite(&header, sizeof(header), 1, file) == 1;
+		isOk = std::fclose(file) == 0 && isOk;
+		if (!isOk || !replaceFile(temporaryPath, path)) {
+			std::remove(temporaryPath.c_str());
+			return makeError(fsdk::FSDKError::Internal);
+		}
+		return makeError(fsdk::FSDKError::Ok);
+	}
+}
+
+MappedFile::~MappedFile() {
+#ifdef _WIN32
+	if (m_data)
+		UnmapViewOfFile(m_data);
+	if (m_mapping)
+		CloseHandle(m_mapping);
+	if (m_file)
+		CloseHandle(m_file);
+#else
+	if (m_data)
+		munmap(const_cast<uint8_t*>(m_data), m_size);
+#endif
+}
+
+bool MappedFile::open(const std::string& path) {
+#ifdef _WIN32
+	HANDLE file = CreateFileA(path.c_str(), GENERIC_READ, FILE_SHARE_READ, nullptr, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, nullptr);
+	if (file == INVALID_HANDLE_VALUE)
+		return false;
+	m_file = file;
+	LARGE_INTEGER size;
+	if (!GetFileSizeEx(file, &size) || size.QuadPart == 0)
+		return false;
+	m_mapping = CreateFileMappingA(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+	if (!m_mapping)
+		return false;
+	m_data = static_cast<const uint8_t*>(MapViewOfFile(m_mapping, FILE_MAP_READ, 0, 0, 0));
+	m_size = m_data ? static_cast<size_t>(size.QuadPart) : 0;
+	return m_data != nullptr;
+#else
+	const int file = ::open(path.c_str(), O_RDONLY);
+	if (file < 0)
+		return false;
+	struct stat status;
+	void* data = MAP_FAILED;
+	if (fstat(file, &status) == 0 && status.st_size > 0)
+		data = mmap(nullptr, static_cast<size_t>(status.st_size), PROT_READ, MAP_SHARED, file, 0);
+	// the mapping stays valid after the descriptor is closed
+	::close(file);
+	if (data == MAP_FAILED)
+		return false;
+	m_data = static_cast<const uint8_t*>(data);
+	m_size = static_cast<size_t>(status.st_size);
+	return true;
+#endif
+}
+
+PyMappedIndex::PyMappedIndex(PyIFaceEngine& faceEngine) :
+	m_faceEngine(faceEngine),
+	m_header()
+{}
+
+fsdk::Result<fsdk::FSDKError> PyMappedIndex::load(
+	PyIFaceEngine& faceEngine,
+	const std::string& path,
+	bool verify,
+	std::shared_ptr<PyMappedIndex>& index) {
+	std::shared_ptr<PyMappedIndex> mapped(new PyMappedIndex(faceEngine));
+	if (!mapped->m_file.open(path) || mapped->m_file.size() < sizeof(MappedIndexHeader))
+		return makeError(fsdk::FSDKError::InvalidInput);
+
+	MappedIndexHeader& header = mapped->m_header;
+	std::memcpy(&header, mapped->m_file.data(), sizeof(header));
+	if (std::memcmp(header.magic, mappedIndexMagic, sizeof(header.magic)) != 0 ||
+		header.headerSize != sizeof(MappedIndexHeader) ||
+		header.headerChecksum != headerChecksum(header))
+		return makeError(fsdk::FSDKError::InvalidInput);
+	if (header.formatVersion != mappedIndexFormatVersion)
+		return makeError(fsdk::FSDKError::UnsupportedFunctionality);
+	// the matrix must be aligned and fit into the file
+	const uint64_t fileSize = mapped->m_file.size();
+	if (header.descriptorSize == 0 ||
+		header.matrixOffset % mappedIndexAlignment != 0 ||
+		header.matrixOffset > fileSize ||
+		header.count > (fileSize - header.matrixOffset) / header.descriptorSize)
+		return makeError(fsdk::FSDKError::InvalidInput);
+
+	// searches create matchers of their own, this one only checks the version
+	const fsdk::IDescriptorMatcherPtr matcher = fsdk::acquire(
+		faceEngine.faceEnginePtr->createMatcher(header.descriptorVersion));
+	if (!matcher)
+		return makeError(fsdk::FSDKError::IncompatibleModelVersions);
+	if (verify) {
+		const fsdk::Result<fsdk::FSDKError> verified = mapped->verify();
+		if (verified.isError())
+			return verified;
+	}
+	index = mapped;
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyMappedIndex::descriptorByIndex(
+	fsdk::DescriptorId index,
+	const fsdk::IDescriptorPtr& descriptor) const {
+	if (!descriptor || index >= m_header.count)
+		return makeError(fsdk::FSDKError::InvalidInput);
+	if (descriptor->getModelVersion() != m_header.descriptorVersion)
+		return makeError(fsdk::FSDKError::IncompatibleDescriptors);
+	Archive archive(reinterpret_cast<const char*>(getDescriptorData(static_cast<size_t>(index))), m_header.descriptorSize);
+	if (descriptor->load(&archive, fsdk::ISerializableObject::NoSignature).isError())
+		return makeError(fsdk::FSDKError::InvalidDescriptor);
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyMappedIndex::verify() const {
+	std::call_once(m_verifyFlag, [this] {
+		const uint32_t checksum = updateChecksum(0, getDescriptorData(0), size() * m_header.descriptorSize);
+		m_verifyError = checksum == m_header.matrixChecksum ? fsdk::FSDKError::Ok : fsdk::FSDKError::InvalidInput;
+	});
+	return makeError(m_verifyError);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, int> PyMappedIndex::search(
+	const fsdk::IDescriptorPtr& reference,
+	int maxResultsCount,
+	fsdk::SearchResult* results,
+	uint32_t threadCount) const {
+	if (!reference || maxResultsCount <= 0)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::InvalidInput, 0);
+	if (reference->getModelVersion() != m_header.descriptorVersion)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::IncompatibleDescriptors, 0);
+
+	const size_t k = static_cast<size_t>(maxResultsCount);
+	TopK<fsdk::SearchResult, MoreSimilar> best(k);
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	std::mutex mutex;
+	// every block selects its own best rows, they are merged under the lock
+	auto scan = [&](size_t begin, size_t end) {
+		TopK<fsdk::SearchResult, MoreSimilar> blockBest(k);
+		fsdk::Result<fsdk::FSDKError> blockErr(fsdk::FSDKError::Ok);
+		const uint32_t version = m_header.descriptorVersion;
+		fsdk::IDescriptorPtr descriptor = fsdk::acquire(m_faceEngine.faceEnginePtr->createDescriptor(version));
+		fsdk::IDescriptorBatchPtr batch = fsdk::acquire(m_faceEngine.faceEnginePtr->createDescriptorBatch(
+			static_cast<int32_t>(searchChunkSize),
+			version));
+		// blocks are scanned on several threads, so every block matches by a matcher of its own
+		fsdk::IDescriptorMatcherPtr matcher = fsdk::acquire(m_faceEngine.faceEnginePtr->createMatcher(version));
+		std::vector<fsdk::MatchingResult> matches(searchChunkSize);
+		if (!descriptor || !batch || !matcher)
+			blockErr = makeError(fsdk::FSDKError::Internal);
+		for (size_t chunk = begin; chunk < end && blockErr.isOk(); chunk += searchChunkSize) {
+			const size_t chunkEnd = std::min(end, chunk + searchChunkSize);
+			batch->clear();
+			for (size_t i = chunk; i < chunkEnd && blockErr.isOk(); ++i) {
+				Archive archive(reinterpret_cast<const char*>(getDescriptorData(i)), m_header.descriptorSize);
+				if (descriptor->load(&archive, fsdk::ISerializableObject::NoSignature).isError() ||
+					batch->add(descriptor).isError())
+					blockErr = makeError(fsdk::FSDKError::InvalidDescriptor);
+			}
+			if (blockErr.isOk())
+				blockErr = matcher->match(reference, batch, matches.data());
+			for (size_t i = chunk; i < chunkEnd && blockErr.isOk(); ++i) {
+				const fsdk::MatchingResult& match = matches[i - chunk];
+				blockBest.push(fsdk::SearchResult(match.distance, match.similarity, static_cast<fsdk::DescriptorId>(i)));
+			}
+		}
+		std::lock_guard<std::mutex> lock(mutex);
+		if (blockErr.isError()) {
+			if (err.isOk())
+				err = blockErr;
+			return;
+		}
+		for (const fsdk::SearchResult& result : blockBest.take())
+			best.push(result);
+	};
+	if (threadCount == 1)
+		scan(0, size());
+	else
+		parallelForBlocks(size(), threadCount, scan);
+	if (err.isError())
+		return fsdk::ResultValue<fsdk::FSDKError, int>(err.getError(), 0);
+
+	const std::vector<fsdk::SearchResult> found = best.take();
+	std::copy(found.begin(), found.end(), results);
+	return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, static_cast<int>(found.size()));
+}
+
+fsdk::Result<fsdk::FSDKError> saveMappedIndex(const std::string& path, const fsdk::IDescriptorBatchPtr& batch) {
+	const size_t count = batch->getCount();
+	if (count == 0)
+		return makeError(fsdk::FSDKError::InvalidDescriptorBatch);
+	return writeMappedIndex(
+		path,
+		batch->getModelVersion(),
+		batch->getDescriptorSize(),
+		count,
+		[&batch](size_t i, uint8_t* row) {
+			fsdk::IDescriptorPtr descriptor = fsdk::acquire(batch->getDescriptorFast(static_cast<uint32_t>(i)));
+			return descriptor && descriptor->getDescriptor(row);
+		});
+}
+
+fsdk::Result<fsdk::FSDKError> saveMappedIndex(
+	const std::string& path,
+	const fsdk::IDenseIndexPtr& index,
+	PyIFaceEngine& faceEngine,
+	uint32_t version) {
+	fsdk::IDescriptorPtr descriptor = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptor(version));
+	if (!descriptor)
+		return makeError(fsdk::FSDKError::IncompatibleModelVersions);
+	// ids of dense index are dense, a row is written for every id below size
+	return writeMappedIndex(
+		path,
+		descriptor->getModelVersion(),
+		descriptor->getDescriptorLength(),
+		index->size(),
+		[&index, &descriptor](size_t i, uint8_t* row) {
+			return index->descriptorByIndex(static_cast<fsdk::DescriptorId>(i), descriptor).isOk() &&
+				descriptor->getDescriptor(row);
+		});
+}
@@ -0,0 +1,126 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+
+#include <cstdint>
+#include <memory>
+#include <mutex>
+#include <string>
+
+// Read-only memory mapping of a whole file. Pages are shared with the page cache and with other processes
+// mapping the same file.
+class MappedFile {
+public:
+	MappedFile() = default;
+	~MappedFile();
+
+	MappedFile(const MappedFile&) = delete;
+	MappedFile& operator=(const MappedFile&) = delete;
+
+	// Returns false if the file can not be opened or mapped
+	bool open(const std::string& path);
+
+	const uint8_t* data() const {
+		return m_data;
+	}
+
+	size_t size() const {
+		return m_size;
+	}
+
+private:
+	const uint8_t* m_data = nullptr;
+	size_t m_size = 0;
+#ifdef _WIN32
+	void* m_file = nullptr;
+	void* m_mapping = nullptr;
+#endif
+};
+
+// Layout of a mapped index file, version 1. Integers are little-endian.
+// The header is followed by zero padding up to matrixOffset, a multiple of mappedIndexAlignment, so
+// the descriptor matrix is page aligned in the mapping. The matrix has count rows of descriptorSize bytes,
+// a row is descriptor data without signature as returned by IDescriptorPtr.getData, its DescriptorId is
+// the row number.
+const char mappedIndexMagic[8] = {'L', 'S', 'D', 'K', 'M', 'I', 'D', 'X'};
+const uint32_t mappedIndexFormatVersion = 1;
+const uint64_t mappedIndexAlignment = 1 << 16;
+
+struct MappedIndexHeader {
+	char magic[8];
+	uint32_t formatVersion;
+	uint32_t headerSize;
+	uint32_t descriptorVersion;
+	uint32_t descriptorSize;
+	uint64_t count;
+	uint64_t matrixOffset;
+	uint32_t matrixChecksum;    // CRC-32 of the matrix
+	uint32_t headerChecksum;    // CRC-32 of the preceding fields
+};
+
+// Read-only index over descriptors of a mapped index file. Loading maps the file and checks its header,
+// the descriptor matrix is read by searches only, its checksum is validated by verify or on load if requested.
+// Search is an exact linear scan: rows are read from the mapping into a batch of a chunk of rows and matched by
+// the matcher of the descriptor version, memory per search is bounded by the chunk size and nothing is kept
+// between searches. All methods are thread safe and must be called without the GIL.
+class PyMappedIndex {
+public:
+	// Maps the file at path, with verify the checksum of the descriptor matrix is validated too
+	static fsdk::Result<fsdk::FSDKError> load(
+		PyIFaceEngine& faceEngine,
+		const std::string& path,
+		bool verify,
+		std::shared_ptr<PyMappedIndex>& index);
+
+	size_t size() const {
+		return static_cast<size_t>(m_header.count);
+	}
+
+	uint32_t getDescriptorVersion() const {
+		return m_header.descriptorVersion;
+	}
+
+	uint32_t getDescriptorSize() const {
+		return m_header.descriptorSize;
+	}
+
+	// Data of descriptor index, the pointer is valid while the index is alive
+	const uint8_t* getDescriptorData(size_t index) const {
+		return m_file.data() + m_header.matrixOffset + index * m_header.descriptorSize;
+	}
+
+	fsdk::Result<fsdk::FSDKError> descriptorByIndex(fsdk::DescriptorId index, const fsdk::IDescriptorPtr& descriptor) const;
+
+	// Validates checksum of the descriptor matrix, it is computed by the first call only
+	fsdk::Result<fsdk::FSDKError> verify() const;
+
+	// Writes up to maxResultsCount nearest descriptors sorted by similarity to results and returns their count.
+	// Rows are scanned on threadCount threads, 0 - number of hardware threads, 1 - in place.
+	fsdk::ResultValue<fsdk::FSDKError, int> search(
+		const fsdk::IDescriptorPtr& reference,
+		int maxResultsCount,
+		fsdk::SearchResult* results,
+		uint32_t threadCount = 1) const;
+
+private:
+	explicit PyMappedIndex(PyIFaceEngine& faceEngine);
+
+	PyIFaceEngine m_faceEngine;
+	MappedFile m_file;
+	MappedIndexHeader m_header;
+	mutable std::once_flag m_verifyFlag;
+	mutable fsdk::FSDKError m_verifyError = fsdk::FSDKError::Ok;
+};
+
+// Write descriptors of batch to a mapped index file. The file is written next to path and renamed,
+// so processes mapping the old file keep their data.
+fsdk::Result<fsdk::FSDKError> saveMappedIndex(const std::string& path, const fsdk::IDescriptorBatchPtr& batch);
+
+// Write descriptors of dense index to a mapped index file, descriptor ids are kept.
+// Descriptors are read by a descriptor of version created by faceEngine.
+fsdk::Result<fsdk::FSDKError> saveMappedIndex(
+	const std::string& path,
+	const fsdk::IDenseIndexPtr& index,
+	PyIFaceEngine& faceEngine,
+	uint32_t version);
@@ -0,0 +1,82 @@
+#include "MatchMatrix.hpp"
+#include "ThreadPool.hpp"
+
+#include <algorithm>
+#include <atomic>
+#include <mutex>
+#include <vector>
+
+fsdk::Result<fsdk::FSDKError> matchMatrix(
+	PyIFaceEngine& faceEngine,
+	const fsdk::IDescriptorBatchPtr& probes,
+	const fsdk::IDescriptorBatchPtr& candidates,
+	uint32_t threadCount,
+	float* distance,
+	float* similarity) {
+	const size_t rows = probes->getCount();
+	const size_t cols = candidates->getCount();
+	if (rows == 0 || cols == 0)
+		return fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Ok);
+	const uint32_t version = probes->getModelVersion();
+
+	// a batch fitting into one tile is matched as is, bigger ones are copied once tile by tile
+	std::vector<fsdk::IDescriptorBatchPtr> tiles;
+	if (cols <= matchMatrixTileSize) {
+		tiles.push_back(candidates);
+	} else {
+		for (size_t begin = 0; begin < cols; begin += matchMatrixTileSize) {
+			const uint32_t size = static_cast<uint32_t>(std::min(matchMatrixTileSize, cols - begin));
+			fsdk::IDescriptorBatchPtr tile = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptorBatch(
+				static_cast<int32_t>(size),
+				version));
+			if (!tile)
+				return fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Internal);
+			if (tile->add(candidates, static_cast<uint32_t>(begin), size).isError())
+				return fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::IncompatibleDescriptors);
+			tiles.push_back(tile);
+		}
+	}
+
+	// work items walk probe blocks of a tile before the next tile, so workers share the tiles in cache
+	const size_t probeBlockCount = (rows + matchMatrixProbeBlockSize - 1) / matchMatrixProbeBlockSize;
+	const size_t itemCount = tiles.size() * probeBlockCount;
+	const size_t workerCount = std::min<size_t>(
+		threadCount == 0 ? ThreadPool::shared().size() : threadCount,
+		itemCount);
+	std::atomic<size_t> nextItem(0);
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	std::mutex errorMutex;
+	auto fail = [&](fsdk::Result<fsdk::FSDKError> workerErr) {
+		std::lock_guard<std::mutex> lock(errorMutex);
+		if (err.isOk())
+			err = workerErr;
+		nextItem = itemCount;
+	};
+	// one call per worker, every worker takes work items until none are left
+	parallelForBlocks(workerCount, workerCount, [&](size_t, size_t) {
+		fsdk::IDescriptorMatcherPtr matcher = fsdk::acquire(faceEngine.faceEnginePtr->createMatcher(version));
+		if (!matcher)
+			return fail(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::IncompatibleModelVersions));
+		std::vector<fsdk::MatchingResult> results(std::min(matchMatrixTileSize, cols));
+		for (size_t item = nextItem++; item < itemCount; item = nextItem++) {
+			const size_t tile = item / probeBlockCount;
+			const size_t tileBegin = tile * matchMatrixTileSize;
+			const size_t tileSize = tiles[tile]->getCount();
+			const size_t probeBegin = (item % probeBlockCount) * matchMatrixProbeBlockSize;
+			const size_t probeEnd = std::min(rows, probeBegin + matchMatrixProbeBlockSize);
+			for (size_t i = probeBegin; i < probeEnd; ++i) {
+				fsdk::IDescriptorPtr probe = fsdk::acquire(probes->getDescriptorFast(static_cast<uint32_t>(i)));
+				const fsdk::Result<fsdk::FSDKError> matchErr = probe ?
+					matcher->match(probe, tiles[tile], results.data()) :
+					fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Internal);
+				if (matchErr.isError())
+					return fail(matchErr);
+				for (size_t j = 0; j < tileSize; ++j) {
+					distance[i * cols + tileBegin + j] = results[j].distance;
+					similarity[i * cols + tileBegin + j] = results[j].similarity;
+				}
+			}
+		}
+	});
+	return err;
+}
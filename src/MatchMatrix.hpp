@@ -0,0 +1,24 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+
+#include <cstddef>
+
+// candidates matched with a block of probes before the next ones, a tile is copied to a batch of its own
+const size_t matchMatrixTileSize = 1024;
+// probes matched with one tile by a worker before it takes the next work item
+const size_t matchMatrixProbeBlockSize = 64;
+
+// Matches every descriptor of probes with every descriptor of candidates and writes row-major matrices
+// of shape (probes count, candidates count) to distance and similarity. Candidates are split into tiles
+// and probes into blocks, pairs of them are matched on threadCount threads (0 means the number of
+// hardware threads), every thread matches by a matcher of its own created by faceEngine.
+// Must be called without the GIL.
+fsdk::Result<fsdk::FSDKError> matchMatrix(
+	PyIFaceEngine& faceEngine,
+	const fsdk::IDescriptorBatchPtr& probes,
+	const fsdk::IDescriptorBatchPtr& candidates,
+	uint32_t threadCount,
+	float* distance,
+	float* similarity);
@@ -0,0 +1,120 @@
+#include "MicroBatcher.hpp"
+#include "BatchedCalls.hpp"
+#include "OwnedImage.hpp"
+
+PyMicroBatcher::PyMicroBatcher(
+	PyIFaceEngine& pyIFaceEngine,
+	fsdk::ObjectDetectorClassType detectorType,
+	uint32_t descriptorVersion,
+	size_t maxBatchSize,
+	double maxLatencyMs) :
+	faceEnginePtr(pyIFaceEngine.faceEnginePtr),
+	detector(pyIFaceEngine.createDetector(detectorType)),
+	extractor(pyIFaceEngine.createExtractor(descriptorVersion)),
+	descriptorVersion(extractor->getModelVersion()) {
+	const std::chrono::microseconds maxLatency(static_cast<int64_t>(std::max(maxLatencyMs, 0.) * 1000.));
+	detectQueue.reset(new MicroBatchQueue<DetectBatchItem>(
+		maxBatchSize,
+		maxLatency,
+		[this](const std::vector<DetectBatchItem*>& batch) { flushDetect(batch); }));
+	extractQueue.reset(new MicroBatchQueue<ExtractBatchItem>(
+		maxBatchSize,
+		maxLatency,
+		[this](const std::vector<ExtractBatchItem*>& batch) { flushExtract(batch); }));
+}
+
+std::tuple<FSDKErrorResult, std::vector<fsdk::Face>> PyMicroBatcher::detect(
+	const fsdk::Image& image,
+	const fsdk::Rect& rect,
+	uint32_t detectionPerImageNum,
+	fsdk::DetectionType type) {
+	DetectBatchItem item;
+	item.image = image;
+	item.rect = rect;
+	item.detectionPerImageNum = detectionPerImageNum;
+	item.type = type;
+	detectQueue->process(item);
+	ownFaceImages(item.faces.data(), item.faces.size());
+	return std::make_tuple(FSDKErrorResult(item.error), std::move(item.faces));
+}
+
+std::tuple<FSDKErrorResult, fsdk::IDescriptorPtr, float> PyMicroBatcher::extract(const fsdk::Image& warp) {
+	ExtractBatchItem item;
+	item.warp = warp;
+	extractQueue->process(item);
+	return std::make_tuple(FSDKErrorResult(item.error), item.descriptor, item.garbageScore);
+}
+
+MicroBatchMetrics PyMicroBatcher::getDetectMetrics() {
+	return detectQueue->getMetrics();
+}
+
+MicroBatchMetrics PyMicroBatcher::getExtractMetrics() {
+	return extractQueue->getMetrics();
+}
+
+void PyMicroBatcher::resetMetrics() {
+	detectQueue->resetMetrics();
+	extractQueue->resetMetrics();
+}
+
+size_t PyMicroBatcher::getMaxBatchSize() const {
+	return detectQueue->getMaxBatchSize();
+}
+
+double PyMicroBatcher::getMaxLatencyMs() const {
+	return detectQueue->getMaxLatency().count() / 1000.;
+}
+
+uint32_t PyMicroBatcher::getDescriptorVersion() const {
+	return descriptorVersion;
+}
+
+void PyMicroBatcher::flushDetect(const std::vector<DetectBatchItem*>& batch) {
+	// one SDK call accepts one detection count and type, requests are grouped by them keeping the order
+	std::vector<DetectBatchItem*> items(batch);
+	std::stable_sort(items.begin(), items.end(), [](const DetectBatchItem* lhs, const DetectBatchItem* rhs) {
+		return std::make_pair(lhs->detectionPerImageNum, static_cast<int>(lhs->type)) <
+			std::make_pair(rhs->detectionPerImageNum, static_cast<int>(rhs->type));
+	});
+
+	size_t begin = 0;
+	while (begin < items.size()) {
+		size_t end = begin + 1;
+		while (end < items.size() &&
+			items[end]->detectionPerImageNum == items[begin]->detectionPerImageNum &&
+			items[end]->type == items[begin]->type)
+			++end;
+
+		std::vector<fsdk::Image> images;
+		std::vector<fsdk::Rect> rectangles;
+		for (size_t i = begin; i < end; ++i) {
+			images.push_back(items[i]->image);
+			rectangles.push_back(items[i]->rect);
+		}
+		std::vector<BatchedDetection> results = detectBatched(
+			detector,
+			images,
+			rectangles,
+			items[begin]->detectionPerImageNum,
+			items[begin]->type);
+		for (size_t i = begin; i < end; ++i) {
+			items[i]->error = results[i - begin].error;
+			items[i]->faces.swap(results[i - begin].faces);
+		}
+		begin = end;
+	}
+}
+
+void PyMicroBatcher::flushExtract(const std::vector<ExtractBatchItem*>& batch) {
+	std::vector<fsdk::Image> warps;
+	warps.reserve(batch.size());
+	for (const ExtractBatchItem* item : batch)
+		warps.push_back(item->warp);
+	const std::vector<BatchedExtraction> results = extractBatched(faceEnginePtr, extractor, warps);
+	for (size_t i = 0; i < batch.size(); ++i) {
+		batch[i]->error = results[i].error;
+		batch[i]->descriptor = results[i].descriptor;
+		batch[i]->garbageScore = results[i].garbageScore;
+	}
+}
@@ -0,0 +1,234 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+#include "ErrorsAdapter.hpp"
+
+#include <algorithm>
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <tuple>
+#include <vector>
+
+// Snapshot of micro-batching queue statistics. batchSizeHistogram[n] is the number of flushed batches of n requests,
+// latency is measured from submission of a request to its completion.
+struct MicroBatchMetrics {
+	size_t queueDepth;
+	uint64_t requestCount;
+	uint64_t batchCount;
+	uint64_t deadlineFlushCount;
+	std::vector<uint64_t> batchSizeHistogram;
+	double meanLatencyMs;
+	double maxLatencyMs;
+};
+
+// Base of queued requests, the queue completes done after the request is flushed
+struct MicroBatchItem {
+	std::chrono::steady_clock::time_point enqueued;
+	std::promise<void> done;
+};
+
+// Collects requests of many threads and passes them to flush in groups. A group is flushed when it reaches
+// maxBatchSize or when the oldest queued request waits for maxLatency. flush is called on the queue thread
+// only, so it can use SDK objects that are not thread safe. Nothing here touches python objects.
+template<typename Item>
+class MicroBatchQueue {
+public:
+	typedef std::function<void(const std::vector<Item*>&)> Flush;
+
+	MicroBatchQueue(size_t maxBatchSize, std::chrono::microseconds maxLatency, Flush flush) :
+		m_flush(flush),
+		m_maxBatchSize(std::max<size_t>(maxBatchSize, 1)),
+		m_maxLatency(maxLatency),
+		m_stop(false) {
+		resetMetrics();
+		m_thread = std::thread([this] { run(); });
+	}
+
+	// Queued requests are flushed before the thread stops
+	~MicroBatchQueue() {
+		{
+			std::lock_guard<std::mutex> lock(m_mutex);
+			m_stop = true;
+		}
+		m_condition.notify_all();
+		m_thread.join();
+	}
+
+	MicroBatchQueue(const MicroBatchQueue&) = delete;
+	MicroBatchQueue& operator=(const MicroBatchQueue&) = delete;
+
+	// Queues item and blocks until it is flushed. Exception thrown by flush is rethrown here.
+	void process(Item& item) {
+		std::future<void> done = item.done.get_future();
+		{
+			std::lock_guard<std::mutex> lock(m_mutex);
+			item.enqueued = std::chrono::steady_clock::now();
+			m_queue.push_back(&item);
+		}
+		m_condition.notify_one();
+		done.get();
+	}
+
+	MicroBatchMetrics getMetrics() {
+		std::lock_guard<std::mutex> lock(m_mutex);
+		MicroBatchMetrics metrics = m_metrics;
+		metrics.queueDepth = m_queue.size();
+		return metrics;
+	}
+
+	void resetMetrics() {
+		std::lock_guard<std::mutex> lock(m_mutex);
+		m_metrics.queueDepth = 0;
+		m_metrics.requestCount = 0;
+		m_metrics.batchCount = 0;
+		m_metrics.deadlineFlushCount = 0;
+		m_metrics.batchSizeHistogram.assign(m_maxBatchSize + 1, 0);
+		m_metrics.meanLatencyMs = 0.;
+		m_metrics.maxLatencyMs = 0.;
+	}
+
+	size_t getMaxBatchSize() const {
+		return m_maxBatchSize;
+	}
+
+	std::chrono::microseconds getMaxLatency() const {
+		return m_maxLatency;
+	}
+
+private:
+	void run() {
+		std::unique_lock<std::mutex> lock(m_mutex);
+		for (;;) {
+			m_condition.wait(lock, [this] { return m_stop || !m_queue.empty(); });
+			if (m_queue.empty())
+				return;
+			// the deadline belongs to the oldest request, newer requests only shorten the wait by filling the batch
+			const std::chrono::steady_clock::time_point deadline = m_queue.front()->enqueued + m_maxLatency;
+			const bool full = m_condition.wait_until(lock, deadline, [this] {
+				return m_stop || m_queue.size() >= m_maxBatchSize;
+			});
+			const size_t count = std::min(m_queue.size(), m_maxBatchSize);
+			std::vector<Item*> batch(m_queue.begin(), m_queue.begin() + count);
+			m_queue.erase(m_queue.begin(), m_queue.begin() + count);
+			lock.unlock();
+
+			std::exception_ptr error;
+			try {
+				m_flush(batch);
+			} catch (...) {
+				error = std::current_exception();
+			}
+			const std::chrono::steady_clock::time_point now = std::chrono::steady_clock::now();
+
+			lock.lock();
+			record(batch, now, !full);
+			for (Item* item : batch) {
+				if (error)
+					item->done.set_exception(error);
+				else
+					item->done.set_value();
+			}
+		}
+	}
+
+	// Must be called under the lock
+	void record(const std::vector<Item*>& batch, std::chrono::steady_clock::time_point now, bool byDeadline) {
+		const uint64_t previousCount = m_metrics.requestCount;
+		double latencySum = 0.;
+		for (const Item* item : batch) {
+			const double latency = std::chrono::duration<double, std::milli>(now - item->enqueued).count();
+			latencySum += latency;
+			m_metrics.maxLatencyMs = std::max(m_metrics.maxLatencyMs, latency);
+		}
+		m_metrics.requestCount += batch.size();
+		m_metrics.meanLatencyMs =
+			(m_metrics.meanLatencyMs * previousCount + latencySum) / m_metrics.requestCount;
+		m_metrics.batchCount += 1;
+		m_metrics.deadlineFlushCount += byDeadline ? 1 : 0;
+		m_metrics.batchSizeHistogram[batch.size()] += 1;
+	}
+
+	Flush m_flush;
+	size_t m_maxBatchSize;
+	std::chrono::microseconds m_maxLatency;
+	std::deque<Item*> m_queue;
+	std::mutex m_mutex;
+	std::condition_variable m_condition;
+	MicroBatchMetrics m_metrics;
+	std::thread m_thread;
+	bool m_stop;
+};
+
+struct DetectBatchItem : MicroBatchItem {
+	DetectBatchItem() : detectionPerImageNum(1), type(fsdk::dtBBox), error(fsdk::FSDKError::Ok) {}
+
+	fsdk::Image image;
+	fsdk::Rect rect;
+	uint32_t detectionPerImageNum;
+	fsdk::DetectionType type;
+	fsdk::Result<fsdk::FSDKError> error;
+	std::vector<fsdk::Face> faces;
+};
+
+struct ExtractBatchItem : MicroBatchItem {
+	ExtractBatchItem() : error(fsdk::FSDKError::Ok), garbageScore(0.f) {}
+
+	fsdk::Image warp;
+	fsdk::Result<fsdk::FSDKError> error;
+	fsdk::IDescriptorPtr descriptor;
+	float garbageScore;
+};
+
+// Detector and extractor behind micro-batching queues: single image requests of many threads
+// are served by batched SDK calls.
+class PyMicroBatcher {
+public:
+	PyMicroBatcher(
+		PyIFaceEngine& pyIFaceEngine,
+		fsdk::ObjectDetectorClassType detectorType,
+		uint32_t descriptorVersion,
+		size_t maxBatchSize,
+		double maxLatencyMs);
+
+	// Must be called without the GIL
+	std::tuple<FSDKErrorResult, std::vector<fsdk::Face>> detect(
+		const fsdk::Image& image,
+		const fsdk::Rect& rect,
+		uint32_t detectionPerImageNum,
+		fsdk::DetectionType type);
+
+	// Must be called without the GIL
+	std::tuple<FSDKErrorResult, fsdk::IDescriptorPtr, float> extract(const fsdk::Image& warp);
+
+	MicroBatchMetrics getDetectMetrics();
+
+	MicroBatchMetrics getExtractMetrics();
+
+	void resetMetrics();
+
+	size_t getMaxBatchSize() const;
+
+	double getMaxLatencyMs() const;
+
+	uint32_t getDescriptorVersion() const;
+
+private:
+	void flushDetect(const std::vector<DetectBatchItem*>& batch);
+
+	void flushExtract(const std::vector<ExtractBatchItem*>& batch);
+
+	fsdk::IFaceEnginePtr faceEnginePtr;
+	fsdk::IDetectorPtr detector;
+	fsdk::IDescriptorExtractorPtr extractor;
+	uint32_t descriptorVersion;
+	// queues are declared last to be destroyed first, their threads use the SDK objects above
+	std::unique_ptr<MicroBatchQueue<DetectBatchItem>> detectQueue;
+	std::unique_ptr<MicroBatchQueue<ExtractBatchItem>> extractQueue;
+};
@@ -0,0 +1,165 @@
+#include <algorithm>
+
+#include <pybind11/stl.h>
+
+#include "NumpyAdapter.hpp"
+
+ImageLayout getImageLayout(int width, int height, fsdk::Format format) {
+	ImageLayout layout;
+	if (fsdk::Format::Type(format) == fsdk::Format::YUV_NV21) {
+		// plane of Y samples followed by plane of interleaved V/U samples of the half height
+		layout.itemSize = 1;
+		layout.shape = {height + height / 2, width};
+		layout.strides = {width, 1};
+		return layout;
+	}
+	const int channelStep = std::max(format.getChannelStep(), 1);
+	layout.itemSize = std::max(format.getByteDepth() / channelStep, 1);
+	layout.shape = {height, width, format.getChannelCount()};
+	layout.strides = {format.computePitch(width), format.getByteDepth(), layout.itemSize};
+	return layout;
+}
+
+static py::dtype getItemType(const ImageLayout& layout) {
+	return layout.itemSize == 2 ? py::dtype::of<uint16_t>() : py::dtype::of<uint8_t>();
+}
+
+py::array imageToArray(const fsdk::Image& image, bool copy, py::handle owner) {
+	const ImageLayout layout = getImageLayout(image.getWidth(), image.getHeight(), image.getFormat());
+	if (copy || !image.isValid() || (!image.ownsData() && !owner))
+		return py::array(getItemType(layout), layout.shape, layout.strides, image.getData());
+	if (!image.ownsData())
+		return py::array(getItemType(layout), layout.shape, layout.strides, image.getData(), owner);
+
+	// image copy shares refcounted storage with the source image and keeps it alive while the view exists
+	fsdk::Image* storage = new fsdk::Image(image);
+	py::capsule base(storage, [](void* ptr) { delete static_cast<fsdk::Image*>(ptr); });
+	return py::array(getItemType(layout), layout.shape, layout.strides, storage->getData(), base);
+}
+
+py::buffer_info imageBufferInfo(fsdk::Image& image) {
+	const ImageLayout layout = getImageLayout(image.getWidth(), image.getHeight(), image.getFormat());
+	return py::buffer_info(
+		image.getData(),
+		layout.itemSize,
+		layout.itemSize == 2 ? py::format_descriptor<uint16_t>::format() : py::format_descriptor<uint8_t>::format(),
+		static_cast<py::ssize_t>(layout.shape.size()),
+		layout.shape,
+		layout.strides);
+}
+
+fsdk::Result<fsdk::Image::Error> checkImageArray(
+	const py::array& array,
+	fsdk::Format format,
+	int& width,
+	int& height) {
+	const fsdk::Format::Type type = fsdk::Format::Type(format);
+	if (type == fsdk::Format::Unknown)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidFormat);
+	const bool isValidType = type == fsdk::Format::R16 ?
+		py::isinstance<py::array_t<uint16_t>>(array) :
+		py::isinstance<py::array_t<uint8_t>>(array);
+	if (!isValidType)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidFormat);
+
+	if (type == fsdk::Format::YUV_NV21) {
+		if (array.ndim() != 2 || array.shape(0) % 3 != 0)
+			return fsdk::makeResult(fsdk::Image::Error::InvalidDataSize);
+		height = static_cast<int>(array.shape(0) / 3 * 2);
+	} else {
+		const py::ssize_t channels = array.ndim() == 3 ? array.shape(2) : 1;
+		if (array.ndim() < 2 || array.ndim() > 3 ||
+			(channels != format.getChannelCount() && channels != format.getChannelStep()))
+			return fsdk::makeResult(fsdk::Image::Error::InvalidDataSize);
+		height = static_cast<int>(array.shape(0));
+	}
+	width = static_cast<int>(array.shape(1));
+	if (width <= 0)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidWidth);
+	if (height <= 0)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidHeight);
+	return fsdk::makeResult(fsdk::Image::Error::Ok);
+}
+
+fsdk::Result<fsdk::Image::Error> reshapeImageArray(
+	py::array& array,
+	fsdk::Format format,
+	int width,
+	int height) {
+	if (array.ndim() != 1)
+		return fsdk::makeResult(fsdk::Image::Error::Ok);
+	if (width <= 0)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidWidth);
+	if (height <= 0)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidHeight);
+
+	const ImageLayout layout = getImageLayout(width, height, format);
+	std::vector<py::ssize_t> shape = layout.shape;
+	if (shape.size() == 3)
+		shape[2] = std::max(format.getChannelStep(), 1);
+	py::ssize_t size = 1;
+	for (const py::ssize_t dim : shape)
+		size *= dim;
+	if (array.size() * array.itemsize() != size * layout.itemSize)
+		return fsdk::makeResult(fsdk::Image::Error::InvalidDataSize);
+
+	if (array.itemsize() != layout.itemSize)
+		array = array.attr("view")(layout.itemSize == 2 ? py::dtype::of<uint16_t>() : py::dtype::of<uint8_t>());
+	array = array.attr("reshape")(py::cast(shape));
+	return fsdk::makeResult(fsdk::Image::Error::Ok);
+}
+
+// whether array memory can be used as image memory as is
+static bool hasImageLayout(const py::array& array, fsdk::Format format, int width, int height) {
+	const ImageLayout layout = getImageLayout(width, height, format);
+	if (array.ndim() == 3 && array.shape(2) != format.getChannelStep())
+		return false;
+	for (py::ssize_t i = 0; i < array.ndim(); ++i) {
+		if (array.strides(i) != layout.strides[i])
+			return false;
+	}
+	return true;
+}
+
+// writeable view of image memory with the same shape as the source array
+static py::array imageViewLike(fsdk::Image& image, const py::array& source) {
+	const ImageLayout layout = getImageLayout(image.getWidth(), image.getHeight(), image.getFormat());
+	std::vector<py::ssize_t> shape(source.shape(), source.shape() + source.ndim());
+	std::vector<py::ssize_t> strides(layout.strides.begin(), layout.strides.begin() + source.ndim());
+	// the view is used only while the image is alive, so it does not own image storage
+	return py::array(source.dtype(), shape, strides, image.getData(), py::none());
+}
+
+fsdk::Result<fsdk::Image::Error> imageFromArray(
+	py::array array,
+	fsdk::Format format,
+	bool borrow,
+	fsdk::Image& image,
+	bool& borrowed) {
+	borrowed = false;
+	int width = 0;
+	int height = 0;
+	fsdk::Result<fsdk::Image::Error> error = checkImageArray(array, format, width, height);
+	if (error.isError())
+		return error;
+
+	if (hasImageLayout(array, format, width, height)) {
+		if (borrow && array.writeable()) {
+			image = fsdk::Image(width, height, format, array.mutable_data(), false);
+			borrowed = true;
+			return fsdk::makeResult(fsdk::Image::Error::Ok);
+		}
+		fsdk::Image result;
+		error = result.set(width, height, format, array.data());
+		if (error.isOk())
+			image = result;
+		return error;
+	}
+
+	fsdk::Image result(width, height, format);
+	if (!result.isValid())
+		return fsdk::makeResult(fsdk::Image::Error::InvalidMemory);
+	py::module::import("numpy").attr("copyto")(imageViewLike(result, array), array);
+	image = result;
+	return fsdk::makeResult(fsdk::Image::Error::Ok);
+}
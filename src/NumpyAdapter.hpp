@@ -0,0 +1,56 @@
+#pragma once
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+#include <fsdk/FaceEngine.h>
+
+#include <vector>
+
+namespace py = pybind11;
+
+// Memory layout of image pixels as seen from numpy: shape is in elements of itemSize bytes, strides are in bytes.
+// Padding bytes of X8 formats are skipped by the strides, YUV_NV21 is described as a single 8-bit plane
+// of height * 3 / 2 rows.
+struct ImageLayout {
+	py::ssize_t itemSize;
+	std::vector<py::ssize_t> shape;
+	std::vector<py::ssize_t> strides;
+};
+
+ImageLayout getImageLayout(int width, int height, fsdk::Format format);
+
+// Returns numpy view of image data. The view holds its own reference to the image storage,
+// so it stays valid even if the image object is reloaded or destroyed. If copy is true the data is copied.
+// Image not owning its data (see fromArray) has no storage to refer to, the view keeps owner alive instead,
+// it must be the python object keeping the memory alive. Without owner such image is copied.
+py::array imageToArray(const fsdk::Image& image, bool copy = false, py::handle owner = py::handle());
+
+py::buffer_info imageBufferInfo(fsdk::Image& image);
+
+// Checks that array describes an image of the given format and fills width and height on success.
+// Dtype must be uint16 for R16 and uint8 for other formats. Shape must be (height, width, channels), where channels
+// is either channel count or channel step of the format, (height, width) for single channel formats
+// and (height * 3 / 2, width) for YUV_NV21. Any strides are accepted.
+fsdk::Result<fsdk::Image::Error> checkImageArray(
+	const py::array& array,
+	fsdk::Format format,
+	int& width,
+	int& height);
+
+// Reshapes flat array (bytes, bytearray or one dimensional array) to the shape of image
+// with given size and format. Arrays that already have more dimensions are left untouched.
+fsdk::Result<fsdk::Image::Error> reshapeImageArray(
+	py::array& array,
+	fsdk::Format format,
+	int width,
+	int height);
+
+// Fills image with data of array. If borrow is true and the array is writeable and has exactly the memory layout
+// of the image, the image wraps memory of the array without copying and borrowed is set to true.
+// Otherwise data is copied once, strided arrays are copied directly into image memory.
+fsdk::Result<fsdk::Image::Error> imageFromArray(
+	py::array array,
+	fsdk::Format format,
+	bool borrow,
+	fsdk::Image& image,
+	bool& borrowed);
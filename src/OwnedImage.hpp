@@ -0,0 +1,32 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+
+#include <cstddef>
+
+// Images made by Image.fromArray with borrow=True wrap memory of numpy arrays kept alive only by their python
+// objects. Such images are copied by ownedImage before C++ objects outliving the call keep them: faces, queues
+// of requests and frames of streams. Images owning their data are shared without copying.
+inline fsdk::Image ownedImage(const fsdk::Image& image) {
+	if (!image.isValid() || image.ownsData())
+		return image;
+	fsdk::Image owned;
+	owned.set(image.getWidth(), image.getHeight(), image.getFormat(), image.getData());
+	return owned;
+}
+
+// Replaces borrowed images of faces by owned ones, faces found on the same image share one copy
+inline void ownFaceImages(fsdk::Face* faces, size_t count) {
+	const void* borrowedData = nullptr;
+	fsdk::Image owned;
+	for (size_t i = 0; i < count; ++i) {
+		fsdk::Image& image = faces[i].img;
+		if (!image.isValid() || image.ownsData())
+			continue;
+		if (image.getData() != borrowedData) {
+			borrowedData = image.getData();
+			owned = ownedImage(image);
+		}
+		image = owned;
+	}
+}
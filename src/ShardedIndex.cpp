@@ -0,0 +1,367 @@
+#include "ShardedIndex.hpp"
+#include "TopK.hpp"
+#include "FileHelpers.hpp"
+
+#include <algorithm>
+#include <cstdio>
+#include <cstring>
+#include <limits>
+#include <numeric>
+#include <thread>
+
+static_assert(sizeof(fsdk::DescriptorId) == sizeof(uint32_t), "global ids are saved as uint32");
+
+namespace {
+	// shard of locations and global id of descriptors removed by a failed append
+	const uint32_t noShard = std::numeric_limits<uint32_t>::max();
+	const fsdk::DescriptorId noGlobalId = std::numeric_limits<fsdk::DescriptorId>::max();
+
+	fsdk::Result<fsdk::FSDKError> makeError(fsdk::FSDKError error) {
+		return fsdk::Result<fsdk::FSDKError>(error);
+	}
+
+	std::string manifestPath(const std::string& directory) {
+		return directory + "/manifest";
+	}
+
+	std::string shardPath(const std::string& directory, size_t shard) {
+		return directory + "/shard_" + std::to_string(shard);
+	}
+
+	// Copy of count descriptors of batch starting from offset
+	fsdk::IDescriptorBatchPtr copyBatch(
+		PyIFaceEngine& faceEngine,
+		const fsdk::IDescriptorBatchPtr& batch,
+		size_t offset,
+		size_t count) {
+		fsdk::IDescriptorBatchPtr part = fsdk::acquire(faceEngine.faceEnginePtr->createDescriptorBatch(
+			static_cast<int32_t>(count),
+			batch->getModelVersion()));
+		if (part && part->add(batch, static_cast<uint32_t>(offset), static_cast<uint32_t>(count)).isError())
+			return fsdk::IDescriptorBatchPtr();
+		return part;
+	}
+}
+
+PyShardedIndex::PyShardedIndex(PyIFaceEngine& faceEngine, uint32_t shardCount, uint32_t threadCount) :
+	m_faceEngine(faceEngine),
+	m_shards(shardCount) {
+	if (threadCount == 0)
+		threadCount = std::max(std::thread::hardware_concurrency(), 1u);
+	m_pool.reset(new ThreadPool(std::min(threadCount, shardCount)));
+}
+
+fsdk::Result<fsdk::FSDKError> PyShardedIndex::build(
+	PyIFaceEngine& faceEngine,
+	const fsdk::IDescriptorBatchPtr& batch,
+	uint32_t shardCount,
+	uint32_t threadCount,
+	std::shared_ptr<PyShardedIndex>& index) {
+	const size_t count = batch ? batch->getCount() : 0;
+	if (shardCount == 0 || count < shardCount)
+		return makeError(fsdk::FSDKError::InvalidInput);
+
+	std::shared_ptr<PyShardedIndex> sharded(new PyShardedIndex(faceEngine, shardCount, threadCount));
+	sharded->m_locations.resize(count);
+	std::vector<fsdk::Result<fsdk::FSDKError>> errors(shardCount, makeError(fsdk::FSDKError::Ok));
+	sharded->m_pool->parallelFor(shardCount, [&](size_t s) {
+		const size_t begin = count * s / shardCount;
+		const size_t end = count * (s + 1) / shardCount;
+		fsdk::IIndexBuilderPtr builder = fsdk::acquire(faceEngine.faceEnginePtr->createIndexBuilder());
+		fsdk::IDescriptorBatchPtr part = copyBatch(faceEngine, batch, begin, end - begin);
+		if (!builder || !part) {
+			errors[s] = makeError(fsdk::FSDKError::Internal);
+			return;
+		}
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appended = builder->appendBatch(part);
+		if (appended.isError()) {
+			errors[s] = appended;
+			return;
+		}
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::IDynamicIndex*> built = builder->buildIndex();
+		if (built.isError()) {
+			errors[s] = makeError(built.getError());
+			return;
+		}
+		// ids of a dynamic index are positions in its storage
+		Shard& shard = sharded->m_shards[s];
+		shard.index = fsdk::acquire(built.getValue());
+		shard.globalIds.resize(end - begin);
+		for (size_t i = begin; i < end; ++i) {
+			shard.globalIds[i - begin] = static_cast<fsdk::DescriptorId>(i);
+			sharded->m_locations[i] = Location{static_cast<uint32_t>(s), static_cast<fsdk::DescriptorId>(i - begin)};
+		}
+	});
+	for (const fsdk::Result<fsdk::FSDKError>& err : errors)
+		if (err.isError())
+			return err;
+	index = sharded;
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyShardedIndex::load(
+	PyIFaceEngine& faceEngine,
+	const std::string& directory,
+	uint32_t threadCount,
+	std::shared_ptr<PyShardedIndex>& index) {
+	FILE* file = std::fopen(manifestPath(directory).c_str(), "rb");
+	if (!file)
+		return makeError(fsdk::FSDKError::InvalidInput);
+	ShardedIndexHeader header = {};
+	bool isOk = std::fread(&header, sizeof(header), 1, file) == 1 &&
+		std::memcmp(header.magic, shardedIndexMagic, sizeof(header.magic)) == 0 &&
+		header.shardCount > 0 &&
+		header.size < noGlobalId;
+	if (isOk && header.formatVersion != shardedIndexFormatVersion) {
+		std::fclose(file);
+		return makeError(fsdk::FSDKError::UnsupportedFunctionality);
+	}
+
+	std::shared_ptr<PyShardedIndex> sharded;
+	if (isOk)
+		sharded.reset(new PyShardedIndex(faceEngine, header.shardCount, threadCount));
+	for (uint32_t s = 0; s < header.shardCount && isOk; ++s) {
+		std::vector<fsdk::DescriptorId>& globalIds = sharded->m_shards[s].globalIds;
+		uint64_t count = 0;
+		isOk = std::fread(&count, sizeof(count), 1, file) == 1 && count < noGlobalId;
+		if (isOk) {
+			globalIds.resize(static_cast<size_t>(count));
+			isOk = std::fread(globalIds.data(), sizeof(fsdk::DescriptorId), globalIds.size(), file) == globalIds.size();
+		}
+	}
+	std::fclose(file);
+	if (!isOk)
+		return makeError(fsdk::FSDKError::InvalidInput);
+
+	// every global id must belong to exactly one descriptor
+	sharded->m_locations.assign(static_cast<size_t>(header.size), Location{noShard, 0});
+	for (uint32_t s = 0; s < header.shardCount; ++s) {
+		const std::vector<fsdk::DescriptorId>& globalIds = sharded->m_shards[s].globalIds;
+		for (size_t i = 0; i < globalIds.size(); ++i) {
+			if (globalIds[i] == noGlobalId)
+				continue;
+			if (globalIds[i] >= header.size || sharded->m_locations[globalIds[i]].shard != noShard)
+				return makeError(fsdk::FSDKError::InvalidInput);
+			sharded->m_locations[globalIds[i]] = Location{s, static_cast<fsdk::DescriptorId>(i)};
+		}
+	}
+	for (const Location& location : sharded->m_locations)
+		if (location.shard == noShard)
+			return makeError(fsdk::FSDKError::InvalidInput);
+
+	std::vector<fsdk::Result<fsdk::FSDKError>> errors(header.shardCount, makeError(fsdk::FSDKError::Ok));
+	sharded->m_pool->parallelFor(header.shardCount, [&](size_t s) {
+		Shard& shard = sharded->m_shards[s];
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::IDynamicIndex*> loaded =
+			faceEngine.faceEnginePtr->loadDynamicIndex(shardPath(directory, s).c_str());
+		if (loaded.isError()) {
+			errors[s] = makeError(loaded.getError());
+			return;
+		}
+		shard.index = fsdk::acquire(loaded.getValue());
+		if (shard.index->size() != shard.globalIds.size())
+			errors[s] = makeError(fsdk::FSDKError::InvalidInput);
+	});
+	for (const fsdk::Result<fsdk::FSDKError>& err : errors)
+		if (err.isError())
+			return err;
+	index = sharded;
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::Result<fsdk::FSDKError> PyShardedIndex::save(const std::string& directory) const {
+	if (!makeDirectory(directory))
+		return makeError(fsdk::FSDKError::InvalidInput);
+	std::vector<fsdk::Result<fsdk::FSDKError>> errors(m_shards.size(), makeError(fsdk::FSDKError::Ok));
+	m_pool->parallelFor(m_shards.size(), [&](size_t s) {
+		errors[s] = m_shards[s].index->saveToDynamicIndex(shardPath(directory, s).c_str());
+	});
+	for (const fsdk::Result<fsdk::FSDKError>& err : errors)
+		if (err.isError())
+			return err;
+
+	// the manifest is replaced when it is complete
+	ShardedIndexHeader header = {};
+	std::memcpy(header.magic, shardedIndexMagic, sizeof(header.magic));
+	header.formatVersion = shardedIndexFormatVersion;
+	header.shardCount = static_cast<uint32_t>(m_shards.size());
+	header.size = m_locations.size();
+	const std::string path = manifestPath(directory);
+	const std::string temporaryPath = path + ".tmp";
+	FILE* file = std::fopen(temporaryPath.c_str(), "wb");
+	if (!file)
+		return makeError(fsdk::FSDKError::InvalidInput);
+	bool isOk = std::fwrite(&header, sizeof(header), 1, file) == 1;
+	for (const Shard& shard : m_shards) {
+		const uint64_t count = shard.globalIds.size();
+		isOk = isOk &&
+			std::fwrite(&count, sizeof(count), 1, file) == 1 &&
+			std::fwrite(shard.globalIds.data(), sizeof(fsdk::DescriptorId), shard.globalIds.size(), file) ==
+				shard.globalIds.size();
+	}
+	isOk = std::fclose(file) == 0 && isOk;
+	if (!isOk || !replaceFile(temporaryPath, path)) {
+		std::remove(temporaryPath.c_str());
+		return makeError(fsdk::FSDKError::Internal);
+	}
+	return makeError(fsdk::FSDKError::Ok);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, int> PyShardedIndex::search(
+	const fsdk::IDescriptorPtr& reference,
+	int maxResultsCount,
+	fsdk::SearchResult* results,
+	bool parallel) const {
+	if (maxResultsCount <= 0)
+		return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::InvalidInput, 0);
+
+	// search of an empty dynamic index fails, such shards are skipped unless all of them are empty
+	std::vector<size_t> searched;
+	for (size_t s = 0; s < m_shards.size(); ++s)
+		if (m_shards[s].index->countOfIndexedDescriptors() > 0)
+			searched.push_back(s);
+	if (searched.empty())
+		searched.push_back(0);
+
+	const size_t k = static_cast<size_t>(maxResultsCount);
+	std::vector<std::vector<fsdk::SearchResult>> found(searched.size(), std::vector<fsdk::SearchResult>(k));
+	std::vector<fsdk::ResultValue<fsdk::FSDKError, int>> counts(
+		searched.size(),
+		fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, 0));
+	auto searchShard = [&](size_t i) {
+		counts[i] = m_shards[searched[i]].index->search(reference, maxResultsCount, found[i].data());
+	};
+	if (parallel && searched.size() > 1)
+		m_pool->parallelFor(searched.size(), searchShard);
+	else
+		for (size_t i = 0; i < searched.size(); ++i)
+			searchShard(i);
+
+	TopK<fsdk::SearchResult, MoreSimilar> best(k);
+	for (size_t i = 0; i < searched.size(); ++i) {
+		if (counts[i].isError())
+			return fsdk::ResultValue<fsdk::FSDKError, int>(counts[i].getError(), 0);
+		const std::vector<fsdk::DescriptorId>& globalIds = m_shards[searched[i]].globalIds;
+		for (int j = 0; j < counts[i].getValue(); ++j) {
+			fsdk::SearchResult result = found[i][j];
+			if (result.index >= globalIds.size() || globalIds[result.index] == noGlobalId)
+				continue;
+			result.index = globalIds[result.index];
+			best.push(result);
+		}
+	}
+	const std::vector<fsdk::SearchResult> merged = best.take();
+	std::copy(merged.begin(), merged.end(), results);
+	return fsdk::ResultValue<fsdk::FSDKError, int>(fsdk::FSDKError::Ok, static_cast<int>(merged.size()));
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyShardedIndex::appendDescriptor(
+	const fsdk::IDescriptorPtr& descriptor) {
+	const uint32_t s = static_cast<uint32_t>(shardsBySize().front());
+	Shard& shard = m_shards[s];
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appended = shard.index->appendDescriptor(descriptor);
+	if (appended.isError())
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(appended.getError(), 0);
+	const fsdk::DescriptorId globalId = static_cast<fsdk::DescriptorId>(m_locations.size());
+	shard.globalIds.push_back(globalId);
+	m_locations.push_back(Location{s, appended.getValue()});
+	return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Ok, globalId);
+}
+
+fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> PyShardedIndex::appendBatch(
+	const fsdk::IDescriptorBatchPtr& batch) {
+	const size_t count = batch ? batch->getCount() : 0;
+	if (count == 0)
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::InvalidInput, 0);
+
+	// part p of the batch goes to shard order[p]
+	const std::vector<size_t> order = shardsBySize();
+	const size_t partCount = std::min(order.size(), count);
+	auto partBegin = [count, partCount](size_t p) {
+		return count * p / partCount;
+	};
+	std::vector<fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>> appended(
+		partCount,
+		fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Ok, 0));
+	auto appendPart = [&](size_t p) {
+		fsdk::IDescriptorBatchPtr part = partCount == 1 ?
+			batch :
+			copyBatch(m_faceEngine, batch, partBegin(p), partBegin(p + 1) - partBegin(p));
+		if (!part) {
+			appended[p] = fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Internal, 0);
+			return;
+		}
+		appended[p] = m_shards[order[p]].index->appendBatch(part);
+	};
+	if (partCount > 1)
+		m_pool->parallelFor(partCount, appendPart);
+	else
+		appendPart(0);
+
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	for (size_t p = 0; p < partCount && err.isOk(); ++p)
+		if (appended[p].isError())
+			err = appended[p];
+	const fsdk::DescriptorId firstGlobalId = static_cast<fsdk::DescriptorId>(m_locations.size());
+	if (err.isOk())
+		m_locations.resize(m_locations.size() + count);
+	for (size_t p = 0; p < partCount; ++p) {
+		if (appended[p].isError())
+			continue;
+		Shard& shard = m_shards[order[p]];
+		for (size_t i = partBegin(p); i < partBegin(p + 1); ++i) {
+			const fsdk::DescriptorId id = appended[p].getValue() + static_cast<fsdk::DescriptorId>(i - partBegin(p));
+			if (err.isOk()) {
+				shard.globalIds.push_back(firstGlobalId + static_cast<fsdk::DescriptorId>(i));
+				m_locations[firstGlobalId + i] = Location{static_cast<uint32_t>(order[p]), id};
+			} else {
+				// parts appended to other shards are removed, they keep their place in the shard storage
+				shard.index->removeDescriptor(id);
+				shard.globalIds.push_back(noGlobalId);
+			}
+		}
+	}
+	if (err.isError())
+		return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(err.getError(), 0);
+	return fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId>(fsdk::FSDKError::Ok, firstGlobalId);
+}
+
+fsdk::Result<fsdk::FSDKError> PyShardedIndex::removeDescriptor(fsdk::DescriptorId id) {
+	if (id >= m_locations.size())
+		return makeError(fsdk::FSDKError::InvalidInput);
+	const Location& location = m_locations[id];
+	return m_shards[location.shard].index->removeDescriptor(location.id);
+}
+
+fsdk::Result<fsdk::FSDKError> PyShardedIndex::descriptorByIndex(
+	fsdk::DescriptorId id,
+	const fsdk::IDescriptorPtr& descriptor) const {
+	if (id >= m_locations.size())
+		return makeError(fsdk::FSDKError::InvalidInput);
+	const Location& location = m_locations[id];
+	return m_shards[location.shard].index->descriptorByIndex(location.id, descriptor);
+}
+
+size_t PyShardedIndex::countOfIndexedDescriptors() const {
+	size_t count = 0;
+	for (const Shard& shard : m_shards)
+		count += shard.index->countOfIndexedDescriptors();
+	return count;
+}
+
+std::vector<size_t> PyShardedIndex::getShardSizes() const {
+	std::vector<size_t> sizes;
+	sizes.reserve(m_shards.size());
+	for (const Shard& shard : m_shards)
+		sizes.push_back(shard.index->size());
+	return sizes;
+}
+
+std::vector<size_t> PyShardedIndex::shardsBySize() const {
+	std::vector<size_t> order(m_shards.size());
+	std::iota(order.begin(), order.end(), 0);
+	std::stable_sort(order.begin(), order.end(), [this](size_t first, size_t second) {
+		return m_shards[first].globalIds.size() < m_shards[second].globalIds.size();
+	});
+	return order;
+}
@@ -0,0 +1,107 @@
+#pragma once
+
+#include <fsdk/FaceEngine.h>
+#include "FaceEngineAdapter.hpp"
+#include "ThreadPool.hpp"
+
+#include <cstdint>
+#include <memory>
+#include <string>
+#include <vector>
+
+// Layout of the manifest file of a saved sharded index, version 1. Integers are little-endian.
+// The header is followed by shardCount records of a uint64 count and count uint32 global ids of descriptors
+// of the shard in order of their ids in the shard. Shard i is saved as a dynamic index to file shard_<i>.
+const char shardedIndexMagic[8] = {'L', 'S', 'D', 'K', 'S', 'H', 'R', 'D'};
+const uint32_t shardedIndexFormatVersion = 1;
+
+struct ShardedIndexHeader {
+	char magic[8];
+	uint32_t formatVersion;
+	uint32_t shardCount;
+	uint64_t size;    // count of global ids
+};
+
+// Index partitioned into several dynamic indexes, each one built by its own index builder.
+// Descriptors have global ids assigned in order of appending which do not depend on the shard keeping them.
+// Shards are built, loaded and searched in parallel on the pool of the index, results of shards are merged.
+// Searches may run concurrently, but not with append or remove, like on IDynamicIndex.
+// All methods must be called without the GIL.
+class PyShardedIndex {
+public:
+	// Splits batch into shardCount ranges of descriptors and builds a shard of every range,
+	// the global id of a descriptor is its position in batch. threadCount == 0 means the number
+	// of hardware threads, the pool never has more threads than shards.
+	static fsdk::Result<fsdk::FSDKError> build(
+		PyIFaceEngine& faceEngine,
+		const fsdk::IDescriptorBatchPtr& batch,
+		uint32_t shardCount,
+		uint32_t threadCount,
+		std::shared_ptr<PyShardedIndex>& index);
+
+	// Loads index saved to directory by save
+	static fsdk::Result<fsdk::FSDKError> load(
+		PyIFaceEngine& faceEngine,
+		const std::string& directory,
+		uint32_t threadCount,
+		std::shared_ptr<PyShardedIndex>& index);
+
+	// Saves shards and the manifest to directory, it is created if it does not exist.
+	// Files of a previously saved index are overwritten.
+	fsdk::Result<fsdk::FSDKError> save(const std::string& directory) const;
+
+	// Writes up to maxResultsCount nearest descriptors with global ids sorted by similarity to results and
+	// returns their count. Shards are searched on the pool if parallel is set and one by one otherwise.
+	fsdk::ResultValue<fsdk::FSDKError, int> search(
+		const fsdk::IDescriptorPtr& reference,
+		int maxResultsCount,
+		fsdk::SearchResult* results,
+		bool parallel = false) const;
+
+	// Appends descriptor to the smallest shard and returns its global id
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appendDescriptor(const fsdk::IDescriptorPtr& descriptor);
+
+	// Splits batch between the smallest shards appended in parallel and returns global id of its first descriptor,
+	// the rest ones get the following ids. Nothing is appended if any shard fails.
+	fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> appendBatch(const fsdk::IDescriptorBatchPtr& batch);
+
+	// Removes descriptor from search, its global id is not reused
+	fsdk::Result<fsdk::FSDKError> removeDescriptor(fsdk::DescriptorId id);
+
+	fsdk::Result<fsdk::FSDKError> descriptorByIndex(fsdk::DescriptorId id, const fsdk::IDescriptorPtr& descriptor) const;
+
+	// Count of global ids, removed descriptors are included like in IDynamicIndex
+	size_t size() const {
+		return m_locations.size();
+	}
+
+	size_t countOfIndexedDescriptors() const;
+
+	size_t getShardCount() const {
+		return m_shards.size();
+	}
+
+	// Count of descriptors stored by every shard
+	std::vector<size_t> getShardSizes() const;
+
+private:
+	struct Shard {
+		fsdk::IDynamicIndexPtr index;
+		std::vector<fsdk::DescriptorId> globalIds;    // by id in the shard
+	};
+
+	struct Location {
+		uint32_t shard;
+		fsdk::DescriptorId id;    // id in the shard
+	};
+
+	PyShardedIndex(PyIFaceEngine& faceEngine, uint32_t shardCount, uint32_t threadCount);
+
+	// Shards in order of their sizes starting from the smallest one
+	std::vector<size_t> shardsBySize() const;
+
+	PyIFaceEngine m_faceEngine;
+	std::vector<Shard> m_shards;
+	std::vector<Location> m_locations;    // by global id
+	std::unique_ptr<ThreadPool> m_pool;
+};
@@ -0,0 +1,169 @@
+#pragma once
+
+#include <algorithm>
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+// Bitset whose copies share unchanged chunks of bits. Copying it copies a vector of pointers to chunks,
+// changing a bit copies one chunk if it is shared, so the bitset of an immutable snapshot is never changed
+// by changes of its copies. Bits out of the stored chunks are zero.
+class SharedBitset {
+public:
+	bool test(size_t bit) const {
+		const size_t chunk = bit / chunkBits;
+		if (chunk >= m_chunks.size() || !m_chunks[chunk])
+			return false;
+		const size_t word = bit % chunkBits / 64;
+		return ((*m_chunks[chunk])[word] >> (bit % 64) & 1) != 0;
+	}
+
+	// Returns true if the bit was changed
+	bool set(size_t bit, bool value = true) {
+		if (test(bit) == value)
+			return false;
+		const size_t chunk = bit / chunkBits;
+		if (chunk >= m_chunks.size())
+			m_chunks.resize(chunk + 1);
+		Chunk& words = ownChunk(chunk);
+		const uint64_t mask = uint64_t(1) << (bit % 64);
+		if (value) {
+			words[bit % chunkBits / 64] |= mask;
+			++m_count;
+		} else {
+			words[bit % chunkBits / 64] &= ~mask;
+			--m_count;
+		}
+		return true;
+	}
+
+	// Count of set bits
+	size_t count() const {
+		return m_count;
+	}
+
+	// Keeps bits set in both bitsets
+	void intersect(const SharedBitset& other) {
+		if (m_chunks.size() > other.m_chunks.size())
+			m_chunks.resize(other.m_chunks.size());
+		for (size_t chunk = 0; chunk < m_chunks.size(); ++chunk) {
+			if (!other.m_chunks[chunk])
+				m_chunks[chunk].reset();
+			else if (m_chunks[chunk] && m_chunks[chunk] != other.m_chunks[chunk])
+				combine(chunk, *other.m_chunks[chunk], [](uint64_t word, uint64_t otherWord) { return word & otherWord; });
+		}
+		recount();
+	}
+
+	// Sets bits set in other, chunks missing in this bitset are shared with other
+	void unite(const SharedBitset& other) {
+		if (m_chunks.size() < other.m_chunks.size())
+			m_chunks.resize(other.m_chunks.size());
+		for (size_t chunk = 0; chunk < other.m_chunks.size(); ++chunk) {
+			if (!m_chunks[chunk])
+				m_chunks[chunk] = other.m_chunks[chunk];
+			else if (other.m_chunks[chunk] && m_chunks[chunk] != other.m_chunks[chunk])
+				combine(chunk, *other.m_chunks[chunk], [](uint64_t word, uint64_t otherWord) { return word | otherWord; });
+		}
+		recount();
+	}
+
+	// Clears bits set in other
+	void subtract(const SharedBitset& other) {
+		const size_t chunkCount = std::min(m_chunks.size(), other.m_chunks.size());
+		for (size_t chunk = 0; chunk < chunkCount; ++chunk)
+			if (m_chunks[chunk] == other.m_chunks[chunk])
+				m_chunks[chunk].reset();
+			else if (m_chunks[chunk] && other.m_chunks[chunk])
+				combine(chunk, *other.m_chunks[chunk], [](uint64_t word, uint64_t otherWord) { return word & ~otherWord; });
+		recount();
+	}
+
+	// Clears bits starting from bitCount
+	void truncate(size_t bitCount) {
+		const size_t chunkCount = (bitCount + chunkBits - 1) / chunkBits;
+		if (m_chunks.size() > chunkCount)
+			m_chunks.resize(chunkCount);
+		const size_t last = bitCount / chunkBits;
+		if (last < m_chunks.size() && m_chunks[last]) {
+			const size_t lastBit = bitCount % chunkBits;
+			Chunk& words = ownChunk(last);
+			std::fill(words.begin() + (lastBit + 63) / 64, words.end(), 0);
+			if (lastBit % 64 != 0)
+				words[lastBit / 64] &= (uint64_t(1) << (lastBit % 64)) - 1;
+		}
+		recount();
+	}
+
+	// Calls f(bit) for every set bit in ascending order
+	template<typename F>
+	void forEach(F f) const {
+		for (size_t chunk = 0; chunk < m_chunks.size(); ++chunk) {
+			if (!m_chunks[chunk])
+				continue;
+			const Chunk& words = *m_chunks[chunk];
+			for (size_t word = 0; word < chunkWords; ++word)
+				for (uint64_t bits = words[word]; bits != 0; bits &= bits - 1)
+					f(chunk * chunkBits + word * 64 + countTrailingZeros(bits));
+		}
+	}
+
+private:
+	typedef std::vector<uint64_t> Chunk;
+
+	static size_t countBits(uint64_t bits) {
+		size_t count = 0;
+		for (; bits != 0; bits &= bits - 1)
+			++count;
+		return count;
+	}
+
+	static size_t countTrailingZeros(uint64_t bits) {
+		size_t count = 0;
+		for (; (bits & 1) == 0; bits >>= 1)
+			++count;
+		return count;
+	}
+
+	// Chunk which may be changed. A chunk is owned only by this bitset if nobody else holds it,
+	// otherwise it is copied before changing.
+	Chunk& ownChunk(size_t chunk) {
+		std::shared_ptr<Chunk>& words = m_chunks[chunk];
+		if (!words)
+			words.reset(new Chunk(chunkWords, 0));
+		else if (words.use_count() > 1)
+			words.reset(new Chunk(*words));
+		return *words;
+	}
+
+	// Replaces words of the chunk by op(word, otherWord)
+	template<typename Op>
+	void combine(size_t chunk, const Chunk& other, Op op) {
+		Chunk& words = ownChunk(chunk);
+		for (size_t word = 0; word < chunkWords; ++word)
+			words[word] = op(words[word], other[word]);
+	}
+
+	// Drops empty chunks and counts set bits again after operations on whole chunks
+	void recount() {
+		m_count = 0;
+		for (std::shared_ptr<Chunk>& words : m_chunks) {
+			if (!words)
+				continue;
+			size_t count = 0;
+			for (uint64_t word : *words)
+				count += countBits(word);
+			if (count == 0)
+				words.reset();
+			m_count += count;
+		}
+		while (!m_chunks.empty() && !m_chunks.back())
+			m_chunks.pop_back();
+	}
+
+	static const size_t chunkWords = 1024;
+	static const size_t chunkBits = chunkWords * 64;
+
+	std::vector<std::shared_ptr<Chunk>> m_chunks;
+	size_t m_count = 0;
+};
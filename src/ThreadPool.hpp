@@ -0,0 +1,183 @@
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <condition_variable>
+#include <exception>
+#include <functional>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <queue>
+#include <thread>
+#include <type_traits>
+#include <vector>
+
+#ifdef _WIN32
+#include <process.h>
+#else
+#include <unistd.h>
+#endif
+
+// Fixed size pool of worker threads executing tasks in order of submission.
+// Workers never hold the GIL, so tasks must not touch python objects.
+class ThreadPool {
+public:
+	// threadCount == 0 means the number of hardware threads
+	explicit ThreadPool(size_t threadCount = 0) : m_stop(false) {
+		if (threadCount == 0)
+			threadCount = std::max(std::thread::hardware_concurrency(), 1u);
+		m_workers.reserve(threadCount);
+		for (size_t i = 0; i < threadCount; ++i)
+			m_workers.emplace_back([this] { run(); });
+	}
+
+	~ThreadPool() {
+		{
+			std::lock_guard<std::mutex> lock(m_mutex);
+			m_stop = true;
+		}
+		m_condition.notify_all();
+		for (std::thread& worker : m_workers)
+			worker.join();
+	}
+
+	ThreadPool(const ThreadPool&) = delete;
+	ThreadPool& operator=(const ThreadPool&) = delete;
+
+	size_t size() const {
+		return m_workers.size();
+	}
+
+	// Pool of hardware threads shared by parallel calls of the module. It is created on first use and never
+	// destroyed, because its threads may be already killed when static objects are destroyed at exit.
+	// A process made by fork has no workers of its parent, so it creates a pool of its own.
+	static ThreadPool& shared() {
+		static std::mutex mutex;
+		static ThreadPool* pool = nullptr;
+		static long poolProcessId = 0;
+		std::lock_guard<std::mutex> lock(mutex);
+		if (!pool || poolProcessId != processId()) {
+			pool = new ThreadPool();
+			poolProcessId = processId();
+		}
+		return *pool;
+	}
+
+	// Whether the calling thread is a worker of this pool
+	bool isWorkerThread() const {
+		return currentPool() == this;
+	}
+
+	// Queues task, the returned future holds its result or exception
+	template<typename F>
+	std::future<typename std::result_of<F()>::type> submit(F task) {
+		typedef typename std::result_of<F()>::type Result;
+		std::shared_ptr<std::packaged_task<Result()>> packaged =
+			std::make_shared<std::packaged_task<Result()>>(std::move(task));
+		std::future<Result> result = packaged->get_future();
+		{
+			std::lock_guard<std::mutex> lock(m_mutex);
+			m_tasks.emplace([packaged] { (*packaged)(); });
+		}
+		m_condition.notify_one();
+		return result;
+	}
+
+	// Calls body(i) for every i in [0, count) on workers of the pool and waits for all calls.
+	// The first exception thrown by body is rethrown after all calls are finished.
+	// Must not be called from a task of the same pool.
+	template<typename F>
+	void parallelFor(size_t count, F body) {
+		std::vector<std::future<void>> results;
+		results.reserve(count);
+		for (size_t i = 0; i < count; ++i)
+			results.push_back(submit([&body, i] { body(i); }));
+		for (std::future<void>& result : results)
+			result.wait();
+		for (std::future<void>& result : results)
+			result.get();
+	}
+
+private:
+	static long processId() {
+#ifdef _WIN32
+		return _getpid();
+#else
+		return static_cast<long>(getpid());
+#endif
+	}
+
+	// pool of the calling worker thread, null for other threads
+	static const ThreadPool*& currentPool() {
+		static thread_local const ThreadPool* pool = nullptr;
+		return pool;
+	}
+
+	void run() {
+		currentPool() = this;
+		for (;;) {
+			std::function<void()> task;
+			{
+				std::unique_lock<std::mutex> lock(m_mutex);
+				m_condition.wait(lock, [this] { return m_stop || !m_tasks.empty(); });
+				if (m_tasks.empty())
+					return;
+				task = std::move(m_tasks.front());
+				m_tasks.pop();
+			}
+			task();
+		}
+	}
+
+	std::vector<std::thread> m_workers;
+	std::queue<std::function<void()>> m_tasks;
+	std::mutex m_mutex;
+	std::condition_variable m_condition;
+	bool m_stop;
+};
+
+// Splits [0, count) into a few blocks per thread to even out the load and calls body(begin, end) for every block
+// on threadCount threads (0 means the number of hardware threads): the calling thread and workers of the shared
+// pool taking blocks in turn. Blocks until all calls are finished, the first exception thrown by body is rethrown
+// after them. A call made from a worker of the shared pool runs all blocks on that worker, so nested parallel
+// calls never wait for workers busy with the outer one.
+template<typename F>
+void parallelForBlocks(size_t count, size_t threadCount, F body) {
+	if (count == 0)
+		return;
+	ThreadPool& pool = ThreadPool::shared();
+	if (threadCount == 0)
+		threadCount = pool.size();
+	const size_t blockSize = (count + threadCount * 4 - 1) / (threadCount * 4);
+	const size_t blockCount = (count + blockSize - 1) / blockSize;
+	std::atomic<size_t> nextBlock(0);
+	auto runBlocks = [&body, &nextBlock, count, blockSize, blockCount] {
+		for (size_t block = nextBlock++; block < blockCount; block = nextBlock++)
+			body(block * blockSize, std::min(count, (block + 1) * blockSize));
+	};
+
+	const size_t helperCount = pool.isWorkerThread() ?
+		0 :
+		std::min(std::min(threadCount, blockCount) - 1, pool.size());
+	std::vector<std::future<void>> helpers;
+	helpers.reserve(helperCount);
+	for (size_t i = 0; i < helperCount; ++i)
+		helpers.push_back(pool.submit(runBlocks));
+	std::exception_ptr error;
+	try {
+		runBlocks();
+	} catch (...) {
+		error = std::current_exception();
+	}
+	for (std::future<void>& helper : helpers) {
+		try {
+			helper.get();
+		} catch (...) {
+			if (!error)
+				error = std::current_exception();
+		}
+	}
+	if (error)
+		std::rethrow_exception(error);
+}
@@ -0,0 +1,51 @@
+#pragma once
+
+#include <algorithm>
+#include <functional>
+#include <vector>
+
+// Bounded selection of k smallest items. Keeps a max-heap of the best items seen so far,
+// so memory is O(k) whatever number of items is pushed.
+template<typename T, typename Less = std::less<T>>
+class TopK {
+public:
+	explicit TopK(size_t k, Less less = Less()) : m_k(k), m_less(less) {
+		m_items.reserve(k);
+	}
+
+	void push(const T& item) {
+		if (m_items.size() < m_k) {
+			m_items.push_back(item);
+			std::push_heap(m_items.begin(), m_items.end(), m_less);
+		} else if (m_k > 0 && m_less(item, m_items.front())) {
+			std::pop_heap(m_items.begin(), m_items.end(), m_less);
+			m_items.back() = item;
+			std::push_heap(m_items.begin(), m_items.end(), m_less);
+		}
+	}
+
+	size_t size() const {
+		return m_items.size();
+	}
+
+	// Returns selected items in ascending order, the selection is empty after the call
+	std::vector<T> take() {
+		std::sort_heap(m_items.begin(), m_items.end(), m_less);
+		std::vector<T> items;
+		items.swap(m_items);
+		return items;
+	}
+
+private:
+	size_t m_k;
+	Less m_less;
+	std::vector<T> m_items;
+};
+
+// Orders search results (any items with a similarity field) from the most similar
+struct MoreSimilar {
+	template<typename T>
+	bool operator()(const T& first, const T& second) const {
+		return first.similarity > second.similarity;
+	}
+};
@@ -0,0 +1,86 @@
+#include "CallbackDispatcher.hpp"
+
+#include <pybind11/stl.h>
+
+#include <algorithm>
+#include <unordered_set>
+
+CallbackDispatcher::CallbackDispatcher(
+	std::shared_ptr<Observer> observer,
+	py::function function,
+	const std::vector<PyICallback::CallbackType>& types,
+	bool latestVisualOnly)
+		:m_state{std::make_shared<State>()}
+{
+	m_state->observer = std::move(observer);
+	m_state->function = std::move(function);
+	m_state->latestVisualOnly = latestVisualOnly;
+	for (auto type: types)
+		m_state->typesMask |= 1u << type;
+	std::shared_ptr<State> state = m_state;
+	m_thread = std::thread{[state]() mutable {
+		run(*state);
+		// a joining dispatcher still holds the state, a detached thread releases the python function itself
+		if (state.use_count() == 1) {
+			py::gil_scoped_acquire acquire;
+			state.reset();
+		}
+	}};
+}
+
+CallbackDispatcher::~CallbackDispatcher() {
+	m_state->stop = true;
+	m_state->observer->wakeUp();
+	if (std::this_thread::get_id() == m_thread.get_id()) {
+		// destroyed by the function running on the thread, joining it would never return
+		m_thread.detach();
+		return;
+	}
+	// the thread might wait for the GIL to deliver the last batch
+	py::gil_scoped_release release;
+	m_thread.join();
+}
+
+void CallbackDispatcher::run(State& state) {
+	while (!state.stop) {
+		if (!state.observer->waitCallbacks(std::chrono::milliseconds{10}))
+			continue;
+		auto callbacks = state.observer->getCallbacks();
+		filter(state, callbacks);
+		if (callbacks.empty())
+			continue;
+
+		py::gil_scoped_acquire acquire;
+		try {
+			state.function(py::cast(std::move(callbacks)));
+		} catch (py::error_already_set& e) {
+			// exceptions of the handler are reported like the ones of __del__, the dispatcher keeps running
+			e.restore();
+			PyErr_WriteUnraisable(state.function.ptr());
+		}
+	}
+}
+
+void CallbackDispatcher::filter(const State& state, std::vector<PyICallback>& callbacks) {
+	auto unwanted = [&state](const PyICallback& c) {
+		return !(state.typesMask & (1u << c.type));
+	};
+	callbacks.erase(std::remove_if(callbacks.begin(), callbacks.end(), unwanted), callbacks.end());
+	if (!state.latestVisualOnly)
+		return;
+
+	// walk from the end so the first visual met for a track is its latest one
+	std::unordered_set<int> seenTracks;
+	std::vector<bool> keep(callbacks.size(), true);
+	for (size_t i = callbacks.size(); i-- > 0;) {
+		if (callbacks[i].type != PyICallback::ctVisual)
+			continue;
+		keep[i] = seenTracks.insert(callbacks[i].trackId).second;
+	}
+	size_t kept = 0;
+	for (size_t i = 0; i < callbacks.size(); ++i) {
+		if (keep[i])
+			callbacks[kept++] = std::move(callbacks[i]);
+	}
+	callbacks.resize(kept);
+}
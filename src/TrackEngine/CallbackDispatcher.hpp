@@ -0,0 +1,49 @@
+#pragma once
+
+#include "CallbackObserver.hpp"
+
+#include <pybind11/pybind11.h>
+
+#include <atomic>
+#include <memory>
+#include <thread>
+#include <vector>
+
+namespace py = pybind11;
+
+// Dedicated thread taking callbacks of a stream and passing them to a python function.
+// Callbacks are taken in batches and the GIL is acquired once per batch, the function gets a list.
+// Callbacks of types not passed in types are taken from the stream and dropped.
+class CallbackDispatcher {
+public:
+	CallbackDispatcher(
+		std::shared_ptr<Observer> observer,
+		py::function function,
+		const std::vector<PyICallback::CallbackType>& types,
+		bool latestVisualOnly);
+
+	// Must be called with the GIL. If called by the function itself, e.g. when it sets another callback of the stream,
+	// the thread is detached and stops once the function returns
+	~CallbackDispatcher();
+
+	CallbackDispatcher(const CallbackDispatcher&) = delete;
+	CallbackDispatcher& operator=(const CallbackDispatcher&) = delete;
+
+private:
+	// State of the thread, shared with it so a detached thread outlives the dispatcher safely
+	struct State {
+		std::shared_ptr<Observer> observer;
+		py::function function;
+		uint32_t typesMask = 0;
+		bool latestVisualOnly = false;
+		std::atomic<bool> stop{false};
+	};
+
+	static void run(State& state);
+
+	// Drops callbacks of unwanted types and, if requested, visual callbacks followed by a newer one of the same track
+	static void filter(const State& state, std::vector<PyICallback>& callbacks);
+
+	std::shared_ptr<State> m_state;
+	std::thread m_thread;
+};
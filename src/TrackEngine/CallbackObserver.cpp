@@ -1,26 +1,149 @@
 #include "CallbackObserver.hpp"
 
-Observer::Observer() {
-	m_callbacks = std::make_shared<std::list<PyICallback>>();
+#include <algorithm>
+#include <cmath>
+#include <cstring>
+#include <functional>
+
+namespace {
+	// Pixels are copied byte-wise, so planar YUV_NV21 frames are not supported and kept as is
+	bool isPackedFormat(const fsdk::Image& image) {
+		return image.isValid() && image.getFormat() != fsdk::Format::YUV_NV21;
+	}
+
+	// Copies the part of image inside rect, rect is clipped by image borders
+	fsdk::Image cropImage(const fsdk::Image& image, const fsdk::Rect& rect) {
+		if (!isPackedFormat(image))
+			return image;
+		const int left = std::max(rect.x, 0);
+		const int top = std::max(rect.y, 0);
+		const int right = std::min(rect.x + rect.width, image.getWidth());
+		const int bottom = std::min(rect.y + rect.height, image.getHeight());
+		if (right <= left || bottom <= top)
+			return fsdk::Image{};
+
+		const fsdk::Format format = image.getFormat();
+		fsdk::Image crop{right - left, bottom - top, format};
+		const int byteDepth = format.getByteDepth();
+		const int srcPitch = format.computePitch(image.getWidth());
+		const int dstPitch = format.computePitch(crop.getWidth());
+		const auto* src = static_cast<const uint8_t*>(image.getData());
+		auto* dst = static_cast<uint8_t*>(crop.getData());
+		for (int y = top; y < bottom; ++y)
+			std::memcpy(dst + (y - top) * dstPitch, src + y * srcPitch + left * byteDepth, (right - left) * byteDepth);
+		return crop;
+	}
+
+	// Nearest neighbour downscale so that the longer side is at most maxSize, smaller images are kept as is
+	fsdk::Image thumbnailImage(const fsdk::Image& image, int maxSize) {
+		if (!isPackedFormat(image) || maxSize <= 0)
+			return image;
+		const int longerSide = std::max(image.getWidth(), image.getHeight());
+		if (longerSide <= maxSize)
+			return image;
+
+		const fsdk::Format format = image.getFormat();
+		const int width = std::max(image.getWidth() * maxSize / longerSide, 1);
+		const int height = std::max(image.getHeight() * maxSize / longerSide, 1);
+		fsdk::Image thumbnail{width, height, format};
+		const int byteDepth = format.getByteDepth();
+		const int srcPitch = format.computePitch(image.getWidth());
+		const int dstPitch = format.computePitch(width);
+		const auto* src = static_cast<const uint8_t*>(image.getData());
+		auto* dst = static_cast<uint8_t*>(thumbnail.getData());
+		for (int y = 0; y < height; ++y) {
+			const uint8_t* srcRow = src + (y * image.getHeight() / height) * srcPitch;
+			uint8_t* dstRow = dst + y * dstPitch;
+			for (int x = 0; x < width; ++x)
+				std::memcpy(dstRow + x * byteDepth, srcRow + (x * image.getWidth() / width) * byteDepth, byteDepth);
+		}
+		return thumbnail;
+	}
+}
+
+Observer::Observer(size_t capacity, OverflowPolicy policy, VisualImageMode visualImageMode, int thumbnailSize)
+		:m_visualImageMode{visualImageMode}
+		,m_thumbnailSize{thumbnailSize}
+{
+	m_callbacks = std::make_shared<RingBuffer<PyICallback>>(capacity, policy);
 }
 
-std::vector<PyICallback> Observer::getCallbacks() {
-	std::lock_guard<std::mutex> lock{m_mutex};
+std::vector<PyICallback> Observer::getCallbacks(size_t maxCount) {
 	std::vector<PyICallback> ret;
-	ret.reserve(m_callbacks->size());
+	ret.reserve(maxCount ? std::min(maxCount, m_callbacks->size()) : m_callbacks->size());
+	m_callbacks->popBatch(ret, maxCount);
+	return ret;
+}
 
-	for (auto& c: *m_callbacks)
-		ret.emplace_back(c);
+size_t Observer::getPendingCount() const {
+	return m_callbacks->size();
+}
 
-	m_callbacks->clear();
-	return ret;
+size_t Observer::getDroppedCount() const {
+	return m_callbacks->dropped();
+}
+
+size_t Observer::getCapacity() const {
+	return m_callbacks->capacity();
+}
+
+OverflowPolicy Observer::getOverflowPolicy() const {
+	return m_callbacks->policy();
+}
+
+VisualImageMode Observer::getVisualImageMode() const {
+	return m_visualImageMode;
+}
+
+void Observer::setBestShotFilter(const BestShotFilter& filter) {
+	std::atomic_store(&m_bestShotFilter, std::shared_ptr<const BestShotFilter>{std::make_shared<BestShotFilter>(filter)});
+}
+
+void Observer::setTrackDescriptors(
+	fsdk::IFaceEnginePtr faceEngine,
+	fsdk::IWarperPtr warper,
+	fsdk::IDescriptorExtractorPtr extractor,
+	size_t topN) {
+
+	std::shared_ptr<TrackDescriptorExtractor> trackDescriptors;
+	if (faceEngine && warper && extractor) {
+		trackDescriptors = std::make_shared<TrackDescriptorExtractor>(
+			faceEngine,
+			warper,
+			extractor,
+			topN,
+			[this](PyICallback&& callback) { push(std::move(callback)); });
+	}
+	// the previous extractor delivers tracks already ended when it is released
+	std::atomic_store(&m_trackDescriptors, trackDescriptors);
+}
+
+void Observer::waitTrackDescriptors() {
+	if (const auto trackDescriptors = std::atomic_load(&m_trackDescriptors))
+		trackDescriptors->wait();
+}
+
+bool Observer::waitCallbacks(std::chrono::milliseconds timeout) {
+	std::unique_lock<std::mutex> lock{m_signalMutex};
+	if (m_callbacks->size() > 0)
+		return true;
+	m_signal.wait_for(lock, timeout);
+	return m_callbacks->size() > 0;
+}
+
+void Observer::wakeUp() {
+	m_signal.notify_all();
+}
+
+void Observer::push(PyICallback&& callback) {
+	m_callbacks->push(std::move(callback));
+	m_signal.notify_one();
 }
 
 void Observer::bestShot(
 	const tsdk::DetectionDescr &detection,
 	const tsdk::AdditionalFrameData* data) {
 
-	std::lock_guard<std::mutex> lock{m_mutex};
 	PyICallback c;
 	c.type = PyICallback::ctBestShot;
 	c.frameId = detection.frameIndex;
@@ -30,7 +153,10 @@ void Observer::bestShot(
 	c.landmarks = detection.landmarks;
 	c.score = detection.detection.score;
 	c.isDetection = true;
-	m_callbacks->emplace_back(std::move(c));
+	push(std::move(c));
+
+	if (const auto trackDescriptors = std::atomic_load(&m_trackDescriptors))
+		trackDescriptors->addBestShot(detection);
 }
 
 void Observer::visual(
@@ -40,32 +166,88 @@ void Observer::visual(
 	const int nTrack,
 	const tsdk::AdditionalFrameData* data) {
 
-	std::lock_guard<std::mutex> lock{m_mutex};
+	// fsdk::Image is reference counted, callbacks of one frame share its pixels or its thumbnail
+	fsdk::Image frameImage;
+	if (m_visualImageMode == vimFull)
+		frameImage = image;
+	else if (m_visualImageMode == vimThumbnail && nTrack > 0)
+		frameImage = thumbnailImage(image, m_thumbnailSize);
+
 	for (int i = 0; i < nTrack; i++) {
 		PyICallback c;
 		c.type = PyICallback::ctVisual;
 		c.frameId = frameId;
 		c.trackId = trackInfo[i].trackId;
-		c.image = image;
+		c.image = m_visualImageMode == vimCrop ? cropImage(image, trackInfo[i].rect) : frameImage;
 		c.bbox = trackInfo[i].rect;
 		c.landmarks = trackInfo[i].landmarks;
 		c.score = trackInfo[i].lastDetectionScore;
 		c.isDetection = trackInfo[i].isDetector;
-		m_callbacks->emplace_back(std::move(c));
+		push(std::move(c));
 	}
 }
 
 void Observer::trackEnd(const tsdk::TrackId &trackId) {
-	std::lock_guard<std::mutex> lock{m_mutex};
+	{
+		std::lock_guard<std::mutex> lock{m_trackRanksMutex};
+		m_trackRanks.erase(trackId);
+	}
+	// with track descriptors the callback is pushed by the extractor worker
+	if (const auto trackDescriptors = std::atomic_load(&m_trackDescriptors)) {
+		trackDescriptors->trackEnd(trackId);
+		return;
+	}
 	PyICallback c;
 	c.type = PyICallback::ctTrackEnd;
 	c.trackId = trackId;
-	m_callbacks->emplace_back(std::move(c));
+	push(std::move(c));
 }
 
 bool Observer::checkBestShot(
 	const tsdk::DetectionDescr &descr,
 	const tsdk::AdditionalFrameData* data) {
 
+	const auto filter = std::atomic_load(&m_bestShotFilter);
+	if (!filter)
+		return true;
+
+	// cheap checks go first, estimators run only for detections passing them
+	const auto& rect = descr.detection.rect;
+	if (descr.detection.score < filter->minScore || std::min(rect.width, rect.height) < filter->minFaceSize)
+		return false;
+
+	float rank = descr.detection.score;
+	if (filter->agsEstimator) {
+		fsdk::ResultValue<fsdk::FSDKError, float> ags = filter->agsEstimator->estimate(descr.image, descr.detection);
+		if (ags.isError() || ags.getValue() < filter->minAGS)
+			return false;
+		rank = ags.getValue();
+	}
+
+	if (filter->headPoseEstimator) {
+		fsdk::HeadPoseEstimation pose;
+		fsdk::Result<fsdk::FSDKError> err = filter->headPoseEstimator->estimate(descr.image, descr.detection, pose);
+		if (err.isError() ||
+			std::abs(pose.yaw) > filter->maxYaw ||
+			std::abs(pose.pitch) > filter->maxPitch ||
+			std::abs(pose.roll) > filter->maxRoll)
+			return false;
+	}
+
+	if (filter->topN == 0)
+		return true;
+	std::lock_guard<std::mutex> lock{m_trackRanksMutex};
+	// ranks are kept as a min heap of size topN, the top is the worst accepted one
+	auto& ranks = m_trackRanks[descr.trackId];
+	if (ranks.size() < filter->topN) {
+		ranks.push_back(rank);
+		std::push_heap(ranks.begin(), ranks.end(), std::greater<float>{});
+		return true;
+	}
+	if (rank <= ranks.front())
+		return false;
+	std::pop_heap(ranks.begin(), ranks.end(), std::greater<float>{});
+	ranks.back() = rank;
+	std::push_heap(ranks.begin(), ranks.end(), std::greater<float>{});
 	return true;
 }
\ No newline at end of file
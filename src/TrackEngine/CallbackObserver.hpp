@@ -1,22 +1,51 @@
 #pragma once
 
 #include "TrackEngineCallback.hpp"
+#include "RingBuffer.hpp"
+#include "TrackDescriptorExtractor.hpp"
 
 #include "trackEngine/ITrackEngine.h"
 
-#include <list>
+#include <chrono>
+#include <condition_variable>
 #include <memory>
 #include <mutex>
+#include <unordered_map>
 #include <vector>
 
 
-using CallbacksListPtr =  std::shared_ptr<std::list<PyICallback>>;
+// Image attached to visual callbacks. Best shot callbacks always carry the whole frame.
+enum VisualImageMode {
+	vimFull,
+	vimNone,
+	vimCrop,
+	vimThumbnail
+};
+
+// Conditions a detection must meet to become a best shot. Estimators are optional, their checks are skipped
+// if they are not set. With topN a detection is accepted only if it is among the N best ones of its track so far,
+// detections are ranked by AGS if its estimator is set and by detection score otherwise.
+struct BestShotFilter {
+	float minScore = 0.f;
+	int minFaceSize = 0;
+	size_t topN = 0;
+	fsdk::IAGSEstimatorPtr agsEstimator;
+	float minAGS = 0.f;
+	fsdk::IHeadPoseEstimatorPtr headPoseEstimator;
+	float maxYaw = 180.f;
+	float maxPitch = 180.f;
+	float maxRoll = 180.f;
+};
 
+using CallbacksBufferPtr = std::shared_ptr<RingBuffer<PyICallback>>;
+
+// Callbacks of one stream are queued to a bounded ring buffer by the TrackEngine callback thread
+// and taken by python in batches, neither side takes a lock.
 struct Observer :
 		tsdk::IBestShotObserver,
 		tsdk::IVisualObserver,
 		tsdk::IBestShotPredicate {
-	Observer();
+	Observer(size_t capacity, OverflowPolicy policy, VisualImageMode visualImageMode, int thumbnailSize);
 
 	void bestShot(
 		const tsdk::DetectionDescr& detection,
@@ -34,8 +63,43 @@ struct Observer :
 	bool checkBestShot(
 		const tsdk::DetectionDescr& descr,
 		const tsdk::AdditionalFrameData* data) override;
-	std::vector<PyICallback> getCallbacks();
+
+	std::vector<PyICallback> getCallbacks(size_t maxCount = 0);
+	size_t getPendingCount() const;
+	size_t getDroppedCount() const;
+	size_t getCapacity() const;
+	OverflowPolicy getOverflowPolicy() const;
+	VisualImageMode getVisualImageMode() const;
+
+	// Can be called while the stream is running, the filter is replaced atomically
+	void setBestShotFilter(const BestShotFilter& filter);
+
+	// Enables extraction of one descriptor per track delivered with its ctTrackEnd callback, null disables it.
+	// Tracks already running get descriptors from best shots accepted since the call.
+	void setTrackDescriptors(
+		fsdk::IFaceEnginePtr faceEngine,
+		fsdk::IWarperPtr warper,
+		fsdk::IDescriptorExtractorPtr extractor,
+		size_t topN);
+	// Waits until descriptors of all ended tracks are delivered
+	void waitTrackDescriptors();
+
+	// Waits until callbacks are queued, wakeUp is called or timeout expires. The producer never locks,
+	// so a wake up can be missed and the timeout bounds the delay. Returns true if callbacks are waiting.
+	bool waitCallbacks(std::chrono::milliseconds timeout);
+	void wakeUp();
 private:
-	CallbacksListPtr m_callbacks;
-	std::mutex m_mutex;
+	void push(PyICallback&& callback);
+
+	CallbacksBufferPtr m_callbacks;
+	VisualImageMode m_visualImageMode;
+	int m_thumbnailSize;
+	std::shared_ptr<const BestShotFilter> m_bestShotFilter;
+	// accepted best shot ranks of tracks for BestShotFilter::topN
+	std::unordered_map<tsdk::TrackId, std::vector<float>> m_trackRanks;
+	std::mutex m_trackRanksMutex;
+	std::mutex m_signalMutex;
+	std::condition_variable m_signal;
+	// declared last, its worker pushes callbacks and is stopped first
+	std::shared_ptr<TrackDescriptorExtractor> m_trackDescriptors;
 };
@@ -0,0 +1,131 @@
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <memory>
+#include <thread>
+#include <vector>
+
+enum OverflowPolicy {
+	opDropOldest,
+	opBlock
+};
+
+// Bounded lock-free ring buffer. Every slot carries a sequence number telling whether it is free or filled
+// for the current lap, so neither side takes a lock and both sides are safe for several threads: the tracker
+// and the track descriptor worker push, while with opDropOldest a producer finding the buffer full pops
+// the oldest item itself.
+template<typename T>
+class RingBuffer {
+public:
+	RingBuffer(size_t capacity, OverflowPolicy policy) :
+		m_capacity{std::max<size_t>(capacity, 1)},
+		m_policy{policy},
+		m_slots{new Slot[m_capacity]},
+		m_head{0},
+		m_tail{0},
+		m_dropped{0}
+	{
+		for (size_t i = 0; i < m_capacity; ++i)
+			m_slots[i].sequence.store(i, std::memory_order_relaxed);
+	}
+
+	RingBuffer(const RingBuffer&) = delete;
+	RingBuffer& operator=(const RingBuffer&) = delete;
+
+	// Producer side. Blocks while the buffer is full with opBlock, drops the oldest item with opDropOldest.
+	void push(T&& value) {
+		for (;;) {
+			size_t pos = m_head.load(std::memory_order_relaxed);
+			Slot& slot = m_slots[pos % m_capacity];
+			const size_t sequence = slot.sequence.load(std::memory_order_acquire);
+			if (sequence == pos) {
+				if (m_head.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed)) {
+					slot.value = std::move(value);
+					slot.sequence.store(pos + 1, std::memory_order_release);
+					return;
+				}
+				continue;
+			}
+			if (sequence > pos)
+				continue; // another producer took the slot, retry with the new head
+			// the slot is either filled and not taken yet or being read by the consumer right now,
+			// in the latter case it is released soon and nothing has to be dropped
+			const bool taken = m_tail.load(std::memory_order_acquire) + m_capacity > pos;
+			T dropped;
+			if (m_policy == opDropOldest && !taken && tryPop(dropped))
+				m_dropped.fetch_add(1, std::memory_order_relaxed);
+			else if (m_policy == opBlock)
+				std::this_thread::sleep_for(std::chrono::microseconds(100));
+			else
+				std::this_thread::yield();
+		}
+	}
+
+	// Consumer side. Moves up to maxCount items (all if 0) to out, returns number of moved items.
+	size_t popBatch(std::vector<T>& out, size_t maxCount = 0) {
+		const size_t limit = maxCount ? maxCount : m_capacity;
+		size_t count = 0;
+		T value;
+		while (count < limit && tryPop(value)) {
+			out.emplace_back(std::move(value));
+			++count;
+		}
+		return count;
+	}
+
+	size_t size() const {
+		const size_t tail = m_tail.load(std::memory_order_acquire);
+		const size_t head = m_head.load(std::memory_order_acquire);
+		return head > tail ? head - tail : 0;
+	}
+
+	size_t capacity() const {
+		return m_capacity;
+	}
+
+	OverflowPolicy policy() const {
+		return m_policy;
+	}
+
+	// Number of items dropped by opDropOldest policy
+	size_t dropped() const {
+		return m_dropped.load(std::memory_order_relaxed);
+	}
+
+private:
+	struct Slot {
+		std::atomic<size_t> sequence;
+		T value;
+	};
+
+	bool tryPop(T& value) {
+		size_t pos = m_tail.load(std::memory_order_relaxed);
+		for (;;) {
+			Slot& slot = m_slots[pos % m_capacity];
+			const size_t sequence = slot.sequence.load(std::memory_order_acquire);
+			if (sequence == pos + 1) {
+				if (m_tail.compare_exchange_weak(pos, pos + 1, std::memory_order_relaxed))
+					break;
+			} else if (sequence < pos + 1) {
+				return false;
+			} else {
+				pos = m_tail.load(std::memory_order_relaxed);
+			}
+		}
+		Slot& slot = m_slots[pos % m_capacity];
+		value = std::move(slot.value);
+		slot.value = T{};
+		slot.sequence.store(pos + m_capacity, std::memory_order_release);
+		return true;
+	}
+
+	const size_t m_capacity;
+	const OverflowPolicy m_policy;
+	std::unique_ptr<Slot[]> m_slots;
+	std::atomic<size_t> m_head;
+	std::atomic<size_t> m_tail;
+	std::atomic<size_t> m_dropped;
+};
@@ -0,0 +1,154 @@
+#include "StreamPool.hpp"
+#include "../OwnedImage.hpp"
+
+#include <pybind11/pybind11.h>
+
+#include <algorithm>
+
+namespace py = pybind11;
+
+PyStreamPool::PyStreamPool(std::vector<PyIStream>&& streams, size_t frameQueueSize)
+		:m_streams{std::move(streams)}
+		,m_slots(m_streams.size())
+		,m_frameQueueSize{std::max<size_t>(frameQueueSize, 1)}
+		,m_statsStart{Clock::now()}
+{
+	m_thread = std::thread{[this] { run(); }};
+}
+
+PyStreamPool::~PyStreamPool() {
+	{
+		std::lock_guard<std::mutex> lock{m_mutex};
+		m_stop = true;
+	}
+	m_condition.notify_all();
+	m_thread.join();
+}
+
+FramePushStatus PyStreamPool::pushFrame(size_t streamId, const fsdk::Image& image, int frameId) {
+	checkStreamId(streamId);
+	// queued frames outlive the call, borrowed images are copied outside of the lock
+	const fsdk::Image frame = ownedImage(image);
+	{
+		std::lock_guard<std::mutex> lock{m_mutex};
+		if (m_closed)
+			return fpsClosed;
+		auto& slot = m_slots[streamId];
+		if (slot.frames.size() >= m_frameQueueSize) {
+			++slot.stats.droppedFrames;
+			return fpsQueueFull;
+		}
+		slot.frames.push_back(Frame{frame, frameId, Clock::now()});
+		++slot.stats.acceptedFrames;
+	}
+	m_condition.notify_one();
+	return fpsAccepted;
+}
+
+void PyStreamPool::waitAll() {
+	{
+		std::unique_lock<std::mutex> lock{m_mutex};
+		m_closed = true;
+		m_drained.wait(lock, [this] {
+			return std::all_of(m_slots.begin(), m_slots.end(), [](const StreamSlot& slot) {
+				return slot.frames.empty();
+			});
+		});
+	}
+	for (auto& stream: m_streams)
+		stream.waitStream();
+}
+
+PyIStream PyStreamPool::getStream(size_t streamId) {
+	checkStreamId(streamId);
+	return m_streams[streamId];
+}
+
+size_t PyStreamPool::getStreamCount() const {
+	return m_streams.size();
+}
+
+StreamStats PyStreamPool::getStats(size_t streamId) {
+	checkStreamId(streamId);
+	std::lock_guard<std::mutex> lock{m_mutex};
+	return makeStats(streamId, Clock::now());
+}
+
+std::vector<StreamStats> PyStreamPool::getAllStats() {
+	std::lock_guard<std::mutex> lock{m_mutex};
+	const auto now = Clock::now();
+	std::vector<StreamStats> stats;
+	stats.reserve(m_slots.size());
+	for (size_t i = 0; i < m_slots.size(); ++i)
+		stats.push_back(makeStats(i, now));
+	return stats;
+}
+
+void PyStreamPool::resetStats() {
+	std::lock_guard<std::mutex> lock{m_mutex};
+	for (auto& slot: m_slots) {
+		slot.stats = StreamStats{};
+		slot.latencySumMs = 0.;
+	}
+	m_statsStart = Clock::now();
+}
+
+void PyStreamPool::run() {
+	std::unique_lock<std::mutex> lock{m_mutex};
+	size_t next = 0;
+	while (!m_stop) {
+		bool progress = false;
+		bool pending = false;
+		// one frame per stream in a round, so every stream gets its turn
+		for (size_t i = 0; i < m_slots.size() && !m_stop; ++i) {
+			const size_t id = (next + i) % m_slots.size();
+			auto& slot = m_slots[id];
+			if (slot.frames.empty())
+				continue;
+			// the frame stays queued until the stream accepts it, this thread is the only one taking frames
+			const Frame frame = slot.frames.front();
+			lock.unlock();
+			const bool pushed = m_streams[id].pushFrame(frame.image, frame.frameId);
+			const auto now = Clock::now();
+			lock.lock();
+			if (pushed) {
+				slot.frames.pop_front();
+				const double latency = std::chrono::duration<double, std::milli>(now - frame.queued).count();
+				slot.latencySumMs += latency;
+				slot.stats.maxLatencyMs = std::max(slot.stats.maxLatencyMs, latency);
+				++slot.stats.deliveredFrames;
+				progress = true;
+			}
+			pending = pending || !slot.frames.empty();
+		}
+		if (!m_slots.empty())
+			next = (next + 1) % m_slots.size();
+
+		if (!pending) {
+			m_drained.notify_all();
+			m_condition.wait(lock, [this] {
+				return m_stop || std::any_of(m_slots.begin(), m_slots.end(), [](const StreamSlot& slot) {
+					return !slot.frames.empty();
+				});
+			});
+		} else if (!progress) {
+			// every stream with frames is full, give them time to process
+			m_condition.wait_for(lock, std::chrono::milliseconds{1});
+		}
+	}
+}
+
+void PyStreamPool::checkStreamId(size_t streamId) const {
+	if (streamId >= m_streams.size())
+		throw py::index_error("\nPyStreamPool error: streamId is out of range!");
+}
+
+StreamStats PyStreamPool::makeStats(size_t streamId, Clock::time_point now) const {
+	const auto& slot = m_slots[streamId];
+	StreamStats stats = slot.stats;
+	stats.queueDepth = slot.frames.size();
+	const double seconds = std::chrono::duration<double>(now - m_statsStart).count();
+	stats.fps = seconds > 0. ? stats.deliveredFrames / seconds : 0.;
+	stats.meanLatencyMs = stats.deliveredFrames ? slot.latencySumMs / stats.deliveredFrames : 0.;
+	return stats;
+}
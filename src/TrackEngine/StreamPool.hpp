@@ -0,0 +1,84 @@
+#pragma once
+
+#include "TrackEngineAdapter.hpp"
+
+#include <chrono>
+#include <condition_variable>
+#include <deque>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+enum FramePushStatus {
+	fpsAccepted,
+	fpsQueueFull,
+	fpsClosed
+};
+
+// Counters of one pool stream since creation of the pool or the last resetStats.
+// Latency is the time a frame waits in the pool queue before the stream accepts it.
+struct StreamStats {
+	size_t queueDepth = 0;
+	uint64_t acceptedFrames = 0;
+	uint64_t droppedFrames = 0;
+	uint64_t deliveredFrames = 0;
+	double fps = 0.;
+	double meanLatencyMs = 0.;
+	double maxLatencyMs = 0.;
+};
+
+// Owns several streams fed by one producer. Frames are queued per stream and a pusher thread hands them
+// to the streams in round robin order, so a busy stream does not hold back the others.
+class PyStreamPool {
+public:
+	PyStreamPool(std::vector<PyIStream>&& streams, size_t frameQueueSize);
+
+	// Must be called with the GIL
+	~PyStreamPool();
+
+	PyStreamPool(const PyStreamPool&) = delete;
+	PyStreamPool& operator=(const PyStreamPool&) = delete;
+
+	FramePushStatus pushFrame(size_t streamId, const fsdk::Image& image, int frameId);
+
+	// Waits until all queued frames are delivered and all streams are finished. Must be called without the GIL.
+	void waitAll();
+
+	PyIStream getStream(size_t streamId);
+	size_t getStreamCount() const;
+	StreamStats getStats(size_t streamId);
+	std::vector<StreamStats> getAllStats();
+	void resetStats();
+
+private:
+	using Clock = std::chrono::steady_clock;
+
+	struct Frame {
+		fsdk::Image image;
+		int frameId;
+		Clock::time_point queued;
+	};
+
+	struct StreamSlot {
+		std::deque<Frame> frames;
+		StreamStats stats;
+		double latencySumMs = 0.;
+	};
+
+	void run();
+	void checkStreamId(size_t streamId) const;
+	// Must be called under the lock
+	StreamStats makeStats(size_t streamId, Clock::time_point now) const;
+
+	std::vector<PyIStream> m_streams;
+	std::vector<StreamSlot> m_slots;
+	const size_t m_frameQueueSize;
+	Clock::time_point m_statsStart;
+	std::mutex m_mutex;
+	std::condition_variable m_condition;
+	// notified by the pusher when queues become empty
+	std::condition_variable m_drained;
+	bool m_stop = false;
+	bool m_closed = false;
+	std::thread m_thread;
+};
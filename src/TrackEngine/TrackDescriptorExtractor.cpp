@@ -0,0 +1,142 @@
+#include "TrackDescriptorExtractor.hpp"
+
+#include <algorithm>
+
+TrackDescriptorExtractor::TrackDescriptorExtractor(
+	fsdk::IFaceEnginePtr faceEngine,
+	fsdk::IWarperPtr warper,
+	fsdk::IDescriptorExtractorPtr extractor,
+	size_t topN,
+	Deliver deliver)
+		:m_faceEngine{faceEngine}
+		,m_warper{warper}
+		,m_extractor{extractor}
+		,m_topN{std::max<size_t>(topN, 1)}
+		,m_deliver{std::move(deliver)}
+{
+	m_thread = std::thread{[this] { run(); }};
+}
+
+TrackDescriptorExtractor::~TrackDescriptorExtractor() {
+	{
+		std::lock_guard<std::mutex> lock{m_mutex};
+		m_stop = true;
+	}
+	m_condition.notify_all();
+	m_thread.join();
+}
+
+void TrackDescriptorExtractor::addBestShot(const tsdk::DetectionDescr& descr) {
+	std::lock_guard<std::mutex> lock{m_mutex};
+	auto& shots = m_tracks[descr.trackId];
+	auto byScore = [](const BestShot& shot, float score) {
+		return shot.detection.score >= score;
+	};
+	auto position = std::lower_bound(shots.begin(), shots.end(), descr.detection.score, byScore);
+	if (static_cast<size_t>(position - shots.begin()) >= m_topN)
+		return;
+	shots.insert(position, BestShot{descr.image, descr.detection, descr.landmarks});
+	if (shots.size() > m_topN)
+		shots.pop_back();
+}
+
+void TrackDescriptorExtractor::trackEnd(const tsdk::TrackId& trackId) {
+	{
+		std::lock_guard<std::mutex> lock{m_mutex};
+		auto it = m_tracks.find(trackId);
+		if (it != m_tracks.end()) {
+			m_ended.emplace_back(trackId, std::move(it->second));
+			m_tracks.erase(it);
+		} else {
+			m_ended.emplace_back(trackId, std::vector<BestShot>{});
+		}
+	}
+	m_condition.notify_one();
+}
+
+void TrackDescriptorExtractor::wait() {
+	std::unique_lock<std::mutex> lock{m_mutex};
+	m_idle.wait(lock, [this] { return !m_busy && m_ended.empty(); });
+}
+
+void TrackDescriptorExtractor::run() {
+	std::unique_lock<std::mutex> lock{m_mutex};
+	for (;;) {
+		m_condition.wait(lock, [this] { return m_stop || !m_ended.empty(); });
+		if (m_ended.empty())
+			return;
+		// all tracks ended since the previous run are extracted together
+		std::vector<Track> tracks;
+		tracks.swap(m_ended);
+		m_busy = true;
+		lock.unlock();
+		process(tracks);
+		lock.lock();
+		m_busy = false;
+		m_idle.notify_all();
+	}
+}
+
+void TrackDescriptorExtractor::process(std::vector<Track>& tracks) {
+	const uint32_t version = m_extractor->getModelVersion();
+	std::vector<std::vector<fsdk::Image>> warps(tracks.size());
+	std::vector<PyICallback> callbacks(tracks.size());
+	for (size_t i = 0; i < tracks.size(); ++i) {
+		callbacks[i].type = PyICallback::ctTrackEnd;
+		callbacks[i].trackId = tracks[i].first;
+		for (const auto& shot: tracks[i].second) {
+			const fsdk::Transformation transformation = m_warper->createTransformation(shot.detection, shot.landmarks);
+			fsdk::Image warp;
+			if (m_warper->warp(shot.image, transformation, warp).isOk())
+				warps[i].push_back(warp);
+		}
+		// frames are not needed anymore
+		tracks[i].second.clear();
+	}
+
+	// tracks with one best shot share one batch call
+	std::vector<size_t> singles;
+	std::vector<fsdk::Image> singleWarps;
+	for (size_t i = 0; i < tracks.size(); ++i) {
+		if (warps[i].size() == 1) {
+			singles.push_back(i);
+			singleWarps.push_back(warps[i].front());
+		}
+	}
+	if (!singles.empty()) {
+		const auto count = static_cast<uint32_t>(singles.size());
+		fsdk::IDescriptorBatchPtr batch = fsdk::acquire(m_faceEngine->createDescriptorBatch(count, version));
+		std::vector<float> scores(count);
+		if (batch && m_extractor->extractFromWarpedImageBatch(singleWarps.data(), batch, scores.data(), count).isOk()) {
+			for (uint32_t i = 0; i < count; ++i) {
+				callbacks[singles[i]].descriptor = fsdk::acquire(batch->getDescriptorSlow(i));
+				callbacks[singles[i]].descriptorScore = scores[i];
+			}
+		}
+	}
+
+	// aggregation of the SDK covers the whole batch of a call, so every track with several best shots needs its own
+	for (size_t i = 0; i < tracks.size(); ++i) {
+		if (warps[i].size() < 2)
+			continue;
+		const auto count = static_cast<uint32_t>(warps[i].size());
+		fsdk::IDescriptorBatchPtr batch = fsdk::acquire(m_faceEngine->createDescriptorBatch(count, version));
+		fsdk::IDescriptorPtr aggregation = fsdk::acquire(m_faceEngine->createDescriptor(version));
+		if (!batch || !aggregation)
+			continue;
+		std::vector<float> scores(count);
+		fsdk::ResultValue<fsdk::FSDKError, float> err = m_extractor->extractFromWarpedImageBatch(
+			warps[i].data(),
+			batch,
+			aggregation,
+			scores.data(),
+			count);
+		if (err.isOk()) {
+			callbacks[i].descriptor = aggregation;
+			callbacks[i].descriptorScore = err.getValue();
+		}
+	}
+
+	for (auto& callback: callbacks)
+		m_deliver(std::move(callback));
+}
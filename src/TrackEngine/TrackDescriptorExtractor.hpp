@@ -0,0 +1,67 @@
+#pragma once
+
+#include "TrackEngineCallback.hpp"
+
+#include "trackEngine/ITrackEngine.h"
+
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+
+// Keeps the best shots of every track and extracts one descriptor per track when the track ends.
+// Extraction runs on a worker thread, so the tracker is not stalled, and tracks ended since the previous
+// run are processed together. The ctTrackEnd callback with the descriptor is passed to deliver.
+class TrackDescriptorExtractor {
+public:
+	using Deliver = std::function<void(PyICallback&&)>;
+
+	TrackDescriptorExtractor(
+		fsdk::IFaceEnginePtr faceEngine,
+		fsdk::IWarperPtr warper,
+		fsdk::IDescriptorExtractorPtr extractor,
+		size_t topN,
+		Deliver deliver);
+
+	// Tracks ended before are still extracted and delivered
+	~TrackDescriptorExtractor();
+
+	TrackDescriptorExtractor(const TrackDescriptorExtractor&) = delete;
+	TrackDescriptorExtractor& operator=(const TrackDescriptorExtractor&) = delete;
+
+	void addBestShot(const tsdk::DetectionDescr& descr);
+	void trackEnd(const tsdk::TrackId& trackId);
+	// Waits until all ended tracks are delivered
+	void wait();
+
+private:
+	struct BestShot {
+		fsdk::Image image;
+		fsdk::Detection detection;
+		fsdk::Landmarks5 landmarks;
+	};
+
+	using Track = std::pair<tsdk::TrackId, std::vector<BestShot>>;
+
+	void run();
+	void process(std::vector<Track>& tracks);
+
+	fsdk::IFaceEnginePtr m_faceEngine;
+	fsdk::IWarperPtr m_warper;
+	fsdk::IDescriptorExtractorPtr m_extractor;
+	const size_t m_topN;
+	Deliver m_deliver;
+
+	std::mutex m_mutex;
+	std::condition_variable m_condition;
+	std::condition_variable m_idle;
+	// best shots of running tracks ordered by detection score, the best one first
+	std::unordered_map<tsdk::TrackId, std::vector<BestShot>> m_tracks;
+	std::vector<Track> m_ended;
+	bool m_busy = false;
+	bool m_stop = false;
+	std::thread m_thread;
+};
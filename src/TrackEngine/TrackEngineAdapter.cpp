@@ -1,4 +1,5 @@
 #include "TrackEngineAdapter.hpp"
+#include "../OwnedImage.hpp"
 
 #include <pybind11/pybind11.h>
 
@@ -8,30 +9,83 @@ PyITrackEngine::PyITrackEngine(const PyIFaceEngine &fsdk, const std::string &con
 	m_trackEngine = fsdk::acquire(tsdk::createTrackEngine(fsdk.faceEnginePtr.get(), configPath.c_str()));
 }
 
-PyIStream PyITrackEngine::createStream() {
+PyIStream PyITrackEngine::createStream(
+	size_t callbackCapacity,
+	OverflowPolicy overflowPolicy,
+	VisualImageMode visualImageMode,
+	int thumbnailSize) {
 	auto stream = fsdk::acquire(m_trackEngine->createStream());
-	return PyIStream{std::move(stream)};
+	return PyIStream{std::move(stream), callbackCapacity, overflowPolicy, visualImageMode, thumbnailSize};
 }
 
 bool PyIStream::pushFrame(const fsdk::Image &image, int id) {
-	return m_stream->pushFrame(image, id, nullptr);
+	// the stream keeps the frame after returning, borrowed images are copied
+	return m_stream->pushFrame(ownedImage(image), id, nullptr);
 }
 
-std::vector<PyICallback> PyIStream::getCallbacks() {
-	return m_streamObserver->getCallbacks();
+std::vector<PyICallback> PyIStream::getCallbacks(size_t maxCount) {
+	return m_streamObserver->getCallbacks(maxCount);
 }
 
-PyIStream::PyIStream(fsdk::Ref<tsdk::IStream> &&_stream)
+size_t PyIStream::getPendingCallbackCount() const {
+	return m_streamObserver->getPendingCount();
+}
+
+size_t PyIStream::getDroppedCallbackCount() const {
+	return m_streamObserver->getDroppedCount();
+}
+
+void PyIStream::setCallback(
+	const py::object& function,
+	const std::vector<PyICallback::CallbackType>& types,
+	bool latestVisualOnly) {
+	// the previous dispatcher is stopped first, callbacks are never delivered by two threads
+	m_dispatcher.reset();
+	if (function.is_none())
+		return;
+	if (!PyCallable_Check(function.ptr()))
+		throw py::type_error("\nPyIStream error: callback must be callable or None!");
+	m_dispatcher = std::make_shared<CallbackDispatcher>(
+		m_streamObserver,
+		py::reinterpret_borrow<py::function>(function),
+		types,
+		latestVisualOnly);
+}
+
+PyIStream::PyIStream(
+	fsdk::Ref<tsdk::IStream> &&_stream,
+	size_t callbackCapacity,
+	OverflowPolicy overflowPolicy,
+	VisualImageMode visualImageMode,
+	int thumbnailSize)
 		:m_stream{_stream}
 {
 	if (m_stream.isNull())
 		throw py::cast_error("\nPyIStream error: stream is nullptr!");
-	m_streamObserver = std::make_shared<Observer>();
+	m_streamObserver = std::make_shared<Observer>(
+		callbackCapacity,
+		overflowPolicy,
+		visualImageMode,
+		thumbnailSize);
 	m_stream->setBestShotObserver(m_streamObserver.get());
 	m_stream->setVisualObserver(m_streamObserver.get());
 	m_stream->setBestShotPredicate(m_streamObserver.get());
 }
 
+void PyIStream::setBestShotFilter(const BestShotFilter& filter) {
+	m_streamObserver->setBestShotFilter(filter);
+}
+
+void PyIStream::setTrackDescriptors(
+	fsdk::IFaceEnginePtr faceEngine,
+	fsdk::IWarperPtr warper,
+	fsdk::IDescriptorExtractorPtr extractor,
+	size_t topN) {
+	m_streamObserver->setTrackDescriptors(faceEngine, warper, extractor, topN);
+}
+
 void PyIStream::waitStream() {
 	m_stream->join();
+	// descriptors of tracks ended by join are extracted by the observer worker
+	m_streamObserver->waitTrackDescriptors();
 }
@@ -1,6 +1,7 @@
 #pragma once
 
 #include "CallbackObserver.hpp"
+#include "CallbackDispatcher.hpp"
 
 #include "../FaceEngineAdapter.hpp"
 
@@ -15,7 +16,11 @@ class PyIStream;
 class PyITrackEngine {
 public:
 	PyITrackEngine(const PyIFaceEngine& fsdk, const std::string& configPath);
-	PyIStream createStream();
+	PyIStream createStream(
+		size_t callbackCapacity,
+		OverflowPolicy overflowPolicy,
+		VisualImageMode visualImageMode,
+		int thumbnailSize);
 private:
 	fsdk::Ref<tsdk::ITrackEngine> m_trackEngine;
 };
@@ -26,17 +31,37 @@ public:
 
 	PyIStream(PyIStream&& other) noexcept:
 			m_stream{other.m_stream},
-			m_streamObserver{std::move(other.m_streamObserver)}
+			m_streamObserver{std::move(other.m_streamObserver)},
+			m_dispatcher{std::move(other.m_dispatcher)}
 	{}
 
-	explicit PyIStream(fsdk::Ref<tsdk::IStream>&& _stream);
+	PyIStream(
+		fsdk::Ref<tsdk::IStream>&& _stream,
+		size_t callbackCapacity,
+		OverflowPolicy overflowPolicy,
+		VisualImageMode visualImageMode,
+		int thumbnailSize);
 
 	bool pushFrame(const fsdk::Image& image, int id);
-	std::vector<PyICallback> getCallbacks();
+	std::vector<PyICallback> getCallbacks(size_t maxCount);
+	size_t getPendingCallbackCount() const;
+	size_t getDroppedCallbackCount() const;
+	void setCallback(
+		const py::object& function,
+		const std::vector<PyICallback::CallbackType>& types,
+		bool latestVisualOnly);
+	void setBestShotFilter(const BestShotFilter& filter);
+	void setTrackDescriptors(
+		fsdk::IFaceEnginePtr faceEngine,
+		fsdk::IWarperPtr warper,
+		fsdk::IDescriptorExtractorPtr extractor,
+		size_t topN);
 	void waitStream();
 private:
 	fsdk::Ref<tsdk::IStream> m_stream;
 	std::shared_ptr<Observer> m_streamObserver;
+	// declared after the observer to be stopped before it is destroyed
+	std::shared_ptr<CallbackDispatcher> m_dispatcher;
 	uint32_t m_frameId = 0;
 };
 
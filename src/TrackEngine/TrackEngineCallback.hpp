@@ -18,4 +18,7 @@ public:
 	int trackId;
 	int frameId;
 	bool isDetection;
+	// set in ctTrackEnd callbacks if track descriptors are enabled for the stream
+	fsdk::IDescriptorPtr descriptor;
+	float descriptorScore = 0.f;
 };
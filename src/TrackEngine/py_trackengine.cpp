@@ -1,5 +1,6 @@
 #include "TrackEngineAdapter.hpp"
 #include "TrackEngineCallback.hpp"
+#include "StreamPool.hpp"
 #include "../FaceEngineAdapter.hpp"
 
 #include <fsdk/FaceEngine.h>
@@ -18,21 +19,247 @@ PYBIND11_MODULE(TrackEngine, t) {
 		  "Creates the TrackEngine object\n");
 
 
+	// enumerations are registered before methods using them as default arguments
+	py::enum_<OverflowPolicy>(t, "OverflowPolicy", "Policy of stream callbacks buffer overflow\n")
+			.value("opDropOldest", opDropOldest, "Oldest callback is dropped to free space for the new one")
+			.value("opBlock", opBlock, "TrackEngine waits until callbacks are taken")
+			.export_values();
+
+	py::enum_<VisualImageMode>(t, "VisualImageMode", "Image attached to visual callbacks\n")
+			.value("vimFull", vimFull, "Whole frame, shared by callbacks of the frame without copying")
+			.value("vimNone", vimNone, "No image, only bbox and landmarks")
+			.value("vimCrop", vimCrop, "Copy of the track bbox, top left corner of the image is bbox top left corner")
+			.value("vimThumbnail", vimThumbnail, "Downscaled copy of the frame, shared by callbacks of the frame")
+			.export_values();
+
+	py::enum_<FramePushStatus>(t, "FramePushStatus", "Result of pushing frame to stream pool\n")
+			.value("fpsAccepted", fpsAccepted, "Frame is queued and will be passed to the stream")
+			.value("fpsQueueFull", fpsQueueFull, "Queue of the stream is full, frame is dropped")
+			.value("fpsClosed", fpsClosed, "waitAll was called, pool does not accept frames anymore")
+			.export_values();
+
+	py::enum_<PyICallback::CallbackType>(t, "TrackEngineCallbackType")
+			.value("ctVisual", PyICallback::CallbackType::ctVisual, "Visual callbacks generated only for frames "
+														   "where exists face tracks")
+			.value("ctBestShot", PyICallback::CallbackType::ctBestShot, "Bestshot callbacks generated for frames where"
+															   "face were detected")
+			.value("ctTrackEnd", PyICallback::CallbackType::ctTrackEnd, "\t\tTrackEnd callback generated when face track\n"
+																		"\t\twas finished\n"
+																		"\t\t!!! NOTICE !!!\n"
+																		"\t\tin callback of this type only trackId has value.\n"
+																		"\t\tAll the rest fields are empty\n")
+			.export_values();
+
 	py::class_<PyITrackEngine>(t, "PyITrackEngine", "Root LUNA SDK object interface\n")
-			.def("createStream", &PyITrackEngine::createStream, "Create frames stream"
-																"\tReturns:\n"
-																"\t\t(object of type PyIStream)");
+			.def("createStream", &PyITrackEngine::createStream,
+				py::arg("callbackCapacity") = 4096,
+				py::arg("overflowPolicy") = opDropOldest,
+				py::arg("visualImageMode") = vimFull,
+				py::arg("thumbnailSize") = 320,
+				"Create frames stream\n"
+				"\tArgs:\n"
+				"\t\tparam1 (int): max number of callbacks waiting for getCallbacks\n"
+				"\t\tparam2 (OverflowPolicy): what to do when callbacks buffer is full:\n"
+				"\t\t\topDropOldest - drop the oldest callback, opBlock - block stream until callbacks are taken\n"
+				"\t\tparam3 (VisualImageMode): image of visual callbacks, best shots always carry the whole frame.\n"
+				"\t\t\tCrops and thumbnails are made for packed formats only, YUV_NV21 frames are kept whole\n"
+				"\t\tparam4 (int): max size of the longer thumbnail side for vimThumbnail mode\n"
+				"\tReturns:\n"
+				"\t\t(object of type PyIStream)")
+			.def("createStreamPool", [](
+				PyITrackEngine& trackEngine,
+				size_t streamCount,
+				size_t frameQueueSize,
+				size_t callbackCapacity,
+				OverflowPolicy overflowPolicy,
+				VisualImageMode visualImageMode,
+				int thumbnailSize) {
+					std::vector<PyIStream> streams;
+					streams.reserve(streamCount);
+					for (size_t i = 0; i < streamCount; ++i)
+						streams.push_back(trackEngine.createStream(
+							callbackCapacity,
+							overflowPolicy,
+							visualImageMode,
+							thumbnailSize));
+					return std::unique_ptr<PyStreamPool>{new PyStreamPool{std::move(streams), frameQueueSize}};
+				},
+				py::arg("streamCount"),
+				py::arg("frameQueueSize") = 8,
+				py::arg("callbackCapacity") = 4096,
+				py::arg("overflowPolicy") = opDropOldest,
+				py::arg("visualImageMode") = vimFull,
+				py::arg("thumbnailSize") = 320,
+				"Create pool of streams fed from one thread\n"
+				"\tArgs:\n"
+				"\t\tparam1 (int): number of streams\n"
+				"\t\tparam2 (int): max number of frames queued for every stream\n"
+				"\t\tparam3-param6: callbacks options of every stream, see createStream\n"
+				"\tReturns:\n"
+				"\t\t(object of type StreamPool)");
+
+	py::class_<StreamStats>(t, "StreamStats", "Counters of pool stream since creation of the pool or resetStats\n")
+			.def_readonly("queueDepth", &StreamStats::queueDepth, "Number of frames waiting in the pool queue")
+			.def_readonly("acceptedFrames", &StreamStats::acceptedFrames, "Number of frames accepted by pushFrame")
+			.def_readonly("droppedFrames", &StreamStats::droppedFrames,
+				"Number of frames rejected by pushFrame because the queue was full")
+			.def_readonly("deliveredFrames", &StreamStats::deliveredFrames, "Number of frames passed to the stream")
+			.def_readonly("fps", &StreamStats::fps, "Frames passed to the stream per second")
+			.def_readonly("meanLatencyMs", &StreamStats::meanLatencyMs,
+				"Mean time a frame waits in the pool queue in milliseconds")
+			.def_readonly("maxLatencyMs", &StreamStats::maxLatencyMs,
+				"Max time a frame waits in the pool queue in milliseconds")
+			.def("__repr__", [](const StreamStats& stats) {
+				return "StreamStats: queueDepth = " + std::to_string(stats.queueDepth) +
+					", acceptedFrames = " + std::to_string(stats.acceptedFrames) +
+					", droppedFrames = " + std::to_string(stats.droppedFrames) +
+					", deliveredFrames = " + std::to_string(stats.deliveredFrames) +
+					", fps = " + std::to_string(stats.fps) +
+					", meanLatencyMs = " + std::to_string(stats.meanLatencyMs);
+			});
+
+	py::class_<PyStreamPool>(t, "StreamPool", "Streams fed from one thread, frames are passed to streams in turn\n")
+			.def("pushFrame", &PyStreamPool::pushFrame,
+				py::arg("streamId"),
+				py::arg("image"),
+				py::arg("frameId"),
+				"Queue frame for stream\n"
+				"\tArgs:\n"
+				"\t\tparam1 (int): index of stream in pool\n"
+				"\t\tparam2 (Image): frame\n"
+				"\t\tparam3 (int): frame id\n"
+				"\tReturns:\n"
+				"\t\t(FramePushStatus) fpsQueueFull means the stream does not keep up with the frame rate")
+			.def("waitAll", &PyStreamPool::waitAll, py::call_guard<py::gil_scoped_release>(),
+				"Blocking function. Waits until all queued frames are passed to streams and processed. "
+				"The pool does not accept frames after it")
+			.def("getStream", &PyStreamPool::getStream, py::arg("streamId"),
+				"Get stream of pool to take its callbacks\n"
+				"\tReturns:\n"
+				"\t\t(object of type PyIStream)")
+			.def("getStreamCount", &PyStreamPool::getStreamCount, "Get number of streams")
+			.def("getStats", &PyStreamPool::getStats, py::arg("streamId"),
+				"Get counters of stream\n"
+				"\tReturns:\n"
+				"\t\t(object of type StreamStats)")
+			.def("getAllStats", &PyStreamPool::getAllStats,
+				"Get counters of all streams\n"
+				"\tReturns:\n"
+				"\t\t(list of StreamStats)")
+			.def("resetStats", &PyStreamPool::resetStats, "Reset counters of all streams");
 
 	py::class_<PyIStream>(t, "PyIStream", "Stream object created in TrackEngine\n")
 			.def("pushFrame", &PyIStream::pushFrame,"Push frame to stream"
 													"\tReturns:\n"
 													"\t\t(bool result) true if frame was pushed successfully"
 													"\t\tfalse if inner frame buffer is full and frame wasn't pushed\n")
-			.def("getCallbacks", &PyIStream::getCallbacks,"Get all frames generated for current stream"
-														  "\tReturns:\n"
-														  "\t\t(array of type PyICallback)")
-			.def("waitStream", &PyIStream::waitStream, "Blocking function. Use it when you have pushed all the frames "
-											  "and you want to wail until all of them will be processed");
+			.def("getCallbacks", &PyIStream::getCallbacks,
+				py::arg("maxCount") = 0,
+				"Take callbacks generated for current stream\n"
+				"\tArgs:\n"
+				"\t\tparam1 (int): max number of callbacks to take. If 0 - take all waiting callbacks\n"
+				"\tReturns:\n"
+				"\t\t(array of type PyICallback)")
+			.def("getPendingCallbackCount", &PyIStream::getPendingCallbackCount,
+				"Get number of callbacks waiting for getCallbacks")
+			.def("getDroppedCallbackCount", &PyIStream::getDroppedCallbackCount,
+				"Get number of callbacks dropped by opDropOldest policy because nobody took them in time")
+			.def("setCallback", &PyIStream::setCallback,
+				py::arg("function"),
+				py::arg("types") = std::vector<PyICallback::CallbackType>{
+					PyICallback::ctVisual, PyICallback::ctBestShot, PyICallback::ctTrackEnd},
+				py::arg("latestVisualOnly") = false,
+				"Deliver callbacks of the stream to python function on a dedicated thread\n"
+				"\tThe function is called with a list of PyICallback, the GIL is acquired once per list.\n"
+				"\tCallbacks are not available for getCallbacks while the function is set.\n"
+				"\tMay be called from the function itself, its thread stops once the function returns.\n"
+				"\tArgs:\n"
+				"\t\tparam1 (callable): function taking list of PyICallback. If None - stop delivery\n"
+				"\t\tparam2 (list of TrackEngineCallbackType): types of delivered callbacks, the rest are dropped\n"
+				"\t\tparam3 (bool): deliver only the latest visual callback of every track from each list,\n"
+				"\t\t\tso slow functions get fewer callbacks instead of lagging behind the stream")
+			.def("setBestShotFilter", [](
+				PyIStream& stream,
+				float minScore,
+				int minFaceSize,
+				size_t topN,
+				const py::object& agsEstimator,
+				float minAGS,
+				const py::object& headPoseEstimator,
+				float maxYaw,
+				float maxPitch,
+				float maxRoll) {
+					BestShotFilter filter;
+					filter.minScore = minScore;
+					filter.minFaceSize = minFaceSize;
+					filter.topN = topN;
+					// estimators are registered by FaceEngine module, None disables their checks
+					if (!agsEstimator.is_none())
+						filter.agsEstimator = agsEstimator.cast<fsdk::IAGSEstimatorPtr>();
+					filter.minAGS = minAGS;
+					if (!headPoseEstimator.is_none())
+						filter.headPoseEstimator = headPoseEstimator.cast<fsdk::IHeadPoseEstimatorPtr>();
+					filter.maxYaw = maxYaw;
+					filter.maxPitch = maxPitch;
+					filter.maxRoll = maxRoll;
+					stream.setBestShotFilter(filter);
+				},
+				py::arg("minScore") = 0.f,
+				py::arg("minFaceSize") = 0,
+				py::arg("topN") = 0,
+				py::arg("agsEstimator") = py::none(),
+				py::arg("minAGS") = 0.f,
+				py::arg("headPoseEstimator") = py::none(),
+				py::arg("maxYaw") = 180.f,
+				py::arg("maxPitch") = 180.f,
+				py::arg("maxRoll") = 180.f,
+				"Set conditions a detection must meet to become a best shot, checked natively before callbacks\n"
+				"\tEstimators are used from the tracking thread and must not be used elsewhere meanwhile.\n"
+				"\tArgs:\n"
+				"\t\tparam1 (float): min detection score\n"
+				"\t\tparam2 (int): min size of the shorter side of face bbox\n"
+				"\t\tparam3 (int): accept only detections among N best ones of the track so far, ranked by AGS\n"
+				"\t\t\tif its estimator is set and by detection score otherwise. If 0 - not limited\n"
+				"\t\tparam4 (IAGSEstimatorPtr): AGS estimator or None\n"
+				"\t\tparam5 (float): min AGS, checked if AGS estimator is set\n"
+				"\t\tparam6 (IHeadPoseEstimatorPtr): head pose estimator or None\n"
+				"\t\tparam7-param9 (float): max absolute yaw, pitch and roll in degrees, checked if head pose\n"
+				"\t\t\testimator is set")
+			.def("setTrackDescriptorExtraction", [](
+				PyIStream& stream,
+				const py::object& faceEngine,
+				const py::object& warper,
+				const py::object& extractor,
+				size_t topN) {
+					// objects are registered by FaceEngine module, None disables extraction
+					if (faceEngine.is_none() || warper.is_none() || extractor.is_none()) {
+						stream.setTrackDescriptors({}, {}, {}, topN);
+						return;
+					}
+					stream.setTrackDescriptors(
+						faceEngine.cast<const PyIFaceEngine&>().faceEnginePtr,
+						warper.cast<fsdk::IWarperPtr>(),
+						extractor.cast<fsdk::IDescriptorExtractorPtr>(),
+						topN);
+				},
+				py::arg("faceEngine") = py::none(),
+				py::arg("warper") = py::none(),
+				py::arg("extractor") = py::none(),
+				py::arg("topN") = 3,
+				"Extract one descriptor per track natively, it is set to descriptor field of ctTrackEnd callback\n"
+				"\tN best shots of a track by detection score are warped and aggregated into one descriptor when\n"
+				"\tthe track ends. Tracks ended at the same time are extracted together on a worker thread, so their\n"
+				"\tctTrackEnd callbacks come after the extraction. Warper and extractor must not be used elsewhere\n"
+				"\tmeanwhile.\n"
+				"\tArgs:\n"
+				"\t\tparam1 (PyIFaceEngine): face engine or None to disable extraction\n"
+				"\t\tparam2 (IWarperPtr): warper or None\n"
+				"\t\tparam3 (IDescriptorExtractorPtr): descriptor extractor or None\n"
+				"\t\tparam4 (int): number of best shots aggregated per track")
+			.def("waitStream", &PyIStream::waitStream, py::call_guard<py::gil_scoped_release>(), "Blocking function. Use it when you have pushed all the frames "
+											  "and you want to wail until all of them will be processed. "
+											  "With opBlock policy callbacks must be taken from another thread "
+											  "if they do not fit the buffer");
 
 	py::class_<PyICallback>(t, "PyICallback", "Callback object generated by TrackEngine\n")
 			.def_readonly("type", &PyICallback::type)
@@ -42,17 +269,7 @@ PYBIND11_MODULE(TrackEngine, t) {
 			.def_readonly("score", &PyICallback::score)
 			.def_readonly("trackId", &PyICallback::trackId)
 			.def_readonly("frameId", &PyICallback::frameId)
-			.def_readonly("isDetection", &PyICallback::isDetection);
-
-	py::enum_<PyICallback::CallbackType>(t, "TrackEngineCallbackType")
-			.value("ctVisual", PyICallback::CallbackType::ctVisual, "Visual callbacks generated only for frames "
-														   "where exists face tracks")
-			.value("ctBestShot", PyICallback::CallbackType::ctBestShot, "Bestshot callbacks generated for frames where"
-															   "face were detected")
-			.value("ctTrackEnd", PyICallback::CallbackType::ctTrackEnd, "\t\tTrackEnd callback generated when face track\n"
-																		"\t\twas finished\n"
-																		"\t\t!!! NOTICE !!!\n"
-																		"\t\tin callback of this type only trackId has value.\n"
-																		"\t\tAll the rest fields are empty\n")
-			.export_values();
-}
+			.def_readonly("isDetection", &PyICallback::isDetection)
+			.def_readonly("descriptor", &PyICallback::descriptor)
+			.def_readonly("descriptorScore", &PyICallback::descriptorScore);
+}
\ No newline at end of file
@@ -0,0 +1,174 @@
+#include <pybind11/pybind11.h>
+#include <fsdk/FaceEngine.h>
+#include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+#include "ErrorsAdapter.hpp"
+#include "FaceEngineAdapter.hpp"
+#include "FaceAnalyzer.hpp"
+#include "EstimatorBatch.hpp"
+#include "EstimationColumns.hpp"
+
+namespace py = pybind11;
+
+// Estimation of FaceAnalysis or None if it was not requested
+template<typename T>
+static py::object analysisField(const FaceAnalysis& analysis, AnalyzerRequest flag, const T& value) {
+	if (analysis.estimated & flag)
+		return py::cast(value);
+	return py::none();
+}
+
+// Adds columns of one estimation of analyses to columns with names prefixed by prefix
+template<typename T, typename F>
+static void addAnalysisColumns(
+	py::dict& columns,
+	const std::vector<FaceAnalysis>& analyses,
+	const std::string& prefix,
+	F get) {
+	std::vector<T> estimations;
+	estimations.reserve(analyses.size());
+	for (const FaceAnalysis& analysis : analyses)
+		estimations.push_back(get(analysis));
+	const py::dict estimationColumns = toColumns(estimations);
+	for (const auto& column : estimationColumns)
+		columns[py::str(prefix + column.first.cast<std::string>())] = column.second;
+}
+
+// Columns of estimations selected by request, named <estimation>_<field>
+static py::dict analysisColumns(const std::vector<FaceAnalysis>& analyses, uint32_t request) {
+	py::dict columns;
+	if (request & arAttributes)
+		addAnalysisColumns<fsdk::AttributeEstimationResult>(columns, analyses, "attributes_",
+			[](const FaceAnalysis& a) { return a.attributes; });
+	if (request & arEmotions)
+		addAnalysisColumns<fsdk::EmotionsEstimation>(columns, analyses, "emotions_",
+			[](const FaceAnalysis& a) { return a.emotions; });
+	if (request & arGlasses)
+		addAnalysisColumns<fsdk::GlassesEstimation>(columns, analyses, "",
+			[](const FaceAnalysis& a) { return a.glasses; });
+	if (request & arMouth)
+		addAnalysisColumns<fsdk::MouthEstimation>(columns, analyses, "mouth_",
+			[](const FaceAnalysis& a) { return a.mouth; });
+	if (request & arMedicalMask)
+		addAnalysisColumns<fsdk::MedicalMaskEstimation>(columns, analyses, "medicalMask_",
+			[](const FaceAnalysis& a) { return a.medicalMask; });
+	if (request & arEyes)
+		addAnalysisColumns<fsdk::EyesEstimation>(columns, analyses, "eyes_",
+			[](const FaceAnalysis& a) { return a.eyes; });
+	if (request & arQuality)
+		addAnalysisColumns<fsdk::SubjectiveQuality>(columns, analyses, "quality_",
+			[](const FaceAnalysis& a) { return a.quality; });
+	return columns;
+}
+
+void analyzer_module(py::module& f) {
+
+	py::enum_<AnalyzerRequest>(f, "AnalyzerRequest", py::arithmetic(),
+		"Estimators run by FaceAnalyzer, flags are combined with | operator.\n")
+		.value("arAttributes", arAttributes, "Age, gender and ethnicity, see AttributeResult\n")
+		.value("arEmotions", arEmotions, "EmotionsEstimation\n")
+		.value("arGlasses", arGlasses, "GlassesEstimation\n")
+		.value("arMouth", arMouth, "MouthEstimation\n")
+		.value("arMedicalMask", arMedicalMask, "MedicalMaskEstimation\n")
+		.value("arEyes", arEyes, "EyesEstimation, requires transformed landmarks of warps\n")
+		.value("arQuality", arQuality, "SubjectiveQuality\n")
+		.value("arAll", arAll, "All estimators\n")
+		.export_values()
+			;
+
+	py::class_<FaceAnalysis>(f, "FaceAnalysis",
+		"Estimations of one warp made by FaceAnalyzer. Estimations which were not requested are None.\n")
+		.def_readonly("estimated", &FaceAnalysis::estimated, "AnalyzerRequest flags of estimations\n")
+		.def_property_readonly("attributes", [](const FaceAnalysis& a) {
+			return analysisField(a, arAttributes, a.attributes); }, "AttributeResult or None\n")
+		.def_property_readonly("emotions", [](const FaceAnalysis& a) {
+			return analysisField(a, arEmotions, a.emotions); }, "EmotionsEstimation or None\n")
+		.def_property_readonly("glasses", [](const FaceAnalysis& a) {
+			return analysisField(a, arGlasses, a.glasses); }, "GlassesEstimation or None\n")
+		.def_property_readonly("mouth", [](const FaceAnalysis& a) {
+			return analysisField(a, arMouth, a.mouth); }, "MouthEstimation or None\n")
+		.def_property_readonly("medicalMask", [](const FaceAnalysis& a) {
+			return analysisField(a, arMedicalMask, a.medicalMask); }, "MedicalMaskEstimation or None\n")
+		.def_property_readonly("eyes", [](const FaceAnalysis& a) {
+			return analysisField(a, arEyes, a.eyes); }, "EyesEstimation or None\n")
+		.def_property_readonly("quality", [](const FaceAnalysis& a) {
+			return analysisField(a, arQuality, a.quality); }, "SubjectiveQuality or None\n")
+		.def("__repr__",
+			[](const FaceAnalysis& a) {
+				return "FaceAnalysis: estimated = " + std::to_string(a.estimated);
+			})
+			;
+
+	py::class_<PyFaceAnalyzer>(f, "FaceAnalyzer",
+		"Runs several estimators on the same warps in one native call.\n"
+		"\tCreate with createFaceAnalyzer. Estimators are created on first request and reused, selected estimators\n"
+		"\trun concurrently on native threads of the analyzer. One analyzer must not be used from several threads at once.\n")
+
+		.def("analyze", [](
+			PyFaceAnalyzer& analyzer,
+			const py::object& warpsObject,
+			AnalyzerRequest request,
+			const py::object& landmarksObject,
+			bool asColumns) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::Landmarks5> landmarks;
+				if (!landmarksObject.is_none())
+					landmarks = landmarksObject.cast<std::vector<fsdk::Landmarks5>>();
+				if (request & arEyes) {
+					if (landmarksObject.is_none())
+						throw py::value_error("FaceAnalyzer.analyze: landmarks of warps are required for arEyes");
+					checkBatchSizes(warps.size(), landmarks.size(), "landmarks");
+				}
+				analyzer.prepare(request);
+				FSDKErrorResult err(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Ok));
+				std::vector<FaceAnalysis> analyses;
+				{
+					py::gil_scoped_release release;
+					std::tie(err, analyses) = analyzer.analyze(warps, landmarks, request);
+				}
+				if (!asColumns)
+					return std::make_tuple(err, py::cast(analyses));
+				if (err.isError)
+					return std::make_tuple(err, py::object(py::dict()));
+				return std::make_tuple(err, py::object(analysisColumns(analyses, request)));
+			},
+			py::arg("warps"),
+			py::arg("request") = arAll,
+			py::arg("landmarks") = py::none(),
+			py::arg("asColumns") = false,
+			"Run estimators selected by request on every warp.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps\n"
+			"\t\tparam2 (AnalyzerRequest): estimators to run, e.g. AnalyzerRequest(arEmotions | arGlasses)\n"
+			"\t\tparam3 (list): transformed Landmarks5 of warps got from warper, required for arEyes only\n"
+			"\t\tparam4 (bool): return a dict of numpy arrays with one row per warp instead of the list. Columns of\n"
+			"\t\t\trequested estimations are named <estimation>_<field>, e.g. emotions_anger, attributes_age_valid,\n"
+			"\t\t\tglasses. Fields are the same as in estimate_batch of the estimators.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with FSDKErrorResult and list of FaceAnalysis (dict of columns) in order of warps,\n"
+			"\t\t\tthe list (the dict) is empty if any estimator failed.\n")
+
+		.def("getCreatedEstimators", &PyFaceAnalyzer::getCreatedEstimators,
+			"Get AnalyzerRequest flags of estimators created so far.\n")
+			;
+
+	f.def("createFaceAnalyzer", [](
+		PyIFaceEngine& faceEngine,
+		fsdk::IAttributeEstimator::EstimationRequest attributeRequest,
+		size_t threadCount) {
+			return PyFaceAnalyzer(faceEngine, attributeRequest, threadCount);
+		},
+		py::arg("faceEngine"),
+		py::arg("attributeRequest") = static_cast<fsdk::IAttributeEstimator::EstimationRequest>(
+			static_cast<int>(fsdk::IAttributeEstimator::EstimationRequest::estimateAge) |
+			static_cast<int>(fsdk::IAttributeEstimator::EstimationRequest::estimateGender) |
+			static_cast<int>(fsdk::IAttributeEstimator::EstimationRequest::estimateEthnicity)),
+		py::arg("threadCount") = 0,
+		"Create face analyzer. Estimators are not created until they are requested.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (PyIFaceEngine): face engine\n"
+		"\t\tparam2 (AttributeRequest): attributes estimated for arAttributes\n"
+		"\t\tparam3 (int): number of threads running estimators, 0 - number of hardware threads\n"
+		"\tReturns:\n"
+		"\t\t(FaceAnalyzer): analyzer object\n");
+}
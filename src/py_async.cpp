@@ -0,0 +1,160 @@
+#include <pybind11/pybind11.h>
+#include <fsdk/FaceEngine.h>
+#include <pybind11/stl.h>
+#include "FaceEngineAdapter.hpp"
+#include "AsyncFaceEngine.hpp"
+
+namespace py = pybind11;
+
+void async_module(py::module& f) {
+
+	py::class_<PyAsyncDetector>(f, "AsyncDetector",
+		"Detector returning asyncio futures. Create with AsyncFaceEngine.createDetector.\n")
+		.def("detect_async", &PyAsyncDetector::detect,
+			py::arg("images"),
+			py::arg("rectangles"),
+			py::arg("detectionPerImageNum"),
+			py::arg("type"),
+			"Detect faces and landmarks on multiple images asynchronously.\n"
+			"\tRequests with the same arguments queued at the same time are detected with one SDK call.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list of images): input images list. Format must be R8G8B8\n"
+			"\t\tparam2 (list of rects): input rectangles of interest list.\n"
+			"\t\t\tSize of list must be the same with images list\n"
+			"\t\tparam3 (int): max number of detections per input image\n"
+			"\t\tparam4 (DetectionType): type of detection: dtBBox, dt5landmarks or dt68landmarks\n"
+			"\tReturns:\n"
+			"\t\t(asyncio.Future): future of tuple with FSDKErrorResult code and list of lists of Faces\n")
+			;
+
+	py::class_<PyAsyncExtractor>(f, "AsyncExtractor",
+		"Descriptor extractor returning asyncio futures. Create with AsyncFaceEngine.createExtractor.\n")
+		.def("extract_async", &PyAsyncExtractor::extract,
+			py::arg("warp"),
+			"Extract descriptor from warped image asynchronously.\n"
+			"\tWarps queued at the same time are extracted with one batch SDK call.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (Image): warped image\n"
+			"\tReturns:\n"
+			"\t\t(asyncio.Future): future of tuple with FSDKErrorResult, descriptor and garbage score\n")
+			;
+
+	py::class_<PyAsyncMatcher>(f, "AsyncMatcher",
+		"Descriptor matcher returning asyncio futures. Create with AsyncFaceEngine.createMatcher.\n")
+		.def("match_async",
+			(py::object (PyAsyncMatcher::*)(const fsdk::IDescriptorPtr&, const fsdk::IDescriptorPtr&))
+				&PyAsyncMatcher::match,
+			py::arg("first"),
+			py::arg("second"),
+			"Match descriptors 1:1 asynchronously.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): first descriptor\n"
+			"\t\tparam2 (IDescriptorPtr): second descriptor\n"
+			"\tReturns:\n"
+			"\t\t(asyncio.Future): future of tuple with FSDKErrorResult and MatchingResult\n")
+		.def("match_async",
+			(py::object (PyAsyncMatcher::*)(const fsdk::IDescriptorPtr&, const fsdk::IDescriptorBatchPtr&))
+				&PyAsyncMatcher::match,
+			py::arg("reference"),
+			py::arg("candidates"),
+			"Match descriptor with batch 1:M asynchronously.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): reference descriptor\n"
+			"\t\tparam2 (IDescriptorBatchPtr): candidate descriptors\n"
+			"\tReturns:\n"
+			"\t\t(asyncio.Future): future of tuple with FSDKErrorResult and list of MatchingResult\n")
+			;
+
+	py::class_<PyAsyncIndex>(f, "AsyncIndex",
+		"Index returning asyncio futures. Create with AsyncFaceEngine.wrapIndex.\n")
+		.def("search_async", &PyAsyncIndex::search,
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			"Search for descriptors with the shorter distance to passed descriptor asynchronously.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): reference descriptor\n"
+			"\t\tparam2 (int): max number of results\n"
+			"\tReturns:\n"
+			"\t\t(asyncio.Future): future of tuple with FSDKErrorResult and list of SearchResult\n")
+			;
+
+	py::class_<PyAsyncFaceEngine>(f, "AsyncFaceEngine",
+		"Face engine facade with asyncio API. Create with createAsyncFaceEngine.\n"
+		"\tRequests are executed by a pool of native threads and complete futures of the event loop\n"
+		"\tthey were submitted from. The request queue is bounded: submitting to a full queue raises RuntimeError.\n")
+		.def("createDetector", &PyAsyncFaceEngine::createDetector,
+			py::arg("type") = fsdk::FACE_DET_DEFAULT,
+			"Create async detector.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (ObjectDetectorClassType): detector type\n"
+			"\tReturns:\n"
+			"\t\t(AsyncDetector): async detector object\n")
+		.def("createExtractor", &PyAsyncFaceEngine::createExtractor,
+			py::arg("version") = 0,
+			"Create async descriptor extractor.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (int): descriptor version. If 0 - use default version from config\n"
+			"\tReturns:\n"
+			"\t\t(AsyncExtractor): async extractor object\n")
+		.def("createMatcher", &PyAsyncFaceEngine::createMatcher,
+			py::arg("version") = 0,
+			"Create async descriptor matcher.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (int): descriptor version. If 0 - use default version from config\n"
+			"\tReturns:\n"
+			"\t\t(AsyncMatcher): async matcher object\n")
+		.def("wrapIndex", (PyAsyncIndex (PyAsyncFaceEngine::*)(const fsdk::IDynamicIndexPtr&))
+				&PyAsyncFaceEngine::wrapIndex,
+			py::arg("index"),
+			"Wrap dynamic index for async search. The index must not be modified while searches are queued or executed.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDynamicIndexPtr): index\n"
+			"\tReturns:\n"
+			"\t\t(AsyncIndex): async index object\n")
+		.def("wrapIndex", (PyAsyncIndex (PyAsyncFaceEngine::*)(const fsdk::IDenseIndexPtr&))
+				&PyAsyncFaceEngine::wrapIndex,
+			py::arg("index"),
+			"Wrap dense index for async search.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDenseIndexPtr): index\n"
+			"\tReturns:\n"
+			"\t\t(AsyncIndex): async index object\n")
+		.def("wrapIndex", (PyAsyncIndex (PyAsyncFaceEngine::*)(const fsdk::IIndexPtr&))
+				&PyAsyncFaceEngine::wrapIndex,
+			py::arg("index"),
+			"Wrap index for async search.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IIndexPtr): index\n"
+			"\tReturns:\n"
+			"\t\t(AsyncIndex): async index object\n")
+		.def("close", &PyAsyncFaceEngine::close,
+			"Stop worker threads. Requests being executed are completed, queued requests are cancelled.\n")
+		.def("getQueueSize", &PyAsyncFaceEngine::getQueueSize,
+			"Get number of queued requests.\n")
+		.def("getMaxQueueSize", &PyAsyncFaceEngine::getMaxQueueSize,
+			"Get max number of queued requests.\n")
+		.def("getMaxBatchSize", &PyAsyncFaceEngine::getMaxBatchSize,
+			"Get max number of requests coalesced into one SDK call.\n")
+			;
+
+	f.def("createAsyncFaceEngine", [](
+		PyIFaceEngine& faceEngine,
+		size_t threadCount,
+		size_t maxQueueSize,
+		size_t maxBatchSize) {
+			return std::unique_ptr<PyAsyncFaceEngine>(
+				new PyAsyncFaceEngine(faceEngine, threadCount, maxQueueSize, maxBatchSize));
+		},
+		py::arg("faceEngine"),
+		py::arg("threadCount") = 0,
+		py::arg("maxQueueSize") = 1024,
+		py::arg("maxBatchSize") = 16,
+		"Create face engine facade with asyncio API.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (PyIFaceEngine): face engine\n"
+		"\t\tparam2 (int): number of worker threads. If 0 - number of hardware threads\n"
+		"\t\tparam3 (int): max number of queued requests\n"
+		"\t\tparam4 (int): max number of requests coalesced into one SDK call\n"
+		"\tReturns:\n"
+		"\t\t(AsyncFaceEngine): async face engine object\n");
+}
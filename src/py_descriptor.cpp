@@ -3,11 +3,50 @@
 #include <pybind11/stl.h>
 #include <pybind11/stl_bind.h>
 #include <pybind11/numpy.h>
+#include <memory>
 #include "ErrorsAdapter.hpp"
 #include "helpers.hpp"
+#include "FaceEngineAdapter.hpp"
+#include "TopK.hpp"
 
 namespace py = pybind11;
 
+// results of a 1:M match kept in the buffer of a thread between calls, bigger buffers are freed after the call
+static const size_t maxKeptMatchingResults = 1 << 16;
+
+// Matching result of a candidate ordered by distance, ties are resolved by index
+struct IndexedMatch {
+	fsdk::MatchingResult result;
+	uint32_t index;
+
+	bool operator<(const IndexedMatch& other) const {
+		return result.distance < other.result.distance ||
+			(result.distance == other.result.distance && index < other.index);
+	}
+};
+
+// Matches reference with all candidates by one call of the matcher and calls visit(match) for every candidate
+// in order. Results are written to a buffer of the calling thread reused by later calls, so only callers
+// keeping some of the results do not allocate per call.
+template<typename F>
+fsdk::Result<fsdk::FSDKError> matchEach(
+	const fsdk::IDescriptorMatcherPtr& matcher,
+	const fsdk::IDescriptorPtr& reference,
+	const fsdk::IDescriptorBatchPtr& candidates,
+	F visit) {
+	static thread_local std::vector<fsdk::MatchingResult> results;
+	const uint32_t count = candidates->getCount();
+	results.resize(count);
+	fsdk::Result<fsdk::FSDKError> err = matcher->match(reference, candidates, results.data());
+	if (err.isOk()) {
+		for (uint32_t i = 0; i < count; ++i)
+			visit(IndexedMatch{results[i], i});
+	}
+	if (results.capacity() > maxKeptMatchingResults)
+		std::vector<fsdk::MatchingResult>().swap(results);
+	return err;
+}
+
 void descriptor_module(py::module& f) {
 
 py::enum_<fsdk::ISerializableObject::Flags>(f, "Save", py::arithmetic(), "Serialization flags.\n")
@@ -220,6 +259,79 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 		"\tReturns:\n"
 		"\t\t(tuple): One of the error codes specified by DescriptorBatchError and valid descriptor object if succeeded.\n")
 	
+	.def("toNumpy",[]( const fsdk::IDescriptorBatchPtr& descriptorBatchPtr) {
+			const uint32_t count = descriptorBatchPtr->getCount();
+			const uint32_t size = count > 0 ? descriptorBatchPtr->getDescriptorSize() : 0;
+			py::array_t<uint8_t> matrix(std::vector<py::ssize_t>{count, size});
+			uint8_t* data = matrix.mutable_data();
+			bool isOk = true;
+			{
+				py::gil_scoped_release release;
+				for (uint32_t i = 0; i < count && isOk; ++i) {
+					fsdk::IDescriptorPtr descriptor = fsdk::acquire(descriptorBatchPtr->getDescriptorFast(i));
+					isOk = descriptor && descriptor->getDescriptor(data + size_t(i) * size);
+				}
+			}
+			if (!isOk)
+				return std::make_tuple(DescriptorBatchResult(
+					fsdk::makeResult(fsdk::IDescriptorBatch::Error::Internal)), py::array_t<uint8_t>());
+			return std::make_tuple(DescriptorBatchResult(
+				fsdk::makeResult(fsdk::IDescriptorBatch::Error::Ok)), matrix);
+		},
+		"Copy all descriptors of batch to numpy matrix.\n"
+		"\tDescriptors are copied once directly into matrix memory without python objects per row.\n"
+		"\tReturns:\n"
+		"\t\t(tuple): One of the error codes specified by DescriptorBatchError and uint8 matrix\n"
+		"\t\t\tof shape (count, descriptor size) if succeeded.\n")
+	
+	.def_static("fromNumpy",[](
+		PyIFaceEngine& faceEngine,
+		const py::array& matrix,
+		uint32_t version) {
+			const fsdk::IDescriptorBatchPtr empty;
+			if (!py::isinstance<py::array_t<uint8_t>>(matrix) || matrix.ndim() != 2 || matrix.shape(0) == 0)
+				return std::make_tuple(DescriptorBatchResult(
+					fsdk::makeResult(fsdk::IDescriptorBatch::Error::InvalidInput)), empty);
+			
+			// descriptor of the required version is created once and used to validate row size
+			// and to pass rows of matrix to batch
+			fsdk::IDescriptorPtr descriptor = faceEngine.createDescriptor(version);
+			const uint32_t size = descriptor->getDescriptorLength();
+			if (matrix.shape(1) != size)
+				return std::make_tuple(DescriptorBatchResult(
+					fsdk::makeResult(fsdk::IDescriptorBatch::Error::InvalidInput)), empty);
+			
+			const uint32_t count = static_cast<uint32_t>(matrix.shape(0));
+			fsdk::IDescriptorBatchPtr batch = faceEngine.createDescriptorBatch(count, descriptor->getModelVersion());
+			const auto rows = py::array_t<uint8_t, py::array::c_style>::ensure(matrix);
+			const char* data = reinterpret_cast<const char*>(rows.data());
+			
+			py::gil_scoped_release release;
+			for (uint32_t i = 0; i < count; ++i) {
+				Archive archive(data + size_t(i) * size, size);
+				if (descriptor->load(&archive, fsdk::ISerializableObject::NoSignature).isError())
+					return std::make_tuple(DescriptorBatchResult(
+						fsdk::makeResult(fsdk::IDescriptorBatch::Error::Internal)), empty);
+				fsdk::Result<fsdk::IDescriptorBatch::Error> error = batch->add(descriptor);
+				if (error.isError())
+					return std::make_tuple(DescriptorBatchResult(error), empty);
+			}
+			return std::make_tuple(DescriptorBatchResult(
+				fsdk::makeResult(fsdk::IDescriptorBatch::Error::Ok)), batch);
+		},
+		py::arg("faceEngine"),
+		py::arg("matrix"),
+		py::arg("version") = 0,
+		"Create descriptor batch from numpy matrix.\n"
+		"\tRows are descriptors data without signature, as returned by toNumpy or IDescriptorPtr.getData.\n"
+		"\tRow size is validated once against descriptor length of the model version.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (PyIFaceEngine): face engine used to create batch and descriptor\n"
+		"\t\tparam2 (numpy.ndarray): uint8 matrix of shape (count, descriptor size)\n"
+		"\t\tparam3 (int): descriptor version. If 0 - use default version from config\n"
+		"\tReturns:\n"
+		"\t\t(tuple): One of the error codes specified by DescriptorBatchError and descriptor batch if succeeded.\n")
+	
 	.def("clear",[]( const fsdk::IDescriptorBatchPtr& descriptorBatchPtr) {
 			return descriptorBatchPtr->clear(); },
 		"Clear object data.\n"
@@ -264,11 +376,13 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 		const fsdk::BaseDetection<float>& detection,
 		const fsdk::Landmarks5& landmarks,
 		const fsdk::IDescriptorPtr& descriptor) {
+				std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
 				fsdk::ResultValue<fsdk::FSDKError, float> err = extractor->extract(
 					image,
 					detection,
 					landmarks,
 					descriptor);
+				release.reset();
 				if (err.isOk())
 					return py::make_tuple(FSDKErrorResult(err), err.getValue());
 				else
@@ -292,7 +406,9 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 		const fsdk::IDescriptorExtractorPtr& extractor,
 		const fsdk::Image& image,
 		const fsdk::IDescriptorPtr& descriptor) {
+			std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
 			fsdk::ResultValue<fsdk::FSDKError, float> err = extractor->extractFromWarpedImage(image, descriptor);
+			release.reset();
 			if (err.isOk())
 				return py::make_tuple(FSDKErrorResult(err), err.getValue());
 			else
@@ -324,7 +440,7 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 				return std::make_tuple(FSDKErrorResult(err), err.getValue(), std::move(garbageScoreBatch));
 			else
 				return std::make_tuple(FSDKErrorResult(err), 0.f, std::vector<float>());
-		},
+		}, py::call_guard<py::gil_scoped_release>(),
 		"Extract batch of descriptors from a batch of images and perform aggregation.\n"
 		"\tThe input images should be warped; see IWarper.\n"
 		"\tArgs:\n"
@@ -353,7 +469,7 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 				return std::make_tuple(FSDKErrorResult(err), std::move(garbageScoreBatch));
 			else
 				return std::make_tuple(FSDKErrorResult(err), std::vector<float>());
-		},
+		}, py::call_guard<py::gil_scoped_release>(),
 		"Extract batch of descriptors from a batch of images.\n"
 		"\tThe input images should be warped; see IWarperPtr.\n"
 		"\tArgs:\n"
@@ -395,7 +511,9 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 		const fsdk::IDescriptorMatcherPtr& matcherPtr,
 		const fsdk::IDescriptorPtr& first,
 		const fsdk::IDescriptorPtr& second) {
+			std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
 			fsdk::ResultValue<fsdk::FSDKError, fsdk::MatchingResult> err = matcherPtr->match(first, second);
+			release.reset();
 			if (err.isOk())
 				return py::make_tuple(FSDKErrorResult(err), err.getValue());
 			else
@@ -418,7 +536,7 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 				return std::make_tuple(FSDKErrorResult(err), std::move(results));
 			else
 				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::MatchingResult>());
-		},
+		}, py::call_guard<py::gil_scoped_release>(),
 		"Match descriptors 1:M.\n"
 		"\tMatches a reference descriptor to a batch of candidate descriptors. "
 		"The results are layed out in the\n"
@@ -444,42 +562,33 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 						std::vector<fsdk::MatchingResult>(),
 						std::vector<uint32_t>());
 		
-			std::vector<fsdk::MatchingResult> results(candidates->getCount());
-			fsdk::Result<fsdk::FSDKError> err = matcherPtr->match(reference, candidates, results.data());
-			if(err.isError())
-				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::MatchingResult>(), std::vector<uint32_t>());
-			
-			if(k > 1 && k <= results.size()) {
-				std::vector<uint32_t> indices(results.size());
-				std::iota(indices.begin(), indices.end(), 0);
-				
-				std::partial_sort(indices.begin(), indices.begin() + k, indices.end(),
-					[&results](decltype(*begin(indices)) a, decltype(*begin(indices)) b) {
-						return results[a].distance < results[b].distance;
+			fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+			// bounded heap of the k nearest candidates
+			TopK<IndexedMatch> nearest(k);
+			{
+				py::gil_scoped_release release;
+				if (k <= candidates->getCount())
+					err = matchEach(matcherPtr, reference, candidates, [&nearest](const IndexedMatch& match) {
+						nearest.push(match);
 					});
-				indices.resize(k);
-				std::vector<fsdk::MatchingResult> resValues;
-				resValues.reserve(k);
-				for(const auto index: indices)
-					resValues.push_back(results[index]);
-				
-				return std::make_tuple(FSDKErrorResult(err), std::move(resValues), std::move(indices));
-				
-			} else if (k == 1) { // k == 1
-				const auto it = std::min_element(results.begin(), results.end(),
-					[](decltype(*begin(results)) a, decltype(*begin(results)) b) {
-						return a.distance < b.distance;
-					});
-				std::vector<fsdk::MatchingResult> resValues{*it};
-				std::vector<uint32_t> resIndex(1, std::distance(results.begin(), it));
-				return std::make_tuple(FSDKErrorResult(err), std::move(resValues), std::move(resIndex));
-			} else {
+			}
+			if(err.isError() || nearest.size() < k)
 				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::MatchingResult>(), std::vector<uint32_t>());
+			
+			std::vector<fsdk::MatchingResult> resValues;
+			std::vector<uint32_t> indices;
+			resValues.reserve(k);
+			indices.reserve(k);
+			for (const IndexedMatch& match : nearest.take()) {
+				resValues.push_back(match.result);
+				indices.push_back(match.index);
 			}
+			return std::make_tuple(FSDKErrorResult(err), std::move(resValues), std::move(indices));
 		},
 		"Match descriptors 1:M.\n"
 		"\tMatches a reference descriptor to a batch of candidate descriptors and returns one K nearest candidates. "
 		"\tNote: this function allows you to not copy match data from c++ to python if you need only best candidates.\n"
+		"\tResults of all candidates are kept in a native buffer reused by later calls of the thread.\n"
 		"\tArgs\n"
 		"\t\tparam1 (IDescriptorPtr): the reference descriptor\n"
 		"\t\tparam2 (IDescriptorPtr): the candidate descriptor batch to match with the reference\n"
@@ -488,6 +597,44 @@ py::class_<fsdk::IDescriptorBatchPtr>(f, "IDescriptorBatchPtr", "Descriptor batc
 		"\t\t(tuple): tuple with result with error code specified by FSDKError and\n"
 		"\t\t\ttwo lists (indices and matching results of K nearest neighbours)\n")
 		
+		.def("match_threshold",[](
+			const fsdk::IDescriptorMatcherPtr& matcherPtr,
+			const fsdk::IDescriptorPtr& reference,
+			const fsdk::IDescriptorBatchPtr& candidates,
+			const float threshold) {
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				std::vector<IndexedMatch> passed;
+				{
+					py::gil_scoped_release release;
+					err = matchEach(matcherPtr, reference, candidates, [&passed, threshold](const IndexedMatch& match) {
+						if (match.result.similarity >= threshold)
+							passed.push_back(match);
+					});
+					if (err.isOk())
+						std::sort(passed.begin(), passed.end());
+					else
+						passed.clear();
+				}
+				std::vector<fsdk::MatchingResult> resValues;
+				std::vector<uint32_t> indices;
+				resValues.reserve(passed.size());
+				indices.reserve(passed.size());
+				for (const IndexedMatch& match : passed) {
+					resValues.push_back(match.result);
+					indices.push_back(match.index);
+				}
+				return std::make_tuple(FSDKErrorResult(err), std::move(resValues), std::move(indices));
+			},
+			"Match descriptors 1:M and return candidates with similarity above the threshold.\n"
+			"\tOnly matching results of passed candidates are copied to python.\n"
+			"\tArgs\n"
+			"\t\tparam1 (IDescriptorPtr): the reference descriptor\n"
+			"\t\tparam2 (IDescriptorBatchPtr): the candidate descriptor batch to match with the reference\n"
+			"\t\tparam3 (float): minimal similarity of returned candidates\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with result with error code specified by FSDKError and\n"
+			"\t\t\ttwo lists (matching results and indices of passed candidates sorted by distance)\n")
+		
 		.def("getModelVersion",[](
 				const fsdk::IDescriptorMatcherPtr& matcherPtr) {
 				return matcherPtr->getModelVersion();
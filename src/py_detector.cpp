@@ -3,7 +3,10 @@
 #include <pybind11/stl.h>
 #include <pybind11/stl_bind.h>
 #include <pybind11/numpy.h>
+#include <memory>
+#include <limits>
 #include "ErrorsAdapter.hpp"
+#include "OwnedImage.hpp"
 
 namespace py = pybind11;
 
@@ -78,6 +81,61 @@ void set_detection_class(py::module& f)
 }
 
 
+// Detections of all images of the batch in order of images with index of the source image
+template<typename T>
+std::vector<std::pair<int32_t, const T*>> flattenResults(fsdk::IResultBatch<T>& batch) {
+	std::vector<std::pair<int32_t, const T*>> results;
+	for (size_t i = 0; i < batch.getSize(); ++i) {
+		fsdk::Span<T> row = batch.getResults(i);
+		for (size_t j = 0; j < row.size(); ++j)
+			results.emplace_back(static_cast<int32_t>(i), &row.data()[j]);
+	}
+	return results;
+}
+
+// Columns shared by face and human detections: image_index, bbox (x, y, width, height) and score
+template<typename T>
+py::dict detectionsToArrays(const std::vector<std::pair<int32_t, const T*>>& results) {
+	const py::ssize_t count = static_cast<py::ssize_t>(results.size());
+	py::array_t<int32_t> imageIndex(count);
+	py::array_t<float> bbox(std::vector<py::ssize_t>{count, 4});
+	py::array_t<float> score(count);
+	auto imageIndexData = imageIndex.mutable_unchecked<1>();
+	auto bboxData = bbox.mutable_unchecked<2>();
+	auto scoreData = score.mutable_unchecked<1>();
+	for (py::ssize_t i = 0; i < count; ++i) {
+		const auto& detection = results[i].second->detection;
+		imageIndexData(i) = results[i].first;
+		bboxData(i, 0) = static_cast<float>(detection.rect.x);
+		bboxData(i, 1) = static_cast<float>(detection.rect.y);
+		bboxData(i, 2) = static_cast<float>(detection.rect.width);
+		bboxData(i, 3) = static_cast<float>(detection.rect.height);
+		scoreData(i) = detection.score;
+	}
+	py::dict arrays;
+	arrays["image_index"] = imageIndex;
+	arrays["bbox"] = bbox;
+	arrays["score"] = score;
+	return arrays;
+}
+
+// (N, K, 2) array of landmarks coordinates, rows of detections without landmarks are filled with NaN
+template<typename Landmarks>
+py::array_t<float> landmarksToArray(const std::vector<const fsdk::Optional<Landmarks>*>& landmarks) {
+	const py::ssize_t count = static_cast<py::ssize_t>(landmarks.size());
+	const py::ssize_t pointCount = static_cast<py::ssize_t>(Landmarks::landmarkCount);
+	py::array_t<float> points(std::vector<py::ssize_t>{count, pointCount, 2});
+	auto pointsData = points.mutable_unchecked<3>();
+	for (py::ssize_t i = 0; i < count; ++i) {
+		const bool isValid = landmarks[i]->valid();
+		for (py::ssize_t j = 0; j < pointCount; ++j) {
+			pointsData(i, j, 0) = isValid ? landmarks[i]->value().landmarks[j].x : std::numeric_limits<float>::quiet_NaN();
+			pointsData(i, j, 1) = isValid ? landmarks[i]->value().landmarks[j].y : std::numeric_limits<float>::quiet_NaN();
+		}
+	}
+	return points;
+}
+
 void detector_module(py::module& f) {
 	
 	set_detection_class(f);
@@ -91,8 +149,17 @@ void detector_module(py::module& f) {
 			const fsdk::DetectionType type) {
 				fsdk::Span<const fsdk::Image> images(imagesVec);
 				fsdk::Span<const fsdk::Rect> rectangles(rectanglesVec);
+				// Python objects are built only after the GIL is taken back
+				std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
 				fsdk::ResultValue<fsdk::FSDKError, fsdk::Ref<fsdk::IResultBatch<fsdk::Face>>> err =
 				det->detect(images, rectangles, detectionPerImageNum, type);
+				if (err.isOk()) {
+					for (size_t i = 0; i < err.getValue()->getSize(); ++i) {
+						fsdk::Span<fsdk::Face> resultsSpan = err.getValue()->getResults(i);
+						ownFaceImages(resultsSpan.data(), resultsSpan.size());
+					}
+				}
+				release.reset();
 				if (err.isOk()) {
 					const size_t sizeBatch = err.getValue()->getSize();
 					py::list outList(sizeBatch);
@@ -122,6 +189,60 @@ void detector_module(py::module& f) {
 			"\t\t(tuple): \n"
 			"\t\t\ttuple with FSDKErrorResult code and list of lists of Faces\n")
 		
+		.def("detect_arrays", [](
+			const fsdk::IDetectorPtr& det,
+			const std::vector<fsdk::Image>& imagesVec,
+			const std::vector<fsdk::Rect>& rectanglesVec,
+			const int detectionPerImageNum,
+			const fsdk::DetectionType type) {
+				fsdk::Span<const fsdk::Image> images(imagesVec);
+				fsdk::Span<const fsdk::Rect> rectangles(rectanglesVec);
+				std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
+				fsdk::ResultValue<fsdk::FSDKError, fsdk::Ref<fsdk::IResultBatch<fsdk::Face>>> err =
+					det->detect(images, rectangles, detectionPerImageNum, type);
+				std::vector<std::pair<int32_t, const fsdk::Face*>> faces;
+				if (err.isOk())
+					faces = flattenResults(*err.getValue());
+				release.reset();
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				
+				py::dict arrays = detectionsToArrays(faces);
+				if (type & fsdk::dt5Landmarks) {
+					std::vector<const fsdk::Optional<fsdk::Landmarks5>*> landmarks;
+					landmarks.reserve(faces.size());
+					for (const auto& face : faces)
+						landmarks.push_back(&face.second->landmarks5);
+					arrays["landmarks5"] = landmarksToArray(landmarks);
+				}
+				if (type & fsdk::dt68Landmarks) {
+					std::vector<const fsdk::Optional<fsdk::Landmarks68>*> landmarks;
+					landmarks.reserve(faces.size());
+					for (const auto& face : faces)
+						landmarks.push_back(&face.second->landmarks68);
+					arrays["landmarks68"] = landmarksToArray(landmarks);
+				}
+				return std::make_tuple(FSDKErrorResult(err), arrays);
+			},
+			"Detect faces and landmarks on multiple images and return results as flat numpy arrays.\n"
+			"\tThe same as detect, but no python object is created per face, so results of big batches\n"
+			"\tcan be filtered by vectorized numpy operations.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list of images): input images list. Format must be R8G8B8\n"
+			"\t\tparam2 (list of rects): input rectangles of interest list.\n"
+			"\t\t\tSize of list must be the same with images list\n"
+			"\t\tparam3 (int): max number of detections per input image\n"
+			"\t\tparam4 (DetectionType): type of detection: dtBBox, dt5landmarks or dt68landmarks\n"
+			"\tReturns:\n"
+			"\t\t(tuple): \n"
+			"\t\t\ttuple with FSDKErrorResult code and dict of numpy arrays with one row per detection:\n"
+			"\t\t\t\timage_index (int32, N): index of the source image in images list\n"
+			"\t\t\t\tbbox (float32, N x 4): x, y, width, height of the detection rect\n"
+			"\t\t\t\tscore (float32, N): detection score\n"
+			"\t\t\t\tlandmarks5 (float32, N x 5 x 2): only if dt5Landmarks is requested\n"
+			"\t\t\t\tlandmarks68 (float32, N x 68 x 2): only if dt68Landmarks is requested\n"
+			"\t\t\tLandmarks are in the same coordinates as Face landmarks, missing landmarks are NaN.\n")
+		
 		.def("setDetectionComparer", [](
 			const fsdk::IDetectorPtr& det,
 			fsdk::DetectionComparerType comparerType) {
@@ -135,11 +256,14 @@ void detector_module(py::module& f) {
 			const fsdk::DetectionType type){
 			
 			fsdk::ResultValue<fsdk::FSDKError, fsdk::Face> err = det->detectOne(image, rect, type);
-			if (err.isOk())
-				return std::make_tuple(FSDKErrorResult(err), err.getValue());
+			if (err.isOk()) {
+				fsdk::Face face = err.getValue();
+				ownFaceImages(&face, 1);
+				return std::make_tuple(FSDKErrorResult(err), face);
+			}
 			else
 				return std::make_tuple(FSDKErrorResult(err), fsdk::Face());
-		},
+		}, py::call_guard<py::gil_scoped_release>(),
 			 "Light function to get just one best detection from single input image\n"
 				 "\tArgs:\n"
 				 "\t\tparam1 (Image): input image\n"
@@ -159,7 +283,7 @@ void detector_module(py::module& f) {
 				}
 				
 				return std::make_tuple(FSDKErrorResult(err), fsdk::Face());
-			}, py::arg("face"), py::arg("type"),
+			}, py::arg("face"), py::arg("type"), py::call_guard<py::gil_scoped_release>(),
 			"Redetect face.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (Face): face structure with detection and landmarks.\n"
@@ -174,10 +298,12 @@ void detector_module(py::module& f) {
 				const fsdk::DetectionType type) {
 					fsdk::ResultValue<fsdk::FSDKError, fsdk::Face> result = det->redetectOne(image, rect, type);
 					if (result.isOk()) {
-						return std::make_tuple(FSDKErrorResult(result), result.getValue());
+						fsdk::Face face = result.getValue();
+						ownFaceImages(&face, 1);
+						return std::make_tuple(FSDKErrorResult(result), face);
 					}
 					return std::make_tuple(FSDKErrorResult(result), fsdk::Face());
-				}, py::arg("image"), py::arg("detection"), py::arg("type"),
+				}, py::arg("image"), py::arg("detection"), py::arg("type"), py::call_guard<py::gil_scoped_release>(),
 			"Redetect face.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (image): input image. Format must be R8G8B8.\n"
@@ -193,10 +319,12 @@ void detector_module(py::module& f) {
 				const fsdk::DetectionType type) {
 					fsdk::ResultValue<fsdk::FSDKError, fsdk::Face> result = det->redetectOne(image, rect, type);
 					if (result.isOk()) {
-						return std::make_tuple(FSDKErrorResult(result), result.getValue());
+						fsdk::Face face = result.getValue();
+						ownFaceImages(&face, 1);
+						return std::make_tuple(FSDKErrorResult(result), face);
 					}
 					return std::make_tuple(FSDKErrorResult(result), fsdk::Face());
-				}, py::arg("image"), py::arg("detection"), py::arg("type"),
+				}, py::arg("image"), py::arg("detection"), py::arg("type"), py::call_guard<py::gil_scoped_release>(),
 			"Redetect face.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (image): input image. Format must be R8G8B8.\n"
@@ -216,7 +344,7 @@ void detector_module(py::module& f) {
 					return std::make_tuple(FSDKErrorResult(err),
 						std::vector<fsdk::Face>(facesSpan.begin(), facesSpan.end()),
 						std::vector<FSDKErrorResult>(errorsSpan.begin(), errorsSpan.end()));
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Batched redetect faces.\n"
 			"\tArgs:\n"
 			"\t\tparam1 ([Face]): detections list.\n"
@@ -232,7 +360,7 @@ void detector_module(py::module& f) {
 					return std::make_tuple(FSDKErrorResult(result), result.getValue());
 				else
 					return std::make_tuple(FSDKErrorResult(result), fsdk::OrientationType());
-			}, py::arg("image"),
+			}, py::arg("image"), py::call_guard<py::gil_scoped_release>(),
 			"estimate orientation of all image (Normal, Left, Right, UpSideSown).\n"
 			"\tArgs:\n"
 			"\t\tparam1 (image): input image\n"
@@ -249,12 +377,14 @@ void detector_module(py::module& f) {
 				fsdk::HumanDetectionType type = fsdk::HumanDetectionType::DCT_BOX) {
 					fsdk::Span<const fsdk::Image> images(imagesVec);
 					fsdk::Span<const fsdk::Rect> rectangles(rectanglesVec);
+					std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
 					fsdk::ResultValue<fsdk::FSDKError, fsdk::Ref<fsdk::IResultBatch<fsdk::Human>>> err =
 						det->detect(
 							images,
 							rectangles,
 							detectionPerImageNum,
 							type);
+					release.reset();
 					if (err.isOk()) {
 						const size_t sizeBatch = err.getValue()->getSize();
 						py::list outList(sizeBatch);
@@ -283,6 +413,61 @@ void detector_module(py::module& f) {
 				"\t\t(tuple): \n"
 				"\t\t\ttuple with FSDKErrorResult code and list of lists of Detections\n")
 
+		.def("detect_arrays", [](
+				const fsdk::Ref<fsdk::IHumanDetector>& det,
+				const std::vector<fsdk::Image>& imagesVec,
+				const std::vector<fsdk::Rect>& rectanglesVec,
+				const uint32_t detectionPerImageNum,
+				fsdk::HumanDetectionType type) {
+					fsdk::Span<const fsdk::Image> images(imagesVec);
+					fsdk::Span<const fsdk::Rect> rectangles(rectanglesVec);
+					std::unique_ptr<py::gil_scoped_release> release(new py::gil_scoped_release);
+					fsdk::ResultValue<fsdk::FSDKError, fsdk::Ref<fsdk::IResultBatch<fsdk::Human>>> err =
+						det->detect(images, rectangles, detectionPerImageNum, type);
+					std::vector<std::pair<int32_t, const fsdk::Human*>> humans;
+					if (err.isOk())
+						humans = flattenResults(*err.getValue());
+					release.reset();
+					if (err.isError())
+						return std::make_tuple(FSDKErrorResult(err), py::dict());
+					
+					py::dict arrays = detectionsToArrays(humans);
+					if (type & fsdk::DCT_POINTS) {
+						const py::ssize_t count = static_cast<py::ssize_t>(humans.size());
+						const py::ssize_t pointCount = static_cast<py::ssize_t>(fsdk::HumanLandmarks17().landmarksCount);
+						py::array_t<float> points(std::vector<py::ssize_t>{count, pointCount, 2});
+						py::array_t<float> scores(std::vector<py::ssize_t>{count, pointCount});
+						auto pointsData = points.mutable_unchecked<3>();
+						auto scoresData = scores.mutable_unchecked<2>();
+						const float nan = std::numeric_limits<float>::quiet_NaN();
+						for (py::ssize_t i = 0; i < count; ++i) {
+							const auto& landmarks = humans[i].second->landmarks17;
+							for (py::ssize_t j = 0; j < pointCount; ++j) {
+								pointsData(i, j, 0) = landmarks.valid() ? landmarks.value().landmarks[j].point.x : nan;
+								pointsData(i, j, 1) = landmarks.valid() ? landmarks.value().landmarks[j].point.y : nan;
+								scoresData(i, j) = landmarks.valid() ? landmarks.value().landmarks[j].score : nan;
+							}
+						}
+						arrays["landmarks17"] = points;
+						arrays["landmarks17_score"] = scores;
+					}
+					return std::make_tuple(FSDKErrorResult(err), arrays);
+			}, py::arg("images"), py::arg("rectangles"), py::arg("detectionPerImageNum"),
+				py::arg("type") = fsdk::HumanDetectionType::DCT_BOX,
+			"Detects humans and returns results as flat numpy arrays.\n"
+				"\tArgs:\n"
+				"\t\tparam1 (list of images): input images list. Format must be R8G8B8\n"
+				"\t\tparam2 (list of rects): input rectangles of interest list.\n"
+				"\t\t\tSize of list must be the same with images list\n"
+				"\t\tparam3 (int): max number of detections per input image\n"
+				"\t\tparam4 (HumanDetectionType) Human detection type enumeration \n"
+				"\tReturns:\n"
+				"\t\t(tuple): \n"
+				"\t\t\ttuple with FSDKErrorResult code and dict of numpy arrays with one row per detection:\n"
+				"\t\t\t\timage_index (int32, N), bbox (float32, N x 4), score (float32, N),\n"
+				"\t\t\t\tlandmarks17 (float32, N x 17 x 2) and landmarks17_score (float32, N x 17)\n"
+				"\t\t\t\tonly if DCT_POINTS is requested, missing keypoints are NaN.\n")
+
 		.def("redetectOne", [](
 				const fsdk::Ref<fsdk::IHumanDetector>& det,
 				const fsdk::Human& human) {
@@ -290,7 +475,7 @@ void detector_module(py::module& f) {
 					fsdk::ResultValue<fsdk::FSDKError, bool> resValue = 
 						det->redetectOne(inOutHuman);
 					return std::make_tuple(FSDKErrorValueBool(resValue), inOutHuman);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Redetects one human based on the previous detection on the new image\n"
 			"\tArgs:\n"
 			"\t\tparam1 (Human): human structure with detection and image\n"
@@ -7,6 +7,8 @@
 #include "FaceEngineAdapter.hpp"
 #include "SettingsProviderAdapter.hpp"
 #include "helpers.hpp"
+#include "EstimatorBatch.hpp"
+#include "EstimationColumns.hpp"
 
 namespace py = pybind11;
 
@@ -23,7 +25,7 @@ void estimators_module(py::module& f) {
 				fsdk::Quality out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Predict quality of an image. Upon success returns fsdk::Quality output structure with quality params and error code "
 			"(see FSDKErrorResult for details). \n"
 			"\tArgs:\n"
@@ -37,7 +39,7 @@ void estimators_module(py::module& f) {
 				fsdk::SubjectiveQuality out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Predict subjective quality of an image. Upon success returns fsdk::SubjectiveQuality output structure with quality params and error code "
 			"(see FSDKErrorResult for details). \n"
 			"\tArgs:\n"
@@ -51,8 +53,61 @@ void estimators_module(py::module& f) {
 				fsdk::SubjectiveQuality out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Alias for estimate_subjective_quality function call. Kept for backward compatibility with older SDK versions\n")
+
+		.def("estimate_quality_batch",[](
+			const fsdk::IQualityEstimatorPtr& est,
+			const py::object& warpsObject,
+			uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::Quality> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return est->estimate(warps[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("threadCount") = 1,
+			"Predict quality of a batch of warps item by item.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tlight, dark, gray, blur (float32, N). On error the dict is empty.\n")
+
+		.def("estimate_subjective_quality_batch",[](
+			const fsdk::IQualityEstimatorPtr& est,
+			const py::object& warpsObject,
+			uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::SubjectiveQuality> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return est->estimate(warps[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("threadCount") = 1,
+			"Predict subjective quality of a batch of warps item by item.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tblur, light, darkness, illumination, specularity (float32, N),\n"
+			"\t\t\tisBlurred, isHighlighted, isDark, isIlluminated, isNotSpecular (bool, N). On error the dict is empty.\n")
 		;
 	
 	py::class_<fsdk::IAttributeEstimatorPtr>(f, "IAttributeEstimatorPtr",
@@ -68,7 +123,7 @@ void estimators_module(py::module& f) {
 			const fsdk::IAttributeEstimator::EstimationRequest request) {
 				fsdk::IAttributeEstimator::EstimationResult result;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, request, result);
-				return std::make_tuple(FSDKErrorResult(err), result); },
+				return std::make_tuple(FSDKErrorResult(err), result); }, py::call_guard<py::gil_scoped_release>(),
 			"Estimate the attributes for image.\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
@@ -80,29 +135,44 @@ void estimators_module(py::module& f) {
 		.def("estimate", [](
 				const fsdk::IAttributeEstimatorPtr& est,
 				const std::vector<fsdk::Image>& warps,
-				const fsdk::IAttributeEstimator::EstimationRequest request) {
+				const fsdk::IAttributeEstimator::EstimationRequest request,
+				bool asColumns) {
 					std::vector<fsdk::AttributeEstimationResult> results(warps.size());
 					fsdk::Span<fsdk::AttributeEstimationResult> resultSpan(results.data(), warps.size());
-					fsdk::ResultValue<fsdk::FSDKError, fsdk::AttributeEstimationResult>  err = est->estimate(
-						fsdk::Span<const fsdk::Image>(warps.data(), warps.size()),
-						request,
-						resultSpan);
+					fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+					fsdk::AttributeEstimationResult aggregation;
+					{
+						py::gil_scoped_release release;
+						fsdk::ResultValue<fsdk::FSDKError, fsdk::AttributeEstimationResult> estimation = est->estimate(
+							fsdk::Span<const fsdk::Image>(warps.data(), warps.size()),
+							request,
+							resultSpan);
+						if (estimation.isOk())
+							aggregation = estimation.getValue();
+						err = estimation;
+					}
 					if (err.isOk())
 						return std::make_tuple(FSDKErrorResult(err),
-							std::vector<fsdk::AttributeEstimationResult>(resultSpan.begin(), resultSpan.end()),
-							err.getValue());
+							resultsToObject(results, true, asColumns),
+							aggregation);
 					else
 						return std::make_tuple(FSDKErrorResult(err),
-							std::vector<fsdk::AttributeEstimationResult>(),
+							resultsToObject(std::vector<fsdk::AttributeEstimationResult>(), false, asColumns),
 							fsdk::AttributeEstimationResult()); },
+			py::arg("warps"), py::arg("request"), py::arg("asColumns") = false,
 			"Estimate the attributes for batch image.\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
 			"\t\tparam1 (list of Images): list of warped Images. Format must be R8G8B8\n"
 			"\t\tparam2 (AttributeRequest): request with flags to check parameters to estimate\n"
+			"\t\tparam3 (bool): return a dict of numpy arrays with one row per warp instead of the list:\n"
+			"\t\t\tage, gender, genderScore, africanAmerican, indian, asian, caucasian (float32, N),\n"
+			"\t\t\tethnicity (int32, N): predominant Ethnicity value,\n"
+			"\t\t\tage_valid, gender_valid, genderScore_valid, ethnicity_valid (bool, N): validity masks, values of\n"
+			"\t\t\tnot estimated attributes are NaN (-1 for ethnicity). On error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): \n"
-			"\t\t\t tuple with FSDKErrorResult code, attribute result and aggregation of results (see AttributeResult)\n")
+			"\t\t\t tuple with FSDKErrorResult code, attribute results and aggregation of results (see AttributeResult)\n")
 			;
 
 	py::enum_<fsdk::IAttributeEstimator::EstimationRequest>(f, "AttributeRequest", py::arithmetic(),
@@ -140,7 +210,7 @@ void estimators_module(py::module& f) {
 				const fsdk::Image& warp) {
 				fsdk::MedicalMaskEstimation estimation{};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, estimation);
-				return std::make_tuple(FSDKErrorResult(err), estimation); },
+				return std::make_tuple(FSDKErrorResult(err), estimation); }, py::call_guard<py::gil_scoped_release>(),
 			"Estimate Medical Mask probabilities..\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
@@ -154,7 +224,7 @@ void estimators_module(py::module& f) {
 				const fsdk::Image& warp) {
 				fsdk::MedicalMaskEstimationExtended estimation{};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, estimation);
-				return std::make_tuple(FSDKErrorResult(err), estimation); },
+				return std::make_tuple(FSDKErrorResult(err), estimation); }, py::call_guard<py::gil_scoped_release>(),
 			"Estimate Medical Mask probabilities..\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
@@ -169,7 +239,7 @@ void estimators_module(py::module& f) {
 				const fsdk::BaseDetection<float>& detection) {
 				fsdk::MedicalMaskEstimation estimation{};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(image, detection, estimation);
-				return std::make_tuple(FSDKErrorResult(err), estimation); },
+				return std::make_tuple(FSDKErrorResult(err), estimation); }, py::call_guard<py::gil_scoped_release>(),
 			"Estimate Medical Mask probabilities..\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
@@ -185,7 +255,7 @@ void estimators_module(py::module& f) {
 				const fsdk::BaseDetection<float>& detection) {
 				fsdk::MedicalMaskEstimationExtended estimation{};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(image, detection, estimation);
-				return std::make_tuple(FSDKErrorResult(err), estimation); },
+				return std::make_tuple(FSDKErrorResult(err), estimation); }, py::call_guard<py::gil_scoped_release>(),
 			"Estimate Medical Mask probabilities..\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
@@ -197,38 +267,54 @@ void estimators_module(py::module& f) {
 
 		.def("estimate", [](
 				const fsdk::IMedicalMaskEstimatorPtr& est,
-				const std::vector<fsdk::Image>& warps) {
+				const std::vector<fsdk::Image>& warps,
+				bool asColumns) {
 				std::vector<fsdk::MedicalMaskEstimation> estimations(warps.size());
-				fsdk::Result<fsdk::FSDKError>  err = est->estimate(warps, fsdk::Span<fsdk::MedicalMaskEstimation>(&estimations[0], estimations.size()));
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(warps, fsdk::Span<fsdk::MedicalMaskEstimation>(estimations.data(), estimations.size()));
+				}
 				if (err.isOk())
-					return std::make_tuple(FSDKErrorResult(err), estimations);
+					return std::make_tuple(FSDKErrorResult(err), resultsToObject(estimations, true, asColumns));
 				else
 					return std::make_tuple(FSDKErrorResult(err),
-						std::vector<fsdk::MedicalMaskEstimation>()); },
+						resultsToObject(std::vector<fsdk::MedicalMaskEstimation>(), false, asColumns)); },
+			py::arg("warps"), py::arg("asColumns") = false,
 			"Estimate Medical Mask probabilities.\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
 			"\t\tparam1 (list of Images): list of warped images, format of images must be R8G8B8. Must be warped!\n"
-			"\t\tparam2 (estimations): request with flags to check parameters to estimate\n"
+			"\t\tparam2 (bool): return a dict of numpy arrays with one row per item instead of the list:\n"
+			"\t\t\tresult (int32, N): MedicalMask value, maskScore, noMaskScore, occludedFaceScore (float32, N).\n"
+			"\t\t\tOn error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): \n"
 			"\t\t\t tuple with FSDKErrorResult code and list of MedicalMaskEstimation estimations\n")
 
 		.def("estimate", [](
 				const fsdk::IMedicalMaskEstimatorPtr& est,
-				const std::vector<fsdk::Image>& warps) {
+				const std::vector<fsdk::Image>& warps,
+				bool asColumns) {
 				std::vector<fsdk::MedicalMaskEstimationExtended> estimations(warps.size());
-				fsdk::Result<fsdk::FSDKError>  err = est->estimate(warps, fsdk::Span<fsdk::MedicalMaskEstimationExtended>(&estimations[0], estimations.size()));
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(warps, fsdk::Span<fsdk::MedicalMaskEstimationExtended>(estimations.data(), estimations.size()));
+				}
 				if (err.isOk())
-					return std::make_tuple(FSDKErrorResult(err), estimations);
+					return std::make_tuple(FSDKErrorResult(err), resultsToObject(estimations, true, asColumns));
 				else
 					return std::make_tuple(FSDKErrorResult(err),
-						std::vector<fsdk::MedicalMaskEstimationExtended>()); },
+						resultsToObject(std::vector<fsdk::MedicalMaskEstimationExtended>(), false, asColumns)); },
+			py::arg("warps"), py::arg("asColumns") = false,
 			"Estimate Medical Mask probabilities.\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
 			"\t\tparam1 (list of Images): list of warped images, format of images must be R8G8B8. Must be warped!\n"
-			"\t\tparam2 (estimations): request with flags to check parameters to estimate\n"
+			"\t\tparam2 (bool): return a dict of numpy arrays with one row per item instead of the list:\n"
+			"\t\t\tresult (int32, N): MedicalMaskExtended value, maskScore, noMaskScore, maskNotInPlace, occludedFaceScore (float32, N).\n"
+			"\t\t\tOn error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): \n"
 			"\t\t\t tuple with FSDKErrorResult code and list of MedicalMaskEstimationExtended estimations\n")
@@ -236,23 +322,32 @@ void estimators_module(py::module& f) {
 		.def("estimate", [](
 				const fsdk::IMedicalMaskEstimatorPtr& est,
 				const std::vector<fsdk::Image>& images,
-				const std::vector<fsdk::BaseDetection<float>> detections) {
+				const std::vector<fsdk::BaseDetection<float>> detections,
+				bool asColumns) {
 				std::vector<fsdk::BaseDetection<int>> detectionsInt(detections.size());
 				for (uint32_t i = 0; i < detections.size(); ++i) {
 					detectionsInt[i] = fsdk::Detection(detections[i]);
 				}
 				std::vector<fsdk::MedicalMaskEstimation> estimations(images.size());
-				fsdk::Result<fsdk::FSDKError>  err = est->estimate(images, detectionsInt, fsdk::Span<fsdk::MedicalMaskEstimation>(&estimations[0], estimations.size()));
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(images, detectionsInt, fsdk::Span<fsdk::MedicalMaskEstimation>(estimations.data(), estimations.size()));
+				}
 				if (err.isOk())
-					return std::make_tuple(FSDKErrorResult(err), estimations);
+					return std::make_tuple(FSDKErrorResult(err), resultsToObject(estimations, true, asColumns));
 				else
 					return std::make_tuple(FSDKErrorResult(err),
-						std::vector<fsdk::MedicalMaskEstimation>()); },
+						resultsToObject(std::vector<fsdk::MedicalMaskEstimation>(), false, asColumns)); },
+			py::arg("images"), py::arg("detections"), py::arg("asColumns") = false,
 			"Estimate Medical Mask probabilities.\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
 			"\t\tparam1 (list of Images): list of Images. Format must be R8G8B8\n"
 			"\t\tparam1 (list of Detections): list of face detections.\n"
+			"\t\tparam3 (bool): return a dict of numpy arrays with one row per item instead of the list:\n"
+			"\t\t\tresult (int32, N): MedicalMask value, maskScore, noMaskScore, occludedFaceScore (float32, N).\n"
+			"\t\t\tOn error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): \n"
 			"\t\t\t tuple with FSDKErrorResult code and list of MedicalMaskEstimation estimations\n")
@@ -260,23 +355,32 @@ void estimators_module(py::module& f) {
 		.def("estimate", [](
 				const fsdk::IMedicalMaskEstimatorPtr& est,
 				const std::vector<fsdk::Image>& images,
-				const std::vector<fsdk::BaseDetection<float>> detections) {
+				const std::vector<fsdk::BaseDetection<float>> detections,
+				bool asColumns) {
 				std::vector<fsdk::BaseDetection<int>> detectionsInt(detections.size());
 				for (uint32_t i = 0; i < detections.size(); ++i) {
 					detectionsInt[i] = fsdk::Detection(detections[i]);
 				}
 				std::vector<fsdk::MedicalMaskEstimationExtended> estimations(images.size());
-				fsdk::Result<fsdk::FSDKError>  err = est->estimate(images, detectionsInt, fsdk::Span<fsdk::MedicalMaskEstimationExtended>(&estimations[0], estimations.size()));
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(images, detectionsInt, fsdk::Span<fsdk::MedicalMaskEstimationExtended>(estimations.data(), estimations.size()));
+				}
 				if (err.isOk())
-					return std::make_tuple(FSDKErrorResult(err), estimations);
+					return std::make_tuple(FSDKErrorResult(err), resultsToObject(estimations, true, asColumns));
 				else
 					return std::make_tuple(FSDKErrorResult(err),
-						std::vector<fsdk::MedicalMaskEstimationExtended>()); },
+						resultsToObject(std::vector<fsdk::MedicalMaskEstimationExtended>(), false, asColumns)); },
+			py::arg("images"), py::arg("detections"), py::arg("asColumns") = false,
 			"Estimate Medical Mask probabilities.\n"
 			"\t\t(see FSDKErrorResult for details)\n"
 			"\tArgs:\n"
 			"\t\tparam1 (list of Images): list of Images. Format must be R8G8B8\n"
 			"\t\tparam1 (list of Detections): list of face detections.\n"
+			"\t\tparam3 (bool): return a dict of numpy arrays with one row per item instead of the list:\n"
+			"\t\t\tresult (int32, N): MedicalMaskExtended value, maskScore, noMaskScore, maskNotInPlace, occludedFaceScore (float32, N).\n"
+			"\t\t\tOn error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): \n"
 			"\t\t\t tuple with FSDKErrorResult code and list of MedicalMaskEstimationExtended estimations\n")
@@ -309,13 +413,41 @@ void estimators_module(py::module& f) {
 				fsdk::HeadPoseEstimation out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(image, detection, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Estimate the angles.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): image source image. Format must be R8G8B8.\n"
 			"\t\tparam2 (Detection): detection.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): tuple with error code FSDKErrorResult and output EthnicityEstimation\n")
+
+		.def("estimate_batch",[](
+			const fsdk::IHeadPoseEstimatorPtr& est,
+			const std::vector<fsdk::Image>& images,
+			const std::vector<fsdk::BaseDetection<float>>& detections,
+			uint32_t threadCount) {
+				checkBatchSizes(images.size(), detections.size(), "detections");
+				std::vector<fsdk::HeadPoseEstimation> out(images.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(images.size(), threadCount, [&](size_t i) {
+						return est->estimate(images[i], detections[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("images"), py::arg("detections"), py::arg("threadCount") = 1,
+			"Estimate the angles of a batch of detections item by item.\n"
+			"\tArgs\n"
+			"\t\tparam1 (list): list of source images. Format must be R8G8B8.\n"
+			"\t\tparam2 (list): list of detections, one per image.\n"
+			"\t\tparam3 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with error code FSDKErrorResult and dict of numpy arrays with one row per item:\n"
+			"\t\t\tpitch, yaw, roll (float32, N). On error the dict is empty.\n")
 			;
 	
 	py::class_<fsdk::Ref<fsdk::IBlackWhiteEstimator>>(f, "IBlackWhiteEstimatorPtr",
@@ -329,7 +461,7 @@ void estimators_module(py::module& f) {
 				bool outIsGrayscale;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(image, outIsGrayscale);
 				return std::make_tuple(FSDKErrorResult(err), outIsGrayscale);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Check if image is grayscale or colo.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): image source image. Format must be R8G8B8.\n"
@@ -348,7 +480,7 @@ void estimators_module(py::module& f) {
 				fsdk::DepthEstimation out = {};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(image, out);
 				return std::make_tuple(FSDKErrorResult(err), out); 
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Check whether or not depth map corresponds to the real person.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): warped depth image with R16 format.\n"
@@ -393,7 +525,7 @@ void estimators_module(py::module& f) {
 				fsdk::IREstimation irEstimation;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(irWarp, irEstimation);
 				return std::make_tuple(FSDKErrorResult(err), irEstimation);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Check whether or not infrared warp corresponds to the real person.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): irWarp infra red face warp\n"
@@ -402,19 +534,26 @@ void estimators_module(py::module& f) {
 
 		.def("estimate", [](
 			const fsdk::ILivenessIREstimatorPtr& est,
-			const std::vector<fsdk::Image>& irWarps) {
+			const std::vector<fsdk::Image>& irWarps,
+			bool asColumns) {
 				std::vector<fsdk::IREstimation> out(irWarps.size());
-				fsdk::Result<fsdk::FSDKError> err = est->estimate(irWarps, out);
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(irWarps, out);
+				}
 				if (err.isOk()) {
-					return std::make_tuple(FSDKErrorResult(err), out);
+					return std::make_tuple(FSDKErrorResult(err), resultsToObject(out, true, asColumns));
 				}
 				return std::make_tuple(
 					FSDKErrorResult(err),
-					std::vector<fsdk::IREstimation>());
-			},
+					resultsToObject(std::vector<fsdk::IREstimation>(), false, asColumns));
+			}, py::arg("irWarps"), py::arg("asColumns") = false,
 			"Check whether or not list of infrared warps correspond to the real person.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Images): List of infra red face warps\n"
+			"\t\tparam2 (bool): return a dict of numpy arrays with one row per warp instead of the list:\n"
+			"\t\t\tisReal (bool, N), score (float32, N). On error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): tuple with Error code and List of IREstimation\n")
 				;
@@ -429,7 +568,7 @@ void estimators_module(py::module& f) {
 					fsdk::LivenessFlyingFacesEstimation estimation = {};
 					fsdk::Result<fsdk::FSDKError> err = est->estimate(face, estimation);
 					return std::make_tuple(FSDKErrorResult(err), estimation);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Checks whether or not detection corresponds to the real person.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Face): Face with valid input image and Detection. Image format must be R8G8B8.\n"
@@ -437,18 +576,25 @@ void estimators_module(py::module& f) {
 			"\t\t(tuple): tuple with Error code and LivenessFlyingFacesEstimation.\n")
 		.def("estimate",[](
 				const fsdk::ILivenessFlyingFacesEstimatorPtr& est,
-				const std::vector<fsdk::Face>& faces) {
+				const std::vector<fsdk::Face>& faces,
+				bool asColumns) {
 					std::vector<fsdk::LivenessFlyingFacesEstimation> out(faces.size());
 					auto scoreSpan = fsdk::Span<fsdk::LivenessFlyingFacesEstimation>(out.data(), out.size());
-					fsdk::Result<fsdk::FSDKError> err = est->estimate(
-						fsdk::Span<const fsdk::Face>(faces.data(), faces.size()),
-						scoreSpan);
-					return std::make_tuple(FSDKErrorResult(err), out);
-			},
+					fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+					{
+						py::gil_scoped_release release;
+						err = est->estimate(
+							fsdk::Span<const fsdk::Face>(faces.data(), faces.size()),
+							scoreSpan);
+					}
+					return std::make_tuple(FSDKErrorResult(err), resultsToObject(out, err.isOk(), asColumns));
+			}, py::arg("faces"), py::arg("asColumns") = false,
 			"Checks whether or not detections corresponds to the real persons.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Faces): List of Faces with valid Images and corresponding Detections.\n"
 			"\t\t\tImage format must be R8G8B8.\n"
+			"\t\tparam2 (bool): return a dict of numpy arrays with one row per face instead of the list:\n"
+			"\t\t\tscore (float32, N), isReal (bool, N). On error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): tuple with Error code and list of LivenessFlyingFacesEstimations.\n")
 		;
@@ -464,7 +610,7 @@ void estimators_module(py::module& f) {
 				fsdk::LivenessFPREstimation estimation = {};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(face, useJpegCompression, estimation);
 				return std::make_tuple(FSDKErrorResult(err), estimation);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Checks whether or not detection corresponds to the real person.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Face): Face with valid input image, landmarks5 and Detection. Image format must be R8G8B8.\n"
@@ -513,7 +659,7 @@ void estimators_module(py::module& f) {
 						resultBackground
 					);
 				return std::make_tuple(FSDKErrorResult(result), resultBackground);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Prepare background method. Pass here every frame from the stream to extract the background\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): current frame\n"
@@ -537,7 +683,7 @@ void estimators_module(py::module& f) {
 						estimation
 					);
 				return std::make_tuple(FSDKErrorResult(result), estimation);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Checks whether or not detections corresponds to the real persons.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): source image\n"
@@ -560,12 +706,38 @@ void estimators_module(py::module& f) {
 				fsdk::SmileEstimation out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(image, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Estimate SmileEstimation probabilities.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): face warped image.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): - tuple with error code FSDKErrorResult and SmileEstimation\n")
+
+		.def("estimate_batch",[](
+			const fsdk::ISmileEstimatorPtr& est,
+			const py::object& warpsObject,
+			uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::SmileEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return est->estimate(warps[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("threadCount") = 1,
+			"Estimate SmileEstimation probabilities of a batch of warps item by item.\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tmouth, smile, occlusion (float32, N). On error the dict is empty.\n")
 			;
 	
 	py::class_<fsdk::ILivenessFlowEstimatorPtr>(f, "ILivenessFlowEstimatorPtr",
@@ -581,7 +753,7 @@ void estimators_module(py::module& f) {
 			const std::vector<fsdk::Image>& frames) {
 				double score = 0.0;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(small, frames.data(), (int)frames.size(), score);
-				return std::make_tuple(FSDKErrorResult(err), score); },
+				return std::make_tuple(FSDKErrorResult(err), score); }, py::call_guard<py::gil_scoped_release>(),
 			"Check if correct optical flow can be calculated from input images..\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): small face crop\n"
@@ -605,13 +777,44 @@ void estimators_module(py::module& f) {
 				fsdk::EyesEstimation out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, eyeRects, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Estimate the attributes.\n"
 				"\tArgs\n"
 				"\t\tparam1 (Image): warp source image. Format must be R8G8B8. Must be warped!\n"
 				"\t\tparam2 (EyeRects): Cropped rects.\n"
 				"\tReturns:\n"
 				"\t\t(tuple): returns error code FSDKErrorResult and EyesEstimation\n")
+
+		.def("estimate_batch",[](
+				const fsdk::IEyeEstimatorPtr& est,
+				const py::object& warpsObject,
+				const std::vector<fsdk::EyeCropper::EyesRects>& eyeRects,
+				uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				checkBatchSizes(warps.size(), eyeRects.size(), "eyeRects");
+				std::vector<fsdk::EyesEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return est->estimate(warps[i], eyeRects[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("eyeRects"), py::arg("threadCount") = 1,
+			"Estimate the attributes of a batch of warps item by item.\n"
+				"\tArgs\n"
+				"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+				"\t\tparam2 (list): list of EyesRects, one per warp.\n"
+				"\t\tparam3 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+				"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+				"\tReturns:\n"
+				"\t\t(tuple): returns error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+				"\t\t\tleft_state, right_state (int32, N): State values\n"
+				"\t\t\tleft_iris, right_iris (float32, N x 32 x 2), left_eyelid, right_eyelid (float32, N x 6 x 2)\n"
+				"\t\t\tOn error the dict is empty.\n")
 			;
 	
 	py::class_<fsdk::IEmotionsEstimatorPtr>(f, "IEmotionsEstimatorPtr",
@@ -627,13 +830,40 @@ void estimators_module(py::module& f) {
 				fsdk::EmotionsEstimation out;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"\tEstimate the attributes.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): warp source image. If format is not R8 it would be converted to R8. "
 			"Must be warped!\n"
 			"\tReturns:\n"
 			"\t\t(tuple): returns error code FSDKErrorResult and EmotionsEstimation\n")
+
+		.def("estimate_batch",[](
+			const fsdk::IEmotionsEstimatorPtr& est,
+			const py::object& warpsObject,
+			uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::EmotionsEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return est->estimate(warps[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("threadCount") = 1,
+			"\tEstimate the attributes of a batch of warps item by item.\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): returns error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tanger, disgust, fear, happiness, sadness, surprise, neutral (float32, N)\n"
+			"\t\t\tpredominant (int32, N): Emotions value. On error the dict is empty.\n")
 			;
 	
 	py::class_<fsdk::IGazeEstimatorPtr>(f, "IGazeEstimatorPtr",
@@ -650,7 +880,7 @@ void estimators_module(py::module& f) {
 				fsdk::GazeEstimation outEyeAngles;
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, landmarks5Transformed, outEyeAngles);
 				return std::make_tuple(FSDKErrorResult(err), outEyeAngles);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Estimate the eye angles.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): Warped Image.\n"
@@ -658,6 +888,35 @@ void estimators_module(py::module& f) {
 			"\t\tparam3 (Landmarks5): Transformed Landmarks5 got from warper. See Warper.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): returns error code FSDKErrorResult and GazeEstimation\n")
+
+		.def("estimate_batch",[](
+				const fsdk::IGazeEstimatorPtr& est,
+				const py::object& warpsObject,
+				const std::vector<fsdk::Landmarks5>& landmarks5Transformed,
+				uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				checkBatchSizes(warps.size(), landmarks5Transformed.size(), "landmarks");
+				std::vector<fsdk::GazeEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return est->estimate(warps[i], landmarks5Transformed[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("landmarks"), py::arg("threadCount") = 1,
+			"Estimate the eye angles of a batch of warps item by item.\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (list): list of transformed Landmarks5 got from warper, one per warp.\n"
+			"\t\tparam3 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): returns error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tyaw, pitch (float32, N). On error the dict is empty.\n")
 		.def("getFaceCenter",[](
 				const fsdk::IGazeEstimatorPtr& est,
 				const fsdk::Landmarks5& landmarks5) {
@@ -683,13 +942,46 @@ void estimators_module(py::module& f) {
 					if (err.isOk())
 						return std::make_tuple(FSDKErrorResult(err), err.getValue());
 					else
-						return std::make_tuple(FSDKErrorResult(err), 0.0f); },
+						return std::make_tuple(FSDKErrorResult(err), 0.0f); }, py::call_guard<py::gil_scoped_release>(),
 				"Estimate the ags.\n"
 				"\tArgs\n"
 				"\t\tparam1 (Image): image source image in R8G8B8 format.\n"
 				"\t\tparam2 (detection): detection coords in image space.\n"
 				"\tReturns:\n"
 				"\t\t(tuple with FSDKErrorResult and float value): Error code and float value.")
+
+			.def("estimate_batch",[](
+				const fsdk::IAGSEstimatorPtr& est,
+				const std::vector<fsdk::Image>& images,
+				const std::vector<fsdk::BaseDetection<float>>& detections,
+				uint32_t threadCount) {
+					checkBatchSizes(images.size(), detections.size(), "detections");
+					std::vector<float> out(images.size());
+					fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+					{
+						py::gil_scoped_release release;
+						err = estimateEach(images.size(), threadCount, [&](size_t i) -> fsdk::Result<fsdk::FSDKError> {
+							fsdk::ResultValue<fsdk::FSDKError, float> ags = est->estimate(images[i], detections[i]);
+							if (ags.isOk())
+								out[i] = ags.getValue();
+							return ags;
+						});
+					}
+					if (err.isError())
+						return std::make_tuple(FSDKErrorResult(err), py::dict());
+					py::dict columns;
+					columns["ags"] = makeColumn<float>(out, [](float ags) { return ags; });
+					return std::make_tuple(FSDKErrorResult(err), columns);
+				}, py::arg("images"), py::arg("detections"), py::arg("threadCount") = 1,
+				"Estimate the ags of a batch of detections item by item.\n"
+				"\tArgs\n"
+				"\t\tparam1 (list): list of source images in R8G8B8 format.\n"
+				"\t\tparam2 (list): list of detections in image space, one per image.\n"
+				"\t\tparam3 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+				"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+				"\tReturns:\n"
+				"\t\t(tuple): tuple with error code FSDKErrorResult and dict of numpy arrays with one row per item:\n"
+				"\t\t\tags (float32, N). On error the dict is empty.\n")
 					;
 	
 	py::class_<fsdk::IGlassesEstimatorPtr>(f, "IGlassesEstimatorPtr",
@@ -704,12 +996,41 @@ void estimators_module(py::module& f) {
 					return std::make_tuple(FSDKErrorResult(err), err.getValue());
 				return std::make_tuple(FSDKErrorResult(err), fsdk::GlassesEstimation::EstimationError);
 				
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"\tChecks whether person wearing any glasses or not.\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): warped source image in R8G8B8 format.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): returns error code FSDKErrorResult and GlassesEstimation\n")
+
+		.def("estimate_batch",[](
+			const fsdk::IGlassesEstimatorPtr& est,
+			const py::object& warpsObject,
+			uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::GlassesEstimation> out(warps.size(), fsdk::GlassesEstimation::EstimationError);
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) -> fsdk::Result<fsdk::FSDKError> {
+						fsdk::ResultValue<fsdk::FSDKError, fsdk::GlassesEstimation> glasses = est->estimate(warps[i]);
+						if (glasses.isOk())
+							out[i] = glasses.getValue();
+						return glasses;
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("threadCount") = 1,
+			"\tChecks whether persons of a batch of warps wear any glasses item by item.\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): returns error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tglasses (int32, N): GlassesEstimation value. On error the dict is empty.\n")
 				;
 
 	py::class_<fsdk::IFacialHairEstimatorPtr>(f, "IFacialHairEstimatorPtr",
@@ -722,7 +1043,7 @@ void estimators_module(py::module& f) {
 				fsdk::FacialHairEstimation out = {};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"\tEstimates the facial hair of person\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): warped image in R8G8B8 format.\n"
@@ -731,19 +1052,48 @@ void estimators_module(py::module& f) {
 
 		.def("estimate", [](
 			const fsdk::IFacialHairEstimatorPtr& est,
-			const std::vector<fsdk::Image>& warps) {
+			const std::vector<fsdk::Image>& warps,
+			bool asColumns) {
 				std::vector<fsdk::FacialHairEstimation> out(warps.size());
-				fsdk::Result<fsdk::FSDKError> err = est->estimate(warps, out);
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(warps, out);
+				}
 				if (err.isError()) {
 					out.clear();
 				}
-				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+				return std::make_tuple(FSDKErrorResult(err), resultsToObject(out, err.isOk(), asColumns));
+			}, py::arg("warps"), py::arg("asColumns") = false,
 			"\tEstimates the facial hair of person\n"
 			"\tArgs\n"
 			"\t\tparam1 (Images): List of warped images in R8G8B8 format.\n"
+			"\t\tparam2 (bool): return a dict of numpy arrays with one row per warp instead of the list,\n"
+			"\t\t\tsee estimate_batch for the columns. On error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): returns Error code and list of FacialHairEstimation\n")
+
+		.def("estimate_batch", [](
+			const fsdk::IFacialHairEstimatorPtr& est,
+			const py::object& warpsObject) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::FacialHairEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(warps, out);
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"),
+			"\tEstimates the facial hair of persons of a batch of warps by one batch call\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): returns Error code and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tresult (int32, N): FacialHair value\n"
+			"\t\t\tnoHairScore, stubbleScore, mustacheScore, beardScore (float32, N). On error the dict is empty.\n")
 				;
 
 	py::class_<fsdk::ICredibilityCheckEstimatorPtr>(f, "ICredibilityCheckEstimatorPtr",
@@ -756,7 +1106,7 @@ void estimators_module(py::module& f) {
 				fsdk::CredibilityCheckEstimation out = {};
 				fsdk::Result<fsdk::FSDKError> err = est->estimate(warp, out);
 				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"\tEstimates the reliability of person\n"
 			"\tArgs\n"
 			"\t\tparam1 (Image): warped image in R8G8B8 format.\n"
@@ -765,23 +1115,54 @@ void estimators_module(py::module& f) {
 
 		.def("estimate", [](
 			const fsdk::ICredibilityCheckEstimatorPtr& est,
-			const std::vector<fsdk::Image>& warps) {
+			const std::vector<fsdk::Image>& warps,
+			bool asColumns) {
 				std::vector<fsdk::CredibilityCheckEstimation> out(warps.size());
-				fsdk::Result<fsdk::FSDKError> err = est->estimate(
-					fsdk::Span<const fsdk::Image>(warps.data(), warps.size()),
-					fsdk::Span<fsdk::CredibilityCheckEstimation>(out.data(), out.size()));
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(
+						fsdk::Span<const fsdk::Image>(warps.data(), warps.size()),
+						fsdk::Span<fsdk::CredibilityCheckEstimation>(out.data(), out.size()));
+				}
 				if (err.isError()) {
 					return std::make_tuple(
 						FSDKErrorResult(err),
-						std::vector<fsdk::CredibilityCheckEstimation>{});
+						resultsToObject(std::vector<fsdk::CredibilityCheckEstimation>{}, false, asColumns));
 				}
-				return std::make_tuple(FSDKErrorResult(err), out);
-			},
+				return std::make_tuple(FSDKErrorResult(err), resultsToObject(out, true, asColumns));
+			}, py::arg("warps"), py::arg("asColumns") = false,
 			"\tEstimates the reliability of person\n"
 			"\tArgs\n"
 			"\t\tparam1 (Images): List of warped images in R8G8B8 format.\n"
+			"\t\tparam2 (bool): return a dict of numpy arrays with one row per warp instead of the list,\n"
+			"\t\t\tsee estimate_batch for the columns. On error the dict is empty.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): returns Error code and list of CredibilityCheckEstimation\n")
+
+		.def("estimate_batch", [](
+			const fsdk::ICredibilityCheckEstimatorPtr& est,
+			const py::object& warpsObject) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::CredibilityCheckEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = est->estimate(
+						fsdk::Span<const fsdk::Image>(warps.data(), warps.size()),
+						fsdk::Span<fsdk::CredibilityCheckEstimation>(out.data(), out.size()));
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"),
+			"\tEstimates the reliability of persons of a batch of warps by one batch call\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): returns Error code and dict of numpy arrays with one row per warp:\n"
+			"\t\t\tvalue (float32, N)\n"
+			"\t\t\tcredibilityStatus (int32, N): CredibilityStatus value. On error the dict is empty.\n")
 				;
 	
 	py::class_<fsdk::MatchingResult>(f, "MatchingResult", "Result of descriptor matching.")
@@ -1351,12 +1732,39 @@ void estimators_module(py::module& f) {
 			fsdk::MouthEstimation out = {};
 			fsdk::Result<fsdk::FSDKError> status = estimator->estimate(warp, out);
 			return std::make_tuple(FSDKErrorResult(status), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"\tEstimates MouthEstimation probabilities.\n"
 			"\tArgs\n"
 			"\t\tparam1 (warp): warped source image in R8G8B8 format.\n"
 			"\tReturns:\n"
 			"\t\t(tuple): returns error code FSDKErrorResult and MouthEstimation\n")
+
+		.def("estimate_batch", [](
+			const fsdk::IMouthEstimatorPtr& estimator,
+			const py::object& warpsObject,
+			uint32_t threadCount) {
+				const std::vector<fsdk::Image> warps = warpsFromObject(warpsObject);
+				std::vector<fsdk::MouthEstimation> out(warps.size());
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = estimateEach(warps.size(), threadCount, [&](size_t i) {
+						return estimator->estimate(warps[i], out[i]);
+					});
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::dict());
+				return std::make_tuple(FSDKErrorResult(err), toColumns(out));
+			}, py::arg("warps"), py::arg("threadCount") = 1,
+			"\tEstimates MouthEstimation probabilities of a batch of warps item by item.\n"
+			"\tArgs\n"
+			"\t\tparam1 (list or numpy.array): list of warped images or uint8 array (N, height, width, 3) of R8G8B8 warps.\n"
+			"\t\tparam2 (int): number of threads calling the estimator, 1 - estimate in place. Other values\n"
+			"\t\t\tcall one estimator from several threads at once, 0 - number of hardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple): returns error code FSDKErrorResult and dict of numpy arrays with one row per warp:\n"
+			"\t\t\topened, smile, occluded (float32, N), isOpened, isSmiling, isOccluded (bool, N).\n"
+			"\t\t\tOn error the dict is empty.\n")
 		;
 	
 	py::class_<fsdk::IOverlapEstimatorPtr>(f, "IOverlapEstimatorPtr",
@@ -1369,7 +1777,7 @@ void estimators_module(py::module& f) {
 				fsdk::OverlapEstimation out = {};
 				fsdk::Result<fsdk::FSDKError> status = estimator->estimate(image, detection, out);
 				return std::make_tuple(FSDKErrorResult(status), out);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"\tEstimates the face overlap.\n"
 			"\tArgs\n"
 			"\t\tparam1 (image): image source image in R8G8B8 format.\n"
@@ -11,6 +11,13 @@
 #include "LivenessEngineAdapter.hpp"
 #include "SettingsProviderAdapter.hpp"
 #include "helpers.hpp"
+#include "MappedIndex.hpp"
+#include "ShardedIndex.hpp"
+#include "LoggedIndex.hpp"
+#include "ConcurrentIndex.hpp"
+#include "IndexFilter.hpp"
+#include "OwnedImage.hpp"
+#include "MatchMatrix.hpp"
 #include <fsdk/Version.h>
 #include <fsdk/Types/HumanLandmarks.h>
 
@@ -24,6 +31,10 @@ void detector_module(py::module& f);
 void descriptor_module(py::module& f);
 void warper_module(py::module& f);
 void liveness_module(py::module& f);
+void pipeline_module(py::module& f);
+void analyzer_module(py::module& f);
+void async_module(py::module& f);
+void microbatcher_module(py::module& f);
 
 PyIFaceEngine createPyFaceEnginePtr(
 	const char* dataPath = nullptr,
@@ -84,6 +95,10 @@ PYBIND11_MODULE(FaceEngine, f) {
 	descriptor_module(f);
 	warper_module(f);
 	liveness_module(f);
+	pipeline_module(f);
+	analyzer_module(f);
+	async_module(f);
+	microbatcher_module(f);
 	set_optional_class(f);
 	
 	enum class FaceEngineEdition {
@@ -107,10 +122,20 @@ PYBIND11_MODULE(FaceEngine, f) {
 
 	py::class_<fsdk::Face>(f, "Face", "Container for detection and landmakrs\n")
 		.def(py::init<>())
-		.def(py::init<fsdk::Image>())
-		.def(py::init<fsdk::Image, fsdk::Detection>())
-		.def(py::init<fsdk::Image, fsdk::BaseDetection<float>>())
-		.def_readwrite("img", &fsdk::Face::img, "Image\n")
+		// faces keep their images, borrowed ones are copied
+		.def(py::init([](const fsdk::Image& image) {
+			return fsdk::Face(ownedImage(image));
+		}))
+		.def(py::init([](const fsdk::Image& image, const fsdk::Detection& detection) {
+			return fsdk::Face(ownedImage(image), detection);
+		}))
+		.def(py::init([](const fsdk::Image& image, const fsdk::BaseDetection<float>& detection) {
+			return fsdk::Face(ownedImage(image), detection);
+		}))
+		.def_property("img",
+			[](const fsdk::Face& face) -> const fsdk::Image& { return face.img; },
+			[](fsdk::Face& face, const fsdk::Image& image) { face.img = ownedImage(image); },
+			"Image\n")
 		.def_readwrite("detection", &fsdk::Face::detection, "Detection\n")
 		.def_readwrite("landmarks5_opt", &fsdk::Face::landmarks5, "Landmarks5 optinal\n")
 		.def_readwrite("landmarks68_opt", &fsdk::Face::landmarks68, "Landmarks68 optinal\n")
@@ -216,6 +241,43 @@ PYBIND11_MODULE(FaceEngine, f) {
 		.def("createExtractor", &PyIFaceEngine::createExtractor, py::arg("version") = 0, "Creates descriptor extractor (version >= DV_MIN_HUMAN_DESCRIPTOR_VERSION is human descriptor)\n")
 		.def("createMatcher", &PyIFaceEngine::createMatcher, py::arg("version") = 0, "Creates descriptor matcher (version >= DV_MIN_HUMAN_DESCRIPTOR_VERSION is human descriptor)\n")
 		
+		.def("match_matrix", [](
+			PyIFaceEngine& faceEngine,
+			const fsdk::IDescriptorBatchPtr& probes,
+			const fsdk::IDescriptorBatchPtr& candidates,
+			uint32_t threadCount) {
+				const std::vector<py::ssize_t> shape{
+					static_cast<py::ssize_t>(probes->getCount()),
+					static_cast<py::ssize_t>(candidates->getCount())};
+				py::array_t<float> distance(shape);
+				py::array_t<float> similarity(shape);
+				float* distanceData = distance.mutable_data();
+				float* similarityData = similarity.mutable_data();
+				fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+				{
+					py::gil_scoped_release release;
+					err = matchMatrix(faceEngine, probes, candidates, threadCount, distanceData, similarityData);
+				}
+				if (err.isError())
+					return std::make_tuple(FSDKErrorResult(err), py::array_t<float>(), py::array_t<float>());
+				return std::make_tuple(FSDKErrorResult(err), distance, similarity);
+			},
+			py::arg("probes"),
+			py::arg("candidates"),
+			py::arg("threadCount") = 0,
+			"Match descriptors M:N.\n"
+			"\tMatches every descriptor of probes batch with every descriptor of candidates batch.\n"
+			"\tCandidates are split into tiles and probes into blocks matched on a pool of threads, every thread\n"
+			"\tcreates a matcher of its own, the GIL is released for the whole call. Results are written directly\n"
+			"\tinto numpy matrices.\n"
+			"\tArgs\n"
+			"\t\tparam1 (IDescriptorBatchPtr): batch of probe descriptors, M descriptors\n"
+			"\t\tparam2 (IDescriptorBatchPtr): batch of candidate descriptors of the same version, N descriptors\n"
+			"\t\tparam3 (int): number of threads. If 0 - use the number of hardware threads\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with error code specified by FSDKError and two float32 matrices\n"
+			"\t\t\tof shape (M, N): distance and similarity\n")
+		
 		// Index
 		.def("createIndexBuilder", &PyIFaceEngine::createIndexBuilder, "Creates index builder.\n")
 		
@@ -227,7 +289,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 					return std::make_tuple(FSDKErrorResult(fsdk::makeResult(res.getError())), fsdk::acquire(res.getValue()));
 				else
 					return std::make_tuple(FSDKErrorResult(fsdk::makeResult(res.getError())), fsdk::IDenseIndexPtr());
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Loads dense index.\n"
 			"\t\t Only indexes saved as dense are to be loaded as dense.\n"
 			"\tArgs:\n"
@@ -243,7 +305,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 					return std::make_tuple(FSDKErrorResult(fsdk::makeResult(res.getError())), fsdk::acquire(res.getValue()));
 				else
 					return std::make_tuple(FSDKErrorResult(fsdk::makeResult(res.getError())), fsdk::IDynamicIndexPtr());
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Loads dynamic index.\n"
 			"\t\t Only indexes saved as dynamic are to be loaded as dynamic.\n"
 			"\tArgs:\n"
@@ -251,6 +313,212 @@ PYBIND11_MODULE(FaceEngine, f) {
 			"\tReturns:\n"
 			"\t\t(tuple with FSDKErrorResult and dense index): error code FSDKErrorResult and output dynamic index.\n")
 		
+		.def("loadDenseIndexMmap", [](
+			PyIFaceEngine& faceEngine,
+			const std::string& indexPath,
+			bool verify) {
+				std::shared_ptr<PyMappedIndex> index;
+				fsdk::Result<fsdk::FSDKError> err = PyMappedIndex::load(faceEngine, indexPath, verify, index);
+				return std::make_tuple(FSDKErrorResult(err), index);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("indexPath"),
+			py::arg("verify") = false,
+			"Maps index saved by saveDenseIndexMmap read-only into memory.\n"
+			"\t\t Descriptors are not read on load unless verify is set, pages of the file are shared by all\n"
+			"\t\t processes mapping it.\n"
+			"\tArgs:\n"
+			"\t\t param1 (str): indexPath Path to index to be loaded.\n"
+			"\t\t param2 (bool): validate checksum of descriptors, it reads the whole file. Otherwise it is\n"
+			"\t\t\tvalidated only by MappedDenseIndex.verify.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and MappedDenseIndex): error code FSDKErrorResult and mapped index\n"
+			"\t\t\tor None. InvalidInput if the file is not a mapped index, its header is corrupted or\n"
+			"\t\t\tverify is set and the checksum of descriptors is wrong.\n")
+		
+		.def("saveDenseIndexMmap", [](
+			PyIFaceEngine&,
+			const std::string& indexPath,
+			const fsdk::IDescriptorBatchPtr& batch) {
+				return FSDKErrorResult(saveMappedIndex(indexPath, batch));
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("indexPath"),
+			py::arg("batch"),
+			"Saves descriptors of batch as index to be loaded by loadDenseIndexMmap.\n"
+			"\t\t Descriptor ids are positions in batch. The file is written aside and renamed,\n"
+			"\t\t processes mapping the previous file keep their data.\n"
+			"\tArgs:\n"
+			"\t\t param1 (str): indexPath Path to save index to.\n"
+			"\t\t param2 (IDescriptorBatchPtr): descriptors to save.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): error code FSDKErrorResult\n")
+		
+		.def("saveDenseIndexMmap", [](
+			PyIFaceEngine& faceEngine,
+			const std::string& indexPath,
+			const fsdk::IDenseIndexPtr& index,
+			uint32_t version) {
+				return FSDKErrorResult(saveMappedIndex(indexPath, index, faceEngine, version));
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("indexPath"),
+			py::arg("index"),
+			py::arg("version") = 0,
+			"Saves descriptors of dense index as index to be loaded by loadDenseIndexMmap.\n"
+			"\t\t Descriptor ids are kept, so they must be 0..size-1.\n"
+			"\tArgs:\n"
+			"\t\t param1 (str): indexPath Path to save index to.\n"
+			"\t\t param2 (IDenseIndexPtr): index to save.\n"
+			"\t\t param3 (int): descriptor version of index. If 0 - use default version from config\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): error code FSDKErrorResult\n")
+		
+		.def("buildShardedIndex", [](
+			PyIFaceEngine& faceEngine,
+			const fsdk::IDescriptorBatchPtr& batch,
+			uint32_t shardCount,
+			uint32_t threadCount) {
+				std::shared_ptr<PyShardedIndex> index;
+				fsdk::Result<fsdk::FSDKError> err = PyShardedIndex::build(faceEngine, batch, shardCount, threadCount, index);
+				return std::make_tuple(FSDKErrorResult(err), index);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("batch"),
+			py::arg("shardCount"),
+			py::arg("threadCount") = 0,
+			"Builds index of shardCount dynamic indexes in parallel.\n"
+			"\t\t Batch is split into shardCount ranges, each one is built by its own index builder.\n"
+			"\t\t Global id of a descriptor is its position in batch.\n"
+			"\tArgs:\n"
+			"\t\t param1 (IDescriptorBatchPtr): descriptors to index, at least shardCount.\n"
+			"\t\t param2 (int): count of shards.\n"
+			"\t\t param3 (int): number of threads building and searching shards. If 0 - use the number of\n"
+			"\t\t\thardware threads. The index never uses more threads than shards.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and ShardedIndex): error code FSDKErrorResult and index or None.\n")
+		
+		.def("loadShardedIndex", [](
+			PyIFaceEngine& faceEngine,
+			const std::string& directory,
+			uint32_t threadCount) {
+				std::shared_ptr<PyShardedIndex> index;
+				fsdk::Result<fsdk::FSDKError> err = PyShardedIndex::load(faceEngine, directory, threadCount, index);
+				return std::make_tuple(FSDKErrorResult(err), index);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("directory"),
+			py::arg("threadCount") = 0,
+			"Loads index saved by ShardedIndex.save, shards are loaded in parallel.\n"
+			"\tArgs:\n"
+			"\t\t param1 (str): directory of saved index.\n"
+			"\t\t param2 (int): number of threads loading and searching shards. If 0 - use the number of\n"
+			"\t\t\thardware threads.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and ShardedIndex): error code FSDKErrorResult and index or None.\n"
+			"\t\t\tInvalidInput if the manifest is missing or inconsistent with shards.\n")
+		
+		.def("createLoggedIndex", [](
+			PyIFaceEngine& faceEngine,
+			const std::string& indexPath,
+			const fsdk::IDynamicIndexPtr& index,
+			uint64_t compactionLogSize,
+			bool syncRecords) {
+				std::shared_ptr<PyLoggedIndex> logged;
+				fsdk::Result<fsdk::FSDKError> err = PyLoggedIndex::create(
+					faceEngine,
+					indexPath,
+					index,
+					compactionLogSize,
+					syncRecords,
+					logged);
+				return std::make_tuple(FSDKErrorResult(err), logged);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("indexPath"),
+			py::arg("index"),
+			py::arg("compactionLogSize") = 0,
+			py::arg("syncRecords") = false,
+			"Saves dynamic index as the snapshot of a logged index and starts an empty log <indexPath>.log.\n"
+			"\t\t The logged index takes the index over, it must not be modified directly any more.\n"
+			"\tArgs:\n"
+			"\t\t param1 (str): indexPath Path to the snapshot.\n"
+			"\t\t param2 (IDynamicIndexPtr): index to log.\n"
+			"\t\t param3 (int): size of the log in bytes which starts background compaction. If 0 - compaction is\n"
+			"\t\t\tstarted only by LoggedDynamicIndex.compact.\n"
+			"\t\t param4 (bool): sync every record of the log to the disk before the modification returns, so it\n"
+			"\t\t\tsurvives a power loss. Otherwise records are only flushed and survive a crash of the process.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and LoggedDynamicIndex): error code FSDKErrorResult and index or None.\n")
+		
+		.def("loadLoggedIndex", [](
+			PyIFaceEngine& faceEngine,
+			const std::string& indexPath,
+			uint64_t compactionLogSize,
+			bool syncRecords) {
+				std::shared_ptr<PyLoggedIndex> logged;
+				fsdk::Result<fsdk::FSDKError> err = PyLoggedIndex::load(
+					faceEngine,
+					indexPath,
+					compactionLogSize,
+					syncRecords,
+					logged);
+				return std::make_tuple(FSDKErrorResult(err), logged);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("indexPath"),
+			py::arg("compactionLogSize") = 0,
+			py::arg("syncRecords") = false,
+			"Loads the snapshot of a logged index and replays its log.\n"
+			"\t\t A record at the end of the log interrupted by a crash is discarded.\n"
+			"\tArgs:\n"
+			"\t\t param1 (str): indexPath Path to the snapshot.\n"
+			"\t\t param2 (int): size of the log in bytes which starts background compaction, 0 - never.\n"
+			"\t\t param3 (bool): sync every record of the log to the disk, see createLoggedIndex.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and LoggedDynamicIndex): error code FSDKErrorResult and index or None.\n")
+		
+		.def("createConcurrentIndex", [](
+			PyIFaceEngine& faceEngine,
+			const fsdk::IDynamicIndexPtr& index,
+			uint32_t segmentSize,
+			uint32_t descriptorVersion) {
+				std::shared_ptr<PyConcurrentIndex> concurrent;
+				fsdk::Result<fsdk::FSDKError> err = PyConcurrentIndex::create(
+					faceEngine,
+					index,
+					segmentSize,
+					descriptorVersion,
+					concurrent);
+				return std::make_tuple(FSDKErrorResult(err), concurrent);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("index"),
+			py::arg("segmentSize") = 1024,
+			py::arg("descriptorVersion") = 0,
+			"Wraps dynamic index into an index which may be searched while descriptors are appended and removed.\n"
+			"\t\t The concurrent index takes the index over, it must not be used directly any more.\n"
+			"\tArgs:\n"
+			"\t\t param1 (IDynamicIndexPtr): index with descriptors appended before, may be empty.\n"
+			"\t\t param2 (int): count of appended descriptors searched by matching before they are built\n"
+			"\t\t\tinto a dynamic index.\n"
+			"\t\t param3 (int): version of descriptors of the index, used to find descriptors removed from it before.\n"
+			"\t\t\tIf 0 - use default version from config.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and ConcurrentDynamicIndex): error code FSDKErrorResult and index or None.\n")
+		
+		.def("createDescriptorTags", [](PyIFaceEngine& faceEngine) {
+				return std::make_shared<PyDescriptorTags>(faceEngine);
+			},
+			"Creates empty DescriptorTags to make filters of index searches.\n"
+			"\tReturns:\n"
+			"\t\t(DescriptorTags): tags of descriptor ids\n")
+		
+		.def("createIndexFilter", [](PyIFaceEngine& faceEngine, const std::vector<fsdk::DescriptorId>& ids) {
+				SharedBitset allowed;
+				for (fsdk::DescriptorId id : ids)
+					allowed.set(id);
+				return std::make_shared<PyIndexFilter>(faceEngine, allowed);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("ids"),
+			"Creates filter allowing passed descriptor ids.\n"
+			"\tArgs:\n"
+			"\t\t param1 (list of int): ids of descriptors.\n"
+			"\tReturns:\n"
+			"\t\t(IndexFilter): filter of descriptor ids\n")
+		
 		.def("setSettingsProvider", &PyIFaceEngine::setSettingsProvider,
 			"Sets settings provider\n"
 			"\tArgs:\n"
@@ -880,6 +1148,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 			PyIFaceEngine.createDescriptorBatch
 			PyIFaceEngine.createExtractor
 			PyIFaceEngine.createMatcher
+			PyIFaceEngine.match_matrix
 			PyIFaceEngine.setSettingsProvider
 			PyIFaceEngine.setRuntimeSettingsProvider
 			PyIFaceEngine.getSettingsProvider
@@ -887,6 +1156,15 @@ PYBIND11_MODULE(FaceEngine, f) {
 			PyIFaceEngine.createIndexBuilder
 			PyIFaceEngine.loadDenseIndex
 			PyIFaceEngine.loadDynamicIndex
+			PyIFaceEngine.loadDenseIndexMmap
+			PyIFaceEngine.saveDenseIndexMmap
+			PyIFaceEngine.buildShardedIndex
+			PyIFaceEngine.loadShardedIndex
+			PyIFaceEngine.createLoggedIndex
+			PyIFaceEngine.loadLoggedIndex
+			PyIFaceEngine.createConcurrentIndex
+			PyIFaceEngine.createDescriptorTags
+			PyIFaceEngine.createIndexFilter
 
 			SettingsProviderValue
 			SettingsProviderValue.__init__
@@ -903,15 +1181,19 @@ PYBIND11_MODULE(FaceEngine, f) {
 			IQualityEstimatorPtr.estimate
 			IQualityEstimatorPtr.estimate_quality
 			IQualityEstimatorPtr.estimate_subjective_quality
+			IQualityEstimatorPtr.estimate_quality_batch
+			IQualityEstimatorPtr.estimate_subjective_quality_batch
 
 			IAttributeEstimatorPtr
 			IAttributeEstimatorPtr.estimate
 
 			IGlassesEstimatorPtr
 			IGlassesEstimatorPtr.estimate
+			IGlassesEstimatorPtr.estimate_batch
 
 			IMouthEstimatorPtr
 			IMouthEstimatorPtr.estimate
+			IMouthEstimatorPtr.estimate_batch
 
 			IMedicalMaskEstimatorPtr
 			IMedicalMaskEstimatorPtr.estimate
@@ -931,6 +1213,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 
 			IDetectorPtr
 			IDetectorPtr.detect
+			IDetectorPtr.detect_arrays
 			IDetectorPtr.detectOne
 			IDetectorPtr.setDetectionComparer
 
@@ -944,6 +1227,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 
 			IHumanDetectorPtr
 			IHumanDetectorPtr.detect
+			IHumanDetectorPtr.detect_arrays
 
 			Human
 			Human.isValid
@@ -975,6 +1259,8 @@ PYBIND11_MODULE(FaceEngine, f) {
 			IDescriptorBatchPtr.getDescriptorSize
 			IDescriptorBatchPtr.getDescriptorSlow
 			IDescriptorBatchPtr.getDescriptorFast
+			IDescriptorBatchPtr.toNumpy
+			IDescriptorBatchPtr.fromNumpy
 			IDescriptorBatchPtr.clear
 			IDescriptorBatchPtr.load
 			IDescriptorBatchPtr.save
@@ -992,9 +1278,50 @@ PYBIND11_MODULE(FaceEngine, f) {
 			IDescriptorMatcherPtr
 			IDescriptorMatcherPtr.getModelVersion
 			IDescriptorMatcherPtr.match
+			IDescriptorMatcherPtr.match_threshold
+
+			createFacePipeline
+			FacePipeline
+			FacePipeline.process
+			FacePipeline.getDescriptorVersion
+			PipelineFace
+			createFaceAnalyzer
+			FaceAnalyzer
+			FaceAnalyzer.analyze
+			FaceAnalyzer.getCreatedEstimators
+			FaceAnalysis
+			AnalyzerRequest
+
+			createAsyncFaceEngine
+			AsyncFaceEngine
+			AsyncFaceEngine.createDetector
+			AsyncFaceEngine.createExtractor
+			AsyncFaceEngine.createMatcher
+			AsyncFaceEngine.wrapIndex
+			AsyncFaceEngine.close
+			AsyncFaceEngine.getQueueSize
+			AsyncFaceEngine.getMaxQueueSize
+			AsyncFaceEngine.getMaxBatchSize
+			AsyncDetector.detect_async
+			AsyncExtractor.extract_async
+			AsyncMatcher.match_async
+			AsyncIndex.search_async
+
+			createMicroBatcher
+			MicroBatcher
+			MicroBatcher.detect
+			MicroBatcher.extract
+			MicroBatcher.getDetectMetrics
+			MicroBatcher.getExtractMetrics
+			MicroBatcher.resetMetrics
+			MicroBatcher.getMaxBatchSize
+			MicroBatcher.getMaxLatencyMs
+			MicroBatcher.getDescriptorVersion
+			MicroBatchMetrics
 
 			IHeadPoseEstimatorPtr
 			IHeadPoseEstimatorPtr.estimate
+			IHeadPoseEstimatorPtr.estimate_batch
 
 			IBlackWhiteEstimatorPtr
 			IBlackWhiteEstimatorPtr.estimate
@@ -1008,18 +1335,22 @@ PYBIND11_MODULE(FaceEngine, f) {
 
 			ISmileEstimatorPtr
 			ISmileEstimatorPtr.estimate
+			ISmileEstimatorPtr.estimate_batch
 
 			ILivenessFlowEstimatorPtr
 			ILivenessFlowEstimatorPtr.estimate
 
 			ICredibilityCheckEstimatorPtr
 			ICredibilityCheckEstimatorPtr.estimate
+			ICredibilityCheckEstimatorPtr.estimate_batch
 
 			IFacialHairEstimatorPtr
 			IFacialHairEstimatorPtr.estimate
+			IFacialHairEstimatorPtr.estimate_batch
 
 			IEyeEstimatorPtr
 			IEyeEstimatorPtr.estimate
+			IEyeEstimatorPtr.estimate_batch
 			
 			EyesRects
 			EyesRects.leftEyeRect
@@ -1031,26 +1362,96 @@ PYBIND11_MODULE(FaceEngine, f) {
 
 			IEmotionsEstimatorPtr
 			IEmotionsEstimatorPtr.estimate
+			IEmotionsEstimatorPtr.estimate_batch
 
 			IGazeEstimatorPtr
 			IGazeEstimatorPtr.estimate
+			IGazeEstimatorPtr.estimate_batch
 
 			IAGSEstimatorPtr
 			IAGSEstimatorPtr.estimate
+			IAGSEstimatorPtr.estimate_batch
 
 			IIndexPtr
 			IIndexPtr.search
+			IIndexPtr.search_batch
 
 			IDenseIndexPtr
 			IDenseIndexPtr.search
+			IDenseIndexPtr.search_batch
 			IDenseIndexPtr.size
 			IDenseIndexPtr.descriptorByIndex
 			IDenseIndexPtr.search
 
+			MappedDenseIndex
+			MappedDenseIndex.search
+			MappedDenseIndex.search_batch
+			MappedDenseIndex.size
+			MappedDenseIndex.getDescriptorVersion
+			MappedDenseIndex.descriptorByIndex
+			MappedDenseIndex.verify
+			MappedDenseIndex.toNumpy
+
+			ShardedIndex
+			ShardedIndex.search
+			ShardedIndex.search_batch
+			ShardedIndex.size
+			ShardedIndex.countOfIndexedDescriptors
+			ShardedIndex.getShardCount
+			ShardedIndex.getShardSizes
+			ShardedIndex.descriptorByIndex
+			ShardedIndex.appendDescriptor
+			ShardedIndex.appendBatch
+			ShardedIndex.removeDescriptor
+			ShardedIndex.save
+
+			LoggedDynamicIndex
+			LoggedDynamicIndex.search
+			LoggedDynamicIndex.search_batch
+			LoggedDynamicIndex.size
+			LoggedDynamicIndex.countOfIndexedDescriptors
+			LoggedDynamicIndex.descriptorByIndex
+			LoggedDynamicIndex.appendDescriptor
+			LoggedDynamicIndex.appendBatch
+			LoggedDynamicIndex.removeDescriptor
+			LoggedDynamicIndex.compact
+			LoggedDynamicIndex.waitCompaction
+			LoggedDynamicIndex.getLogSize
+			ConcurrentDynamicIndex
+			ConcurrentDynamicIndex.search
+			ConcurrentDynamicIndex.search_batch
+			ConcurrentDynamicIndex.snapshot
+			ConcurrentDynamicIndex.size
+			ConcurrentDynamicIndex.countOfIndexedDescriptors
+			ConcurrentDynamicIndex.descriptorByIndex
+			ConcurrentDynamicIndex.appendDescriptor
+			ConcurrentDynamicIndex.appendBatch
+			ConcurrentDynamicIndex.removeDescriptor
+			ConcurrentDynamicIndex.getSegmentCount
+			ConcurrentDynamicIndexSnapshot
+			ConcurrentDynamicIndexSnapshot.search
+			ConcurrentDynamicIndexSnapshot.search_batch
+			ConcurrentDynamicIndexSnapshot.size
+			ConcurrentDynamicIndexSnapshot.countOfIndexedDescriptors
+			ConcurrentDynamicIndexSnapshot.descriptorByIndex
+			ConcurrentDynamicIndexSnapshot.isRemoved
+			ConcurrentDynamicIndexSnapshot.getEpoch
+			IndexFilter
+			IndexFilter.count
+			IndexFilter.contains
+			DescriptorTags
+			DescriptorTags.addTag
+			DescriptorTags.removeTag
+			DescriptorTags.clear
+			DescriptorTags.getTags
+			DescriptorTags.getCount
+			DescriptorTags.filter
+
 			IDynamicIndexPtr
 			IDynamicIndexPtr.saveToDenseIndex
 			IDynamicIndexPtr.saveToDynamicIndex
 			IDynamicIndexPtr.search
+			IDynamicIndexPtr.search_batch
 			IDynamicIndexPtr.size
 			IDynamicIndexPtr.descriptorByIndex
 			IDynamicIndexPtr.appendDescriptor
@@ -1196,6 +1597,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 			Image.getFormat
 			Image.getRect
 			Image.getData
+			Image.getDataR16
 			Image.getChannelCount
 			Image.getChannelStep
 			Image.getBitDepth
@@ -1205,6 +1607,8 @@ PYBIND11_MODULE(FaceEngine, f) {
 			Image.isBGR
 			Image.isValidFormat
 			Image.setData
+			Image.setYUVData
+			Image.fromArray
 			Image.save
 			Image.load
 			Image.getRect
@@ -1296,9 +1700,11 @@ PYBIND11_MODULE(FaceEngine, f) {
 
 			IIndexPtr
 			IIndexPtr.search
+			IIndexPtr.search_batch
 			
 			IDenseIndexPtr
 			IDenseIndexPtr.search
+			IDenseIndexPtr.search_batch
 			IDenseIndexPtr.size
 			IDenseIndexPtr.descriptorByIndex
 			
@@ -1307,6 +1713,7 @@ PYBIND11_MODULE(FaceEngine, f) {
 			IDynamicIndexPtr.saveToDynamicIndex
 			IDynamicIndexPtr.countOfIndexedDescriptors
 			IDynamicIndexPtr.search
+			IDynamicIndexPtr.search_batch
 			IDynamicIndexPtr.size
 			IDynamicIndexPtr.descriptorByIndex
 			IDynamicIndexPtr.search
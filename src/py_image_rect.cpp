@@ -7,6 +7,7 @@
 #include "FaceEngineAdapter.hpp"
 #include "SettingsProviderAdapter.hpp"
 #include "helpers.hpp"
+#include "NumpyAdapter.hpp"
 
 namespace py = pybind11;
 
@@ -98,10 +99,19 @@ py::enum_<fsdk::Format::Type>(f, "FormatType", "Format type enumeration.\n")
 		"\t 4:2:0 format with a plane of 8-bit Y samples followed by interleaved 2x2 subsampled V/U 8-bit chroma samples;")
 	;
 
-py::class_<fsdk::Image>(f, "Image",
+py::class_<fsdk::Image>(f, "Image", py::buffer_protocol(),
 	"Image objects\n"
+	"\tImage supports buffer protocol, so numpy.asarray(image) or memoryview(image) give access to image data\n"
+	"\twithout copying. Such view is valid until the image is reloaded or destroyed, use getData to get\n"
+	"\ta view that owns a reference to image data.\n"
 	"More detailed description see in FaceEngineSDK_Handbook.pdf or source C++ interface.\n")
 	.def(py::init<>())
+	.def(py::init([](int width, int height, fsdk::Format::Type type) {
+			return fsdk::Image(width, height, fsdk::Format(type));
+		}), py::arg("width"), py::arg("height"), py::arg("format"),
+		"Allocates image of given size and format. Image data is not initialized, it can be filled through\n"
+		"\tthe view returned by getData, e.g. cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=image.getData()).\n")
+	.def_buffer(&imageBufferInfo)
 	.def("getWidth", &fsdk::Image::getWidth)
 	.def("getHeight", &fsdk::Image::getHeight)
 	.def("isValid", &fsdk::Image::isValid)
@@ -114,23 +124,26 @@ py::class_<fsdk::Image>(f, "Image",
 		"Image rectangle.\n"
 		"\tResulting rectangle top left corner is always at (0, 0).\n")
 	
-	.def("getData", [](const fsdk::Image& image) {
-		fsdk::Format type = fsdk::Format::Type(image.getFormat());
-		int c = type.getChannelCount();
-		const auto* const data_uint = image.getDataAs<uint8_t>();
-		std::array<ssize_t, 3> shape { image.getHeight(), image.getWidth(), c };
-		auto ptr = data_uint;
-		return py::array(shape, ptr);
-	}, "\tReturns image as numpy array.\n")
+	.def("getData", [](py::object self, bool copy) {
+		// a borrowed image is kept alive together with its array by this object
+		return imageToArray(self.cast<const fsdk::Image&>(), copy, self);
+	}, py::arg("copy") = false,
+		"\tReturns image as numpy array.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (bool): copy image data, by default numpy array is a view of image data without copying\n"
+		"\tReturns:\n"
+		"\t\t(numpy.array): array with shape (height, width, channels), dtype is uint16 for R16 format and\n"
+		"\t\t\tuint8 for others. Padding bytes of X8 formats are skipped by strides. YUV_NV21 image is returned\n"
+		"\t\t\tas array with shape (height * 3 / 2, width). The view keeps image data alive, but changes\n"
+		"\t\t\tof the view are visible in the image and vice versa.\n")
 	
-	.def("getDataR16", [](const fsdk::Image& image) {
-		fsdk::Format type = fsdk::Format::R16;
-		int c = type.getChannelCount();
-		const auto* const data_uint = image.getDataAs<uint16_t>();
-		std::array<ssize_t, 3> shape { image.getHeight(), image.getWidth(), c };
-		auto ptr = data_uint;
-		return py::array(shape, ptr);
-	}, "\tReturns image as numpy array.\n")
+	.def("getDataR16", [](py::object self, bool copy) {
+		const fsdk::Image& image = self.cast<const fsdk::Image&>();
+		if (fsdk::Format::Type(image.getFormat()) != fsdk::Format::R16)
+			throw py::value_error("getDataR16: image format must be R16");
+		return imageToArray(image, copy, self);
+	}, py::arg("copy") = false,
+		"\tReturns R16 image as numpy array of uint16, see getData.\n")
 	
 	.def("getChannelCount", [](const fsdk::Image& image) {
 		fsdk::Format type = fsdk::Format::Type(image.getFormat());
@@ -170,18 +183,79 @@ py::class_<fsdk::Image>(f, "Image",
 	}, "\tReturns true if image format is one of valid types, i.e. not Unknown.\n")
 	
 	.def("setData", [](fsdk::Image& image, py::array npImage, fsdk::Format::Type type) {
-		auto size = npImage.shape();
-		
-		fsdk::Result<fsdk::Image::Error> error = image.set((int)size[1], (int)size[0], fsdk::Format(type), npImage.data());
+		fsdk::Image result;
+		bool borrowed = false;
+		fsdk::Result<fsdk::Image::Error> error = imageFromArray(npImage, fsdk::Format(type), false, result, borrowed);
+		if (error.isOk())
+			image = result;
 		return ImageErrorResult(error);
 	}, "\n\tSet image by numpy array. Please point format. example: \n"
 		"\t\timage.setData(numpy_array, FaceEngine.FormatType.R8G8B8X8)\n"
-		"\t\tThis method is unsafe. The responsibility for correct buffer lies on the user.\n")
+		"\t\tData is always copied. Dtype, shape and strides of the array are checked against the format, see fromArray.\n"
+		"\tReturns:\n"
+		"\t\t(ImageErrorResult): InvalidFormat for wrong dtype, InvalidDataSize for wrong shape.\n")
 	
 	.def("setYUVData", [](fsdk::Image& image, int width, int height, py::array yuvBlob, fsdk::Format::Type type) {
-		fsdk::Result<fsdk::Image::Error> error = image.set((int)width, (int)height, fsdk::Format(type), yuvBlob.data());
+		fsdk::Image result;
+		bool borrowed = false;
+		fsdk::Result<fsdk::Image::Error> error = reshapeImageArray(yuvBlob, fsdk::Format(type), width, height);
+		if (error.isOk())
+			error = imageFromArray(yuvBlob, fsdk::Format(type), false, result, borrowed);
+		if (error.isOk() && (result.getWidth() != width || result.getHeight() != height))
+			error = fsdk::makeResult(fsdk::Image::Error::InvalidDataSize);
+		if (error.isOk())
+			image = result;
 		return ImageErrorResult(error);
-	})
+	}, "\n\tSet image by YUV data. Data is always copied.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (int): image width\n"
+		"\t\tparam2 (int): image height\n"
+		"\t\tparam3 (numpy.array): flat array of uint8 with size width * height * 3 / 2 or array\n"
+		"\t\t\twith shape (height * 3 / 2, width)\n"
+		"\t\tparam4 (FormatType): format, usually YUV_NV21\n"
+		"\tReturns:\n"
+		"\t\t(ImageErrorResult): InvalidDataSize if size of data does not correspond to width and height.\n")
+	
+	.def_static("fromArray", [](py::object data, fsdk::Format::Type type, bool borrow, int width, int height) {
+		// numpy takes bytes as a single string item, other buffers are viewed as arrays by their buffer format
+		if (!py::isinstance<py::array>(data)) {
+			PyObject* view = PyMemoryView_FromObject(data.ptr());
+			if (!view) {
+				PyErr_Clear();
+				throw py::type_error("fromArray: object does not support buffer protocol");
+			}
+			data = py::reinterpret_steal<py::object>(view);
+		}
+		py::array array = py::array::ensure(data);
+		if (!array)
+			throw py::type_error("fromArray: object does not support buffer protocol");
+		fsdk::Image image;
+		bool borrowed = false;
+		fsdk::Result<fsdk::Image::Error> error = reshapeImageArray(array, fsdk::Format(type), width, height);
+		if (error.isOk())
+			error = imageFromArray(array, fsdk::Format(type), borrow, image, borrowed);
+		py::object result = py::cast(image);
+		// borrowed memory belongs to the array, it must live as long as the image object
+		if (borrowed)
+			py::detail::keep_alive_impl(result, array);
+		return py::make_tuple(ImageErrorResult(error), result);
+	}, py::arg("array"), py::arg("format"), py::arg("borrow") = true, py::arg("width") = 0, py::arg("height") = 0,
+		"Creates image from numpy array or any object supporting buffer protocol (bytes, bytearray).\n"
+		"\tDtype must be uint16 for R16 and uint8 for other formats. Shape must be (height, width, channels),\n"
+		"\twhere channels is channel count or channel step of the format (with padding), (height, width) for\n"
+		"\tsingle channel formats and (height * 3 / 2, width) for YUV_NV21. Flat buffers are reshaped using width and height.\n"
+		"\tIf borrow is true and the array is writeable, C-contiguous and has channels with padding, the image\n"
+		"\twraps memory of the array without copying and keeps the array alive. Otherwise data is copied once.\n"
+		"\tNote: borrowed memory is not owned by the image. Calls keeping the image after returning (faces\n"
+		"\treturned by detectors, asynchronous requests, TrackEngine stream pushFrame) copy borrowed images.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (numpy.array): source data\n"
+		"\t\tparam2 (FormatType): image format\n"
+		"\t\tparam3 (bool): wrap array memory without copying if possible\n"
+		"\t\tparam4 (int): image width, used only for flat buffers\n"
+		"\t\tparam5 (int): image height, used only for flat buffers\n"
+		"\tReturns:\n"
+		"\t\t(tuple): tuple with ImageErrorResult and image\n")
 
 	.def("save", [](const fsdk::Image& image, const char* path) {
 		fsdk::Result<fsdk::Image::Error> error = image.save(path);
@@ -5,9 +5,129 @@
 #include <pybind11/numpy.h>
 #include "ErrorsAdapter.hpp"
 #include "FaceEngineAdapter.hpp"
+#include "ThreadPool.hpp"
+#include "MappedIndex.hpp"
+#include "ShardedIndex.hpp"
+#include "LoggedIndex.hpp"
+#include "ConcurrentIndex.hpp"
+#include "IndexFilter.hpp"
+
+#include <algorithm>
+#include <limits>
+#include <mutex>
 
 namespace py = pybind11;
 
+// Searches every descriptor of references batch in parallel and writes results directly into
+// (count x maxResultsCount) matrices. Missing results have index -1 and NaN similarity.
+template<typename IndexPtr>
+std::tuple<FSDKErrorResult, py::array_t<int64_t>, py::array_t<float>> searchBatch(
+	const IndexPtr& indexPtr,
+	const fsdk::IDescriptorBatchPtr& references,
+	const int maxResultsCount,
+	uint32_t threadCount) {
+	if (maxResultsCount <= 0)
+		return std::make_tuple(
+			FSDKErrorResult(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::InvalidInput)),
+			py::array_t<int64_t>(),
+			py::array_t<float>());
+	
+	const size_t count = references->getCount();
+	const size_t k = static_cast<size_t>(maxResultsCount);
+	const std::vector<py::ssize_t> shape{static_cast<py::ssize_t>(count), maxResultsCount};
+	py::array_t<int64_t> indices(shape);
+	py::array_t<float> similarity(shape);
+	int64_t* indicesData = indices.mutable_data();
+	float* similarityData = similarity.mutable_data();
+	fsdk::Result<fsdk::FSDKError> err(fsdk::FSDKError::Ok);
+	{
+		py::gil_scoped_release release;
+		std::mutex errorMutex;
+		parallelForBlocks(count, threadCount, [&](size_t begin, size_t end) {
+			// results of every thread are kept between calls, so the pool searches without allocations
+			static thread_local std::vector<fsdk::SearchResult> results;
+			results.resize(k);
+			for (size_t i = begin; i < end; ++i) {
+				fsdk::IDescriptorPtr reference = fsdk::acquire(references->getDescriptorFast(static_cast<uint32_t>(i)));
+				if (!reference) {
+					std::lock_guard<std::mutex> lock(errorMutex);
+					err = fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Internal);
+					return;
+				}
+				fsdk::ResultValue<fsdk::FSDKError, int> searchErr = indexPtr->search(
+					reference,
+					maxResultsCount,
+					results.data());
+				if (searchErr.isError()) {
+					std::lock_guard<std::mutex> lock(errorMutex);
+					err = searchErr;
+					return;
+				}
+				const size_t found = static_cast<size_t>(searchErr.getValue());
+				for (size_t j = 0; j < k; ++j) {
+					indicesData[i * k + j] = j < found ? static_cast<int64_t>(results[j].index) : -1;
+					similarityData[i * k + j] = j < found ?
+						results[j].similarity :
+						std::numeric_limits<float>::quiet_NaN();
+				}
+			}
+		});
+	}
+	if (err.isError())
+		return std::make_tuple(FSDKErrorResult(err), py::array_t<int64_t>(), py::array_t<float>());
+	return std::make_tuple(FSDKErrorResult(err), indices, similarity);
+}
+
+static const char* searchBatchDoc =
+	"Search for descriptors with the shorter distance to every descriptor of batch.\n"
+	"\tQueries are split into blocks searched in parallel by the calling thread and the pool of threads shared\n"
+	"\tby the module, the GIL is released for the whole call. Results are written directly into numpy matrices.\n"
+	"\tArgs:\n"
+	"\t\tparam1 (IDescriptorBatchPtr): Descriptors to match against index, Q descriptors.\n"
+	"\t\tparam2 (int): Maximum count of results K per descriptor.\n"
+	"\t\tparam3 (int): number of threads. If 0 - use the number of hardware threads\n"
+	"\tReturns:\n"
+	"\t\t(tuple): tuple with FSDKErrorResult and two matrices of shape (Q, K):\n"
+	"\t\t\tindices (int64) of found descriptors and their similarity (float32).\n"
+	"\t\t\tIf less than K descriptors are found, the rest of row is filled with -1 and NaN.\n";
+
+// Searches descriptors allowed by filter and copies results to python, see filteredSearch
+template<typename IndexPtr>
+std::tuple<FSDKErrorResult, std::vector<fsdk::SearchResult>> searchFiltered(
+	const IndexPtr& indexPtr,
+	size_t size,
+	const SharedBitset& allowed,
+	const PyIndexFilter& filter,
+	const fsdk::IDescriptorPtr& reference,
+	const int maxResultsCount) {
+	std::vector<fsdk::SearchResult> searchResults(std::max(maxResultsCount, 0));
+	fsdk::ResultValue<fsdk::FSDKError, int> err = filteredSearch(
+		indexPtr,
+		size,
+		allowed,
+		filter.getFaceEngine(),
+		reference,
+		maxResultsCount,
+		searchResults.data());
+	if (err.isOk()) {
+		searchResults.resize(static_cast<size_t>(err.getValue()));
+		return std::make_tuple(FSDKErrorResult(err), std::move(searchResults));
+	}
+	return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
+}
+
+static const char* searchFilteredDoc =
+	"Search for descriptors allowed by filter with the shorter distance to passed descriptor.\n"
+	"\tIf the filter allows few ids, their descriptors are matched exactly, otherwise the index is searched\n"
+	"\tfor more results until maxResultsCount of them pass the filter. Ids of descriptors removed from a dynamic\n"
+	"\tindex must be cleared out of filters, e.g. by DescriptorTags.clear, ConcurrentDynamicIndex skips them itself.\n"
+	"\tArgs:\n"
+	"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
+	"\t\tparam2 (int): Maximum count of results.\n"
+	"\t\tparam3 (IndexFilter): ids to search among.\n"
+	"\tReturns:\n"
+	"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults\n";
+
 void index_module(py::module& f) {
 	// Index
 	py::class_<fsdk::IIndexPtr>(f, "IIndexPtr", "Some data structure optimized for search queries.\n")
@@ -27,7 +147,7 @@ void index_module(py::module& f) {
 				} else {
 					return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
 				}
-				},
+				}, py::call_guard<py::gil_scoped_release>(),
 			"Search for descriptors with the shorter distance to passed descriptor.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
@@ -36,6 +156,12 @@ void index_module(py::module& f) {
 			"\tReturns:\n"
 			"\t\t(tuple of FSDKErrorResult and list of SearchResults): \n"
 			"\t\t\ttuple with FSDKErrorResult and list of SearchResults\n")
+		
+		.def("search_batch", &searchBatch<fsdk::IIndexPtr>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
 				;
 	
 	py::class_<fsdk::IDenseIndexPtr>(f, "IDenseIndexPtr", "Dense (read only) index.\n")
@@ -56,7 +182,7 @@ void index_module(py::module& f) {
 					} else {
 						return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
 					}
-				},
+				}, py::call_guard<py::gil_scoped_release>(),
 			"Search for descriptors with the shorter distance to passed descriptor.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
@@ -65,6 +191,24 @@ void index_module(py::module& f) {
 			"\tReturns:\n"
 			"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults,\n")
 		
+		.def("search", [](
+			const fsdk::IDenseIndexPtr& indexPtr,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount,
+			const PyIndexFilter& filter) {
+				return searchFiltered(indexPtr, indexPtr->size(), filter.getIds(), filter, reference, maxResultsCount);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			py::arg("filter"),
+			searchFilteredDoc)
+		
+		.def("search_batch", &searchBatch<fsdk::IDenseIndexPtr>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
+		
 		.def("size", [](
 			const fsdk::IDenseIndexPtr& indexPtr) {
 			return indexPtr->size();
@@ -90,12 +234,16 @@ void index_module(py::module& f) {
 			"\t\t\tMore detailed description see in FaceEngineSDK_Handbook.pdf or source C++ interface.\n")
 			; // IDenseIndexPtr
 		
-	py::class_<fsdk::IDynamicIndexPtr>(f, "IDynamicIndexPtr", "Dynamic index")
+	py::class_<fsdk::IDynamicIndexPtr>(f, "IDynamicIndexPtr",
+		"Dynamic index.\n"
+		"\tSearch, append and save calls release the GIL while the index is busy, so a dynamic index\n"
+		"\tshared between python threads must not be modified while it is being searched.\n")
 		
 		.def("saveToDenseIndex", [](const fsdk::IDynamicIndexPtr& dynamicIndex, const char* path) {
 			fsdk::Result<fsdk::FSDKError> err = dynamicIndex->saveToDenseIndex(path);
 			return FSDKErrorResult(err);
-		}, "Saves index as dense. To load saved index use @see loadDenseIndex method.\n"
+		}, py::call_guard<py::gil_scoped_release>(),
+		"Saves index as dense. To load saved index use @see loadDenseIndex method.\n"
 			"\tDense index cannot be loaded as dynamic.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (str): Path to file to be created and filled with index data.\n"
@@ -106,7 +254,8 @@ void index_module(py::module& f) {
 		.def("saveToDynamicIndex", [](const fsdk::IDynamicIndexPtr& indexPtr, const char* path) {
 			fsdk::Result<fsdk::FSDKError> err = indexPtr->saveToDynamicIndex(path);
 			return FSDKErrorResult(err);
-		}, "Saves index as dynamic. To load saved index use @see loadDynamicIndex method.\n"
+		}, py::call_guard<py::gil_scoped_release>(),
+		"Saves index as dynamic. To load saved index use @see loadDynamicIndex method.\n"
 			"\tDynamic index cannot be loaded as dense.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (str): Path to file to be created and filled with index data.\n"
@@ -145,7 +294,7 @@ void index_module(py::module& f) {
 				} else {
 					return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
 				}
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Search for descriptors with the shorter distance to passed descriptor.\n"
 			"\tArgs:\n"
 			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
@@ -155,6 +304,24 @@ void index_module(py::module& f) {
 			"\t\t(tuple of FSDKErrorResult and list): \n"
 			"\t\t\ttuple with FSDKErrorResult and list of SearchResults\n")
 		
+		.def("search", [](
+			const fsdk::IDynamicIndexPtr& indexPtr,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount,
+			const PyIndexFilter& filter) {
+				return searchFiltered(indexPtr, indexPtr->size(), filter.getIds(), filter, reference, maxResultsCount);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			py::arg("filter"),
+			searchFilteredDoc)
+		
+		.def("search_batch", &searchBatch<fsdk::IDynamicIndexPtr>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
+		
 		.def("size", [](
 			const fsdk::IDynamicIndexPtr& indexPtr) {
 			return indexPtr->size();
@@ -194,7 +361,7 @@ void index_module(py::module& f) {
 			const fsdk::IDescriptorBatchPtr batch) {
 				fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> err = index->appendBatch(batch);
 				return FSDKErrorValueInt(err);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Appends batch of descriptors to internal storage.\n"
 			"\t\tparam1 (batch): Batch of descriptors with correct length, version and data\n"
 			"\tReturns:\n"
@@ -234,7 +401,8 @@ void index_module(py::module& f) {
 				return std::make_tuple(FSDKErrorResult(fsdk::makeResult(res.getError())), fsdk::acquire(res.getValue()));
 			else
 				return std::make_tuple(FSDKErrorResult(fsdk::makeResult(res.getError())), fsdk::IDynamicIndexPtr());
-		}, "Builds index with every descriptor appended. Blocks until completed.\n"
+		}, py::call_guard<py::gil_scoped_release>(),
+		"Builds index with every descriptor appended. Blocks until completed.\n"
 			"\t\t Is very heavy method in terms of computing load.\n")
 		
 		.def("appendDescriptor", [](const fsdk::IIndexBuilderPtr& indexBuilderPtr, const fsdk::IDescriptorPtr batch){
@@ -255,7 +423,7 @@ void index_module(py::module& f) {
 			const fsdk::IDescriptorBatchPtr batch) {
 				fsdk::ResultValue<fsdk::FSDKError, fsdk::DescriptorId> err = indexBuilderPtr->appendBatch(batch);
 				return FSDKErrorValueInt(err);
-			},
+			}, py::call_guard<py::gil_scoped_release>(),
 			"Appends batch of descriptors to internal storage.\n"
 			"\t\tparam1 (batch): Batch of descriptors with correct length, version and data\n"
 			"\tReturns:\n"
@@ -302,4 +470,580 @@ void index_module(py::module& f) {
 			"\t\t(tuple of FSDKErrorResult and descriptor):tuple with FSDKErrorResult and descriptor\n"
 			"\t\tMore detailed description see in FaceEngineSDK_Handbook.pdf or source C++ interface.\n")
 				;
+
+	py::class_<PyMappedIndex, std::shared_ptr<PyMappedIndex>>(f, "MappedDenseIndex",
+		"Read-only index mapped from a file saved by PyIFaceEngine.saveDenseIndexMmap.\n"
+		"\tThe file is mapped read-only, so its pages are shared by all processes loading it and loading does\n"
+		"\tnot read descriptors. Search is an exact linear scan: descriptors are read from the mapping in chunks\n"
+		"\tand matched with the query by the matcher of their version, nothing is kept between searches.\n"
+		"\tChecksum of descriptors is validated by verify or by loadDenseIndexMmap with verify set.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyMappedIndex>& index,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount,
+			uint32_t threadCount) {
+				std::vector<fsdk::SearchResult> searchResults(std::max(maxResultsCount, 0));
+				fsdk::ResultValue<fsdk::FSDKError, int> err = index->search(
+					reference,
+					maxResultsCount,
+					searchResults.data(),
+					threadCount);
+				if (err.isOk()) {
+					searchResults.resize(static_cast<size_t>(err.getValue()));
+					return std::make_tuple(FSDKErrorResult(err), std::move(searchResults));
+				}
+				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			"Search for descriptors with the shorter distance to passed descriptor.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
+			"\t\tparam2 (int): Maximum count of results.\n"
+			"\t\tparam3 (int): number of threads scanning descriptors. If 0 - use the number of hardware threads\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults\n"
+			"\t\t\tsorted by similarity.\n")
+
+		.def("search_batch", &searchBatch<std::shared_ptr<PyMappedIndex>>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
+
+		.def("size", &PyMappedIndex::size, "Return count of descriptors.\n")
+
+		.def("getDescriptorVersion", &PyMappedIndex::getDescriptorVersion, "Return version of descriptors.\n")
+
+		.def("descriptorByIndex", [](
+			const std::shared_ptr<PyMappedIndex>& index,
+			const fsdk::DescriptorId id,
+			const fsdk::IDescriptorPtr& descriptorPtr) {
+				fsdk::Result<fsdk::FSDKError> err = index->descriptorByIndex(id, descriptorPtr);
+				if (err.isOk())
+					return std::make_tuple(FSDKErrorResult(err), descriptorPtr);
+				return std::make_tuple(FSDKErrorResult(err), fsdk::IDescriptorPtr());
+			},
+			"Requests descriptor data out of the mapped file.\n"
+			"\t\tparam1 (index): Identification value of descriptor. Must be less than size().\n"
+			"\t\tparam2 (descriptor): created descriptor object of the index version.\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and descriptor):tuple with FSDKErrorResult and descriptor\n")
+
+		.def("verify", [](const std::shared_ptr<PyMappedIndex>& index) {
+				return FSDKErrorResult(index->verify());
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Validate checksum of descriptors. It reads the whole file once, later calls return the saved result.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): InvalidInput if the file is corrupted\n")
+
+		.def("toNumpy", [](const std::shared_ptr<PyMappedIndex>& index) {
+				// the capsule keeps the mapping alive while the array exists
+				py::capsule owner(
+					new std::shared_ptr<PyMappedIndex>(index),
+					[](void* ptr) { delete static_cast<std::shared_ptr<PyMappedIndex>*>(ptr); });
+				const py::ssize_t size = index->getDescriptorSize();
+				py::array_t<uint8_t> matrix(
+					std::vector<py::ssize_t>{static_cast<py::ssize_t>(index->size()), size},
+					std::vector<py::ssize_t>{size, 1},
+					index->getDescriptorData(0),
+					owner);
+				matrix.attr("setflags")(py::arg("write") = false);
+				return matrix;
+			},
+			"Get read-only view of descriptors without copying.\n"
+			"\tReturns:\n"
+			"\t\t(numpy.ndarray): uint8 matrix of shape (size, descriptor size) backed by the mapped file,\n"
+			"\t\t\trows are accepted by IDescriptorBatchPtr.fromNumpy.\n")
+			; // MappedDenseIndex
+
+	py::class_<PyShardedIndex, std::shared_ptr<PyShardedIndex>>(f, "ShardedIndex",
+		"Index partitioned into several dynamic indexes (shards) built by their own index builders.\n"
+		"\tCreate with PyIFaceEngine.buildShardedIndex or loadShardedIndex. Descriptors have global ids which\n"
+		"\tdo not depend on the shard keeping them. A query is searched by every shard on the pool of the index\n"
+		"\tand results of shards are merged. Like IDynamicIndex, it must not be modified while it is being searched.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyShardedIndex>& index,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount) {
+				std::vector<fsdk::SearchResult> searchResults(std::max(maxResultsCount, 0));
+				fsdk::ResultValue<fsdk::FSDKError, int> err = index->search(
+					reference,
+					maxResultsCount,
+					searchResults.data(),
+					true);
+				if (err.isOk()) {
+					searchResults.resize(static_cast<size_t>(err.getValue()));
+					return std::make_tuple(FSDKErrorResult(err), std::move(searchResults));
+				}
+				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			"Search for descriptors with the shorter distance to passed descriptor in all shards in parallel.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
+			"\t\tparam2 (int): Maximum count of results. It is upper bound value, it\n"
+			"\t\t\tdoes not guarantee to return exactly this amount of results.\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults\n"
+			"\t\t\twith global ids sorted by similarity.\n")
+
+		.def("search_batch", &searchBatch<std::shared_ptr<PyShardedIndex>>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
+
+		.def("size", &PyShardedIndex::size,
+			"Returns count of global ids. Removed descriptors are counted like in IDynamicIndex.size.\n")
+
+		.def("countOfIndexedDescriptors", &PyShardedIndex::countOfIndexedDescriptors,
+			"Returns count of searchable descriptors of all shards.\n")
+
+		.def("getShardCount", &PyShardedIndex::getShardCount, "Returns count of shards.\n")
+
+		.def("getShardSizes", &PyShardedIndex::getShardSizes, "Returns list with count of descriptors stored by every shard.\n")
+
+		.def("descriptorByIndex", [](
+			const std::shared_ptr<PyShardedIndex>& index,
+			const fsdk::DescriptorId id,
+			const fsdk::IDescriptorPtr& descriptorPtr) {
+				fsdk::Result<fsdk::FSDKError> err = index->descriptorByIndex(id, descriptorPtr);
+				if (err.isOk())
+					return std::make_tuple(FSDKErrorResult(err), descriptorPtr);
+				return std::make_tuple(FSDKErrorResult(err), fsdk::IDescriptorPtr());
+			},
+			"Requests descriptor data out of the shard keeping it.\n"
+			"\t\tparam1 (index): Global id of descriptor. Must be less than size().\n"
+			"\t\tparam2 (descriptor): created descriptor object with correctly set\n"
+			"\t\t\tversion and length. Only changes data of passed descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and descriptor):tuple with FSDKErrorResult and descriptor\n")
+
+		.def("appendDescriptor", [](
+			const std::shared_ptr<PyShardedIndex>& index,
+			const fsdk::IDescriptorPtr& descriptor) {
+				return FSDKErrorValueInt(index->appendDescriptor(descriptor));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Appends descriptor to the smallest shard.\n"
+			"\t\tparam1 (descriptor): created descriptor with correct length, version and data\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorValueInt): One of the error codes specified by FSDKError and global id\n"
+			"\t\t\tof appended descriptor.\n")
+
+		.def("appendBatch", [](
+			const std::shared_ptr<PyShardedIndex>& index,
+			const fsdk::IDescriptorBatchPtr& batch) {
+				return FSDKErrorValueInt(index->appendBatch(batch));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Appends batch of descriptors. The batch is split between the smallest shards appended in parallel.\n"
+			"\t\tparam1 (batch): Batch of descriptors with correct length, version and data\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorValueInt): One of the error codes specified by FSDKError and global id\n"
+			"\t\t\tof the first appended descriptor. Other descriptors from batch get the following ids\n"
+			"\t\t\tin the same order as they are in the batch. Nothing is appended on error.\n")
+
+		.def("removeDescriptor", [](
+			const std::shared_ptr<PyShardedIndex>& index,
+			const fsdk::DescriptorId id) {
+				return FSDKErrorResult(index->removeDescriptor(id));
+			},
+			"Removes descriptor out of search. Like in IDynamicIndex, its global id is not reused.\n"
+			"\t\tparam1 (index): Global id of descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): One of the error codes specified by FSDKError\n")
+
+		.def("save", [](
+			const std::shared_ptr<PyShardedIndex>& index,
+			const std::string& directory) {
+				return FSDKErrorResult(index->save(directory));
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("directory"),
+			"Saves shards as dynamic indexes in parallel and a manifest with global ids to directory.\n"
+			"\t\tThe directory is created if it does not exist, files of a previously saved index are overwritten.\n"
+			"\t\tTo load saved index use PyIFaceEngine.loadShardedIndex.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (str): Path to directory.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): One of the error codes specified by FSDKErrorResult\n")
+			; // ShardedIndex
+
+	py::class_<PyLoggedIndex, std::shared_ptr<PyLoggedIndex>>(f, "LoggedDynamicIndex",
+		"Dynamic index saved incrementally as a snapshot and a log of operations made after it.\n"
+		"\tCreate with PyIFaceEngine.createLoggedIndex or loadLoggedIndex. Every append and remove is written\n"
+		"\tto the log <path>.log when it is applied, loading replays the log over the snapshot at <path>.\n"
+		"\tCompaction saves a new snapshot and clears the log, it blocks appends and removes but not searches.\n"
+		"\tLike IDynamicIndex, it must not be modified while it is being searched.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyLoggedIndex>& index,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount) {
+				std::vector<fsdk::SearchResult> searchResults(std::max(maxResultsCount, 0));
+				fsdk::ResultValue<fsdk::FSDKError, int> err = index->search(
+					reference,
+					maxResultsCount,
+					searchResults.data());
+				if (err.isOk()) {
+					searchResults.resize(static_cast<size_t>(err.getValue()));
+					return std::make_tuple(FSDKErrorResult(err), std::move(searchResults));
+				}
+				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			"Search for descriptors with the shorter distance to passed descriptor.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
+			"\t\tparam2 (int): Maximum count of results. It is upper bound value, it\n"
+			"\t\t\tdoes not guarantee to return exactly this amount of results.\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults\n")
+
+		.def("search_batch", &searchBatch<std::shared_ptr<PyLoggedIndex>>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
+
+		.def("size", &PyLoggedIndex::size, "Returns size of internal storage.\n")
+
+		.def("countOfIndexedDescriptors", &PyLoggedIndex::countOfIndexedDescriptors,
+			"Returns count of indexed descriptors, see IDynamicIndexPtr.countOfIndexedDescriptors.\n")
+
+		.def("descriptorByIndex", [](
+			const std::shared_ptr<PyLoggedIndex>& index,
+			const fsdk::DescriptorId id,
+			const fsdk::IDescriptorPtr& descriptorPtr) {
+				fsdk::Result<fsdk::FSDKError> err = index->descriptorByIndex(id, descriptorPtr);
+				return std::make_tuple(FSDKErrorResult(err), descriptorPtr);
+			},
+			"Requests descriptor data out of internal storage.\n"
+			"\t\tparam1 (index): Identification value of descriptor. Must be less than size().\n"
+			"\t\tparam2 (descriptor): created descriptor object with correctly set\n"
+			"\t\tversion and length. Only changes data of passed descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and descriptor): tuple with FSDKErrorResult and descriptor\n")
+
+		.def("appendDescriptor", [](
+			const std::shared_ptr<PyLoggedIndex>& index,
+			const fsdk::IDescriptorPtr& descriptor) {
+				return FSDKErrorValueInt(index->appendDescriptor(descriptor));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Appends descriptor to internal storage and writes it to the log.\n"
+			"\t\tparam1 (descriptor): created descriptor with correct length, version and data\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorValueInt): One of the error codes specified by FSDKError and identification\n"
+			"\t\t\tof appended descriptor. If the log can not be written, the descriptor is removed again,\n"
+			"\t\t\tInternal error is returned and next modifications fail until compact succeeds.\n")
+
+		.def("appendBatch", [](
+			const std::shared_ptr<PyLoggedIndex>& index,
+			const fsdk::IDescriptorBatchPtr& batch) {
+				return FSDKErrorValueInt(index->appendBatch(batch));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Appends batch of descriptors to internal storage and writes them to the log as one record.\n"
+			"\t\tparam1 (batch): Batch of descriptors with correct length, version and data\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorValueInt): One of the error codes specified by FSDKError and identification\n"
+			"\t\t\tof the first appended descriptor, other ones follow it in order of the batch.\n"
+			"\t\t\tIf the log can not be written, the descriptors are removed again as by appendDescriptor.\n")
+
+		.def("removeDescriptor", [](
+			const std::shared_ptr<PyLoggedIndex>& index,
+			const fsdk::DescriptorId id) {
+				return FSDKErrorResult(index->removeDescriptor(id));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Writes the removal to the log and removes descriptor out of graph.\n"
+			"\t\tparam1 (index): Identification of descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): One of the error codes specified by FSDKError\n")
+
+		.def("compact", [](
+			const std::shared_ptr<PyLoggedIndex>& index,
+			bool wait) {
+				if (wait)
+					return FSDKErrorResult(index->compact());
+				index->startCompaction();
+				return FSDKErrorResult(fsdk::Result<fsdk::FSDKError>(fsdk::FSDKError::Ok));
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("wait") = true,
+			"Saves the index as a new snapshot and clears the log.\n"
+			"\t\tThe snapshot and its directory are synced to the disk before the log is cleared.\n"
+			"\t\tAppends and removes wait for compaction, searches run while it is saving.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (bool): wait for compaction. Otherwise it is started on a background thread unless\n"
+			"\t\t\ta background compaction is running, use waitCompaction to get its result.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): One of the error codes specified by FSDKError, Ok if not waited\n")
+
+		.def("waitCompaction", [](const std::shared_ptr<PyLoggedIndex>& index) {
+				return FSDKErrorResult(index->waitCompaction());
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Waits for the last background compaction.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): result of the compaction, Ok if there was none\n")
+
+		.def("getLogSize", &PyLoggedIndex::getLogSize, "Returns size of the log in bytes.\n")
+			; // LoggedDynamicIndex
+
+	py::class_<PyConcurrentIndexSnapshot, std::shared_ptr<PyConcurrentIndexSnapshot>>(f, "ConcurrentDynamicIndexSnapshot",
+		"Immutable state of ConcurrentDynamicIndex taken by ConcurrentDynamicIndex.snapshot.\n"
+		"\tIt sees every append and remove finished before it was taken and none of the later ones,\n"
+		"\tso several queries may be searched against the same state while the index is modified.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyConcurrentIndexSnapshot>& snapshot,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount) {
+				std::vector<fsdk::SearchResult> searchResults(std::max(maxResultsCount, 0));
+				fsdk::ResultValue<fsdk::FSDKError, int> err = snapshot->search(
+					reference,
+					maxResultsCount,
+					searchResults.data());
+				if (err.isOk()) {
+					searchResults.resize(static_cast<size_t>(err.getValue()));
+					return std::make_tuple(FSDKErrorResult(err), std::move(searchResults));
+				}
+				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			"Search for not removed descriptors with the shorter distance to passed descriptor.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
+			"\t\tparam2 (int): Maximum count of results.\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults,\n"
+			"\t\t\tthe list is empty if the index has no descriptors.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyConcurrentIndexSnapshot>& snapshot,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount,
+			const PyIndexFilter& filter) {
+				SharedBitset allowed = filter.getIds();
+				allowed.subtract(snapshot->getRemoved());
+				return searchFiltered(snapshot, snapshot->size(), allowed, filter, reference, maxResultsCount);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			py::arg("filter"),
+			searchFilteredDoc)
+
+		.def("search_batch", &searchBatch<std::shared_ptr<PyConcurrentIndexSnapshot>>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			searchBatchDoc)
+
+		.def("size", &PyConcurrentIndexSnapshot::size, "Returns count of ids including removed descriptors.\n")
+
+		.def("countOfIndexedDescriptors", &PyConcurrentIndexSnapshot::countOfIndexedDescriptors,
+			"Returns count of not removed descriptors.\n")
+
+		.def("descriptorByIndex", [](
+			const std::shared_ptr<PyConcurrentIndexSnapshot>& snapshot,
+			const fsdk::DescriptorId id,
+			const fsdk::IDescriptorPtr& descriptorPtr) {
+				fsdk::Result<fsdk::FSDKError> err = snapshot->descriptorByIndex(id, descriptorPtr);
+				return std::make_tuple(FSDKErrorResult(err), descriptorPtr);
+			},
+			"Requests descriptor data out of internal storage.\n"
+			"\t\tparam1 (index): Identification value of descriptor. Must be less than size().\n"
+			"\t\tparam2 (descriptor): created descriptor object with correctly set\n"
+			"\t\tversion and length. Only changes data of passed descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and descriptor): tuple with FSDKErrorResult and descriptor\n")
+
+		.def("isRemoved", &PyConcurrentIndexSnapshot::isRemoved,
+			"Returns True if descriptor was removed by ConcurrentDynamicIndex.removeDescriptor.\n")
+
+		.def("getEpoch", &PyConcurrentIndexSnapshot::getEpoch,
+			"Returns count of appends and removes made before the snapshot was taken.\n")
+			; // ConcurrentDynamicIndexSnapshot
+
+	py::class_<PyConcurrentIndex, std::shared_ptr<PyConcurrentIndex>>(f, "ConcurrentDynamicIndex",
+		"Dynamic index which may be searched from several threads while it is modified.\n"
+		"\tCreate with PyIFaceEngine.createConcurrentIndex. Searches use the current snapshot of the index and\n"
+		"\tnever wait for appends and removes, ids appended or removed by a finished call are visible to all\n"
+		"\tsearches started after it. Appends and removes are serialized. Appended descriptors are searched\n"
+		"\tby matching until there are segmentSize of them, then they are built into a new dynamic index.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyConcurrentIndex>& index,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount) {
+				std::vector<fsdk::SearchResult> searchResults(std::max(maxResultsCount, 0));
+				fsdk::ResultValue<fsdk::FSDKError, int> err = index->search(
+					reference,
+					maxResultsCount,
+					searchResults.data());
+				if (err.isOk()) {
+					searchResults.resize(static_cast<size_t>(err.getValue()));
+					return std::make_tuple(FSDKErrorResult(err), std::move(searchResults));
+				}
+				return std::make_tuple(FSDKErrorResult(err), std::vector<fsdk::SearchResult>());
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			"Search for not removed descriptors with the shorter distance to passed descriptor.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (IDescriptorPtr): Descriptor to match against index.\n"
+			"\t\tparam2 (int): Maximum count of results.\n"
+			"\tReturns:\n"
+			"\t\t(tuple of FSDKErrorResult and list): tuple with FSDKErrorResult and list of SearchResults,\n"
+			"\t\t\tthe list is empty if the index has no descriptors.\n")
+
+		.def("search", [](
+			const std::shared_ptr<PyConcurrentIndex>& index,
+			const fsdk::IDescriptorPtr& reference,
+			const int maxResultsCount,
+			const PyIndexFilter& filter) {
+				const std::shared_ptr<PyConcurrentIndexSnapshot> snapshot = index->snapshot();
+				SharedBitset allowed = filter.getIds();
+				allowed.subtract(snapshot->getRemoved());
+				return searchFiltered(snapshot, snapshot->size(), allowed, filter, reference, maxResultsCount);
+			}, py::call_guard<py::gil_scoped_release>(),
+			py::arg("reference"),
+			py::arg("maxResultsCount"),
+			py::arg("filter"),
+			searchFilteredDoc)
+
+		.def("search_batch", &searchBatch<std::shared_ptr<PyConcurrentIndex>>,
+			py::arg("references"),
+			py::arg("maxResultsCount"),
+			py::arg("threadCount") = 0,
+			"Search for descriptors with the shorter distance to every descriptor of batch.\n"
+			"\tEvery query uses the current snapshot, search_batch of ConcurrentDynamicIndexSnapshot searches\n"
+			"\tall of them against the same state. See IDynamicIndexPtr.search_batch for arguments.\n")
+
+		.def("snapshot", &PyConcurrentIndex::snapshot, "Returns ConcurrentDynamicIndexSnapshot with the current state.\n")
+
+		.def("size", &PyConcurrentIndex::size, "Returns count of ids including removed descriptors.\n")
+
+		.def("countOfIndexedDescriptors", &PyConcurrentIndex::countOfIndexedDescriptors,
+			"Returns count of not removed descriptors.\n")
+
+		.def("descriptorByIndex", [](
+			const std::shared_ptr<PyConcurrentIndex>& index,
+			const fsdk::DescriptorId id,
+			const fsdk::IDescriptorPtr& descriptorPtr) {
+				fsdk::Result<fsdk::FSDKError> err = index->descriptorByIndex(id, descriptorPtr);
+				return std::make_tuple(FSDKErrorResult(err), descriptorPtr);
+			},
+			"Requests descriptor data out of internal storage.\n"
+			"\t\tparam1 (index): Identification value of descriptor. Must be less than size().\n"
+			"\t\tparam2 (descriptor): created descriptor object with correctly set\n"
+			"\t\tversion and length. Only changes data of passed descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(tuple with FSDKErrorResult and descriptor): tuple with FSDKErrorResult and descriptor\n")
+
+		.def("appendDescriptor", [](
+			const std::shared_ptr<PyConcurrentIndex>& index,
+			const fsdk::IDescriptorPtr& descriptor) {
+				return FSDKErrorValueInt(index->appendDescriptor(descriptor));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Appends a copy of descriptor, it is visible to searches started after the call returns.\n"
+			"\t\tparam1 (descriptor): created descriptor with correct length, version and data\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorValueInt): One of the error codes specified by FSDKError and identification\n"
+			"\t\t\tof appended descriptor. All appended descriptors must have the same version.\n")
+
+		.def("appendBatch", [](
+			const std::shared_ptr<PyConcurrentIndex>& index,
+			const fsdk::IDescriptorBatchPtr& batch) {
+				return FSDKErrorValueInt(index->appendBatch(batch));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Appends a copy of batch, its descriptors become visible to searches at once.\n"
+			"\t\tparam1 (batch): Batch of descriptors with correct length, version and data\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorValueInt): One of the error codes specified by FSDKError and identification\n"
+			"\t\t\tof the first appended descriptor, other ones follow it in order of the batch.\n")
+
+		.def("removeDescriptor", [](
+			const std::shared_ptr<PyConcurrentIndex>& index,
+			const fsdk::DescriptorId id) {
+				return FSDKErrorResult(index->removeDescriptor(id));
+			}, py::call_guard<py::gil_scoped_release>(),
+			"Removes descriptor from search, searches started after the call returns do not find it.\n"
+			"\t\tparam1 (index): Identification of descriptor.\n"
+			"\tReturns:\n"
+			"\t\t(FSDKErrorResult): One of the error codes specified by FSDKError\n")
+
+		.def("getSegmentCount", &PyConcurrentIndex::getSegmentCount,
+			"Returns count of built and pending segments searched by the index.\n")
+			; // ConcurrentDynamicIndex
+
+	py::class_<PyIndexFilter, std::shared_ptr<PyIndexFilter>>(f, "IndexFilter",
+		"Immutable set of descriptor ids passed to search of an index to restrict results to them.\n"
+		"\tCreate with DescriptorTags.filter or PyIFaceEngine.createIndexFilter. Filters are combined\n"
+		"\twith operators & (intersection), | (union) and - (difference).\n")
+
+		.def("count", &PyIndexFilter::count, "Returns count of ids allowed by the filter.\n")
+
+		.def("contains", &PyIndexFilter::contains, "Returns True if the filter allows id.\n")
+
+		.def("__contains__", &PyIndexFilter::contains)
+
+		.def("__and__", &PyIndexFilter::intersect, py::call_guard<py::gil_scoped_release>())
+
+		.def("__or__", &PyIndexFilter::unite, py::call_guard<py::gil_scoped_release>())
+
+		.def("__sub__", &PyIndexFilter::subtract, py::call_guard<py::gil_scoped_release>())
+			; // IndexFilter
+
+	py::class_<PyDescriptorTags, std::shared_ptr<PyDescriptorTags>>(f, "DescriptorTags",
+		"Integer tags of descriptor ids, e.g. tenant, camera or day, used to make IndexFilter.\n"
+		"\tCreate with PyIFaceEngine.createDescriptorTags. Ids of every tag are kept as a compact bitset,\n"
+		"\tso filters are evaluated by operations on bitsets before the search. Tags may be changed and\n"
+		"\tfilters made from several threads, filters made before are not changed.\n")
+
+		.def("addTag", &PyDescriptorTags::addTag, py::call_guard<py::gil_scoped_release>(),
+			py::arg("tag"),
+			py::arg("ids"),
+			"Tags descriptors.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (int): tag.\n"
+			"\t\tparam2 (list of int): ids of descriptors.\n")
+
+		.def("removeTag", &PyDescriptorTags::removeTag, py::call_guard<py::gil_scoped_release>(),
+			py::arg("tag"),
+			py::arg("ids"),
+			"Removes tag of descriptors.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (int): tag.\n"
+			"\t\tparam2 (list of int): ids of descriptors.\n")
+
+		.def("clear", &PyDescriptorTags::clear, py::call_guard<py::gil_scoped_release>(),
+			py::arg("id"),
+			"Removes all tags of descriptor, call it when the descriptor is removed from the index.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (int): id of descriptor.\n")
+
+		.def("getTags", &PyDescriptorTags::getTags,
+			py::arg("id"),
+			"Returns list of tags of descriptor in ascending order.\n")
+
+		.def("getCount", &PyDescriptorTags::getCount,
+			py::arg("tag"),
+			"Returns count of descriptors with tag.\n")
+
+		.def("filter", &PyDescriptorTags::filter, py::call_guard<py::gil_scoped_release>(),
+			py::arg("allOf") = std::vector<uint32_t>(),
+			py::arg("anyOf") = std::vector<uint32_t>(),
+			py::arg("noneOf") = std::vector<uint32_t>(),
+			"Makes filter of descriptors matching a predicate on tags.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list of int): tags every one of which descriptors must have.\n"
+			"\t\tparam2 (list of int): tags at least one of which descriptors must have, if not empty.\n"
+			"\t\tparam3 (list of int): tags descriptors must not have.\n"
+			"\t\tIf allOf and anyOf are empty, descriptors having any tag are taken.\n"
+			"\tReturns:\n"
+			"\t\t(IndexFilter): filter of descriptor ids\n")
+			; // DescriptorTags
 }
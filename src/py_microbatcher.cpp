@@ -0,0 +1,103 @@
+#include <pybind11/pybind11.h>
+#include <fsdk/FaceEngine.h>
+#include <pybind11/stl.h>
+#include "ErrorsAdapter.hpp"
+#include "FaceEngineAdapter.hpp"
+#include "MicroBatcher.hpp"
+
+namespace py = pybind11;
+
+void microbatcher_module(py::module& f) {
+
+	py::class_<MicroBatchMetrics>(f, "MicroBatchMetrics",
+		"Statistics of micro-batching queue since creation or the last reset.\n")
+		.def_readonly("queueDepth", &MicroBatchMetrics::queueDepth, "Number of requests waiting in queue now\n")
+		.def_readonly("requestCount", &MicroBatchMetrics::requestCount, "Number of processed requests\n")
+		.def_readonly("batchCount", &MicroBatchMetrics::batchCount, "Number of batched SDK calls\n")
+		.def_readonly("deadlineFlushCount", &MicroBatchMetrics::deadlineFlushCount,
+			"Number of batches flushed by latency deadline before reaching max batch size\n")
+		.def_readonly("batchSizeHistogram", &MicroBatchMetrics::batchSizeHistogram,
+			"List where item n is the number of batches of n requests\n")
+		.def_readonly("meanLatencyMs", &MicroBatchMetrics::meanLatencyMs,
+			"Mean time from request submission to its completion in milliseconds\n")
+		.def_readonly("maxLatencyMs", &MicroBatchMetrics::maxLatencyMs,
+			"Max time from request submission to its completion in milliseconds\n")
+		.def("__repr__",
+			[](const MicroBatchMetrics& metrics) {
+				return "MicroBatchMetrics: queueDepth = " + std::to_string(metrics.queueDepth) +
+					", requestCount = " + std::to_string(metrics.requestCount) +
+					", batchCount = " + std::to_string(metrics.batchCount) +
+					", deadlineFlushCount = " + std::to_string(metrics.deadlineFlushCount) +
+					", meanLatencyMs = " + std::to_string(metrics.meanLatencyMs) +
+					", maxLatencyMs = " + std::to_string(metrics.maxLatencyMs);
+			})
+			;
+
+	py::class_<PyMicroBatcher>(f, "MicroBatcher",
+		"Detector and extractor behind micro-batching queues.\n"
+		"\tCreate with createMicroBatcher. Single image requests of many python threads are collected\n"
+		"\tand served by one batched SDK call when maxBatchSize requests are queued or the oldest one\n"
+		"\twaited for maxLatencyMs. Calls block the calling thread with the GIL released.\n")
+
+		.def("detect", &PyMicroBatcher::detect,
+			py::arg("image"),
+			py::arg("rect"),
+			py::arg("detectionPerImageNum") = 1,
+			py::arg("type") = fsdk::dtBBox,
+			py::call_guard<py::gil_scoped_release>(),
+			"Detect faces on image within batch of concurrent requests.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (Image): input image. Format must be R8G8B8\n"
+			"\t\tparam2 (Rect): rectangle of interest\n"
+			"\t\tparam3 (int): max number of detections\n"
+			"\t\tparam4 (DetectionType): type of detection: dtBBox, dt5landmarks or dt68landmarks\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with FSDKErrorResult code and list of Faces\n")
+
+		.def("extract", &PyMicroBatcher::extract,
+			py::arg("warp"),
+			py::call_guard<py::gil_scoped_release>(),
+			"Extract descriptor from warped image within batch of concurrent requests.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (Image): warped image\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with FSDKErrorResult, descriptor and garbage score\n")
+
+		.def("getDetectMetrics", &PyMicroBatcher::getDetectMetrics, "Get statistics of detection queue.\n")
+		.def("getExtractMetrics", &PyMicroBatcher::getExtractMetrics, "Get statistics of extraction queue.\n")
+		.def("resetMetrics", &PyMicroBatcher::resetMetrics, "Reset statistics of both queues.\n")
+		.def("getMaxBatchSize", &PyMicroBatcher::getMaxBatchSize, "Get max number of requests in one SDK call.\n")
+		.def("getMaxLatencyMs", &PyMicroBatcher::getMaxLatencyMs,
+			"Get max time the oldest request waits for the batch to fill in milliseconds.\n")
+		.def("getDescriptorVersion", &PyMicroBatcher::getDescriptorVersion,
+			"Get version of extracted descriptors.\n")
+			;
+
+	f.def("createMicroBatcher", [](
+		PyIFaceEngine& faceEngine,
+		fsdk::ObjectDetectorClassType detectorType,
+		uint32_t descriptorVersion,
+		size_t maxBatchSize,
+		double maxLatencyMs) {
+			return std::unique_ptr<PyMicroBatcher>(new PyMicroBatcher(
+				faceEngine,
+				detectorType,
+				descriptorVersion,
+				maxBatchSize,
+				maxLatencyMs));
+		},
+		py::arg("faceEngine"),
+		py::arg("detectorType") = fsdk::FACE_DET_DEFAULT,
+		py::arg("descriptorVersion") = 0,
+		py::arg("maxBatchSize") = 16,
+		py::arg("maxLatencyMs") = 5.,
+		"Create micro-batching detector and extractor.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (PyIFaceEngine): face engine\n"
+		"\t\tparam2 (ObjectDetectorClassType): detector type\n"
+		"\t\tparam3 (int): descriptor version. If 0 - use default version from config\n"
+		"\t\tparam4 (int): max number of requests in one SDK call\n"
+		"\t\tparam5 (float): max time the oldest request waits for the batch to fill in milliseconds\n"
+		"\tReturns:\n"
+		"\t\t(MicroBatcher): micro batcher object\n");
+}
@@ -0,0 +1,108 @@
+#include <pybind11/pybind11.h>
+#include <fsdk/FaceEngine.h>
+#include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+#include "ErrorsAdapter.hpp"
+#include "FaceEngineAdapter.hpp"
+#include "FacePipeline.hpp"
+#include "NumpyAdapter.hpp"
+
+namespace py = pybind11;
+
+// Images of python list: Image objects are used as is, numpy R8G8B8 frames are wrapped without copying.
+// Wrapped frames are valid only while the list is alive.
+static fsdk::Result<fsdk::Image::Error> imagesFromList(const py::list& list, std::vector<fsdk::Image>& images) {
+	images.reserve(py::len(list));
+	for (const py::handle item : list) {
+		if (py::isinstance<fsdk::Image>(item)) {
+			images.push_back(item.cast<fsdk::Image>());
+			continue;
+		}
+		if (!py::isinstance<py::array>(item))
+			throw py::type_error("FacePipeline.process: images must be Image objects or numpy arrays");
+		py::array array = py::reinterpret_borrow<py::array>(item);
+		fsdk::Image image;
+		bool borrowed = false;
+		fsdk::Result<fsdk::Image::Error> error = imageFromArray(
+			array,
+			fsdk::Format(fsdk::Format::R8G8B8),
+			true,
+			image,
+			borrowed);
+		if (error.isError())
+			return error;
+		images.push_back(image);
+	}
+	return fsdk::makeResult(fsdk::Image::Error::Ok);
+}
+
+void pipeline_module(py::module& f) {
+
+	py::class_<PipelineFace>(f, "PipelineFace",
+		"Face processed by FacePipeline: detection, landmarks, optional warp and position of descriptor in batch.\n")
+		.def_readonly("imageIndex", &PipelineFace::imageIndex, "Index of source image in input list\n")
+		.def_readonly("detection", &PipelineFace::detection, "Face detection\n")
+		.def_readonly("landmarks5", &PipelineFace::landmarks5, "Face landmarks used for warping\n")
+		.def_readonly("warp", &PipelineFace::warp, "Warped image, empty if warps were not requested\n")
+		.def_readonly("descriptorIndex", &PipelineFace::descriptorIndex,
+			"Index of face descriptor in descriptor batch returned with faces\n")
+		.def_readonly("garbageScore", &PipelineFace::garbageScore,
+			"Descriptor score normalized in range [0, 1], 1 - face on the warp; 0 - garbage on the warp\n")
+		.def("__repr__",
+			[](const PipelineFace& face) {
+				return "PipelineFace: imageIndex = " + std::to_string(face.imageIndex) +
+					", descriptorIndex = " + std::to_string(face.descriptorIndex) +
+					", garbageScore = " + std::to_string(face.garbageScore);
+			})
+			;
+
+	py::class_<PyFacePipeline>(f, "FacePipeline",
+		"Detector, warper and extractor chained in one native call.\n"
+		"\tCreate with createFacePipeline. Faces found on all images are extracted with one batch call,\n"
+		"\twarps stay on C++ side unless requested. One pipeline must not be used from several threads at once.\n")
+
+		.def("process", [](
+			PyFacePipeline& pipeline,
+			const py::list& images,
+			uint32_t detectionPerImageNum,
+			bool keepWarps) {
+				std::vector<fsdk::Image> imagesVec;
+				fsdk::Result<fsdk::Image::Error> imageErr = imagesFromList(images, imagesVec);
+				if (imageErr.isError())
+					throw py::value_error(std::string("FacePipeline.process: invalid numpy frame: ") + imageErr.what());
+				py::gil_scoped_release release;
+				return pipeline.process(imagesVec, detectionPerImageNum, keepWarps);
+			},
+			py::arg("images"),
+			py::arg("detectionPerImageNum") = 1,
+			py::arg("keepWarps") = false,
+			"Detect faces, warp them and extract descriptors.\n"
+			"\tArgs:\n"
+			"\t\tparam1 (list): list of R8G8B8 images or numpy frames of shape (height, width, 3) and uint8 type\n"
+			"\t\tparam2 (int): max number of detections per input image\n"
+			"\t\tparam3 (bool): return warped images of faces\n"
+			"\tReturns:\n"
+			"\t\t(tuple): tuple with FSDKErrorResult, list of PipelineFace in order of images and\n"
+			"\t\t\tdescriptor batch with descriptors of faces at PipelineFace.descriptorIndex.\n")
+
+		.def("getDescriptorVersion", &PyFacePipeline::getDescriptorVersion,
+			"Get version of descriptors created by pipeline.\n")
+			;
+
+	f.def("createFacePipeline", [](
+		PyIFaceEngine& faceEngine,
+		fsdk::ObjectDetectorClassType detectorType,
+		uint32_t descriptorVersion) {
+			return PyFacePipeline(faceEngine, detectorType, descriptorVersion);
+		},
+		py::arg("faceEngine"),
+		py::arg("detectorType") = fsdk::FACE_DET_DEFAULT,
+		py::arg("descriptorVersion") = 0,
+		"Create face pipeline: detector, warper and extractor of the face engine.\n"
+		"\tArgs:\n"
+		"\t\tparam1 (PyIFaceEngine): face engine\n"
+		"\t\tparam2 (ObjectDetectorClassType): detector type\n"
+		"\t\tparam3 (int): descriptor version. If 0 - use default version from config\n"
+		"\tReturns:\n"
+		"\t\t(FacePipeline): pipeline object\n");
+}
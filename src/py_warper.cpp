@@ -24,7 +24,7 @@ py::class_<fsdk::IWarperPtr>(f, "IWarperPtr",
 			if (error.isOk())
 				return std::make_tuple(FSDKErrorResult(error), transformedImage);
 			else
-				return std::make_tuple(FSDKErrorResult(error), fsdk::Image()); },
+				return std::make_tuple(FSDKErrorResult(error), fsdk::Image()); }, py::call_guard<py::gil_scoped_release>(),
 		"Warp image\n"
 		"\tArgs:\n"
 		"\t\tparam1 (Image): input image. Format must be R8G8B8\n"
@@ -132,7 +132,7 @@ py::class_<fsdk::IHumanWarperPtr>(f, "IHumanWarperPtr",
 				if (error.isOk())
 					 return std::make_tuple(FSDKErrorResult(error), transformedImage);
 				 else
-					 return std::make_tuple(FSDKErrorResult(error), fsdk::Image()); },
+					 return std::make_tuple(FSDKErrorResult(error), fsdk::Image()); }, py::call_guard<py::gil_scoped_release>(),
 			 "Warp image\n"
 			 "\tArgs:\n"
 			 "\t\tparam1 (human): human detection. The format of image inside must be R8G8B8\n"
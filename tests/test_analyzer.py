@@ -0,0 +1,123 @@
+import unittest
+import argparse
+import sys
+import os
+import numpy as np
+from license_helper import make_activation, ActivationLicenseError
+
+# if FaceEngine is NOT installed within the system, add the directory with FaceEngine*.so to system paths
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", "--bind-path", type=str,
+                    help="path to directory with FaceEngine*.so file - binding of luna-sdk")
+
+args = parser.parse_args()
+
+if len(sys.argv) == 1 or not args.bind_path or not os.path.isdir(args.bind_path):
+    parser.print_help(sys.stderr)
+    sys.exit(1)
+
+path_to_binding = args.bind_path
+print("Directory {0} with python bindings of FaceEngine was included".format(path_to_binding))
+print(sys.argv)
+
+sys.path.append(path_to_binding)
+
+# if FaceEngine is installed within the system only this string of code is required for module importing
+import FaceEngine as fe
+
+testDataPath = "testData"
+
+# erase two first arguments for unittest argument parsing
+del (sys.argv[1])
+del (sys.argv[1])
+
+
+class TestFaceAnalyzer(unittest.TestCase):
+    faceEngine = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.faceEngine = fe.createFaceEngine("data")
+        if not make_activation(cls.faceEngine):
+            raise ActivationLicenseError("License is not activated!")
+        image = fe.Image()
+        err = image.load(os.path.join(testDataPath, "image1.ppm"), fe.FormatType.R8G8B8)
+        cls.assertTrue(cls, err.isOk)
+        detector = cls.faceEngine.createDetector(fe.FACE_DET_V3)
+        err, faces = detector.detect([image], [image.getRect()], 1, fe.DetectionType(fe.dtBBox | fe.dt5Landmarks))
+        cls.assertTrue(cls, err.isOk)
+        face = faces[0][0]
+        warper = cls.faceEngine.createWarper()
+        transformation = warper.createTransformation(face.detection, face.landmarks5_opt.value())
+        err, cls.warp = warper.warp(image, transformation)
+        cls.assertTrue(cls, err.isOk)
+        err, cls.landmarks = warper.warp(face.landmarks5_opt.value(), transformation)
+        cls.assertTrue(cls, err.isOk)
+
+    def testAnalyzeAll(self):
+        analyzer = fe.createFaceAnalyzer(self.faceEngine)
+        self.assertEqual(0, analyzer.getCreatedEstimators())
+        err, results = analyzer.analyze([self.warp, self.warp], fe.arAll, [self.landmarks, self.landmarks])
+        self.assertTrue(err.isOk)
+        self.assertEqual(2, len(results))
+        self.assertEqual(int(fe.arAll), analyzer.getCreatedEstimators())
+
+        err, emotions = self.faceEngine.createEmotionsEstimator().estimate(self.warp)
+        self.assertTrue(err.isOk)
+        err, glasses = self.faceEngine.createGlassesEstimator().estimate(self.warp)
+        self.assertTrue(err.isOk)
+        err, mouth = self.faceEngine.createMouthEstimator().estimate(self.warp)
+        self.assertTrue(err.isOk)
+        for result in results:
+            self.assertEqual(int(fe.arAll), result.estimated)
+            self.assertAlmostEqual(emotions.happiness, result.emotions.happiness, delta=0.001)
+            self.assertEqual(glasses, result.glasses)
+            self.assertAlmostEqual(mouth.smile, result.mouth.smile, delta=0.001)
+            self.assertTrue(result.attributes.age_opt.isValid())
+            self.assertIsNotNone(result.eyes)
+            self.assertIsNotNone(result.medicalMask)
+            self.assertIsNotNone(result.quality)
+
+    def testAnalyzePartial(self):
+        analyzer = fe.createFaceAnalyzer(self.faceEngine, threadCount=2)
+        request = fe.AnalyzerRequest(fe.arEmotions | fe.arGlasses)
+        err, results = analyzer.analyze(np.stack([self.warp.getData()] * 3), request)
+        self.assertTrue(err.isOk)
+        self.assertEqual(3, len(results))
+        self.assertEqual(int(request), analyzer.getCreatedEstimators())
+        for result in results:
+            self.assertIsNotNone(result.emotions)
+            self.assertIsNotNone(result.glasses)
+            self.assertIsNone(result.attributes)
+            self.assertIsNone(result.eyes)
+            self.assertIsNone(result.quality)
+
+        err, results = analyzer.analyze([], fe.arAll)
+        self.assertTrue(err.isOk)
+        self.assertEqual([], results)
+        with self.assertRaises(ValueError):
+            analyzer.analyze([self.warp], fe.arEyes)
+        with self.assertRaises(ValueError):
+            analyzer.analyze([self.warp, self.warp], fe.arEyes, [self.landmarks])
+
+    def testAnalyzeColumns(self):
+        analyzer = fe.createFaceAnalyzer(self.faceEngine, fe.AttributeRequest.estimateAge)
+        request = fe.AnalyzerRequest(fe.arAttributes | fe.arEmotions | fe.arGlasses)
+        err, results = analyzer.analyze([self.warp, self.warp], request)
+        self.assertTrue(err.isOk)
+        err, columns = analyzer.analyze([self.warp, self.warp], request, asColumns=True)
+        self.assertTrue(err.isOk)
+        np.testing.assert_allclose(columns["emotions_happiness"], [r.emotions.happiness for r in results], rtol=1e-6)
+        np.testing.assert_array_equal(columns["glasses"], [int(r.glasses) for r in results])
+        np.testing.assert_array_equal(columns["attributes_age_valid"], [True, True])
+        np.testing.assert_array_equal(columns["attributes_gender_valid"], [False, False])
+        # columns of estimators which were not requested are absent
+        self.assertFalse(any(name.startswith("quality_") for name in columns))
+
+        err, columns = analyzer.analyze([], request, asColumns=True)
+        self.assertTrue(err.isOk)
+        self.assertEqual(0, len(columns["glasses"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
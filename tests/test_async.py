@@ -0,0 +1,135 @@
+import unittest
+import argparse
+import sys
+import os
+import asyncio
+from license_helper import make_activation, ActivationLicenseError
+
+# if FaceEngine is NOT installed within the system, add the directory with FaceEngine*.so to system paths
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", "--bind-path", type=str,
+                    help="path to directory with FaceEngine*.so file - binding of luna-sdk")
+
+args = parser.parse_args()
+
+if len(sys.argv) == 1 or not args.bind_path or not os.path.isdir(args.bind_path):
+    parser.print_help(sys.stderr)
+    sys.exit(1)
+
+path_to_binding = args.bind_path
+print("Directory {0} with python bindings of FaceEngine was included".format(path_to_binding))
+print(sys.argv)
+
+sys.path.append(path_to_binding)
+
+# if FaceEngine is installed within the system only this string of code is required for module importing
+import FaceEngine as fe
+
+testDataPath = "testData"
+
+# erase two first arguments for unittest argument parsing
+del (sys.argv[1])
+del (sys.argv[1])
+
+
+
+class TestAsyncFaceEngine(unittest.TestCase):
+    faceEngine = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.faceEngine = fe.createFaceEngine("data")
+        if not make_activation(cls.faceEngine):
+            raise ActivationLicenseError("License is not activated!")
+        cls.images = []
+        for name in ["image1.ppm", "image_720.jpg"]:
+            image = fe.Image()
+            err = image.load(os.path.join(testDataPath, name), fe.FormatType.R8G8B8)
+            cls.assertTrue(cls, err.isOk)
+            cls.images.append(image)
+
+    def setUp(self):
+        self.asyncEngine = fe.createAsyncFaceEngine(self.faceEngine, 2)
+
+    def tearDown(self):
+        self.asyncEngine.close()
+
+    def testDetectAndExtract(self):
+        detectionType = fe.DetectionType(fe.dtBBox | fe.dt5Landmarks)
+        detector = self.asyncEngine.createDetector(fe.FACE_DET_V3)
+        extractor = self.asyncEngine.createExtractor()
+        matcher = self.asyncEngine.createMatcher()
+        warper = self.faceEngine.createWarper()
+
+        async def run():
+            detections = await asyncio.gather(*[
+                detector.detect_async([image], [image.getRect()], 1, detectionType) for image in self.images])
+            warps = []
+            for image, (err, faces) in zip(self.images, detections):
+                self.assertTrue(err.isOk)
+                face = faces[0][0]
+                transformation = warper.createTransformation(face.detection, face.landmarks5_opt.value())
+                err, warp = warper.warp(image, transformation)
+                self.assertTrue(err.isOk)
+                warps.append(warp)
+            extractions = await asyncio.gather(*[extractor.extract_async(warp) for warp in warps])
+            matches = await asyncio.gather(*[
+                matcher.match_async(descriptor, descriptor) for _, descriptor, _ in extractions])
+            return detections, warps, extractions, matches
+
+        detections, warps, extractions, matches = asyncio.run(run())
+
+        syncDetector = self.faceEngine.createDetector(fe.FACE_DET_V3)
+        syncExtractor = self.faceEngine.createExtractor()
+        syncMatcher = self.faceEngine.createMatcher()
+        for image, warp, (_, faces), (err, descriptor, score), (matchErr, match) in zip(
+                self.images, warps, detections, extractions, matches):
+            _, reference = syncDetector.detect([image], [image.getRect()], 1, detectionType)
+            self.assertAlmostEqual(reference[0][0].detection.rect.x, faces[0][0].detection.rect.x, delta=0.01)
+            self.assertTrue(err.isOk)
+            referenceDescriptor = self.faceEngine.createDescriptor(syncExtractor.getModelVersion())
+            _, referenceScore = syncExtractor.extractFromWarpedImage(warp, referenceDescriptor)
+            self.assertAlmostEqual(referenceScore, score, delta=0.001)
+            _, result = syncMatcher.match(referenceDescriptor, descriptor)
+            self.assertAlmostEqual(1.0, result.similarity, delta=0.001)
+            self.assertTrue(matchErr.isOk)
+            self.assertAlmostEqual(1.0, match.similarity, delta=0.001)
+
+    def testSearch(self):
+        pipeline = fe.createFacePipeline(self.faceEngine, fe.FACE_DET_V3)
+        err, faces, batch = pipeline.process(self.images, 1)
+        self.assertTrue(err.isOk)
+        indexBuilder = self.faceEngine.createIndexBuilder()
+        indexBuilder.appendBatch(batch)
+        err, index = indexBuilder.buildIndex()
+        self.assertTrue(err.isOk)
+        asyncIndex = self.asyncEngine.wrapIndex(index)
+        err, descriptor = batch.getDescriptorSlow(0)
+        self.assertTrue(err.isOk)
+
+        err, results = asyncio.run(asyncIndex.search_async(descriptor, len(faces)))
+        self.assertTrue(err.isOk)
+        _, reference = index.search(descriptor, len(faces))
+        self.assertEqual([r.index for r in reference], [r.index for r in results])
+
+    def testQueueFull(self):
+        asyncEngine = fe.createAsyncFaceEngine(self.faceEngine, 1, 1)
+        detector = asyncEngine.createDetector(fe.FACE_DET_V3)
+        image = self.images[0]
+
+        async def run():
+            futures = []
+            with self.assertRaises(RuntimeError):
+                for _ in range(100):
+                    futures.append(detector.detect_async([image], [image.getRect()], 1, fe.dtBBox))
+            return await asyncio.gather(*futures)
+
+        for err, _ in asyncio.run(run()):
+            self.assertTrue(err.isOk)
+        asyncEngine.close()
+        with self.assertRaises(RuntimeError):
+            detector.detect_async([image], [image.getRect()], 1, fe.dtBBox)
+
+
+if __name__ == '__main__':
+    unittest.main()
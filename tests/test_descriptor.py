@@ -2,6 +2,7 @@ import unittest
 import argparse
 import sys
 import os
+import numpy as np
 from collections import OrderedDict
 from license_helper import make_activation, ActivationLicenseError
 
@@ -590,6 +591,159 @@ class TestFaceEngineRect(unittest.TestCase):
         del extractor
         del batch
 
+    def testBatchNumpy(self):
+        warps = [fe.Image(), fe.Image()]
+        err1 = warps[0].load(os.path.join(self.test_data_path, "warp1.ppm"))
+        self.assertTrue(err1.isOk and warps[0].isValid())
+        err2 = warps[1].load(os.path.join(self.test_data_path, "warp2.ppm"))
+        self.assertTrue(err2.isOk and warps[1].isValid())
+
+        version = 54
+        extractor = self.faceEngine.createExtractor(version)
+        batch = self.faceEngine.createDescriptorBatch(2, version)
+        res_batch, _ = extractor.extractFromWarpedImageBatch(warps, batch, 2)
+        self.assertTrue(res_batch.isOk)
+
+        err, matrix = batch.toNumpy()
+        self.assertTrue(err.isOk)
+        self.assertEqual(np.uint8, matrix.dtype)
+        self.assertEqual((2, batch.getDescriptorSize()), matrix.shape)
+        for i in range(2):
+            _, descriptor = batch.getDescriptorFast(i)
+            self.assertEqual(descriptor.getData(), matrix[i].tobytes())
+
+        err, batch_loaded = fe.IDescriptorBatchPtr.fromNumpy(self.faceEngine, matrix, version)
+        self.assertTrue(err.isOk)
+        self.assertEqual(2, batch_loaded.getCount())
+        self.assertEqual(version, batch_loaded.getModelVersion())
+        err, matrix_loaded = batch_loaded.toNumpy()
+        self.assertTrue(err.isOk)
+        self.assertTrue(np.array_equal(matrix, matrix_loaded))
+
+        # strided rows are accepted as well
+        err, batch_loaded = fe.IDescriptorBatchPtr.fromNumpy(self.faceEngine, np.asfortranarray(matrix), version)
+        self.assertTrue(err.isOk)
+
+        for invalid in [matrix[:, :-1], matrix.astype(np.float32), matrix[0], matrix[:0]]:
+            with self.subTest(shape=invalid.shape, dtype=invalid.dtype):
+                err, _ = fe.IDescriptorBatchPtr.fromNumpy(self.faceEngine, invalid, version)
+                self.assertTrue(err.isError)
+                self.assertEqual(fe.DescriptorBatchError.InvalidInput, err.error)
+
+        err, matrix_empty = self.faceEngine.createDescriptorBatch(2, version).toNumpy()
+        self.assertTrue(err.isOk)
+        self.assertEqual(0, matrix_empty.shape[0])
+
+    def testMatchTopKAndThreshold(self):
+        warps = [fe.Image(), fe.Image()]
+        err1 = warps[0].load(os.path.join(self.test_data_path, "warp1.ppm"))
+        self.assertTrue(err1.isOk and warps[0].isValid())
+        err2 = warps[1].load(os.path.join(self.test_data_path, "warp2.ppm"))
+        self.assertTrue(err2.isOk and warps[1].isValid())
+
+        version = 54
+        extractor = self.faceEngine.createExtractor(version)
+        matcher = self.faceEngine.createMatcher(version)
+        candidates = self.faceEngine.createDescriptorBatch(4, version)
+        res_batch, _ = extractor.extractFromWarpedImageBatch([warps[1], warps[0], warps[1], warps[0]], candidates, 4)
+        self.assertTrue(res_batch.isOk)
+        _, reference = candidates.getDescriptorSlow(1)
+        err, all_results = matcher.match(reference, candidates)
+        self.assertTrue(err.isOk)
+        expected = sorted(range(4), key=lambda i: (all_results[i].distance, i))
+
+        for k in range(1, 5):
+            with self.subTest(k=k):
+                err, results, indices = matcher.match(reference, candidates, k)
+                self.assertTrue(err.isOk)
+                self.assertEqual(expected[:k], indices)
+                for result, index in zip(results, indices):
+                    self.assertEqual(all_results[index].distance, result.distance)
+        err, results, indices = matcher.match(reference, candidates, 5)
+        self.assertTrue(err.isOk)
+        self.assertEqual([], indices)
+
+        threshold = all_results[0].similarity
+        err, results, indices = matcher.match_threshold(reference, candidates, threshold)
+        self.assertTrue(err.isOk)
+        self.assertEqual([i for i in expected if all_results[i].similarity >= threshold], indices)
+        self.assertTrue(all(result.similarity >= threshold for result in results))
+        err, results, indices = matcher.match_threshold(reference, candidates, 1.1)
+        self.assertTrue(err.isOk)
+        self.assertEqual([], indices)
+
+        # results of big batches do not fit into the buffer kept between calls
+        count = 10000
+        big_candidates = self.faceEngine.createDescriptorBatch(count, version)
+        for i in range(count):
+            self.assertTrue(big_candidates.add(candidates, i % 4, 1).isOk)
+        err, all_results = matcher.match(reference, big_candidates)
+        self.assertTrue(err.isOk)
+        expected = sorted(range(count), key=lambda i: (all_results[i].distance, i))
+        err, results, indices = matcher.match(reference, big_candidates, 10)
+        self.assertTrue(err.isOk)
+        self.assertEqual(expected[:10], indices)
+        err, results, indices = matcher.match_threshold(reference, big_candidates, threshold)
+        self.assertTrue(err.isOk)
+        self.assertEqual([i for i in expected if all_results[i].similarity >= threshold], indices)
+
+    def testMatchMatrix(self):
+        warps = [fe.Image(), fe.Image()]
+        err1 = warps[0].load(os.path.join(self.test_data_path, "warp1.ppm"))
+        self.assertTrue(err1.isOk and warps[0].isValid())
+        err2 = warps[1].load(os.path.join(self.test_data_path, "warp2.ppm"))
+        self.assertTrue(err2.isOk and warps[1].isValid())
+
+        version = 54
+        extractor = self.faceEngine.createExtractor(version)
+        matcher = self.faceEngine.createMatcher(version)
+        probes = self.faceEngine.createDescriptorBatch(2, version)
+        res_batch, _ = extractor.extractFromWarpedImageBatch(warps, probes, 2)
+        self.assertTrue(res_batch.isOk)
+        candidates = self.faceEngine.createDescriptorBatch(3, version)
+        res_batch, _ = extractor.extractFromWarpedImageBatch([warps[1], warps[0], warps[1]], candidates, 3)
+        self.assertTrue(res_batch.isOk)
+
+        for threadCount in [0, 1, 3]:
+            with self.subTest(threadCount=threadCount):
+                err, distance, similarity = self.faceEngine.match_matrix(probes, candidates, threadCount)
+                self.assertTrue(err.isOk)
+                self.assertEqual((2, 3), distance.shape)
+                self.assertEqual(np.float32, distance.dtype)
+                self.assertEqual((2, 3), similarity.shape)
+                for i in range(2):
+                    _, probe = probes.getDescriptorFast(i)
+                    err, results = matcher.match(probe, candidates)
+                    self.assertTrue(err.isOk)
+                    for j, result in enumerate(results):
+                        self.assertAlmostEqual(result.distance, distance[i, j], delta=0.0001)
+                        self.assertAlmostEqual(result.similarity, similarity[i, j], delta=0.0001)
+
+        err, distance, _ = self.faceEngine.match_matrix(probes, self.faceEngine.createDescriptorBatch(3, version))
+        self.assertTrue(err.isOk)
+        self.assertEqual((2, 0), distance.shape)
+
+        # candidates of several tiles
+        count = 2500
+        big_candidates = self.faceEngine.createDescriptorBatch(count, version)
+        for i in range(count):
+            self.assertTrue(big_candidates.add(candidates, i % 3, 1).isOk)
+        err, distance, similarity = self.faceEngine.match_matrix(probes, big_candidates)
+        self.assertTrue(err.isOk)
+        self.assertEqual((2, count), distance.shape)
+        for i in range(2):
+            _, probe = probes.getDescriptorFast(i)
+            err, results = matcher.match(probe, big_candidates)
+            self.assertTrue(err.isOk)
+            self.assertTrue(np.allclose([result.distance for result in results], distance[i], atol=0.0001))
+            self.assertTrue(np.allclose([result.similarity for result in results], similarity[i], atol=0.0001))
+
+        other_batch = self.faceEngine.createDescriptorBatch(2, 46)
+        res_batch, _ = self.faceEngine.createExtractor(46).extractFromWarpedImageBatch(warps, other_batch, 2)
+        self.assertTrue(res_batch.isOk)
+        err, _, _ = self.faceEngine.match_matrix(probes, other_batch)
+        self.assertTrue(err.isError)
+
     @unittest.expectedFailure
     def testDescriptorWithoutConfig(self):
         emptyFaceEngine = fe.createFaceEngine("")
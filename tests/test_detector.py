@@ -2,6 +2,7 @@ import unittest
 import argparse
 import sys
 import os
+import numpy as np
 from license_helper import make_activation, ActivationLicenseError
 
 # if FaceEngine is NOT installed within the system, add the directory with FaceEngine*.so to system paths
@@ -216,6 +217,61 @@ class TestFaceEngineDetector(unittest.TestCase):
         self.assertEqual(127, list_of_list_of_detections[0][0].detection.rect.width)
         self.assertEqual(319, list_of_list_of_detections[0][0].detection.rect.height)
 
+    def testDetectArrays(self):
+        images = []
+        for value in ["image1.ppm", "image_720.jpg", "mouth.ppm"]:
+            image = fe.Image()
+            err = image.load(os.path.join(testDataPath, value))
+            self.assertTrue(err.isOk)
+            images.append(image)
+        rectangles = [image.getRect() for image in images]
+        detector = self.faceEngine.createDetector(fe.FACE_DET_V3)
+        detectionType = fe.DetectionType(fe.dtBBox | fe.dt5Landmarks | fe.dt68Landmarks)
+        err, facesList = detector.detect(images, rectangles, 3, detectionType)
+        self.assertTrue(err.isOk)
+        err, arrays = detector.detect_arrays(images, rectangles, 3, detectionType)
+        self.assertTrue(err.isOk)
+        faces = [face for faces in facesList for face in faces]
+        count = len(faces)
+        self.assertEqual((count,), arrays["image_index"].shape)
+        self.assertEqual(np.int32, arrays["image_index"].dtype)
+        self.assertEqual((count, 4), arrays["bbox"].shape)
+        self.assertEqual(np.float32, arrays["bbox"].dtype)
+        self.assertEqual((count, 5, 2), arrays["landmarks5"].shape)
+        self.assertEqual((count, 68, 2), arrays["landmarks68"].shape)
+        self.assertEqual([i for i, faces in enumerate(facesList) for _ in faces], arrays["image_index"].tolist())
+        for i, face in enumerate(faces):
+            rect = face.detection.rect
+            np.testing.assert_allclose([rect.x, rect.y, rect.width, rect.height], arrays["bbox"][i], atol=0.01)
+            self.assertAlmostEqual(face.detection.score, arrays["score"][i], delta=0.0001)
+            landmarks = face.landmarks5_opt.value()
+            for k in range(5):
+                self.assertAlmostEqual(landmarks[k].x, arrays["landmarks5"][i, k, 0], delta=0.01)
+                self.assertAlmostEqual(landmarks[k].y, arrays["landmarks5"][i, k, 1], delta=0.01)
+
+        err, arrays = detector.detect_arrays(images, rectangles, 3, fe.DetectionType(fe.dtBBox))
+        self.assertTrue(err.isOk)
+        self.assertNotIn("landmarks5", arrays)
+        self.assertNotIn("landmarks68", arrays)
+
+    def testHumanDetectArrays(self):
+        humanDetector = self.faceEngine.createHumanDetector()
+        image = fe.Image()
+        err_image = image.load(os.path.join(testDataPath, "0_Parade_marchingband_1_620.ppm"))
+        self.assertTrue(err_image.isOk)
+        detectionType = fe.HumanDetectionType(fe.DCT_ALL)
+        err, humansList = humanDetector.detect([image], [image.getRect()], 10, detectionType)
+        self.assertTrue(err.isOk)
+        err, arrays = humanDetector.detect_arrays([image], [image.getRect()], 10, detectionType)
+        self.assertTrue(err.isOk)
+        count = len(humansList[0])
+        self.assertEqual((count, 4), arrays["bbox"].shape)
+        for i, human in enumerate(humansList[0]):
+            rect = human.detection.rect
+            np.testing.assert_allclose([rect.x, rect.y, rect.width, rect.height], arrays["bbox"][i], atol=0.01)
+        self.assertEqual((count, 17, 2), arrays["landmarks17"].shape)
+        self.assertEqual((count, 17), arrays["landmarks17_score"].shape)
+
     def testRedetectDifferentImages(self):
         images = []
         image_list = ["image1.ppm", "image_720.jpg", "mouth.ppm"]
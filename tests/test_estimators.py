@@ -5,6 +5,7 @@ import sys
 import os
 import logging
 import struct
+import numpy as np
 from license_helper import make_activation, ActivationLicenseError
 
 # if FaceEngine is not installed within the system, add the directory with FaceEngine*.so to system paths
@@ -150,6 +151,23 @@ class TestFaceEngineEstimators(unittest.TestCase):
         self.assertEqual(result1.ethnicity_opt.value().caucasian, result.ethnicity_opt.value().caucasian)
         self.assertEqual(result1.age_opt.value(), result.age_opt.value())
 
+    def testAttributeEstimatorColumns(self):
+        attributeEstimator = self.faceEngine.createAttributeEstimator()
+        image = f.Image()
+        image.load("testData/00205_9501_p.ppm")
+        self.assertTrue(image.isValid())
+        err, list_result, _ = attributeEstimator.estimate([image, image], f.AttributeRequest.estimateAge)
+        self.assertTrue(err.isOk)
+        err, columns, _ = attributeEstimator.estimate([image, image], f.AttributeRequest.estimateAge, asColumns=True)
+        self.assertTrue(err.isOk)
+        np.testing.assert_array_equal(columns["age_valid"], [True, True])
+        np.testing.assert_allclose(columns["age"], [result.age_opt.value() for result in list_result], rtol=1e-6)
+        # attributes which were not requested are masked out
+        np.testing.assert_array_equal(columns["gender_valid"], [False, False])
+        np.testing.assert_array_equal(columns["ethnicity_valid"], [False, False])
+        self.assertTrue(np.isnan(columns["gender"]).all())
+        np.testing.assert_array_equal(columns["ethnicity"], [-1, -1])
+
     def testQualityEstimator(self):
         qualityEstimator = self.faceEngine.createQualityEstimator()
         image = f.Image()
@@ -181,6 +199,27 @@ class TestFaceEngineEstimators(unittest.TestCase):
         self.assertAlmostEqual(quality.gray, qualityRef.gray, delta=refPrecision)
         self.assertAlmostEqual(quality.blur, qualityRef.blur, delta=refPrecision)
 
+    def testQualityEstimatorBatch(self):
+        qualityEstimator = self.faceEngine.createQualityEstimator()
+        image = f.Image()
+        image.load("testData/photo_2017-03-30_14-47-43_p.ppm")
+        self.assertTrue(image.isValid())
+        err, quality = qualityEstimator.estimate_quality(image)
+        self.assertTrue(err.isOk)
+        err, subjective = qualityEstimator.estimate_subjective_quality(image)
+        self.assertTrue(err.isOk)
+        err, columns = qualityEstimator.estimate_quality_batch([image, image])
+        self.assertTrue(err.isOk)
+        for name in ("light", "dark", "gray", "blur"):
+            with self.subTest(name=name):
+                self.assertEqual(columns[name].dtype, np.float32)
+                np.testing.assert_allclose(columns[name], [getattr(quality, name)] * 2, rtol=1e-6)
+        err, columns = qualityEstimator.estimate_subjective_quality_batch([image, image], threadCount=1)
+        self.assertTrue(err.isOk)
+        self.assertEqual(columns["isBlurred"].dtype, np.bool_)
+        np.testing.assert_array_equal(columns["isBlurred"], [subjective.isBlurred] * 2)
+        np.testing.assert_allclose(columns["specularity"], [subjective.specularity] * 2, rtol=1e-6)
+
     def testOverlapEstimator(self):
         image = f.Image()
         err = image.load("testData/overlap_image1.jpg")
@@ -206,6 +245,45 @@ class TestFaceEngineEstimators(unittest.TestCase):
                 self.assertTrue(err.isOk)
                 self.assertEqual(glasses_estimation, glasses_state)
 
+    def testGlassesEstimatorBatch(self):
+        params = {f.GlassesEstimation.NoGlasses: "testData/warp_noglasses.jpg", f.GlassesEstimation.EyeGlasses: "testData/warp_eyeglasses.jpg", f.GlassesEstimation.SunGlasses: "testData/warp_sunglasses.jpg"}
+        warps = []
+        for image_path in params.values():
+            warp = f.Image()
+            err = warp.load(image_path, f.FormatType.R8G8B8)
+            self.assertTrue(err.isOk)
+            warps.append(warp)
+        expected = np.array([int(glasses_state) for glasses_state in params.keys()], dtype=np.int32)
+        glassesEstimator = self.faceEngine.createGlassesEstimator()
+        for threadCount in (0, 1):
+            with self.subTest(threadCount=threadCount):
+                err, columns = glassesEstimator.estimate_batch(warps, threadCount)
+                self.assertTrue(err.isOk)
+                np.testing.assert_array_equal(columns["glasses"], expected)
+        # the same warps given as one numpy array
+        err, columns = glassesEstimator.estimate_batch(np.stack([warp.getData() for warp in warps]))
+        self.assertTrue(err.isOk)
+        np.testing.assert_array_equal(columns["glasses"], expected)
+        err, columns = glassesEstimator.estimate_batch([])
+        self.assertTrue(err.isOk)
+        self.assertEqual(len(columns["glasses"]), 0)
+
+    def testHeadPoseEstimatorBatch(self):
+        image = f.Image()
+        image.load("testData/photo_2017-03-30_14-47-43_p.ppm")
+        face_err, face = detect(image, self.faceEngine)
+        self.assertTrue(face_err.isOk)
+        headPoseEstimator = self.faceEngine.createHeadPoseEstimator()
+        err, headPoseEstimation = headPoseEstimator.estimate(image, face.detection)
+        self.assertTrue(err.isOk)
+        err, columns = headPoseEstimator.estimate_batch([image] * 4, [face.detection] * 4)
+        self.assertTrue(err.isOk)
+        for name in ("pitch", "yaw", "roll"):
+            self.assertEqual(columns[name].dtype, np.float32)
+            np.testing.assert_allclose(columns[name], [getattr(headPoseEstimation, name)] * 4, atol=1e-3)
+        with self.assertRaises(ValueError):
+            headPoseEstimator.estimate_batch([image, image], [face.detection])
+
     def testHeadPoseEstimator(self):
         for i in ('landmarks', 'image'):
             with self.subTest(i=i):
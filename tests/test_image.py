@@ -157,6 +157,148 @@ class TestFaceEngineImage(unittest.TestCase):
         self.assertTrue(image_with_set_data.getChannelSize() == depth_image_load.getChannelSize())
         self.assertTrue(image_with_set_data.getChannelStep() == depth_image_load.getChannelStep())
 
+    def test_get_data_view(self):
+        test_image = f.Image()
+        test_image.load("testData/warp1.ppm", f.FormatType.R8G8B8)
+        view = test_image.getData()
+        copy = test_image.getData(copy=True)
+        self.assertTrue(np.array_equal(view, copy))
+        self.assertTrue(np.array_equal(np.asarray(test_image), copy))
+        # view shares memory with image, copy does not
+        view[0, 0, 0] = 255 - view[0, 0, 0]
+        self.assertEqual(test_image.getData()[0, 0, 0], view[0, 0, 0])
+        self.assertNotEqual(copy[0, 0, 0], view[0, 0, 0])
+        # view keeps image data alive after reloading of the image
+        saved = view.copy()
+        test_image.load("testData/smile.ppm", f.FormatType.R8G8B8)
+        self.assertTrue(np.array_equal(view, saved))
+
+    def test_get_data_padded(self):
+        test_image = f.Image()
+        test_image.load("testData/warp1.ppm", f.FormatType.R8G8B8)
+        rgb = test_image.getData()
+        for format_type in (f.FormatType.B8G8R8X8, f.FormatType.R8G8B8X8):
+            err, padded_image = test_image.convert(format_type)
+            self.assertTrue(err.isOk)
+            padded = padded_image.getData()
+            self.assertEqual(padded.shape, (padded_image.getHeight(), padded_image.getWidth(),
+                                            padded_image.getChannelCount()))
+            self.assertEqual(padded.strides[0], padded_image.computePitch(padded_image.getWidth()))
+            self.assertEqual(padded.strides[1], padded_image.getByteDepth())
+            if format_type == f.FormatType.R8G8B8X8:
+                self.assertTrue(np.array_equal(padded[:, :, :3], rgb))
+            else:
+                self.assertTrue(np.array_equal(padded[:, :, 2::-1], rgb))
+
+    def test_get_data_r16_view(self):
+        depth_image = f.loadImage("testData/warp.depth")
+        view = depth_image.getDataR16()
+        self.assertEqual(view.dtype, np.uint16)
+        self.assertEqual(view.strides[1], 2)
+        self.assertTrue(np.array_equal(view, depth_image.getData(copy=True)))
+        rgb_image = f.Image()
+        rgb_image.load("testData/warp1.ppm")
+        self.assertRaises(ValueError, rgb_image.getDataR16)
+
+    def test_from_array_borrow(self):
+        array = np.random.randint(0, 255, (120, 100, 3), dtype=np.uint8)
+        err, borrowed_image = f.Image.fromArray(array, f.FormatType.R8G8B8)
+        self.assertTrue(err.isOk)
+        self.assertEqual(borrowed_image.getWidth(), 100)
+        self.assertEqual(borrowed_image.getHeight(), 120)
+        self.assertEqual(borrowed_image.getFormat(), f.FormatType.R8G8B8)
+        self.assertTrue(np.array_equal(borrowed_image.getData(), array))
+        # borrowed image shares memory with the array
+        array[0, 0, 0] = 255 - array[0, 0, 0]
+        self.assertEqual(borrowed_image.getData()[0, 0, 0], array[0, 0, 0])
+        # array is kept alive by the image
+        expected = array.copy()
+        del array
+        self.assertTrue(np.array_equal(borrowed_image.getData(), expected))
+        # view of a borrowed image keeps the memory alive after the image and the array are deleted
+        view = borrowed_image.getData()
+        face = f.Face(borrowed_image)
+        del borrowed_image
+        self.assertTrue(np.array_equal(view, expected))
+        # faces keep a copy of borrowed images
+        view[0, 0, 0] = 255 - view[0, 0, 0]
+        self.assertTrue(np.array_equal(face.img.getData(), expected))
+
+        array = np.random.randint(0, 255, (120, 100, 3), dtype=np.uint8)
+        err, copied_image = f.Image.fromArray(array, f.FormatType.R8G8B8, borrow=False)
+        self.assertTrue(err.isOk)
+        array[0, 0, 0] = 255 - array[0, 0, 0]
+        self.assertNotEqual(copied_image.getData()[0, 0, 0], array[0, 0, 0])
+
+    def test_from_array_copy_layout(self):
+        array = np.random.randint(0, 255, (120, 200, 3), dtype=np.uint8)
+        # strided slice and reversed channels are copied with correct layout
+        strided = array[:, ::2, ::-1]
+        err, strided_image = f.Image.fromArray(strided, f.FormatType.R8G8B8)
+        self.assertTrue(err.isOk)
+        self.assertEqual(strided_image.getWidth(), 100)
+        self.assertTrue(np.array_equal(strided_image.getData(), strided))
+        # three channel array is expanded to the padded format
+        err, padded_image = f.Image.fromArray(array, f.FormatType.R8G8B8X8)
+        self.assertTrue(err.isOk)
+        self.assertTrue(np.array_equal(padded_image.getData(), array))
+        # single channel image from two dimensional array
+        gray = np.ascontiguousarray(array[:, :, 0])
+        err, gray_image = f.Image.fromArray(gray, f.FormatType.R8)
+        self.assertTrue(err.isOk)
+        self.assertTrue(np.array_equal(gray_image.getData()[:, :, 0], gray))
+        # flat buffers are reshaped with width and height
+        err, bytes_image = f.Image.fromArray(array.tobytes(), f.FormatType.R8G8B8, width=200, height=120)
+        self.assertTrue(err.isOk)
+        self.assertTrue(np.array_equal(bytes_image.getData(), array))
+        # writeable bytearray is borrowed
+        buffer = bytearray(array.tobytes())
+        err, bytearray_image = f.Image.fromArray(buffer, f.FormatType.R8G8B8, width=200, height=120)
+        self.assertTrue(err.isOk)
+        buffer[0] = 255 - buffer[0]
+        self.assertEqual(bytearray_image.getData()[0, 0, 0], buffer[0])
+
+    def test_from_array_errors(self):
+        array = np.zeros((120, 100, 3), dtype=np.uint8)
+        err, _ = f.Image.fromArray(array.astype(np.float32), f.FormatType.R8G8B8)
+        self.assertEqual(err.error, f.ImageError.InvalidFormat)
+        err, _ = f.Image.fromArray(array.astype(np.uint16), f.FormatType.R8G8B8)
+        self.assertEqual(err.error, f.ImageError.InvalidFormat)
+        err, _ = f.Image.fromArray(array, f.FormatType.R8)
+        self.assertEqual(err.error, f.ImageError.InvalidDataSize)
+        err, _ = f.Image.fromArray(array[:, :, :2], f.FormatType.R8G8B8)
+        self.assertEqual(err.error, f.ImageError.InvalidDataSize)
+        err, _ = f.Image.fromArray(array.tobytes(), f.FormatType.R8G8B8, width=100, height=100)
+        self.assertEqual(err.error, f.ImageError.InvalidDataSize)
+        test_image = f.Image()
+        err = test_image.setData(array[:, :, 0], f.FormatType.R8G8B8)
+        self.assertEqual(err.error, f.ImageError.InvalidDataSize)
+        self.assertFalse(test_image.isValid())
+
+    def test_set_data_strided(self):
+        array = np.random.randint(0, 255, (120, 200, 3), dtype=np.uint8)
+        test_image = f.Image()
+        err = test_image.setData(array[:, 50:150], f.FormatType.R8G8B8)
+        self.assertTrue(err.isOk)
+        self.assertTrue(np.array_equal(test_image.getData(), array[:, 50:150]))
+
+    def test_set_yuv_data(self):
+        width, height = 64, 48
+        yuv = np.random.randint(0, 255, width * height * 3 // 2, dtype=np.uint8)
+        test_image = f.Image()
+        err = test_image.setYUVData(width, height, yuv, f.FormatType.YUV_NV21)
+        self.assertTrue(err.isOk)
+        self.assertEqual(test_image.getWidth(), width)
+        self.assertEqual(test_image.getHeight(), height)
+        self.assertTrue(np.array_equal(test_image.getData().ravel(), yuv))
+        err = test_image.setYUVData(width, height, yuv[:-1], f.FormatType.YUV_NV21)
+        self.assertEqual(err.error, f.ImageError.InvalidDataSize)
+
+    def test_allocate(self):
+        test_image = f.Image(100, 120, f.FormatType.R8G8B8)
+        self.assertTrue(test_image.isValid())
+        self.assertEqual(test_image.getData().shape, (120, 100, 3))
+
     def test_set_data(self):
         print("Tests for image.setData are enabled.")
         test_image1 = f.Image()
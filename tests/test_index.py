@@ -3,6 +3,8 @@ import unittest
 import argparse
 import sys
 import os
+import threading
+import numpy as np
 from license_helper import make_activation, ActivationLicenseError
 
 # if FaceEngine is not installed within the system, add the directory with FaceEngine*.so to system paths
@@ -345,6 +347,355 @@ class TestFaceEngineRect(unittest.TestCase):
         self.assertFalse(err.isOk)
         self.assertEqual(arr, [])
 
+    def testSearchBatch(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        indexPath = testDataPath + "/dense_index"
+        builtIndex.saveToDenseIndex(indexPath)
+        loadedIndex = loadAcquiredDenseIndex(faceEngine, indexPath)
+        queryCount = 20
+        queries = faceEngine.createDescriptorBatch(queryCount)
+        for i in range(queryCount):
+            _, queryDescriptor = batch.getDescriptorFast(i * 7)
+            queries.add(queryDescriptor)
+        for index in [builtIndex, loadedIndex]:
+            for threadCount in [0, 1, 4]:
+                with self.subTest(index=type(index).__name__, threadCount=threadCount):
+                    err, indices, similarity = index.search_batch(queries, searchResultSize, threadCount)
+                    self.assertTrue(err.isOk)
+                    self.assertEqual((queryCount, searchResultSize), indices.shape)
+                    self.assertEqual(np.int64, indices.dtype)
+                    self.assertEqual((queryCount, searchResultSize), similarity.shape)
+                    self.assertEqual(np.float32, similarity.dtype)
+                    for i in range(queryCount):
+                        _, queryDescriptor = queries.getDescriptorFast(i)
+                        err, results = index.search(queryDescriptor, searchResultSize)
+                        self.assertTrue(err.isOk)
+                        self.assertEqual([result.index for result in results], indices[i, :len(results)].tolist())
+                        for j, result in enumerate(results):
+                            self.assertAlmostEqual(result.similarity, similarity[i, j], delta=0.0001)
+                        self.assertTrue(np.all(indices[i, len(results):] == -1))
+
+        err, _, _ = builtIndex.search_batch(queries, 0)
+        self.assertTrue(err.isError)
+        self.assertEqual(fe.FSDKError.InvalidInput, err.error)
+
+    def testMappedIndex(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        indexPath = testDataPath + "/mapped_index"
+        err = faceEngine.saveDenseIndexMmap(indexPath, batch)
+        self.assertTrue(err.isOk)
+        err, mappedIndex = faceEngine.loadDenseIndexMmap(indexPath)
+        self.assertTrue(err.isOk)
+        self.assertEqual(mappedIndex.size(), sizeOfBatch)
+        self.assertEqual(mappedIndex.getDescriptorVersion(), 46)
+        self.assertTrue(mappedIndex.verify().isOk)
+        self.query(batch, mappedIndex, faceEngine, IndexTest(108, 9228))
+        self.assertTrue(np.array_equal(mappedIndex.toNumpy(), batch.toNumpy()))
+        self.assertFalse(mappedIndex.toNumpy().flags.writeable)
+
+        # search is exact, results are the best matches of the whole batch
+        err, matches = faceEngine.createMatcher().match(descriptor, batch)
+        self.assertTrue(err.isOk)
+        expected = sorted(range(len(matches)), key=lambda i: -matches[i].similarity)[:searchResultSize]
+        for threadCount in [0, 1, 4]:
+            with self.subTest(threadCount=threadCount):
+                err, results = mappedIndex.search(descriptor, searchResultSize, threadCount)
+                self.assertTrue(err.isOk)
+                self.assertEqual([result.index for result in results], expected)
+        err, indices, _ = mappedIndex.search_batch(batch, 1)
+        self.assertTrue(err.isOk)
+        self.assertEqual(indices[:, 0].tolist(), list(range(sizeOfBatch)))
+
+        # corrupted descriptors are found by verify, searches do not read the whole file first
+        err, mappedIndex = faceEngine.loadDenseIndexMmap(indexPath)
+        self.assertTrue(err.isOk)
+        matrixOffset = os.path.getsize(indexPath) - mappedIndex.toNumpy().nbytes
+        del mappedIndex
+        with open(indexPath, "r+b") as file:
+            file.seek(matrixOffset)
+            byte = file.read(1)
+            file.seek(matrixOffset)
+            file.write(bytes([byte[0] ^ 0xff]))
+        err, mappedIndex = faceEngine.loadDenseIndexMmap(indexPath)
+        self.assertTrue(err.isOk)
+        self.assertEqual(fe.FSDKError.InvalidInput, mappedIndex.verify().error)
+        del mappedIndex
+        err, mappedIndex = faceEngine.loadDenseIndexMmap(indexPath, verify=True)
+        self.assertEqual(fe.FSDKError.InvalidInput, err.error)
+        self.assertIsNone(mappedIndex)
+
+        # corrupted header is rejected on load
+        with open(indexPath, "r+b") as file:
+            file.seek(20)
+            file.write(b"\xff")
+        err, mappedIndex = faceEngine.loadDenseIndexMmap(indexPath)
+        self.assertTrue(err.isError)
+        self.assertEqual(fe.FSDKError.InvalidInput, err.error)
+        self.assertIsNone(mappedIndex)
+
+    def testShardedIndex(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        shardCount = 4
+        err, shardedIndex = faceEngine.buildShardedIndex(batch, shardCount)
+        self.assertTrue(err.isOk)
+        self.assertEqual(shardedIndex.getShardCount(), shardCount)
+        self.assertEqual(shardedIndex.size(), sizeOfBatch)
+        self.assertEqual(sum(shardedIndex.getShardSizes()), sizeOfBatch)
+        # global ids are positions in batch
+        self.query(batch, shardedIndex, faceEngine, IndexTest(169, 7712))
+        err, results = shardedIndex.search(descriptor, searchResultSize)
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results], reference)
+
+        appendRes = shardedIndex.appendBatch(batch)
+        self.assertTrue(appendRes.isOk)
+        self.assertEqual(appendRes.value, sizeOfBatch)
+        self.assertEqual(shardedIndex.size(), 2 * sizeOfBatch)
+        self.query(batch, shardedIndex, faceEngine, IndexTest(169, 2 * sizeOfBatch))
+        appendRes = shardedIndex.appendDescriptor(batch.getDescriptorFast(7)[1])
+        self.assertTrue(appendRes.isOk)
+        self.assertEqual(appendRes.value, 2 * sizeOfBatch)
+        self.assertTrue(shardedIndex.removeDescriptor(reference[0]).isOk)
+        self.assertEqual(shardedIndex.countOfIndexedDescriptors(), 2 * sizeOfBatch)
+
+        indexPath = testDataPath + "/sharded_index"
+        self.assertTrue(shardedIndex.save(indexPath).isOk)
+        err, loadedIndex = faceEngine.loadShardedIndex(indexPath, 2)
+        self.assertTrue(err.isOk)
+        self.assertEqual(loadedIndex.size(), shardedIndex.size())
+        self.assertEqual(loadedIndex.getShardSizes(), shardedIndex.getShardSizes())
+        for index in [shardedIndex, loadedIndex]:
+            with self.subTest(index=index):
+                err, results = index.search(descriptor, searchResultSize)
+                self.assertTrue(err.isOk)
+                self.assertNotIn(reference[0], [result.index for result in results])
+                err, indices, _ = index.search_batch(batch, 1)
+                self.assertTrue(err.isOk)
+                self.assertEqual(indices.shape, (sizeOfBatch, 1))
+
+        err, _ = faceEngine.buildShardedIndex(batch, 0)
+        self.assertEqual(fe.FSDKError.InvalidInput, err.error)
+        err, _ = faceEngine.loadShardedIndex(testDataPath + "/missing_sharded_index")
+        self.assertEqual(fe.FSDKError.InvalidInput, err.error)
+
+    def testLoggedIndex(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        indexPath = testDataPath + "/logged_index"
+        err, loggedIndex = faceEngine.createLoggedIndex(indexPath, builtIndex)
+        self.assertTrue(err.isOk)
+        emptyLogSize = loggedIndex.getLogSize()
+        self.assertEqual(loggedIndex.size(), sizeOfBatch)
+
+        appendRes = loggedIndex.appendBatch(batch)
+        self.assertTrue(appendRes.isOk)
+        self.assertEqual(appendRes.value, sizeOfBatch)
+        appendRes = loggedIndex.appendDescriptor(descriptor)
+        self.assertTrue(appendRes.isOk)
+        self.assertEqual(appendRes.value, 2 * sizeOfBatch)
+        self.assertTrue(loggedIndex.removeDescriptor(reference[0]).isOk)
+        self.assertGreater(loggedIndex.getLogSize(), emptyLogSize)
+
+        # the snapshot is not saved again, the log is replayed on load
+        err, loadedIndex = faceEngine.loadLoggedIndex(indexPath)
+        self.assertTrue(err.isOk)
+        self.assertEqual(loadedIndex.size(), 2 * sizeOfBatch + 1)
+        self.assertEqual(loadedIndex.countOfIndexedDescriptors(), 2 * sizeOfBatch)
+        self.query(batch, loadedIndex, faceEngine, IndexTest(169, 3 * sizeOfBatch))
+        err, results = loadedIndex.search(descriptor, searchResultSize)
+        self.assertTrue(err.isOk)
+        self.assertEqual(results[0].index, 2 * sizeOfBatch)
+        self.assertNotIn(reference[0], [result.index for result in results])
+
+        # a record torn by a crash is discarded
+        del loadedIndex
+        self.assertTrue(loggedIndex.removeDescriptor(reference[1]).isOk)
+        logSize = os.path.getsize(indexPath + ".log")
+        with open(indexPath + ".log", "r+b") as file:
+            file.truncate(logSize - 2)
+        err, loadedIndex = faceEngine.loadLoggedIndex(indexPath)
+        self.assertTrue(err.isOk)
+        err, results = loadedIndex.search(descriptor, searchResultSize)
+        self.assertIn(reference[1], [result.index for result in results])
+        del loadedIndex
+
+        self.assertTrue(loggedIndex.compact(wait=False).isOk)
+        self.assertTrue(loggedIndex.waitCompaction().isOk)
+        self.assertEqual(loggedIndex.getLogSize(), emptyLogSize)
+        err, loadedIndex = faceEngine.loadLoggedIndex(indexPath)
+        self.assertTrue(err.isOk)
+        self.assertEqual(loadedIndex.size(), loggedIndex.size())
+        self.assertEqual(loadedIndex.countOfIndexedDescriptors(), loggedIndex.countOfIndexedDescriptors())
+
+    def testLoggedIndexSyncRecords(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        indexPath = testDataPath + "/synced_logged_index"
+        err, loggedIndex = faceEngine.createLoggedIndex(indexPath, builtIndex, syncRecords=True)
+        self.assertTrue(err.isOk)
+        appendRes = loggedIndex.appendDescriptor(descriptor)
+        self.assertTrue(appendRes.isOk)
+        self.assertTrue(loggedIndex.removeDescriptor(reference[0]).isOk)
+        # ids never appended are refused before anything is logged
+        logSize = loggedIndex.getLogSize()
+        self.assertEqual(fe.FSDKError.InvalidInput, loggedIndex.removeDescriptor(sizeOfBatch + 1).error)
+        self.assertEqual(loggedIndex.getLogSize(), logSize)
+
+        err, loadedIndex = faceEngine.loadLoggedIndex(indexPath, syncRecords=True)
+        self.assertTrue(err.isOk)
+        self.assertEqual(loadedIndex.size(), sizeOfBatch + 1)
+        self.assertEqual(loadedIndex.countOfIndexedDescriptors(), sizeOfBatch)
+
+    def testConcurrentIndex(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        err, concurrentIndex = faceEngine.createConcurrentIndex(builtIndex, 100)
+        self.assertTrue(err.isOk)
+        self.assertEqual(concurrentIndex.size(), sizeOfBatch)
+        err, results = concurrentIndex.search(descriptor, searchResultSize)
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results], reference)
+
+        # ids are published after the calls returned, so every snapshot taken later must see them
+        appended = []
+        removed = set()
+        failures = []
+        writing = threading.Event()
+        writing.set()
+
+        def write():
+            for i in range(sizeOfBatch):
+                appendRes = concurrentIndex.appendDescriptor(batch.getDescriptorFast(i)[1])
+                if not appendRes.isOk or appendRes.value != sizeOfBatch + i:
+                    failures.append("append {0}".format(i))
+                appended.append(appendRes.value)
+                if i % 5 == 0:
+                    if not concurrentIndex.removeDescriptor(appendRes.value).isOk:
+                        failures.append("remove {0}".format(i))
+                    removed.add(appendRes.value)
+            writing.clear()
+
+        def read():
+            while writing.is_set():
+                count = len(appended)
+                removedBefore = set(removed)
+                snapshot = concurrentIndex.snapshot()
+                if count == 0:
+                    continue
+                lastId = appended[count - 1]
+                if snapshot.size() <= lastId:
+                    failures.append("size {0} of snapshot after id {1}".format(snapshot.size(), lastId))
+                err, results = snapshot.search(batch.getDescriptorFast(lastId - sizeOfBatch)[1], searchResultSize)
+                if not err.isOk:
+                    failures.append("search after id {0}".format(lastId))
+                    continue
+                found = [result.index for result in results]
+                if lastId not in removedBefore and lastId not in found:
+                    failures.append("id {0} is not found".format(lastId))
+                if removedBefore.intersection(found):
+                    failures.append("removed ids {0} are found".format(removedBefore.intersection(found)))
+
+        threads = [threading.Thread(target=write)] + [threading.Thread(target=read) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+        removedCount = (sizeOfBatch + 4) // 5
+        self.assertEqual(concurrentIndex.size(), 2 * sizeOfBatch)
+        self.assertEqual(concurrentIndex.countOfIndexedDescriptors(), 2 * sizeOfBatch - removedCount)
+        self.assertLess(concurrentIndex.getSegmentCount(), 10)
+        self.query(batch, concurrentIndex, faceEngine, IndexTest(169, 2 * sizeOfBatch))
+        snapshot = concurrentIndex.snapshot()
+        self.assertEqual(snapshot.getEpoch(), sizeOfBatch + removedCount)
+        self.assertTrue(snapshot.isRemoved(sizeOfBatch))
+        self.assertTrue(concurrentIndex.removeDescriptor(reference[0]).isOk)
+        self.assertFalse(snapshot.isRemoved(reference[0]))
+        err, indices, _ = snapshot.search_batch(batch, searchResultSize)
+        self.assertTrue(err.isOk)
+        self.assertIn(reference[0], indices)
+        err, indices, _ = concurrentIndex.search_batch(batch, searchResultSize)
+        self.assertTrue(err.isOk)
+        self.assertNotIn(reference[0], indices)
+
+        err, _ = faceEngine.createConcurrentIndex(builtIndex, 0)
+        self.assertEqual(fe.FSDKError.InvalidInput, err.error)
+
+    def testConcurrentIndexOfRemoved(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        self.assertTrue(builtIndex.removeDescriptor(reference[0]).isOk)
+        err, concurrentIndex = faceEngine.createConcurrentIndex(builtIndex, 100, 46)
+        self.assertTrue(err.isOk)
+        self.assertTrue(concurrentIndex.snapshot().isRemoved(reference[0]))
+        self.assertEqual(concurrentIndex.countOfIndexedDescriptors(), sizeOfBatch - 1)
+        # removing it again keeps the count
+        self.assertTrue(concurrentIndex.removeDescriptor(reference[0]).isOk)
+        self.assertEqual(concurrentIndex.countOfIndexedDescriptors(), sizeOfBatch - 1)
+        err, results = concurrentIndex.search(descriptor, searchResultSize)
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results][:searchResultSize - 1], reference[1:])
+
+    def testFilteredSearch(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        err, allResults = builtIndex.search(descriptor, sizeOfBatch)
+        self.assertTrue(err.isOk)
+        tags = faceEngine.createDescriptorTags()
+        evenIds = list(range(0, sizeOfBatch, 2))
+        tags.addTag(1, evenIds)
+        tags.addTag(2, reference[:5])
+        self.assertEqual(tags.getCount(1), len(evenIds))
+        self.assertEqual(tags.getTags(reference[0]), [1, 2] if reference[0] % 2 == 0 else [2])
+
+        # most ids pass the filter, the index is searched for more results
+        err, results = builtIndex.search(descriptor, searchResultSize, tags.filter(anyOf=[1]))
+        self.assertTrue(err.isOk)
+        expected = [result.index for result in allResults if result.index % 2 == 0][:searchResultSize]
+        self.assertEqual([result.index for result in results], expected)
+
+        # few ids pass the filter, their descriptors are matched exactly
+        err, results = builtIndex.search(descriptor, searchResultSize, tags.filter(allOf=[2]))
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results], reference[:5])
+        err, results = builtIndex.search(descriptor, searchResultSize, tags.filter(anyOf=[1], noneOf=[2]))
+        self.assertTrue(err.isOk)
+        self.assertFalse(set(reference[:5]).intersection(result.index for result in results))
+
+        idsFilter = faceEngine.createIndexFilter(reference[3:])
+        self.assertEqual((idsFilter & tags.filter(allOf=[2])).count(), 2)
+        self.assertEqual((idsFilter | tags.filter(allOf=[2])).count(), len(reference))
+        self.assertNotIn(reference[3], idsFilter - tags.filter(allOf=[2]))
+        err, results = builtIndex.search(descriptor, searchResultSize, faceEngine.createIndexFilter([]))
+        self.assertTrue(err.isOk)
+        self.assertEqual(results, [])
+
+        err, concurrentIndex = faceEngine.createConcurrentIndex(builtIndex)
+        self.assertTrue(err.isOk)
+        self.assertTrue(concurrentIndex.removeDescriptor(reference[0]).isOk)
+        tags.clear(reference[0])
+        self.assertEqual(tags.getTags(reference[0]), [])
+        err, results = concurrentIndex.search(descriptor, searchResultSize, tags.filter(allOf=[2]))
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results], reference[1:5])
+        # removed ids are not found even if the filter allows them
+        removedFilter = idsFilter | faceEngine.createIndexFilter([reference[0]])
+        err, results = concurrentIndex.snapshot().search(descriptor, searchResultSize, removedFilter)
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results], reference[3:])
+
+    def testFilteredSearchAfterRemove(self):
+        faceEngine, descriptor, batch = load("descriptor1_46.bin", "batch46_eq1k.bin")
+        builtIndex = buildAcquiredIndexWithBatch(faceEngine, batch)
+        # few ids pass the filter, so they are scanned exactly, the filter is made before the removal
+        idsFilter = faceEngine.createIndexFilter(reference)
+        self.assertTrue(builtIndex.removeDescriptor(reference[0]).isOk)
+        err, results = builtIndex.search(descriptor, searchResultSize, idsFilter)
+        self.assertTrue(err.isOk)
+        self.assertEqual([result.index for result in results], reference[1:])
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,110 @@
+import unittest
+import argparse
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from license_helper import make_activation, ActivationLicenseError
+
+# if FaceEngine is NOT installed within the system, add the directory with FaceEngine*.so to system paths
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", "--bind-path", type=str,
+                    help="path to directory with FaceEngine*.so file - binding of luna-sdk")
+
+args = parser.parse_args()
+
+if len(sys.argv) == 1 or not args.bind_path or not os.path.isdir(args.bind_path):
+    parser.print_help(sys.stderr)
+    sys.exit(1)
+
+path_to_binding = args.bind_path
+print("Directory {0} with python bindings of FaceEngine was included".format(path_to_binding))
+print(sys.argv)
+
+sys.path.append(path_to_binding)
+
+# if FaceEngine is installed within the system only this string of code is required for module importing
+import FaceEngine as fe
+
+testDataPath = "testData"
+
+# erase two first arguments for unittest argument parsing
+del (sys.argv[1])
+del (sys.argv[1])
+
+
+
+class TestMicroBatcher(unittest.TestCase):
+    faceEngine = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.faceEngine = fe.createFaceEngine("data")
+        if not make_activation(cls.faceEngine):
+            raise ActivationLicenseError("License is not activated!")
+        cls.images = []
+        for name in ["image1.ppm", "image_720.jpg"]:
+            image = fe.Image()
+            err = image.load(os.path.join(testDataPath, name), fe.FormatType.R8G8B8)
+            cls.assertTrue(cls, err.isOk)
+            cls.images.append(image)
+
+    def testDetectConcurrent(self):
+        detectionType = fe.DetectionType(fe.dtBBox | fe.dt5Landmarks)
+        batcher = fe.createMicroBatcher(self.faceEngine, fe.FACE_DET_V3, 0, 8, 50.0)
+        detector = self.faceEngine.createDetector(fe.FACE_DET_V3)
+        requests = self.images * 16
+
+        with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+            results = list(pool.map(
+                lambda image: batcher.detect(image, image.getRect(), 1, detectionType), requests))
+
+        for image, (err, faces) in zip(requests, results):
+            self.assertTrue(err.isOk)
+            _, reference = detector.detect([image], [image.getRect()], 1, detectionType)
+            self.assertEqual(len(reference[0]), len(faces))
+            self.assertAlmostEqual(reference[0][0].detection.rect.x, faces[0].detection.rect.x, delta=0.01)
+
+        metrics = batcher.getDetectMetrics()
+        self.assertEqual(len(requests), metrics.requestCount)
+        self.assertEqual(0, metrics.queueDepth)
+        self.assertEqual(9, len(metrics.batchSizeHistogram))
+        self.assertEqual(metrics.batchCount, sum(metrics.batchSizeHistogram))
+        self.assertEqual(len(requests), sum(size * count for size, count in enumerate(metrics.batchSizeHistogram)))
+        self.assertLess(metrics.batchCount, len(requests))
+        self.assertGreaterEqual(metrics.maxLatencyMs, metrics.meanLatencyMs)
+
+        batcher.resetMetrics()
+        self.assertEqual(0, batcher.getDetectMetrics().requestCount)
+
+    def testExtract(self):
+        batcher = fe.createMicroBatcher(self.faceEngine, fe.FACE_DET_V3, 0, 4, 1.0)
+        detector = self.faceEngine.createDetector(fe.FACE_DET_V3)
+        warper = self.faceEngine.createWarper()
+        extractor = self.faceEngine.createExtractor(batcher.getDescriptorVersion())
+        matcher = self.faceEngine.createMatcher(batcher.getDescriptorVersion())
+        warps = []
+        for image in self.images:
+            err, faces = detector.detect([image], [image.getRect()], 1, fe.DetectionType(fe.dtBBox | fe.dt5Landmarks))
+            self.assertTrue(err.isOk)
+            face = faces[0][0]
+            err, warp = warper.warp(image, warper.createTransformation(face.detection, face.landmarks5_opt.value()))
+            self.assertTrue(err.isOk)
+            warps.append(warp)
+
+        with ThreadPoolExecutor(max_workers=len(warps)) as pool:
+            results = list(pool.map(batcher.extract, warps))
+
+        for warp, (err, descriptor, score) in zip(warps, results):
+            self.assertTrue(err.isOk)
+            reference = self.faceEngine.createDescriptor(batcher.getDescriptorVersion())
+            _, referenceScore = extractor.extractFromWarpedImage(warp, reference)
+            self.assertAlmostEqual(referenceScore, score, delta=0.001)
+            _, result = matcher.match(reference, descriptor)
+            self.assertAlmostEqual(1.0, result.similarity, delta=0.001)
+        self.assertEqual(len(warps), batcher.getExtractMetrics().requestCount)
+        self.assertEqual(4, batcher.getMaxBatchSize())
+        self.assertAlmostEqual(1.0, batcher.getMaxLatencyMs())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import argparse
+import sys
+import os
+import numpy as np
+from license_helper import make_activation, ActivationLicenseError
+
+# if FaceEngine is NOT installed within the system, add the directory with FaceEngine*.so to system paths
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", "--bind-path", type=str,
+                    help="path to directory with FaceEngine*.so file - binding of luna-sdk")
+
+args = parser.parse_args()
+
+if len(sys.argv) == 1 or not args.bind_path or not os.path.isdir(args.bind_path):
+    parser.print_help(sys.stderr)
+    sys.exit(1)
+
+path_to_binding = args.bind_path
+print("Directory {0} with python bindings of FaceEngine was included".format(path_to_binding))
+print(sys.argv)
+
+sys.path.append(path_to_binding)
+
+# if FaceEngine is installed within the system only this string of code is required for module importing
+import FaceEngine as fe
+
+testDataPath = "testData"
+
+# erase two first arguments for unittest argument parsing
+del (sys.argv[1])
+del (sys.argv[1])
+
+
+class TestFacePipeline(unittest.TestCase):
+    faceEngine = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.faceEngine = fe.createFaceEngine("data")
+        if not make_activation(cls.faceEngine):
+            raise ActivationLicenseError("License is not activated!")
+        cls.images = []
+        for name in ["image1.ppm", "image_720.jpg"]:
+            image = fe.Image()
+            err = image.load(os.path.join(testDataPath, name), fe.FormatType.R8G8B8)
+            cls.assertTrue(cls, err.isOk)
+            cls.images.append(image)
+
+    def extractReference(self, image, detector, warper, extractor, version):
+        err, faces = detector.detect([image], [image.getRect()], 1, fe.DetectionType(fe.dtBBox | fe.dt5Landmarks))
+        self.assertTrue(err.isOk)
+        face = faces[0][0]
+        transformation = warper.createTransformation(face.detection, face.landmarks5_opt.value())
+        err, warp = warper.warp(image, transformation)
+        self.assertTrue(err.isOk)
+        descriptor = self.faceEngine.createDescriptor(version)
+        err, _ = extractor.extractFromWarpedImage(warp, descriptor)
+        self.assertTrue(err.isOk)
+        return face, descriptor
+
+    def testProcess(self):
+        pipeline = fe.createFacePipeline(self.faceEngine, fe.FACE_DET_V3)
+        version = pipeline.getDescriptorVersion()
+        err, faces, batch = pipeline.process(self.images, 1)
+        self.assertTrue(err.isOk)
+        self.assertEqual(len(self.images), len(faces))
+        self.assertEqual(len(faces), batch.getCount())
+        self.assertEqual(version, batch.getModelVersion())
+
+        detector = self.faceEngine.createDetector(fe.FACE_DET_V3)
+        warper = self.faceEngine.createWarper()
+        extractor = self.faceEngine.createExtractor(version)
+        matcher = self.faceEngine.createMatcher(version)
+        for i, face in enumerate(faces):
+            self.assertEqual(i, face.imageIndex)
+            self.assertFalse(face.warp.isValid())
+            reference_face, reference_descriptor = self.extractReference(
+                self.images[i], detector, warper, extractor, version)
+            self.assertAlmostEqual(reference_face.detection.rect.x, face.detection.rect.x, delta=0.01)
+            self.assertAlmostEqual(reference_face.detection.rect.y, face.detection.rect.y, delta=0.01)
+            err, descriptor = batch.getDescriptorSlow(face.descriptorIndex)
+            self.assertTrue(err.isOk)
+            err, result = matcher.match(reference_descriptor, descriptor)
+            self.assertTrue(err.isOk)
+            self.assertAlmostEqual(1.0, result.similarity, delta=0.001)
+
+    def testProcessNumpyAndWarps(self):
+        pipeline = fe.createFacePipeline(self.faceEngine, fe.FACE_DET_V3)
+        frames = [image.getData(copy=True) for image in self.images]
+        err, faces, batch = pipeline.process(frames, 1, True)
+        self.assertTrue(err.isOk)
+        err, reference_faces, reference_batch = pipeline.process(self.images, 1)
+        self.assertTrue(err.isOk)
+        self.assertEqual(len(reference_faces), len(faces))
+        for face in faces:
+            self.assertTrue(face.warp.isValid())
+        err, reference = reference_batch.toNumpy()
+        self.assertTrue(err.isOk)
+        err, matrix = batch.toNumpy()
+        self.assertTrue(err.isOk)
+        self.assertTrue(np.array_equal(reference, matrix))
+
+        with self.assertRaises(ValueError):
+            pipeline.process([np.zeros((10, 10), dtype=np.uint8)])
+        with self.assertRaises(TypeError):
+            pipeline.process(["image"])
+
+    def testProcessEmpty(self):
+        pipeline = fe.createFacePipeline(self.faceEngine, fe.FACE_DET_V3)
+        err, faces, _ = pipeline.process([])
+        self.assertTrue(err.isOk)
+        self.assertEqual([], faces)
+        blank = fe.Image(640, 480, fe.FormatType.R8G8B8)
+        blank.getData()[:] = 0
+        err, faces, batch = pipeline.process([blank])
+        self.assertTrue(err.isOk)
+        self.assertEqual([], faces)
+        self.assertEqual(0, batch.getCount())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import argparse
+import sys
+import os
+import threading
+from license_helper import make_activation, ActivationLicenseError
+
+# if FaceEngine is NOT installed within the system, add the directory with FaceEngine*.so to system paths
+parser = argparse.ArgumentParser()
+parser.add_argument("-b", "--bind-path", type=str,
+                    help="path to directory with FaceEngine*.so file - binding of luna-sdk")
+
+args = parser.parse_args()
+
+if len(sys.argv) == 1 or not args.bind_path or not os.path.isdir(args.bind_path):
+    parser.print_help(sys.stderr)
+    sys.exit(1)
+
+path_to_binding = args.bind_path
+print("Directory {0} with python bindings of FaceEngine was included".format(path_to_binding))
+print(sys.argv)
+
+sys.path.append(path_to_binding)
+
+# if FaceEngine is installed within the system only this string of code is required for module importing
+import FaceEngine as fe
+import TrackEngine as te
+
+testDataPath = "testData"
+
+# erase two first arguments for unittest argument parsing
+del (sys.argv[1])
+del (sys.argv[1])
+
+
+class TestStreamCallbacks(unittest.TestCase):
+    faceEngine = None
+    trackEngine = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.faceEngine = fe.createFaceEngine("data")
+        if not make_activation(cls.faceEngine):
+            raise ActivationLicenseError("License is not activated!")
+        cls.trackEngine = te.createTrackEngine(cls.faceEngine, "data/trackengine.conf")
+        cls.image = fe.Image()
+        err = cls.image.load(os.path.join(testDataPath, "image1.ppm"), fe.FormatType.R8G8B8)
+        cls.assertTrue(cls, err.isOk)
+
+    def testResubscribeFromCallback(self):
+        stream = self.trackEngine.createStream(1024, te.opDropOldest)
+        resubscribed = threading.Event()
+        delivered = threading.Event()
+
+        def second(callbacks):
+            delivered.set()
+
+        def first(callbacks):
+            # the dispatcher delivering this list is replaced by the one of the new function
+            stream.setCallback(second, [te.ctVisual])
+            resubscribed.set()
+
+        stream.setCallback(first, [te.ctVisual])
+        frameId = 0
+        while not resubscribed.wait(0.01) and frameId < 100:
+            self.assertTrue(stream.pushFrame(self.image, frameId))
+            frameId += 1
+        self.assertTrue(resubscribed.is_set())
+        for _ in range(20):
+            self.assertTrue(stream.pushFrame(self.image, frameId))
+            frameId += 1
+        stream.waitStream()
+        self.assertTrue(delivered.wait(5))
+        stream.setCallback(None)
+
+
+if __name__ == '__main__':
+    unittest.main()